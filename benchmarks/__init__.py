@@ -0,0 +1,5 @@
+"""
+Benchmarks for Cron GUI.
+
+Run with ``python -m benchmarks.run`` from the repository root.
+"""
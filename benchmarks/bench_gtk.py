@@ -0,0 +1,96 @@
+"""
+Headless GTK benchmarks for the job list.
+
+These need GTK 4 and a display. Run them under a virtual display, e.g.
+``xvfb-run python -m benchmarks.run --group gtk`` or with
+``GDK_BACKEND=broadway`` and a running broadwayd.
+"""
+
+from typing import List
+
+from benchmarks.bench_manager import open_manager, tabfile
+from benchmarks.harness import benchmark
+
+
+def gtk_available() -> bool:
+    """Check whether GTK 4 can be initialized in this environment."""
+    try:
+        import gi
+
+        gi.require_version("Gtk", "4.0")
+        from gi.repository import Gtk
+
+        return Gtk.init_check()
+    except (ImportError, ValueError):
+        return False
+
+
+def _drain_main_loop():
+    """Run pending GLib work so layout/filter costs are included."""
+    from gi.repository import GLib
+
+    context = GLib.MainContext.default()
+    while context.pending():
+        context.iteration(False)
+
+
+def _jobs(count: int) -> List[dict]:
+    """Get job dictionaries from a generated crontab of ``count`` lines."""
+    return open_manager(tabfile(count)).list_jobs()
+
+
+def register(sizes: List[int]):
+    """Register GTK benchmarks for each job count."""
+    if not gtk_available():
+        return
+
+    from cron_gui.job_list import JobListView
+
+    def noop(*args):
+        pass
+
+    for size in sizes:
+        jobs = _jobs(size)
+
+        @benchmark(f"gtk.update_jobs[{size}]", "gtk", rounds=3)
+        def _update_jobs(jobs=jobs):
+            view = JobListView(on_edit=noop, on_delete=noop, on_toggle=noop)
+
+            def run():
+                view.update_jobs(jobs)
+                _drain_main_loop()
+
+            return run, len(jobs)
+
+        @benchmark(f"gtk.filter[{size}]", "gtk", rounds=3)
+        def _filter(jobs=jobs):
+            view = JobListView(on_edit=noop, on_delete=noop, on_toggle=noop)
+            view.update_jobs(jobs)
+            _drain_main_loop()
+            queries = ["backup", "billing", "*/5", "", "zzz-no-match", ""]
+
+            def run():
+                for query in queries:
+                    view.set_search_text(query)
+                    _drain_main_loop()
+
+            return run, len(queries)
+
+        @benchmark(f"gtk.sort[{size}]", "gtk", rounds=3)
+        def _sort(jobs=jobs):
+            view = JobListView(on_edit=noop, on_delete=noop, on_toggle=noop)
+            view.update_jobs(jobs)
+            _drain_main_loop()
+            orders = [
+                ("command", "none", False),
+                ("next_run", "next_run", False),
+                ("enabled", "command", True),
+                ("file", "none", False),
+            ]
+
+            def run():
+                for order in orders:
+                    view.set_sort(*order)
+                    _drain_main_loop()
+
+            return run, len(orders)
@@ -0,0 +1,429 @@
+"""
+Benchmarks for cron_gui.cron_manager against generated tabfiles.
+"""
+
+import atexit
+import io
+import os
+import random
+import shutil
+import tempfile
+from datetime import date
+from typing import Dict, List
+
+from benchmarks.generate_crontab import write_crontab
+from benchmarks.harness import benchmark
+from cron_gui.command_check import CommandChecker, check_key
+from cron_gui.cron_backend import CrontabBackend, SshTransport
+from cron_gui.cron_manager import CronManager
+from cron_gui.crontab_document import CronLine, CrontabDocument, format_job, iter_jobs
+from cron_gui.crontab_lint import CrontabLinter
+from cron_gui.edit_journal import EditJournal, content_hash
+from cron_gui.fleet_diff import CrontabState, diff_states
+from cron_gui.fleet_manager import FleetManager, ssh_backends
+from cron_gui.history_store import HistoryStore
+from cron_gui.job_duplicates import find_duplicates
+from cron_gui.job_sort import JobKeys, rank_jobs
+from cron_gui.job_templates import JobTemplate, read_parameters
+from cron_gui.schedule_calendar import ScheduleCalendar
+from cron_gui.startup_cache import StartupCache
+
+_TMPDIR = tempfile.mkdtemp(prefix="cron_gui_bench_")
+atexit.register(shutil.rmtree, _TMPDIR, ignore_errors=True)
+
+
+def tabfile(lines: int) -> str:
+    """Get the path of a generated crontab with the given number of lines."""
+    path = os.path.join(_TMPDIR, f"crontab-{lines}")
+    if not os.path.exists(path):
+        write_crontab(path, lines)
+    return path
+
+
+def open_manager(path: str) -> CronManager:
+    """Open a tabfile with an in-memory journal and a throwaway history."""
+    history = HistoryStore(os.path.join(_TMPDIR, "history", os.path.basename(path)))
+    return CronManager(tabfile=path, journal=EditJournal(), history=history)
+
+
+def open_remote(backend: CrontabBackend) -> CronManager:
+    """Open a backend with an in-memory journal and a throwaway history."""
+    name = content_hash(backend.describe())
+    history = HistoryStore(os.path.join(_TMPDIR, "history", name))
+    return CronManager(backend=backend, journal=EditJournal(), history=history)
+
+
+def fake_fleet(hosts: int, lines: int, latency: float) -> List[CrontabBackend]:
+    """
+    Create SSH backends of hosts served by the fake_ssh.sh stand-in.
+
+    Args:
+        hosts: Number of hosts
+        lines: Lines of each host's crontab
+        latency: Seconds every ssh command takes, like a round trip
+    """
+    root = os.path.join(_TMPDIR, f"fleet-{hosts}x{lines}")
+    if not os.path.exists(root):
+        for idx in range(hosts):
+            os.makedirs(os.path.join(root, f"host{idx:03d}"))
+            shutil.copyfile(
+                tabfile(lines), os.path.join(root, f"host{idx:03d}", "default")
+            )
+    os.environ["FAKE_SSH_ROOT"] = root
+    os.environ["FAKE_SSH_LATENCY"] = str(latency)
+    fake_ssh = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fake_ssh.sh")
+    transport = SshTransport(ssh=["sh", fake_ssh])
+    return ssh_backends(((f"host{idx:03d}", None) for idx in range(hosts)), transport)
+
+
+def drifted_hosts(hosts: int, jobs: int) -> List[List[CronLine]]:
+    """
+    Create the job lines of hosts that mostly share one crontab.
+
+    Every host reschedules one job, lacks another and has one of its own.
+    """
+    with open(tabfile(jobs * 2), "r", encoding="utf-8") as fh:
+        shared = CrontabDocument.parse(fh.read()).jobs()[:jobs]
+    fleet = []
+    for idx in range(hosts):
+        lines = list(shared)
+        changed = lines[idx % jobs]
+        lines[idx % jobs] = CronLine(format_job("7 7 * * *", changed.command))
+        del lines[(idx * 7 + 1) % jobs]
+        lines.append(CronLine(format_job("@hourly", f"/usr/local/bin/only-{idx}")))
+        fleet.append(lines)
+    return fleet
+
+
+def copied_jobs(count: int) -> List[Dict]:
+    """
+    Create jobs of a crontab full of edited copies.
+
+    Every command exists in about five versions with another argument, so
+    near-identical commands are spread over the whole crontab.
+    """
+    rng = random.Random(43)
+    tools = ["sync", "backup", "report", "clean", "rotate", "index", "mail", "dump"]
+    jobs = []
+    for idx in range(count):
+        command = (
+            f"/opt/{rng.choice(tools)}{idx % (count // 5 or 1)}/bin/run "
+            f"--mode {rng.choice(tools)} --id {rng.randrange(5000)}"
+        )
+        schedule = f"{rng.randrange(60)} {rng.randrange(24)} * * *"
+        jobs.append(
+            {"id": idx, "command": command, "schedule": schedule, "enabled": True}
+        )
+    return jobs
+
+
+def tenant_csv(count: int) -> str:
+    """Build a CSV parameter list of tenants and their databases."""
+    rows = ["tenant,db"]
+    rows.extend(f"t{idx},db{idx % 97}" for idx in range(count))
+    return "\n".join(rows) + "\n"
+
+
+TENANT_TEMPLATE = JobTemplate(
+    "0 2 * * *",
+    "/opt/backup --tenant={{tenant}} --db={{db}} >> /var/log/{{tenant}}.log",
+    "backup {{tenant}} #{{n}}",
+    stagger=60,
+)
+
+
+def register(sizes: List[int]):
+    """Register manager benchmarks for each crontab size."""
+
+    # 200 hosts answering after 50 ms, like a fleet in another data center
+    @benchmark("fleet.open[200]", "manager", rounds=3)
+    def _fleet_open():
+        backends = fake_fleet(200, 100, 0.05)
+
+        def run():
+            fleet = FleetManager(backends, manager_factory=open_remote)
+            assert not fleet.errors, fleet.errors
+
+        return run, 200
+
+    @benchmark("fleet.reload[200]", "manager", rounds=3)
+    def _fleet_reload():
+        fleet = FleetManager(fake_fleet(200, 100, 0.05), manager_factory=open_remote)
+
+        def run():
+            fleet.reload()
+
+        return run, 200
+
+    @benchmark("fleet.diff[500x1000]", "manager", rounds=3)
+    def _fleet_diff():
+        states = [
+            CrontabState(f"host{idx:03d}", lines)
+            for idx, lines in enumerate(drifted_hosts(500, 1000))
+        ]
+
+        def run():
+            target, diffs = diff_states(states)
+            assert all(len(diff.extra) == 1 for diff in diffs)
+
+        return run, 500 * 1000
+
+    @benchmark("fleet.state[500x1000]", "manager", rounds=3)
+    def _fleet_states():
+        hosts = drifted_hosts(500, 1000)
+
+        def run():
+            for idx, lines in enumerate(hosts):
+                CrontabState(f"host{idx:03d}", lines)
+
+        return run, 500 * 1000
+
+    @benchmark("duplicates.similar[100000]", "manager", rounds=1)
+    def _similar():
+        jobs = copied_jobs(100000)
+
+        def run():
+            find_duplicates(jobs)
+
+        return run, len(jobs)
+
+    @benchmark("templates.expand[50000]", "manager", rounds=3)
+    def _templates_expand():
+        text = tenant_csv(50000)
+
+        def run():
+            for _ in TENANT_TEMPLATE.expand(read_parameters(io.StringIO(text))):
+                pass
+
+        return run, 50000
+
+    @benchmark("manager.add_jobs[50000]", "manager", rounds=3)
+    def _add_jobs():
+        rows = read_parameters(io.StringIO(tenant_csv(50000)))
+        jobs = [job[1:] for job in TENANT_TEMPLATE.expand(rows)]
+        path = os.path.join(_TMPDIR, "add-jobs")
+
+        def run():
+            # Into an empty crontab each round, in one write
+            open(path, "w").close()
+            assert open_manager(path).add_jobs(jobs)
+
+        return run, len(jobs)
+
+    for size in sizes:
+
+        @benchmark(f"manager.load[{size}]", "manager", rounds=3)
+        def _load(size=size):
+            path = tabfile(size)
+
+            def run():
+                open_manager(path)
+
+            return run, size
+
+        @benchmark(f"manager.load_cached[{size}]", "manager", rounds=3)
+        def _load_cached(size=size):
+            path = tabfile(size)
+            cache = StartupCache(os.path.join(_TMPDIR, "startup"))
+            manager = open_manager(path)
+            jobs = manager.list_jobs()
+            linter = CrontabLinter()
+            linter.lint(jobs)
+            cache.save(
+                manager.source,
+                manager.fingerprint,
+                manager.document.render(),
+                jobs,
+                *linter.cached_state(),
+            )
+
+            def run():
+                # What the window does before the crontab is read again
+                history = os.path.join(_TMPDIR, "history", os.path.basename(path))
+                cached = CronManager(
+                    tabfile=path,
+                    journal=EditJournal(),
+                    history=HistoryStore(history),
+                    cache=cache,
+                )
+                linter = CrontabLinter()
+                linter.prime(cached.cached.lint, cached.cached.schedules)
+                linter.lint(cached.list_jobs())
+
+            return run, size
+
+        @benchmark(f"document.parse[{size}]", "manager", rounds=3)
+        def _parse(size=size):
+            with open(tabfile(size), "r", encoding="utf-8") as fh:
+                text = fh.read()
+
+            def run():
+                CrontabDocument.parse(text)
+
+            return run, size
+
+        @benchmark(f"document.stream_jobs[{size}]", "manager", rounds=3)
+        def _stream(size=size):
+            with open(tabfile(size), "rb") as fh:
+                data = fh.read()
+
+            def run():
+                for line in iter_jobs(data):
+                    line.schedule
+
+            return run, size
+
+        @benchmark(f"manager.list_jobs[{size}]", "manager", rounds=3)
+        def _list_jobs(size=size):
+            manager = open_manager(tabfile(size))
+
+            def run():
+                manager.list_jobs()
+
+            return run, size
+
+        @benchmark(f"history.commit[{size}]", "manager", rounds=3)
+        def _history_commit(size=size):
+            with open(tabfile(size), "r", encoding="utf-8") as fh:
+                lines = fh.read().split("\n")
+            store = HistoryStore(os.path.join(_TMPDIR, "history", f"commit-{size}"))
+            state = {"version": 0}
+
+            def run():
+                # One edited line per version, like a typical GUI edit
+                state["version"] += 1
+                lines[state["version"] % len(lines)] += " # edited"
+                store.commit("\n".join(lines), "Edit job")
+
+            return run, 1
+
+        @benchmark(f"jobs.rank_next_run[{size}]", "manager", rounds=3)
+        def _rank(size=size):
+            jobs = open_manager(tabfile(size)).list_jobs()
+            keys = [JobKeys(job) for job in jobs]
+            # Warm the cached keys; later rankings only sort
+            rank_jobs(keys, "next_run", "next_run")
+
+            def run():
+                rank_jobs(keys, "next_run", "next_run")
+
+            return run, len(keys)
+
+        @benchmark(f"lint.jobs[{size}]", "manager", rounds=3)
+        def _lint(size=size):
+            jobs = open_manager(tabfile(size)).list_jobs()
+
+            def run():
+                CrontabLinter().lint(jobs)
+
+            return run, len(jobs)
+
+        @benchmark(f"lint.cached[{size}]", "manager", rounds=3)
+        def _lint_cached(size=size):
+            jobs = open_manager(tabfile(size)).list_jobs()
+            linter = CrontabLinter()
+            # Like relinting after an edit: every job but one is cached
+            linter.lint(jobs[1:])
+
+            def run():
+                linter.lint(jobs)
+
+            return run, len(jobs)
+
+        @benchmark(f"checks.commands[{size}]", "manager", rounds=3)
+        def _checks(size=size):
+            keys = [check_key(job) for job in open_manager(tabfile(size)).list_jobs()]
+
+            def run():
+                CommandChecker().check_many(keys)
+
+            return run, len(keys)
+
+        @benchmark(f"checks.cached[{size}]", "manager", rounds=3)
+        def _checks_cached(size=size):
+            keys = [check_key(job) for job in open_manager(tabfile(size)).list_jobs()]
+            checker = CommandChecker()
+            checker.check_many(keys)
+
+            def run():
+                # Like after a file changed: one directory is looked at again
+                checker.invalidate("/usr/bin")
+                checker.check_many(keys)
+
+            return run, len(keys)
+
+        @benchmark(f"duplicates.find[{size}]", "manager", rounds=3)
+        def _duplicates(size=size):
+            jobs = open_manager(tabfile(size)).list_jobs()
+
+            def run():
+                find_duplicates(jobs)
+
+            return run, len(jobs)
+
+        @benchmark(f"calendar.month[{size}]", "manager", rounds=3)
+        def _calendar_month(size=size):
+            jobs = open_manager(tabfile(size)).list_jobs()
+
+            def run():
+                # A month with a DST change in most zones
+                ScheduleCalendar(jobs).month_counts(2026, 3)
+
+            return run, len(jobs)
+
+        @benchmark(f"calendar.day[{size}]", "manager", rounds=3)
+        def _calendar_day(size=size):
+            jobs = open_manager(tabfile(size)).list_jobs()
+            schedule_calendar = ScheduleCalendar(jobs)
+
+            def run():
+                schedule_calendar.day_hours(date(2026, 3, 29))
+
+            return run, len(jobs)
+
+        @benchmark(f"manager.merge_write[{size}]", "manager", rounds=3)
+        def _merge_write(size=size):
+            path = os.path.join(_TMPDIR, f"merge-{size}")
+            shutil.copyfile(tabfile(size), path)
+            ours = open_manager(path)
+            theirs = open_manager(path)
+            last = ours.job_counts()[0] - 1
+            state = {"enabled": False}
+
+            def run():
+                # Each write lands on a crontab the other manager changed
+                theirs.toggle_job(0, state["enabled"])
+                ours.toggle_job(last, state["enabled"])
+                state["enabled"] = not state["enabled"]
+
+            return run, 2
+
+        for count in (1, 1000):
+
+            @benchmark(f"manager.toggle_jobs[{size}x{count}]", "manager", rounds=3)
+            def _toggle_jobs(size=size, count=count):
+                path = os.path.join(_TMPDIR, f"toggle-{size}-{count}")
+                shutil.copyfile(tabfile(size), path)
+                manager = open_manager(path)
+                job_ids = list(range(min(count, manager.job_counts()[0])))
+                state = {"enabled": False}
+
+                def run():
+                    manager.toggle_jobs(job_ids, state["enabled"])
+                    state["enabled"] = not state["enabled"]
+
+                return run, len(job_ids)
+
+            @benchmark(f"manager.undo_redo[{size}x{count}]", "manager", rounds=3)
+            def _undo_redo(size=size, count=count):
+                path = os.path.join(_TMPDIR, f"undo-{size}-{count}")
+                shutil.copyfile(tabfile(size), path)
+                manager = open_manager(path)
+                job_ids = list(range(0, manager.job_counts()[0], 7))[:count]
+                manager.delete_jobs(job_ids)
+
+                def run():
+                    manager.undo()
+                    manager.redo()
+
+                return run, len(job_ids)
@@ -0,0 +1,168 @@
+"""
+Microbenchmarks for cron_gui.cron_parser.
+"""
+
+from datetime import datetime
+from typing import List
+
+from benchmarks.generate_crontab import unique_expressions
+from benchmarks.harness import benchmark
+from cron_gui import cron_parser
+from cron_gui.cron_schedule import (
+    compile_schedule,
+    iter_run_timestamps,
+    parse_field_items,
+)
+
+
+# Schedules in words, filled in with varying times by _phrases
+_PHRASE_TEMPLATES = (
+    "every day at {h}:{m:02d}",
+    "every 15 minutes on weekdays between {h} and 23",
+    "at {h}:{m:02d} on the 1st of each month",
+    "every 2 hours from {h}:{m:02d} to 23:59",
+    "on the 1st and 15th of january through june at {h}:{m:02d}",
+    "friday through monday at {h}:{m:02d}",
+    "every 90 minutes between {h} and 23",
+)
+
+
+def _phrases(count: int) -> List[str]:
+    """Get count schedules in words, with varying times."""
+    templates = len(_PHRASE_TEMPLATES)
+    return [
+        _PHRASE_TEMPLATES[idx % templates].format(
+            h=idx // templates % 24, m=idx // templates // 24 % 60
+        )
+        for idx in range(count)
+    ]
+
+
+def _clear_parser_caches():
+    """Drop memoized results so cold-path timings are honest."""
+    cron_parser.validate_cron_expression.__wrapped__.cache_clear()
+    cron_parser.cron_to_human_readable.__wrapped__.cache_clear()
+    cron_parser.natural_to_cron.__wrapped__.cache_clear()
+    compile_schedule.cache_clear()
+    parse_field_items.cache_clear()
+
+
+def _natural_keystrokes(phrases: List[str]):
+    """Compile every prefix of the phrases, as the job dialog does while typing."""
+    for phrase in phrases:
+        for end in range(1, len(phrase) + 1):
+            try:
+                cron_parser.natural_to_cron(phrase[:end])
+            except ValueError:
+                pass
+
+
+def register(sizes: List[int]):
+    """Register parser benchmarks for each expression count."""
+
+    @benchmark("parser.natural.keystrokes", "parser")
+    def _natural_typing():
+        phrases = _phrases(len(_PHRASE_TEMPLATES))
+
+        def run():
+            _clear_parser_caches()
+            _natural_keystrokes(phrases)
+
+        return run, sum(len(phrase) for phrase in phrases)
+
+    for size in sizes:
+        expressions = unique_expressions(size)
+
+        @benchmark(f"parser.validate.cold[{size}]", "parser")
+        def _validate_cold(expressions=expressions):
+            def run():
+                _clear_parser_caches()
+                for expr in expressions:
+                    cron_parser.validate_cron_expression(expr)
+
+            return run, len(expressions)
+
+        @benchmark(f"parser.validate.warm[{size}]", "parser")
+        def _validate_warm(expressions=expressions):
+            for expr in expressions:
+                cron_parser.validate_cron_expression(expr)
+
+            def run():
+                for expr in expressions:
+                    cron_parser.validate_cron_expression(expr)
+
+            return run, len(expressions)
+
+        @benchmark(f"parser.describe.cold[{size}]", "parser")
+        def _describe_cold(expressions=expressions):
+            def run():
+                _clear_parser_caches()
+                for expr in expressions:
+                    cron_parser.cron_to_human_readable(expr)
+
+            return run, len(expressions)
+
+        @benchmark(f"parser.describe.warm[{size}]", "parser")
+        def _describe_warm(expressions=expressions):
+            for expr in expressions:
+                cron_parser.cron_to_human_readable(expr)
+
+            def run():
+                for expr in expressions:
+                    cron_parser.cron_to_human_readable(expr)
+
+            return run, len(expressions)
+
+        @benchmark(f"parser.natural.cold[{size}]", "parser")
+        def _natural_cold(size=size):
+            phrases = _phrases(size)
+
+            def run():
+                _clear_parser_caches()
+                for phrase in phrases:
+                    cron_parser.natural_to_cron(phrase)
+
+            return run, len(phrases)
+
+        @benchmark(f"parser.natural.warm[{size}]", "parser")
+        def _natural_warm(size=size):
+            phrases = _phrases(size)
+            for phrase in phrases:
+                cron_parser.natural_to_cron(phrase)
+
+            def run():
+                for phrase in phrases:
+                    cron_parser.natural_to_cron(phrase)
+
+            return run, len(phrases)
+
+        @benchmark(f"parser.next_runs[{size}]", "parser", rounds=3)
+        def _next_runs(expressions=expressions):
+            def run():
+                for expr in expressions:
+                    cron_parser.get_next_runs(expr, 5)
+
+            return run, len(expressions)
+
+        @benchmark(f"parser.forecast_year_tz[{size}]", "parser", rounds=1)
+        def _forecast(expressions=expressions):
+            schedules = [compile_schedule(expr) for expr in expressions]
+            start = datetime(2026, 1, 1)
+            end = datetime(2027, 1, 1).timestamp()
+
+            def year_of_runs(schedule):
+                runs = 0
+                for instant in iter_run_timestamps(schedule, start, "Europe/Berlin"):
+                    if instant >= end:
+                        break
+                    runs += 1
+                return runs
+
+            # The work is every run in the year, not the number of schedules
+            total = sum(year_of_runs(schedule) for schedule in schedules)
+
+            def run():
+                for schedule in schedules:
+                    year_of_runs(schedule)
+
+            return run, total
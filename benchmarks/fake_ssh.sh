@@ -0,0 +1,47 @@
+#!/bin/sh
+# Stand-in for the ssh client, for exercising remote backends without hosts.
+#
+# Takes the same command line as ssh (options, --, host, remote command) and
+# emulates "crontab [-u USER] -l" and "crontab [-u USER] -" against files
+# under $FAKE_SSH_ROOT/HOST/USER. $FAKE_SSH_LATENCY adds a delay in seconds
+# to every command, like a network round trip.
+#
+# Usage: SshTransport(ssh=["sh", "benchmarks/fake_ssh.sh"])
+
+set -f
+while [ $# -gt 0 ]; do
+    case "$1" in
+        -O) exit 0 ;;  # control commands such as -O exit have nothing to stop
+        -o | -p | -l | -i) shift 2 ;;
+        --) shift; break ;;
+        -*) shift ;;
+        *) break ;;
+    esac
+done
+host=${1##*@}
+shift
+# The remote command arrives as one shell-quoted string
+set -- $*
+if [ "$1" != crontab ]; then
+    echo "fake_ssh: only crontab commands are supported" >&2
+    exit 255
+fi
+shift
+user=default
+if [ "$1" = -u ]; then
+    user=$2
+    shift 2
+fi
+if [ -n "$FAKE_SSH_LATENCY" ]; then
+    sleep "$FAKE_SSH_LATENCY"
+fi
+
+file=$FAKE_SSH_ROOT/$host/$user
+if [ "$1" = -l ]; then
+    if [ ! -f "$file" ]; then
+        echo "no crontab for $user" >&2
+        exit 1
+    fi
+    exec cat "$file"
+fi
+mkdir -p "${file%/*}" && cat >"$file.tmp" && mv "$file.tmp" "$file"
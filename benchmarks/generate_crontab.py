@@ -0,0 +1,150 @@
+"""
+Generate synthetic crontabs with a realistic mix of lines.
+
+Usage:
+    python -m benchmarks.generate_crontab --lines 100000 -o big.cron
+"""
+
+import argparse
+import random
+import sys
+from typing import Iterator, List, Tuple
+
+# (weight, expression) pairs, roughly matching what shows up in real crontabs
+EXPRESSIONS: List[Tuple[int, str]] = [
+    (20, "*/5 * * * *"),
+    (15, "0 * * * *"),
+    (12, "{m} {h} * * *"),
+    (8, "*/15 * * * *"),
+    (8, "{m} {h} * * {dow}"),
+    (6, "{m} {h} {dom} * *"),
+    (5, "{m} 9-17 * * 1-5"),
+    (5, "* * * * *"),
+    (4, "{m} */{step} * * *"),
+    (3, "{m},{m2} {h} * * *"),
+    (3, "{m} {h} {dom} {mon} *"),
+    (2, "{m} {h} * * mon-fri"),
+    (2, "{m} {h} 1,15 * *"),
+    (1, "{m} {h} * jan,jul *"),
+]
+
+COMMANDS = [
+    "/usr/local/bin/backup.sh --target /mnt/backup/{name}",
+    "find /tmp/{name} -mtime +7 -delete",
+    "curl -fsS https://{name}.example.com/health > /dev/null",
+    "/usr/bin/python3 /opt/{name}/manage.py clearsessions",
+    "cd /srv/{name} && ./rotate-logs >> /var/log/{name}.log 2>&1",
+    "rsync -a /var/www/{name}/ backup@mirror:/data/{name}/",
+    "/usr/sbin/logrotate /etc/logrotate.d/{name}",
+    "pg_dump {name} | gzip > /var/backups/{name}.sql.gz",
+    "/opt/{name}/bin/report --daily --mail ops@example.com",
+]
+
+NAMES = ["billing", "search", "mail", "auth", "cdn", "metrics", "api", "web"]
+
+ENV_LINES = [
+    "MAILTO=ops@example.com",
+    "PATH=/usr/local/sbin:/usr/local/bin:/usr/sbin:/usr/bin:/sbin:/bin",
+    "SHELL=/bin/bash",
+    "CRON_TZ=UTC",
+]
+
+
+def _expression(rng: random.Random) -> str:
+    """Pick a weighted expression template and fill it in."""
+    template = rng.choices(
+        [expr for _, expr in EXPRESSIONS], [w for w, _ in EXPRESSIONS]
+    )[0]
+    m = rng.randrange(60)
+    return template.format(
+        m=m,
+        m2=(m + 30) % 60,
+        h=rng.randrange(24),
+        dow=rng.randrange(7),
+        dom=rng.randint(1, 28),
+        mon=rng.randint(1, 12),
+        step=rng.choice([2, 3, 4, 6, 12]),
+    )
+
+
+def generate_lines(count: int, seed: int = 0) -> Iterator[str]:
+    """
+    Yield synthetic crontab lines.
+
+    About 75% of lines are enabled jobs, 8% disabled jobs, 10% comments,
+    4% environment assignments and the rest blank lines.
+
+    Args:
+        count: Number of lines to generate
+        seed: Random seed, so runs are reproducible
+
+    Yields:
+        Crontab lines without trailing newlines
+    """
+    rng = random.Random(seed)
+    for idx in range(count):
+        roll = rng.random()
+        if roll >= 0.97:
+            yield ""
+        elif roll >= 0.93:
+            yield rng.choice(ENV_LINES)
+        elif roll >= 0.83:
+            yield f"# {rng.choice(NAMES)} maintenance section {idx}"
+        else:
+            name = rng.choice(NAMES)
+            command = rng.choice(COMMANDS).format(name=name)
+            line = f"{_expression(rng)} {command}"
+            if rng.random() < 0.3:
+                line += f" # {name} job {idx}"
+            if roll >= 0.75:
+                line = "# " + line
+            yield line
+
+
+def write_crontab(path: str, count: int, seed: int = 0):
+    """
+    Write a synthetic crontab file without holding it all in memory.
+
+    Args:
+        path: Destination file path
+        count: Number of lines to generate
+        seed: Random seed
+    """
+    with open(path, "w", encoding="utf-8") as fh:
+        for line in generate_lines(count, seed):
+            fh.write(line)
+            fh.write("\n")
+
+
+def unique_expressions(count: int, seed: int = 0) -> List[str]:
+    """
+    Get a list of generated cron expressions.
+
+    Args:
+        count: Number of expressions
+        seed: Random seed
+
+    Returns:
+        List of expressions (duplicates are possible, as in real crontabs)
+    """
+    rng = random.Random(seed)
+    return [_expression(rng) for _ in range(count)]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--lines", type=int, default=1000, help="number of lines")
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    parser.add_argument("-o", "--output", default="-", help="output file or -")
+    args = parser.parse_args(argv)
+
+    if args.output == "-":
+        for line in generate_lines(args.lines, args.seed):
+            sys.stdout.write(line + "\n")
+    else:
+        write_crontab(args.output, args.lines, args.seed)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,142 @@
+"""
+Minimal benchmark harness: registration, timing and baseline comparison.
+"""
+
+import gc
+import json
+import platform
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+
+# Registered benchmarks: name -> (setup factory, group)
+_REGISTRY: Dict[str, Dict] = {}
+
+
+def benchmark(name: str, group: str = "core", rounds: int = 5):
+    """
+    Register a benchmark.
+
+    The decorated function does the setup and returns a zero-argument
+    callable that is timed, plus the number of operations it performs.
+
+    Args:
+        name: Unique benchmark name (e.g., "parser.validate[10000]")
+        group: Group used to select benchmarks from the command line
+        rounds: Number of timed rounds
+    """
+
+    def decorator(factory: Callable):
+        _REGISTRY[name] = {"factory": factory, "group": group, "rounds": rounds}
+        return factory
+
+    return decorator
+
+
+def registered(groups: Optional[List[str]] = None, match: str = "") -> List[str]:
+    """Get the names of registered benchmarks, optionally filtered."""
+    return [
+        name
+        for name, entry in _REGISTRY.items()
+        if (not groups or entry["group"] in groups) and match in name
+    ]
+
+
+def run_benchmark(name: str) -> Dict:
+    """
+    Run a registered benchmark.
+
+    Args:
+        name: Benchmark name
+
+    Returns:
+        Dictionary with timing statistics in seconds
+    """
+    entry = _REGISTRY[name]
+    func, ops = entry["factory"]()
+
+    timings = []
+    for _ in range(entry["rounds"]):
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+
+    median = statistics.median(timings)
+    return {
+        "group": entry["group"],
+        "rounds": entry["rounds"],
+        "ops": ops,
+        "min_s": min(timings),
+        "median_s": median,
+        "mean_s": statistics.fmean(timings),
+        "ops_per_s": ops / median if median else 0.0,
+    }
+
+
+def environment() -> Dict:
+    """Describe the machine the results were taken on."""
+    return {
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def save_results(path: str, results: Dict[str, Dict]):
+    """Write results and environment metadata as JSON."""
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump({"environment": environment(), "results": results}, fh, indent=2)
+
+
+def load_results(path: str) -> Dict[str, Dict]:
+    """Read the results section of a saved JSON file."""
+    with open(path, "r", encoding="utf-8") as fh:
+        return json.load(fh)["results"]
+
+
+def compare(
+    results: Dict[str, Dict],
+    baseline: Dict[str, Dict],
+    threshold: float = 0.10,
+    overrides: Optional[Dict[str, float]] = None,
+) -> List[Dict]:
+    """
+    Compare results against a baseline.
+
+    Args:
+        results: Current results
+        baseline: Baseline results
+        threshold: Allowed slowdown as a fraction of the baseline median
+        overrides: Per-benchmark thresholds; keys are name prefixes, and the
+            longest prefix matching a benchmark applies
+
+    Returns:
+        One entry per benchmark present in both, with a "regressed" flag
+    """
+    overrides = overrides or {}
+    report = []
+    for name, current in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+
+        # The most specific, i.e. longest, matching prefix wins
+        matches = [prefix for prefix in overrides if name.startswith(prefix)]
+        limit = overrides[max(matches, key=len)] if matches else threshold
+
+        ratio = current["median_s"] / base["median_s"] if base["median_s"] else 1.0
+        report.append(
+            {
+                "name": name,
+                "baseline_s": base["median_s"],
+                "current_s": current["median_s"],
+                "ratio": ratio,
+                "threshold": limit,
+                "regressed": ratio > 1.0 + limit,
+            }
+        )
+    return report
@@ -0,0 +1,107 @@
+"""
+Run the Cron GUI benchmarks and optionally gate on a baseline.
+
+Examples:
+    python -m benchmarks.run -o results.json
+    python -m benchmarks.run --baseline baseline.json --threshold 0.15
+    python -m benchmarks.run --group parser --sizes 100,10000,100000
+"""
+
+import argparse
+import os
+import sys
+
+# Allow running from a source checkout without installing the package
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+)
+
+from benchmarks import bench_gtk, bench_manager, bench_parser  # noqa: E402
+from benchmarks.harness import (  # noqa: E402
+    compare,
+    load_results,
+    registered,
+    run_benchmark,
+    save_results,
+)
+
+DEFAULT_SIZES = "100,10000"
+
+
+def _parse_overrides(values):
+    """Parse repeated NAME_PREFIX=FRACTION threshold overrides."""
+    overrides = {}
+    for value in values or []:
+        prefix, _, fraction = value.partition("=")
+        overrides[prefix] = float(fraction)
+    return overrides
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Run Cron GUI benchmarks")
+    parser.add_argument(
+        "--sizes",
+        default=DEFAULT_SIZES,
+        help=f"comma-separated crontab sizes (default: {DEFAULT_SIZES})",
+    )
+    parser.add_argument(
+        "--group",
+        action="append",
+        choices=["parser", "manager", "gtk"],
+        help="only run this group (repeatable)",
+    )
+    parser.add_argument("-k", "--match", default="", help="only run names containing this")
+    parser.add_argument("-o", "--output", help="write results JSON to this file")
+    parser.add_argument("--baseline", help="baseline results JSON to compare against")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.10,
+        help="allowed slowdown vs. baseline median (default: 0.10 = 10%%)",
+    )
+    parser.add_argument(
+        "--threshold-for",
+        action="append",
+        metavar="PREFIX=FRACTION",
+        help="per-benchmark threshold, e.g. gtk.=0.30 (repeatable)",
+    )
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(",") if size]
+    for module in (bench_parser, bench_manager, bench_gtk):
+        module.register(sizes)
+
+    results = {}
+    for name in registered(args.group, args.match):
+        result = run_benchmark(name)
+        results[name] = result
+        print(
+            f"{name:<40} {result['median_s'] * 1000:10.2f} ms"
+            f"  {result['ops_per_s']:14,.0f} ops/s"
+        )
+
+    if args.output:
+        save_results(args.output, results)
+
+    if not args.baseline:
+        return 0
+
+    report = compare(
+        results,
+        load_results(args.baseline),
+        args.threshold,
+        _parse_overrides(args.threshold_for),
+    )
+    regressions = [entry for entry in report if entry["regressed"]]
+    print()
+    for entry in report:
+        marker = "REGRESSION" if entry["regressed"] else "ok"
+        print(
+            f"{entry['name']:<40} {entry['ratio']:6.2f}x "
+            f"(limit {1 + entry['threshold']:.2f}x)  {marker}"
+        )
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -17,25 +17,41 @@ gi.require_version("Adw", "1")
 from gi.repository import Gtk, Adw, Gio
 
 from cron_gui.window import CronGuiWindow
+from cron_gui.profiling import profiler
 
 
 class CronGuiApplication(Adw.Application):
     """Main GTK application."""
 
-    def __init__(self):
+    def __init__(self, tabfile=None, hosts=None, target=None):
         super().__init__(
             application_id="com.github.cron_gui", flags=Gio.ApplicationFlags.FLAGS_NONE
         )
 
+        # Crontab-format file to edit instead of the user's crontab
+        self.tabfile = tabfile
+        # File listing hosts whose crontabs to edit over SSH
+        self.hosts = hosts
+        # System or other user's crontab to edit through the privileged helper
+        self.target = target
+
         # Create actions
         self.create_action("quit", self.on_quit, ["<primary>q"])
         self.create_action("about", self.on_about)
 
+    def do_shutdown(self):
+        """Called when the application is shutting down."""
+        if profiler.enabled and profiler.trace_file:
+            profiler.export_chrome_trace(profiler.trace_file)
+        Adw.Application.do_shutdown(self)
+
     def do_activate(self):
         """Called when the application is activated."""
         win = self.props.active_window
         if not win:
-            win = CronGuiWindow(self)
+            win = CronGuiWindow(
+                self, tabfile=self.tabfile, hosts=self.hosts, target=self.target
+            )
         win.present()
 
     def create_action(self, name, callback, shortcuts=None):
@@ -67,10 +83,56 @@ class CronGuiApplication(Adw.Application):
         about.present()
 
 
+def parse_args(argv):
+    """
+    Strip our own options from argv and apply them.
+
+    Supported options are --profile[=TRACE_FILE], --tabfile=PATH,
+    --hosts=FILE, --user=NAME (another user's crontab) and --system[=NAME]
+    (/etc/crontab, or /etc/cron.d/NAME); the last two edit as root.
+
+    Args:
+        argv: Command line arguments
+
+    Returns:
+        Tuple of (remaining arguments for the GTK application, options dict)
+    """
+    options = {"tabfile": None, "hosts": None, "target": None}
+    remaining = []
+    args = iter(argv)
+    for arg in args:
+        if arg == "--profile":
+            profiler.enable()
+        elif arg.startswith("--profile="):
+            profiler.enable(arg.split("=", 1)[1])
+        elif arg == "--tabfile":
+            options["tabfile"] = next(args, None)
+        elif arg.startswith("--tabfile="):
+            options["tabfile"] = arg.split("=", 1)[1]
+        elif arg == "--hosts":
+            options["hosts"] = next(args, None)
+        elif arg.startswith("--hosts="):
+            options["hosts"] = arg.split("=", 1)[1]
+        elif arg == "--user":
+            options["target"] = f"user/{next(args, '')}"
+        elif arg.startswith("--user="):
+            options["target"] = f"user/{arg.split('=', 1)[1]}"
+        elif arg == "--system":
+            options["target"] = "system"
+        elif arg.startswith("--system="):
+            options["target"] = f"cron.d/{arg.split('=', 1)[1]}"
+        else:
+            remaining.append(arg)
+    return remaining, options
+
+
 def main():
     """Main entry point."""
-    app = CronGuiApplication()
-    return app.run(sys.argv)
+    argv, options = parse_args(sys.argv)
+    app = CronGuiApplication(
+        tabfile=options["tabfile"], hosts=options["hosts"], target=options["target"]
+    )
+    return app.run(argv)
 
 
 if __name__ == "__main__":
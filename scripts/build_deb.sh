@@ -23,6 +23,9 @@ mkdir -p "$DEB_DIR/usr/bin"
 mkdir -p "$DEB_DIR/usr/share/applications"
 mkdir -p "$DEB_DIR/usr/lib/python3/dist-packages"
 mkdir -p "$DEB_DIR/usr/share/icons/hicolor/scalable/apps"
+mkdir -p "$DEB_DIR/usr/share/dbus-1/services"
+mkdir -p "$DEB_DIR/usr/libexec"
+mkdir -p "$DEB_DIR/usr/share/polkit-1/actions"
 python3 setup.py sdist bdist_wheel
 
 # 2. Create Control File
@@ -32,7 +35,7 @@ Version: $VERSION
 Section: utils
 Priority: optional
 Architecture: $ARCH
-Depends: python3 (>= 3.8), python3-gi, python3-gi-cairo, gir1.2-gtk-4.0, gir1.2-adw-1, python3-crontab, python3-croniter
+Depends: python3 (>= 3.8), python3-gi, python3-gi-cairo, gir1.2-gtk-4.0, gir1.2-adw-1
 Maintainer: Cron GUI Team <maintainer@example.com>
 Description: Modern Cron GUI Manager
  A modern, beautiful Linux desktop application for managing cron jobs 
@@ -65,6 +68,49 @@ exec python3 -m cron_gui.main "\$@"
 EOF
 chmod 755 "$DEB_DIR/usr/bin/$APP_NAME"
 
+# Service and its command line client; the bus starts the service on demand
+for tool in service:dbus_service ctl:dbus_client; do
+    cat > "$DEB_DIR/usr/bin/$APP_NAME-${tool%%:*}" << EOF
+#!/bin/sh
+export PYTHONPATH=/usr/lib/python3/dist-packages
+exec python3 -m cron_gui.${tool#*:} "\$@"
+EOF
+    chmod 755 "$DEB_DIR/usr/bin/$APP_NAME-${tool%%:*}"
+done
+cat > "$DEB_DIR/usr/share/dbus-1/services/com.github.cron_gui.Service.service" << EOF
+[D-BUS Service]
+Name=com.github.cron_gui.Service
+Exec=/usr/bin/$APP_NAME-service
+EOF
+
+# Privileged helper for --system and --user; polkit keeps the authorization
+# for a few minutes, so reopening the window does not ask again
+cat > "$DEB_DIR/usr/libexec/$APP_NAME-helper" << EOF
+#!/usr/bin/python3 -I
+import sys
+sys.path.insert(0, "/usr/lib/python3/dist-packages")
+from cron_gui.privileged_helper import main
+sys.exit(main())
+EOF
+chmod 755 "$DEB_DIR/usr/libexec/$APP_NAME-helper"
+cat > "$DEB_DIR/usr/share/polkit-1/actions/com.github.cron_gui.helper.policy" << EOF
+<?xml version="1.0" encoding="UTF-8"?>
+<!DOCTYPE policyconfig PUBLIC "-//freedesktop//DTD PolicyKit Policy Configuration 1.0//EN"
+ "http://www.freedesktop.org/standards/PolicyKit/1/policyconfig.dtd">
+<policyconfig>
+  <action id="com.github.cron_gui.helper">
+    <description>Edit system and other users' crontabs</description>
+    <message>Authentication is required to edit system crontabs</message>
+    <defaults>
+      <allow_any>auth_admin</allow_any>
+      <allow_inactive>auth_admin</allow_inactive>
+      <allow_active>auth_admin_keep</allow_active>
+    </defaults>
+    <annotate key="org.freedesktop.policykit.exec.path">/usr/libexec/$APP_NAME-helper</annotate>
+  </action>
+</policyconfig>
+EOF
+
 # Need to ensure main.py is importable as a module or adjust entry point
 # Let's move main.py to cron_gui/__main__.py for better module execution
 cp main.py "$DEB_DIR/usr/lib/python3/dist-packages/cron_gui/main.py"
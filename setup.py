@@ -24,18 +24,15 @@ setup(
         "Topic :: System :: Systems Administration",
         "License :: OSI Approved :: MIT License",
         "Programming Language :: Python :: 3",
-        "Programming Language :: Python :: 3.8",
         "Programming Language :: Python :: 3.9",
         "Programming Language :: Python :: 3.10",
         "Programming Language :: Python :: 3.11",
         "Operating System :: POSIX :: Linux",
         "Environment :: X11 Applications :: GTK",
     ],
-    python_requires=">=3.8",
+    python_requires=">=3.9",
     install_requires=[
         "PyGObject>=3.42.0",
-        "python-crontab>=3.0.0",
-        "croniter>=1.4.1",
     ],
     include_package_data=True,
     package_data={
@@ -44,6 +41,9 @@ setup(
     entry_points={
         "console_scripts": [
             "cron-gui=main:main",
+            "cron-gui-diff=cron_gui.fleet_diff:main",
+            "cron-gui-service=cron_gui.dbus_service:main",
+            "cron-gui-ctl=cron_gui.dbus_client:main",
         ],
     },
 )
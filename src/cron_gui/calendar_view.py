@@ -0,0 +1,398 @@
+"""
+Calendar View - A month of job firings, with the hours of a selected day.
+
+The month grid and the hour strip are drawn on Gtk.DrawingAreas rather than
+built from labels, so a month costs the same to show whether its jobs fire
+ten times or a million. Counts come from schedule_calendar: the per-day
+counts when a month is shown, the per-hour counts of a day when it is
+selected, and the jobs of an hour when that is selected.
+"""
+
+import gi
+
+gi.require_version("Gtk", "4.0")
+from gi.repository import Gtk, Pango, PangoCairo
+import calendar
+import math
+from datetime import date
+from typing import Callable, Dict, List, Optional
+
+from cron_gui.profiling import profiler
+from cron_gui.schedule_calendar import ScheduleCalendar
+
+# Most jobs listed for an hour; the rest are summarized
+MAX_HOUR_JOBS = 500
+
+# Height of the weekday names above the month grid
+HEADER_HEIGHT = 24
+
+# Height of the hour labels below the hour strip
+HOUR_LABEL_HEIGHT = 18
+
+# Fill of busy days and hours (libadwaita's blue accent)
+ACCENT = (0.21, 0.52, 0.89)
+
+
+def _short_count(count: int) -> str:
+    """Format a run count to fit a calendar cell, e.g. 12.3k."""
+    if count < 1000:
+        return str(count)
+    if count < 1000000:
+        return f"{count / 1000:.1f}k"
+    return f"{count / 1000000:.1f}M"
+
+
+def _foreground(widget: Gtk.Widget):
+    """Get the text color of a widget."""
+    if hasattr(widget, "get_color"):
+        return widget.get_color()
+    return widget.get_style_context().get_color()
+
+
+class CalendarView(Gtk.Box):
+    """Month calendar of job firings with an agenda of the selected day."""
+
+    def __init__(
+        self,
+        list_jobs: Callable[[], List[Dict]],
+        on_edit: Callable[[Dict], None],
+    ):
+        """
+        Initialize the view.
+
+        Args:
+            list_jobs: Returns the jobs to show, as CronManager.list_jobs
+            on_edit: Called with a job activated in the agenda
+        """
+        super().__init__(orientation=Gtk.Orientation.VERTICAL)
+
+        self.list_jobs = list_jobs
+        self.on_edit = on_edit
+        self.schedule_calendar: Optional[ScheduleCalendar] = None
+        self.jobs: Dict[int, Dict] = {}
+        today = date.today()
+        self.year, self.month = today.year, today.month
+        self.day = today
+        self.hour: Optional[int] = None
+        # Runs per day of the month and per hour of the selected day
+        self.counts: List[int] = []
+        self.hours: List[int] = [0] * 24
+
+        # Month navigation
+        nav = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=6)
+        nav.set_margin_top(6)
+        nav.set_margin_start(12)
+        nav.set_margin_end(12)
+        previous_button = Gtk.Button(icon_name="go-previous-symbolic")
+        previous_button.set_tooltip_text("Previous month")
+        previous_button.connect("clicked", self._on_month_step, -1)
+        nav.append(previous_button)
+        self.month_label = Gtk.Label()
+        self.month_label.set_hexpand(True)
+        self.month_label.add_css_class("title-4")
+        nav.append(self.month_label)
+        today_button = Gtk.Button(label="Today")
+        today_button.connect("clicked", self._on_today_clicked)
+        nav.append(today_button)
+        next_button = Gtk.Button(icon_name="go-next-symbolic")
+        next_button.set_tooltip_text("Next month")
+        next_button.connect("clicked", self._on_month_step, 1)
+        nav.append(next_button)
+        self.append(nav)
+
+        # Month grid
+        self.month_area = Gtk.DrawingArea()
+        self.month_area.set_content_height(300)
+        self.month_area.set_vexpand(True)
+        self.month_area.set_margin_start(12)
+        self.month_area.set_margin_end(12)
+        self.month_area.set_draw_func(self._draw_month)
+        self.month_area.set_has_tooltip(True)
+        self.month_area.connect("query-tooltip", self._on_month_tooltip)
+        month_click = Gtk.GestureClick()
+        month_click.connect("pressed", self._on_month_pressed)
+        self.month_area.add_controller(month_click)
+
+        # Selected day: runs per hour, and the jobs of the selected hour
+        self.day_label = Gtk.Label()
+        self.day_label.set_xalign(0)
+        self.day_label.add_css_class("heading")
+        self.hour_area = Gtk.DrawingArea()
+        self.hour_area.set_content_height(90)
+        self.hour_area.set_draw_func(self._draw_hours)
+        hour_click = Gtk.GestureClick()
+        hour_click.connect("pressed", self._on_hour_pressed)
+        self.hour_area.add_controller(hour_click)
+        self.hour_label = Gtk.Label()
+        self.hour_label.set_xalign(0)
+        self.hour_label.add_css_class("dim-label")
+
+        self.job_list = Gtk.ListBox()
+        self.job_list.set_selection_mode(Gtk.SelectionMode.NONE)
+        self.job_list.add_css_class("boxed-list")
+        self.job_list.connect("row-activated", self._on_job_activated)
+        jobs_scrolled = Gtk.ScrolledWindow()
+        jobs_scrolled.set_policy(Gtk.PolicyType.NEVER, Gtk.PolicyType.AUTOMATIC)
+        jobs_scrolled.set_vexpand(True)
+        jobs_scrolled.set_child(self.job_list)
+
+        detail_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=6)
+        detail_box.set_margin_top(6)
+        detail_box.set_margin_bottom(12)
+        detail_box.set_margin_start(12)
+        detail_box.set_margin_end(12)
+        detail_box.append(self.day_label)
+        detail_box.append(self.hour_area)
+        detail_box.append(self.hour_label)
+        detail_box.append(jobs_scrolled)
+
+        paned = Gtk.Paned(orientation=Gtk.Orientation.VERTICAL)
+        paned.set_start_child(self.month_area)
+        paned.set_end_child(detail_box)
+        paned.set_vexpand(True)
+        self.append(paned)
+
+        self.connect("map", self._on_map)
+
+    def invalidate(self):
+        """Count again after the jobs changed, at once if the view is shown."""
+        self.schedule_calendar = None
+        if self.get_mapped():
+            self.reload()
+
+    def reload(self):
+        """Read the jobs and count their runs."""
+        jobs = self.list_jobs()
+        self.jobs = {job["id"]: job for job in jobs}
+        self.schedule_calendar = ScheduleCalendar(jobs)
+        self._show_month()
+
+    def _on_map(self, widget):
+        """Count the runs when the view is first shown after a change."""
+        if self.schedule_calendar is None:
+            self.reload()
+
+    def _show_month(self):
+        """Count the runs of the shown month and redraw it."""
+        self.counts = self.schedule_calendar.month_counts(self.year, self.month)
+        self.month_label.set_text(f"{calendar.month_name[self.month]} {self.year}")
+        if (self.day.year, self.day.month) != (self.year, self.month):
+            self.day = date(self.year, self.month, 1)
+            self.hour = None
+        self.month_area.queue_draw()
+        self._show_day()
+
+    def _show_day(self):
+        """Count the runs of the selected day per hour."""
+        self.hours = self.schedule_calendar.day_hours(self.day)
+        if self.hour is None or not self.hours[self.hour]:
+            self.hour = next(
+                (hour for hour, runs in enumerate(self.hours) if runs), None
+            )
+        total = sum(self.hours)
+        self.day_label.set_text(
+            f"{self.day:%A, %d %B %Y}: {total:,} run{'s' if total != 1 else ''}"
+        )
+        self.hour_area.queue_draw()
+        self._show_hour()
+
+    def _show_hour(self):
+        """List the jobs running in the selected hour."""
+        row = self.job_list.get_row_at_index(0)
+        while row is not None:
+            self.job_list.remove(row)
+            row = self.job_list.get_row_at_index(0)
+
+        if self.hour is None:
+            self.hour_label.set_text("No jobs run on this day.")
+            return
+        jobs = self.schedule_calendar.hour_jobs(self.day, self.hour)
+        self.hour_label.set_text(
+            f"{len(jobs):,} job(s) run between {self.hour:02d}:00 and "
+            f"{self.hour:02d}:59"
+        )
+        with profiler.span("calendar.render", "ui"):
+            for job_id, runs in jobs[:MAX_HOUR_JOBS]:
+                self.job_list.append(self._create_row(self.jobs[job_id], runs))
+        if len(jobs) > MAX_HOUR_JOBS:
+            more = Gtk.Label(label=f"… and {len(jobs) - MAX_HOUR_JOBS:,} more jobs")
+            more.add_css_class("dim-label")
+            row = Gtk.ListBoxRow(selectable=False, activatable=False)
+            row.set_child(more)
+            self.job_list.append(row)
+
+    def _create_row(self, job: Dict, runs: int) -> Gtk.ListBoxRow:
+        """Create the agenda row of a job."""
+        title = Gtk.Label(label=job["command"])
+        title.set_xalign(0)
+        title.set_hexpand(True)
+        title.set_ellipsize(Pango.EllipsizeMode.MIDDLE)
+        subtitle = Gtk.Label(label=job["schedule"])
+        subtitle.set_xalign(0)
+        subtitle.add_css_class("dim-label")
+        subtitle.add_css_class("caption")
+        text_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=2)
+        text_box.append(title)
+        text_box.append(subtitle)
+
+        runs_label = Gtk.Label(label=f"{runs} run{'s' if runs != 1 else ''}")
+        runs_label.add_css_class("dim-label")
+
+        box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=12)
+        box.set_margin_top(6)
+        box.set_margin_bottom(6)
+        box.set_margin_start(12)
+        box.set_margin_end(12)
+        box.append(text_box)
+        box.append(runs_label)
+
+        row = Gtk.ListBoxRow()
+        row.set_child(box)
+        row.set_tooltip_text(job.get("comment") or None)
+        row.job = job
+        return row
+
+    def _on_job_activated(self, listbox, row):
+        """Edit a job of the agenda."""
+        self.on_edit(row.job)
+
+    def _on_month_step(self, button, step: int):
+        """Show the previous or next month."""
+        month = self.month - 1 + step
+        self.year, self.month = self.year + month // 12, month % 12 + 1
+        if self.schedule_calendar is not None:
+            self._show_month()
+
+    def _on_today_clicked(self, button):
+        """Show and select today."""
+        self.day = date.today()
+        self.year, self.month = self.day.year, self.day.month
+        self.hour = None
+        if self.schedule_calendar is not None:
+            self._show_month()
+
+    def _weeks(self) -> List[List[int]]:
+        """Get the weeks of the shown month, 0 for days of other months."""
+        return calendar.Calendar().monthdayscalendar(self.year, self.month)
+
+    def _day_at(self, x: float, y: float) -> Optional[date]:
+        """Get the day of the month grid cell at a point."""
+        weeks = self._weeks()
+        width = self.month_area.get_width()
+        height = self.month_area.get_height() - HEADER_HEIGHT
+        if y < HEADER_HEIGHT or width <= 0 or height <= 0:
+            return None
+        column = min(int(x * 7 / width), 6)
+        row = min(int((y - HEADER_HEIGHT) * len(weeks) / height), len(weeks) - 1)
+        day = weeks[row][column]
+        return date(self.year, self.month, day) if day else None
+
+    def _on_month_pressed(self, gesture, n_press, x, y):
+        """Select the clicked day."""
+        day = self._day_at(x, y)
+        if day is not None and self.schedule_calendar is not None:
+            self.day = day
+            self.month_area.queue_draw()
+            self._show_day()
+
+    def _on_month_tooltip(self, widget, x, y, keyboard_mode, tooltip) -> bool:
+        """Show the exact run count of the day under the pointer."""
+        day = self._day_at(x, y)
+        if day is None or not self.counts:
+            return False
+        runs = self.counts[day.day - 1]
+        tooltip.set_text(f"{day:%d %B}: {runs:,} run{'s' if runs != 1 else ''}")
+        return True
+
+    def _on_hour_pressed(self, gesture, n_press, x, y):
+        """Select the clicked hour."""
+        width = self.hour_area.get_width()
+        if width <= 0 or self.schedule_calendar is None:
+            return
+        hour = min(int(x * 24 / width), 23)
+        if self.hours[hour]:
+            self.hour = hour
+            self.hour_area.queue_draw()
+            self._show_hour()
+
+    def _draw_text(self, area, cr, text: str, x: float, y: float, bold=False):
+        """Draw text with its top left corner at a point."""
+        layout = area.create_pango_layout(None)
+        if bold:
+            layout.set_markup(f"<b>{text}</b>", -1)
+        else:
+            layout.set_text(text, -1)
+        cr.move_to(x, y)
+        PangoCairo.show_layout(cr, layout)
+
+    def _draw_month(self, area, cr, width, height):
+        """Draw the month grid, shading each day by its runs."""
+        weeks = self._weeks()
+        color = _foreground(area)
+        cell_width = width / 7
+        cell_height = (height - HEADER_HEIGHT) / len(weeks)
+        # Shading grows with the log of the runs, so a few minutely jobs
+        # do not make every other day look empty
+        busiest = math.log1p(max(self.counts, default=0)) or 1.0
+        today = date.today()
+
+        cr.set_source_rgba(color.red, color.green, color.blue, 0.6)
+        weekdays = calendar.Calendar().iterweekdays()
+        for column, weekday in enumerate(weekdays):
+            self._draw_text(
+                area, cr, calendar.day_abbr[weekday], column * cell_width + 6, 4
+            )
+
+        for row, week in enumerate(weeks):
+            for column, day in enumerate(week):
+                if not day:
+                    continue
+                x = column * cell_width
+                y = HEADER_HEIGHT + row * cell_height
+                runs = self.counts[day - 1] if self.counts else 0
+
+                if runs:
+                    shade = 0.15 + 0.6 * math.log1p(runs) / busiest
+                    cr.set_source_rgba(*ACCENT, shade)
+                    cr.rectangle(x + 1, y + 1, cell_width - 2, cell_height - 2)
+                    cr.fill()
+                if day == self.day.day:
+                    cr.set_source_rgba(*ACCENT, 1.0)
+                    cr.set_line_width(2)
+                    cr.rectangle(x + 2, y + 2, cell_width - 4, cell_height - 4)
+                    cr.stroke()
+
+                cr.set_source_rgba(color.red, color.green, color.blue, color.alpha)
+                current = (self.year, self.month, day) == (
+                    today.year,
+                    today.month,
+                    today.day,
+                )
+                self._draw_text(area, cr, str(day), x + 6, y + 4, bold=current)
+                if runs:
+                    layout = area.create_pango_layout(_short_count(runs))
+                    text_width, text_height = layout.get_pixel_size()
+                    cr.move_to(
+                        x + cell_width - text_width - 6,
+                        y + cell_height - text_height - 4,
+                    )
+                    PangoCairo.show_layout(cr, layout)
+
+    def _draw_hours(self, area, cr, width, height):
+        """Draw the runs per hour of the selected day as bars."""
+        color = _foreground(area)
+        bar_width = width / 24
+        bar_height = height - HOUR_LABEL_HEIGHT
+        busiest = max(self.hours) or 1
+
+        for hour, runs in enumerate(self.hours):
+            x = hour * bar_width
+            if runs:
+                filled = max(2.0, bar_height * runs / busiest)
+                alpha = 1.0 if hour == self.hour else 0.5
+                cr.set_source_rgba(*ACCENT, alpha)
+                cr.rectangle(x + 1, bar_height - filled, bar_width - 2, filled)
+                cr.fill()
+            if hour % 3 == 0:
+                cr.set_source_rgba(color.red, color.green, color.blue, 0.6)
+                self._draw_text(area, cr, f"{hour:02d}", x + 1, bar_height + 2)
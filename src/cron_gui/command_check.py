@@ -0,0 +1,401 @@
+"""
+Command Check - Pre-flight checks of the commands jobs would run.
+
+A job's command is checked the way cron would start it: each program is
+looked up on the job's PATH and must be executable, a script's ``#!``
+interpreter must exist, and absolute paths it mentions should exist too
+(for output redirections, the directory the file is written to).
+
+Checking thousands of jobs must not stat the same files thousands of
+times. Directories are listed once and files are stat'ed once, and both
+stay cached until the directory they are in is invalidated, normally by a
+file monitor (see command_check_service). Interpreters are cached by the
+script's path and modification time, and findings by the command and the
+PATH and HOME it runs with.
+
+CommandChecker is not thread-safe; command_check_service runs it on a
+single worker thread.
+"""
+
+import os
+import re
+import shlex
+import stat
+from typing import Callable, Dict, FrozenSet, List, Optional, Set, Tuple
+
+from cron_gui.crontab_lint import (
+    SEVERITY_ERROR,
+    SEVERITY_INFO,
+    SEVERITY_WARNING,
+    LintFinding,
+)
+
+# PATH cron gives jobs that do not set one
+DEFAULT_PATH = "/usr/bin:/bin"
+
+# Most commands whose findings are cached
+CHECK_CACHE_SIZE = 65536
+
+# Bytes read from a script to find its interpreter
+SHEBANG_LENGTH = 256
+
+# Words the shell runs itself; they are not looked up on PATH
+SHELL_BUILTINS = frozenset(
+    """
+    . : [ [[ alias bg break builtin case cd command continue declare echo
+    eval exec exit export false fg for function getopts hash if kill let
+    local printf pwd read readonly return set shift source test time times
+    trap true type ulimit umask unalias unset until wait while { ! ( nice
+    nohup
+    """.split()
+)
+
+# (command, PATH, HOME) of a job
+CheckKey = Tuple[str, str, str]
+
+_SEPARATOR = re.compile(r"&&|\|\||[;|]|(?<![<>&])&(?![<>&])")
+_DUPLICATE_FD = re.compile(r"\d*[<>]&[\d-]+")
+_ASSIGNMENT = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*=")
+_REDIRECT = re.compile(r"(?:\d|&)?>>?\|?\s*([^\s&;|<>]+)")
+_INPUT = re.compile(r"<\s*([^\s&;|<>]+)")
+_UNRESOLVABLE = re.compile(r"[$`*?\[{]")
+_PERCENT = re.compile(r"(?<!\\)%")
+
+
+def check_key(job: Dict) -> CheckKey:
+    """Get what a job's checks depend on, see CronManager.list_jobs."""
+    env = job.get("env") or {}
+    return job["command"], env.get("PATH") or DEFAULT_PATH, env.get("HOME") or ""
+
+
+class _Segment:
+    """One simple command of a command line, e.g. a stage of a pipeline."""
+
+    __slots__ = ("program", "arguments", "outputs", "inputs")
+
+    def __init__(self, text: str):
+        text = _DUPLICATE_FD.sub(" ", text)
+        self.outputs = _REDIRECT.findall(text)
+        self.inputs = _INPUT.findall(text)
+        text = _INPUT.sub(" ", _REDIRECT.sub(" ", text))
+        try:
+            words = shlex.split(text)
+        except ValueError:
+            words = text.split()
+        while words and _ASSIGNMENT.match(words[0]):
+            words.pop(0)
+        self.program = words[0] if words else None
+        self.arguments = words[1:]
+
+
+def split_command(command: str) -> List[_Segment]:
+    """
+    Split a command line into the simple commands cron's shell runs.
+
+    Args:
+        command: Command as written in the crontab; text after an
+            unescaped % is input, not part of the command
+
+    Returns:
+        Segments with a program, its arguments and redirection targets
+    """
+    command = _PERCENT.split(command, 1)[0]
+    return [_Segment(text) for text in _SEPARATOR.split(command) if text.strip()]
+
+
+class CommandChecker:
+    """Checks commands, caching what it learns about the file system."""
+
+    def __init__(
+        self,
+        on_watch: Optional[Callable[[str], None]] = None,
+        cache_size: int = CHECK_CACHE_SIZE,
+    ):
+        """
+        Initialize the checker.
+
+        Args:
+            on_watch: Called with every directory whose contents findings
+                start to depend on, to watch it and call invalidate when it
+                changes
+            cache_size: Most commands whose findings are kept
+        """
+        self.on_watch = on_watch
+        self.cache_size = cache_size
+        # Directory -> names in it, None if it cannot be listed
+        self._listings: Dict[str, Optional[FrozenSet[str]]] = {}
+        # Path -> its stat result, None if it does not exist
+        self._stats: Dict[str, Optional[os.stat_result]] = {}
+        # (script, modification time) -> interpreter command line
+        self._interpreters: Dict[Tuple[str, int], Optional[List[str]]] = {}
+        self._results: Dict[CheckKey, Tuple[LintFinding, ...]] = {}
+        # Directory -> cached paths and findings that depend on it
+        self._paths: Dict[str, Set[str]] = {}
+        self._dependents: Dict[str, Set[CheckKey]] = {}
+        # Directories the findings being computed depend on
+        self._deps: Set[str] = set()
+        self._watched: Set[str] = set()
+        self._uid = os.geteuid()
+        self._groups = set(os.getgroups()) | {os.getegid()}
+
+    def check_many(self, keys: List[CheckKey]) -> Dict[CheckKey, Tuple]:
+        """
+        Check several commands.
+
+        Args:
+            keys: See check_key
+
+        Returns:
+            Findings of each distinct key
+        """
+        return {key: self.check(key) for key in dict.fromkeys(keys)}
+
+    def check(self, key: CheckKey) -> Tuple[LintFinding, ...]:
+        """
+        Check one command.
+
+        Args:
+            key: See check_key
+
+        Returns:
+            Findings, in the order of the command's words
+        """
+        findings = self._results.get(key)
+        if findings is not None:
+            return findings
+
+        command, path, home = key
+        self._deps = set()
+        findings = []
+        for segment in split_command(command):
+            findings.extend(self._check_segment(segment, path, home))
+        findings = tuple(dict.fromkeys(findings))
+
+        if len(self._results) >= self.cache_size:
+            self._results.clear()
+            self._dependents.clear()
+        self._results[key] = findings
+        for directory in self._deps:
+            self._dependents.setdefault(directory, set()).add(key)
+        return findings
+
+    def invalidate(self, directory: str) -> int:
+        """
+        Forget what is cached about a directory and the files in it.
+
+        Args:
+            directory: Absolute path of a directory that changed
+
+        Returns:
+            Number of commands whose findings were dropped
+        """
+        self._listings.pop(directory, None)
+        for path in self._paths.pop(directory, ()):
+            self._stats.pop(path, None)
+        dropped = 0
+        for key in self._dependents.pop(directory, ()):
+            if self._results.pop(key, None) is not None:
+                dropped += 1
+        return dropped
+
+    def invalidate_many(self, directories: List[str]) -> int:
+        """Invalidate several directories, see invalidate."""
+        return sum(self.invalidate(directory) for directory in directories)
+
+    def _depend(self, directory: str):
+        """Record that the findings being computed depend on a directory."""
+        self._deps.add(directory)
+        if directory not in self._watched:
+            self._watched.add(directory)
+            if self.on_watch is not None:
+                self.on_watch(directory)
+
+    def _listing(self, directory: str) -> Optional[FrozenSet[str]]:
+        """List a directory once; None if it does not exist or is unreadable."""
+        self._depend(directory)
+        if directory not in self._listings:
+            try:
+                self._listings[directory] = frozenset(os.listdir(directory))
+            except OSError:
+                self._listings[directory] = None
+        return self._listings[directory]
+
+    def _stat(self, path: str) -> Optional[os.stat_result]:
+        """Stat a path once; None if it does not exist."""
+        directory = os.path.dirname(path) or "/"
+        self._depend(directory)
+        if path not in self._stats:
+            try:
+                self._stats[path] = os.stat(path)
+            except OSError:
+                self._stats[path] = None
+            self._paths.setdefault(directory, set()).add(path)
+        return self._stats[path]
+
+    def _exists(self, path: str) -> bool:
+        """Check that a path exists, listing its directory rather than stat'ing it."""
+        path = os.path.normpath(path)
+        directory, name = os.path.split(path)
+        if not name:
+            return True
+        names = self._listing(directory)
+        if names is None:
+            # Unreadable directories may still hold the file
+            return self._stat(path) is not None
+        return name in names
+
+    def _which(self, program: str, path: str) -> Optional[str]:
+        """Find a program on a PATH, like the shell does."""
+        for directory in path.split(":"):
+            directory = directory or "."
+            if not os.path.isabs(directory):
+                # Relative to the job's working directory, which is unknown
+                continue
+            names = self._listing(directory)
+            if names is not None and program in names:
+                found = os.path.join(directory, program)
+                info = self._stat(found)
+                if info is not None and self._is_executable(info):
+                    return found
+        return None
+
+    def _is_executable(self, info: os.stat_result) -> bool:
+        """Check that a file may be executed by this user, from its stat result."""
+        if not stat.S_ISREG(info.st_mode):
+            return False
+        if self._uid == 0:
+            return bool(info.st_mode & 0o111)
+        if info.st_uid == self._uid:
+            return bool(info.st_mode & stat.S_IXUSR)
+        if info.st_gid in self._groups:
+            return bool(info.st_mode & stat.S_IXGRP)
+        return bool(info.st_mode & stat.S_IXOTH)
+
+    def _interpreter(self, script: str, info: os.stat_result) -> Optional[List[str]]:
+        """Read a script's #! line; None if it has none."""
+        cache_key = (script, info.st_mtime_ns)
+        if cache_key not in self._interpreters:
+            interpreter = None
+            try:
+                with open(script, "rb") as fh:
+                    head = fh.read(SHEBANG_LENGTH)
+                if head.startswith(b"#!"):
+                    line = head[2:].split(b"\n", 1)[0]
+                    interpreter = line.decode("utf-8", "replace").split()
+            except OSError:
+                pass
+            self._interpreters[cache_key] = interpreter
+        return self._interpreters[cache_key]
+
+    def _check_segment(
+        self, segment: _Segment, path: str, home: str
+    ) -> List[LintFinding]:
+        """Check the program, interpreter and paths of one simple command."""
+        findings = []
+        program = segment.program
+        if program and program not in SHELL_BUILTINS:
+            finding = self._check_program(_expand(program, home), path)
+            if finding is not None:
+                findings.append(finding)
+
+        for target in segment.outputs:
+            target = _expand(target, home)
+            if not os.path.isabs(target) or _UNRESOLVABLE.search(target):
+                continue
+            directory = os.path.dirname(os.path.normpath(target))
+            if not self._exists(directory):
+                findings.append(
+                    LintFinding(
+                        "missing-directory",
+                        SEVERITY_WARNING,
+                        f"{directory} does not exist, so output cannot be "
+                        f"written to {target}",
+                    )
+                )
+
+        for argument in segment.inputs + segment.arguments:
+            argument = _expand(argument, home)
+            if (
+                not argument.startswith("/")
+                or _UNRESOLVABLE.search(argument)
+                or any(char.isspace() for char in argument)
+                or self._exists(argument)
+            ):
+                continue
+            # The command may create the file itself, e.g. tee or rsync
+            if program != "cd" and self._exists(
+                os.path.dirname(os.path.normpath(argument))
+            ):
+                finding = LintFinding(
+                    "missing-file", SEVERITY_INFO, f"{argument} does not exist yet"
+                )
+            else:
+                finding = LintFinding(
+                    "missing-file", SEVERITY_WARNING, f"{argument} does not exist"
+                )
+            findings.append(finding)
+        return findings
+
+    def _check_program(self, program: str, path: str) -> Optional[LintFinding]:
+        """Check that a program can be started, including its interpreter."""
+        if _UNRESOLVABLE.search(program):
+            return None
+        if "/" not in program:
+            found = self._which(program, path)
+            if found is None:
+                return LintFinding(
+                    "command-not-found",
+                    SEVERITY_ERROR,
+                    f"{program} is not found on PATH={path}",
+                )
+        elif not os.path.isabs(program):
+            # Relative to the working directory; see the relative-path lint
+            return None
+        else:
+            found = os.path.normpath(program)
+            if not self._exists(found):
+                return LintFinding(
+                    "command-not-found", SEVERITY_ERROR, f"{found} does not exist"
+                )
+
+        info = self._stat(found)
+        if info is None:
+            return LintFinding(
+                "command-not-found", SEVERITY_ERROR, f"{found} does not exist"
+            )
+        if not self._is_executable(info):
+            return LintFinding(
+                "not-executable",
+                SEVERITY_ERROR,
+                f"{found} is not an executable file; run chmod +x on it",
+            )
+
+        interpreter = self._interpreter(found, info)
+        if not interpreter:
+            return None
+        name = interpreter[0]
+        if os.path.basename(name) == "env":
+            # "#!/usr/bin/env python3" looks the interpreter up on PATH
+            words = [word for word in interpreter[1:] if not word.startswith("-")]
+            if words and "/" not in words[0] and self._which(words[0], path) is None:
+                return LintFinding(
+                    "bad-interpreter",
+                    SEVERITY_ERROR,
+                    f"{found} runs {words[0]}, which is not found on PATH={path}",
+                )
+        info = self._stat(name) if os.path.isabs(name) else None
+        if info is None or not self._is_executable(info):
+            return LintFinding(
+                "bad-interpreter",
+                SEVERITY_ERROR,
+                f"{found} runs {name}, which is missing or not executable",
+            )
+        return None
+
+
+def _expand(word: str, home: str) -> str:
+    """Expand a leading ~ like the shell does."""
+    if word == "~" or word.startswith("~/"):
+        return (home or os.path.expanduser("~")) + word[1:]
+    return word
+
@@ -0,0 +1,131 @@
+"""
+Command Check Service - Run command checks off the GTK thread.
+
+One worker thread owns the CommandChecker, so checks never block the user
+interface and the checker's caches need no locking. Results are handed
+back on the GTK main loop. Every directory the checker looked at is
+watched with a Gio file monitor; when one changes, its cache entries are
+dropped and listeners are told to check their jobs again, which only
+re-checks the commands that depended on it.
+"""
+
+from gi.repository import GLib, Gio
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, List, Set
+
+from cron_gui.command_check import CheckKey, CommandChecker
+
+# Most directories watched; changes elsewhere are only seen after a reload
+MAX_MONITORS = 512
+
+# How long to wait for more changes before re-checking, in milliseconds
+SETTLE_DELAY_MS = 500
+
+# Changes that can alter a check's outcome; writes to files that exist
+# (e.g. a log being appended to) cannot
+_RELEVANT_EVENTS = {
+    Gio.FileMonitorEvent.CREATED,
+    Gio.FileMonitorEvent.DELETED,
+    Gio.FileMonitorEvent.ATTRIBUTE_CHANGED,
+    Gio.FileMonitorEvent.CHANGES_DONE_HINT,
+    Gio.FileMonitorEvent.MOVED_IN,
+    Gio.FileMonitorEvent.MOVED_OUT,
+    Gio.FileMonitorEvent.RENAMED,
+}
+
+
+class CommandCheckService:
+    """Checks commands on a worker thread and watches what they depend on."""
+
+    def __init__(self):
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="command-check"
+        )
+        self._checker = CommandChecker(on_watch=self._on_watch)
+        self._monitors: Dict[str, Gio.FileMonitor] = {}
+        self._changed: Set[str] = set()
+        self._listeners: List[Callable[[], None]] = []
+
+    def check(
+        self,
+        keys: List[CheckKey],
+        callback: Callable[[Dict[CheckKey, tuple]], None],
+    ):
+        """
+        Check commands in the background.
+
+        Args:
+            keys: See command_check.check_key
+            callback: Called on the main loop with the findings of each
+                distinct key
+        """
+        future = self._executor.submit(self._checker.check_many, keys)
+        future.add_done_callback(
+            lambda done: GLib.idle_add(self._deliver, done, callback)
+        )
+
+    def connect_changed(self, listener: Callable[[], None]):
+        """Call listener when files changed and jobs should be checked again."""
+        self._listeners.append(listener)
+
+    def close(self):
+        """Stop watching and let the worker finish."""
+        for monitor in self._monitors.values():
+            monitor.cancel()
+        self._monitors.clear()
+        self._listeners.clear()
+        self._executor.shutdown(wait=False)
+
+    def _deliver(self, future: Future, callback: Callable) -> bool:
+        """Hand results to a callback on the main loop."""
+        try:
+            results = future.result()
+        except Exception as e:
+            print(f"Error checking commands: {e}")
+            return GLib.SOURCE_REMOVE
+        callback(results)
+        return GLib.SOURCE_REMOVE
+
+    def _on_watch(self, directory: str):
+        """Watch a directory; called on the worker thread."""
+        GLib.idle_add(self._watch, directory)
+
+    def _watch(self, directory: str) -> bool:
+        """Start monitoring a directory on the main loop."""
+        if directory in self._monitors or len(self._monitors) >= MAX_MONITORS:
+            return GLib.SOURCE_REMOVE
+        try:
+            monitor = Gio.File.new_for_path(directory).monitor_directory(
+                Gio.FileMonitorFlags.WATCH_MOVES, None
+            )
+        except GLib.Error as e:
+            print(f"Error watching {directory}: {e}")
+            return GLib.SOURCE_REMOVE
+        monitor.connect("changed", self._on_directory_changed, directory)
+        self._monitors[directory] = monitor
+        return GLib.SOURCE_REMOVE
+
+    def _on_directory_changed(self, monitor, file, other_file, event, directory):
+        """Collect changed directories and re-check once they settle."""
+        if event not in _RELEVANT_EVENTS:
+            return
+        if not self._changed:
+            GLib.timeout_add(SETTLE_DELAY_MS, self._flush_changes)
+        self._changed.add(directory)
+
+    def _flush_changes(self) -> bool:
+        """Invalidate the changed directories and notify listeners."""
+        changed = list(self._changed)
+        self._changed.clear()
+        # Queued behind running checks, so none sees a half-invalidated cache
+        future = self._executor.submit(self._checker.invalidate_many, changed)
+        future.add_done_callback(
+            lambda done: GLib.idle_add(self._deliver, done, self._notify)
+        )
+        return GLib.SOURCE_REMOVE
+
+    def _notify(self, dropped: int):
+        """Tell listeners to check again if any findings were dropped."""
+        if dropped:
+            for listener in list(self._listeners):
+                listener()
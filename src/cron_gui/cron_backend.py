@@ -0,0 +1,413 @@
+"""
+Cron Backend - Where crontab text is read from and written to.
+
+CronManager works on crontab text and delegates storage to a backend:
+the user's crontab (through the ``crontab`` command), a plain
+crontab-format file on disk, or a crontab on another host over SSH.
+"""
+
+import fcntl
+import getpass
+import os
+import shlex
+import subprocess
+import tempfile
+from contextlib import contextmanager
+from typing import List, Optional, Sequence
+
+from cron_gui.edit_journal import content_hash
+
+
+class BackendError(RuntimeError):
+    """Raised when a backend cannot read or write the crontab."""
+
+
+class CrontabBackend:
+    """Base class for crontab storage backends."""
+
+    # Host the crontab lives on; empty for this machine
+    host = ""
+
+    # Whether the crontab can only be viewed; writes raise BackendError
+    read_only = False
+
+    def describe(self) -> str:
+        """Get a short human-readable description of the backend."""
+        raise NotImplementedError
+
+    def read(self) -> str:
+        """
+        Read the whole crontab.
+
+        Returns:
+            Crontab text; empty if there is no crontab yet
+        """
+        raise NotImplementedError
+
+    def write(self, content: str):
+        """
+        Replace the whole crontab.
+
+        Args:
+            content: New crontab text
+        """
+        raise NotImplementedError
+
+    def write_if_unchanged(self, content: str, expected: str) -> Optional[str]:
+        """
+        Replace the whole crontab unless someone else changed it.
+
+        This default reads and then writes, which leaves a short window for
+        another writer; backends that can lock override it.
+
+        Args:
+            content: New crontab text
+            expected: content_hash() of the crontab as last read or written
+
+        Returns:
+            None if the crontab was written, otherwise its current text
+        """
+        current = self.read()
+        if content_hash(current) != expected:
+            return current
+        self.write(content)
+        return None
+
+
+class UserCrontabBackend(CrontabBackend):
+    """Reads and writes a user's crontab with the ``crontab`` command."""
+
+    def __init__(self, user: Optional[str] = None):
+        """
+        Initialize the backend.
+
+        Args:
+            user: Username for crontab. If None, uses current user.
+        """
+        self.user = user
+
+    def _command(self, *args: str):
+        """Build a crontab command line, adding -u only for other users."""
+        command = ["crontab"]
+        if self.user and self.user != getpass.getuser():
+            command += ["-u", self.user]
+        return command + list(args)
+
+    def describe(self) -> str:
+        return f"crontab of {self.user or getpass.getuser()}"
+
+    def read(self) -> str:
+        try:
+            result = subprocess.run(
+                self._command("-l"), capture_output=True, text=True, check=False
+            )
+        except OSError as e:
+            raise BackendError(f"Cannot run crontab: {e}")
+
+        if result.returncode != 0:
+            # crontab -l exits non-zero when the user has no crontab yet
+            if "no crontab for" in result.stderr:
+                return ""
+            raise BackendError(result.stderr.strip() or "crontab -l failed")
+        return result.stdout
+
+    def write(self, content: str):
+        try:
+            result = subprocess.run(
+                self._command("-"),
+                input=content,
+                capture_output=True,
+                text=True,
+                check=False,
+            )
+        except OSError as e:
+            raise BackendError(f"Cannot run crontab: {e}")
+
+        if result.returncode != 0:
+            raise BackendError(result.stderr.strip() or "crontab - failed")
+
+
+@contextmanager
+def _locked(path: str, exclusive: bool):
+    """
+    Hold an flock on ``path`` for the duration of the block.
+
+    Writers replace the file by renaming a new one over it, so after
+    acquiring the lock we check that the path still refers to the inode we
+    locked and retry otherwise. This is the same advisory lock that
+    ``flock(1)`` and cron's own crontab tooling take, so we never interleave
+    with them.
+    """
+    mode = fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH
+    while True:
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except FileNotFoundError:
+            if not exclusive:
+                yield None
+                return
+            # Create an empty file so there is something to lock
+            fd = os.open(path, os.O_RDONLY | os.O_CREAT, 0o644)
+
+        try:
+            fcntl.flock(fd, mode)
+            try:
+                same_file = os.fstat(fd).st_ino == os.stat(path).st_ino
+            except FileNotFoundError:
+                same_file = False
+            if same_file:
+                yield fd
+                return
+        finally:
+            os.close(fd)
+
+
+class TabfileBackend(CrontabBackend):
+    """Reads and writes a crontab-format file directly, without cron."""
+
+    def __init__(self, path: str):
+        """
+        Initialize the backend.
+
+        Args:
+            path: Path of the crontab file. It is created on first write.
+        """
+        self.path = os.path.abspath(path)
+
+    def describe(self) -> str:
+        return self.path
+
+    def read(self) -> str:
+        try:
+            with _locked(self.path, exclusive=False) as fd:
+                if fd is None:
+                    return ""
+                return _read_fd(fd)
+        except OSError as e:
+            raise BackendError(f"Cannot read {self.path}: {e}")
+
+    def write(self, content: str):
+        try:
+            with _locked(self.path, exclusive=True) as fd:
+                self._replace(fd, content)
+            _fsync_directory(os.path.dirname(self.path))
+        except OSError as e:
+            raise BackendError(f"Cannot write {self.path}: {e}")
+
+    def write_if_unchanged(self, content: str, expected: str) -> Optional[str]:
+        # The check and the write happen under one exclusive lock
+        try:
+            with _locked(self.path, exclusive=True) as fd:
+                current = _read_fd(fd)
+                if content_hash(current) != expected:
+                    return current
+                self._replace(fd, content)
+            _fsync_directory(os.path.dirname(self.path))
+            return None
+        except OSError as e:
+            raise BackendError(f"Cannot write {self.path}: {e}")
+
+    def _replace(self, fd: int, content: str):
+        """Atomically replace the file, whose lock is held on fd."""
+        mode = os.fstat(fd).st_mode & 0o7777
+        tmp_fd, tmp_path = tempfile.mkstemp(
+            prefix=f".{os.path.basename(self.path)}.", dir=os.path.dirname(self.path)
+        )
+        try:
+            with os.fdopen(
+                tmp_fd, "w", encoding="utf-8", errors="surrogateescape"
+            ) as fh:
+                fh.write(content)
+                fh.flush()
+                os.fsync(fh.fileno())
+            os.chmod(tmp_path, mode)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+
+def _read_fd(fd: int) -> str:
+    """Read a whole file descriptor in as few reads as its size allows."""
+    # Callers need the text itself, so map-and-copy would only add
+    # overhead; one read sized from fstat gets a whole regular file
+    size = os.fstat(fd).st_size
+    chunks = []
+    while True:
+        chunk = os.read(fd, max(size + 1, 64 * 1024))
+        if not chunk:
+            break
+        chunks.append(chunk)
+    data = chunks[0] if len(chunks) == 1 else b"".join(chunks)
+    return data.decode("utf-8", errors="surrogateescape")
+
+
+def _fsync_directory(directory: str):
+    """Make a rename durable by syncing its directory."""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class SshTransport:
+    """
+    Runs commands on other hosts with the ssh client.
+
+    Every host gets one master connection (OpenSSH ControlMaster) that later
+    commands are multiplexed over, so only the first command per host pays
+    for the TCP and key exchange handshakes. The master stays up for
+    ``persist`` seconds after the last command.
+    """
+
+    def __init__(
+        self,
+        ssh: Sequence[str] = ("ssh",),
+        control_dir: Optional[str] = None,
+        persist: int = 300,
+        connect_timeout: int = 10,
+        options: Sequence[str] = (),
+    ):
+        """
+        Initialize the transport.
+
+        Args:
+            ssh: Client command line. Anything that takes ssh's options,
+                a host and a remote command works, e.g. a stand-in script.
+            control_dir: Where the master connections' sockets live;
+                defaults to $XDG_RUNTIME_DIR or the temp directory
+            persist: Seconds an idle master connection is kept
+            connect_timeout: Seconds to wait for a host to answer
+            options: Extra ssh options, e.g. ("-o", "Port=2222")
+        """
+        self.ssh = list(ssh)
+        if control_dir is None:
+            control_dir = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+        # %C is a hash of the connection; socket paths must stay short
+        self.control_path = os.path.join(control_dir, "cron_gui-ssh-%C")
+        self.options = []
+        for option in (
+            "BatchMode=yes",
+            f"ConnectTimeout={connect_timeout}",
+            "ControlMaster=auto",
+            f"ControlPath={self.control_path}",
+            f"ControlPersist={persist}",
+        ):
+            self.options += ["-o", option]
+        self.options += list(options)
+
+    def command(self, host: str, remote: Sequence[str]) -> List[str]:
+        """Build the local command line that runs a command on a host."""
+        return self.ssh + self.options + ["--", host, shlex.join(remote)]
+
+    def run(
+        self,
+        host: str,
+        remote: Sequence[str],
+        input: Optional[str] = None,
+        timeout: Optional[float] = None,
+    ) -> subprocess.CompletedProcess:
+        """
+        Run a command on a host.
+
+        Args:
+            host: Host name, optionally as user@host
+            remote: Command and arguments to run there
+            input: Text fed to the command's stdin
+            timeout: Seconds before giving up
+
+        Returns:
+            The completed process, with text stdout and stderr
+
+        Raises:
+            BackendError: If ssh cannot be started or times out
+        """
+        try:
+            return subprocess.run(
+                self.command(host, remote),
+                input=input,
+                capture_output=True,
+                text=True,
+                errors="surrogateescape",
+                timeout=timeout,
+                check=False,
+            )
+        except (OSError, subprocess.TimeoutExpired) as e:
+            raise BackendError(f"Cannot reach {host}: {e}")
+
+    def close(self, host: str):
+        """Stop the master connection of a host, if there is one."""
+        try:
+            subprocess.run(
+                self.ssh + self.options + ["-O", "exit", "--", host],
+                capture_output=True,
+                timeout=5,
+                check=False,
+            )
+        except (OSError, subprocess.TimeoutExpired):
+            pass
+
+
+class SshBackend(CrontabBackend):
+    """Reads and writes a crontab on another host with ``crontab`` over SSH."""
+
+    def __init__(
+        self,
+        host: str,
+        user: Optional[str] = None,
+        transport: Optional[SshTransport] = None,
+        timeout: float = 30,
+    ):
+        """
+        Initialize the backend.
+
+        Args:
+            host: Host to connect to, optionally as login@host
+            user: Whose crontab to edit there; None for the login user's
+            transport: Shared transport; one is created if None
+            timeout: Seconds a single read or write may take
+        """
+        self.host = host
+        self.user = user
+        self.transport = transport or SshTransport()
+        self.timeout = timeout
+
+    def _command(self, *args: str) -> List[str]:
+        """Build the remote crontab command line."""
+        command = ["crontab"]
+        if self.user:
+            command += ["-u", self.user]
+        return command + list(args)
+
+    def describe(self) -> str:
+        if self.user:
+            return f"crontab of {self.user} on {self.host}"
+        return f"crontab on {self.host}"
+
+    def read(self) -> str:
+        result = self.transport.run(
+            self.host, self._command("-l"), timeout=self.timeout
+        )
+        if result.returncode != 0:
+            if "no crontab for" in result.stderr:
+                return ""
+            raise BackendError(
+                f"{self.host}: {result.stderr.strip() or 'crontab -l failed'}"
+            )
+        return result.stdout
+
+    def write(self, content: str):
+        result = self.transport.run(
+            self.host, self._command("-"), input=content, timeout=self.timeout
+        )
+        if result.returncode != 0:
+            raise BackendError(
+                f"{self.host}: {result.stderr.strip() or 'crontab - failed'}"
+            )
@@ -0,0 +1,213 @@
+"""
+Cron Describe - Human-readable descriptions of cron expressions.
+
+Descriptions are compiled from the parsed field items (see
+cron_schedule.parse_field_items) rather than from the raw text, so lists,
+ranges, steps, names and ``L``/``W``/``#`` are all described. The wording
+comes from the phrase tables in cron_gui.phrases, which are loaded on first
+use. Callers should go through the memoized
+cron_parser.cron_to_human_readable.
+"""
+
+from typing import Dict, List, Optional, Sequence
+
+from cron_gui.cron_schedule import (
+    MACROS,
+    SPECIAL_KINDS,
+    FieldItem,
+    parse_field_items,
+)
+from cron_gui.phrases import load_phrases
+
+# Phrase table keys per field index
+_FIELD_KEYS = ("minute", "hour", "day", "month", "weekday", "second")
+
+# Up to this many fixed times are listed as clock times ("at 09:00 and 17:00")
+MAX_LISTED_TIMES = 4
+
+
+def _join(phrases: Dict, parts: Sequence[str]) -> str:
+    """Join items as "a, b and c"."""
+    separator, last = phrases["list"]
+    if len(parts) < 2:
+        return "".join(parts)
+    return separator.join(parts[:-1]) + last + parts[-1]
+
+
+def _name(phrases: Dict, field: int, value: int) -> str:
+    """Render a single value of a field."""
+    if field == 3:
+        return phrases["month_names"][value - 1]
+    if field == 4:
+        return phrases["weekday_names"][value % 7]
+    return str(value)
+
+
+def _endpoint(phrases: Dict, field: int, value: int, last: bool = False) -> str:
+    """Render the end of a range; hours are shown as clock times."""
+    if field == 1:
+        return f"{value:02d}:59" if last else f"{value:02d}:00"
+    return _name(phrases, field, value)
+
+
+def _expand_steps(items: Sequence[FieldItem]) -> List[FieldItem]:
+    """Turn stepped weekday items into plain values ("*/2" -> 0,2,4,6)."""
+    expanded = []
+    for kind, start, end, step in items:
+        if step != 1 and kind in ("*", "range", "from"):
+            expanded.extend(
+                ("value", value, value, 1) for value in range(start, end + 1, step)
+            )
+        else:
+            expanded.append((kind, start, end, step))
+    return expanded
+
+
+def _describe_field(
+    phrases: Dict, field: int, items: Sequence[FieldItem], hourly: bool = False
+) -> str:
+    """
+    Describe one field.
+
+    Args:
+        phrases: Phrase table
+        field: Field index into FIELD_RANGES
+        items: Parsed items of the field
+        hourly: For the minute field, whether the hour field is unrestricted
+
+    Returns:
+        Description, empty for an unrestricted field
+    """
+    table = phrases[_FIELD_KEYS[field]]
+    if field == 4:
+        items = _expand_steps(items)
+    single = len(items) == 1
+
+    fragments: List[Optional[str]] = []
+    parts: List[str] = []
+    plural = False
+    for kind, start, end, step in items:
+        if kind == "*":
+            text = table["*"] if step == 1 else table["*/"].format(step=step)
+            if text:
+                fragments.append(text)
+        elif kind in SPECIAL_KINDS:
+            fragments.append(
+                table[kind].format(
+                    start=start,
+                    day=phrases["weekday_names"][start % 7],
+                    nth=phrases["ordinals"][end - 1] if kind == "#" else "",
+                )
+            )
+        elif kind == "from":
+            fragments.append(
+                table["from"].format(step=step, start=_endpoint(phrases, field, start))
+            )
+        elif kind == "range" and (step != 1 or single):
+            fragments.append(
+                table["range/" if step != 1 else "range"].format(
+                    step=step,
+                    start=_endpoint(phrases, field, start),
+                    end=_endpoint(phrases, field, end, last=True),
+                )
+            )
+        else:
+            # Values and ranges inside a list are described together
+            if not parts:
+                fragments.append(None)
+            if kind == "range":
+                plural = True
+                parts.append(
+                    phrases["range"].format(
+                        start=_name(phrases, field, start),
+                        end=_name(phrases, field, end),
+                    )
+                )
+            else:
+                parts.append(_name(phrases, field, start))
+
+    if parts:
+        singular_text, plural_text = table["hourly" if hourly else "values"]
+        template = plural_text if plural or len(parts) > 1 else singular_text
+        fragments[fragments.index(None)] = template.format(list=_join(phrases, parts))
+    return _join(phrases, fragments)
+
+
+def _fixed_times(fields: Sequence[Sequence[FieldItem]]) -> Optional[List[str]]:
+    """
+    List the clock times of a schedule with only single values in its
+    second, minute and hour fields.
+
+    Returns:
+        Sorted times, or None if there are other items or too many times
+    """
+    seconds = fields[5] if len(fields) == 6 else (("value", 0, 0, 1),)
+    fixed = (fields[0], fields[1], seconds)
+    if any(item[0] != "value" for field in fixed for item in field):
+        return None
+    if len(fields[0]) * len(fields[1]) * len(seconds) > MAX_LISTED_TIMES:
+        return None
+
+    show_seconds = any(item[1] for item in seconds)
+    times = []
+    for hour in sorted({item[1] for item in fields[1]}):
+        for minute in sorted({item[1] for item in fields[0]}):
+            for second in sorted({item[1] for item in seconds}):
+                if show_seconds:
+                    times.append(f"{hour:02d}:{minute:02d}:{second:02d}")
+                else:
+                    times.append(f"{hour:02d}:{minute:02d}")
+    return times
+
+
+def describe_expression(expression: str, language: Optional[str] = None) -> str:
+    """
+    Describe a cron expression in words.
+
+    Args:
+        expression: Cron expression or macro
+        language: Language code of the phrase table; defaults to the locale
+
+    Returns:
+        Description such as "At 09:00, on Monday through Friday", or the
+        table's "invalid" phrase
+    """
+    phrases = load_phrases(language)
+    texts = expression.split()
+    if len(texts) == 1 and texts[0].lower() in MACROS:
+        macro = texts[0].lower()
+        if macro == "@reboot":
+            return phrases["reboot"]
+        texts = MACROS[macro].split()
+    if len(texts) not in (5, 6):
+        return phrases["invalid"]
+
+    try:
+        fields = [parse_field_items(text, idx) for idx, text in enumerate(texts)]
+    except ValueError:
+        return phrases["invalid"]
+
+    clauses = []
+    times = _fixed_times(fields)
+    if times is not None:
+        clauses.append(phrases["at_times"].format(list=_join(phrases, times)))
+    else:
+        if len(fields) == 6:
+            clauses.append(_describe_field(phrases, 5, fields[5]))
+        hour_text = _describe_field(phrases, 1, fields[1])
+        clauses.append(_describe_field(phrases, 0, fields[0], hourly=not hour_text))
+        clauses.append(hour_text)
+
+    # Like cron, restricted day of month and day of week fields are ORed
+    day_text = _describe_field(phrases, 2, fields[2])
+    weekday_text = _describe_field(phrases, 4, fields[4])
+    if day_text and weekday_text and not texts[2].startswith(("*", "?")) and not (
+        texts[4].startswith(("*", "?"))
+    ):
+        clauses.append(phrases["or"].format(day_text, weekday_text))
+    else:
+        clauses.extend((day_text, weekday_text))
+    clauses.append(_describe_field(phrases, 3, fields[3]))
+
+    text = phrases["clause"].join(clause for clause in clauses if clause)
+    return text[:1].upper() + text[1:]
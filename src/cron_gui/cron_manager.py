@@ -1,28 +1,303 @@
 """
-Cron Manager - Backend logic for managing cron jobs using python-crontab.
+Cron Manager - Backend logic for managing cron jobs.
 """
 
-from crontab import CronTab
-from typing import List, Dict, Optional
+from contextlib import contextmanager
+from typing import (
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+)
 import os
+import socket
+
+from cron_gui.cron_backend import (
+    BackendError,
+    CrontabBackend,
+    TabfileBackend,
+    UserCrontabBackend,
+)
+from cron_gui.cron_parser import validate_cron_expression
+from cron_gui.cron_schedule import cron_dialect_error
+from cron_gui.edit_journal import (
+    EditJournal,
+    content_hash,
+    default_journal_path,
+    diff_lines,
+    diff_texts,
+)
+from cron_gui.history_store import HistoryStore, default_history_dir
+from cron_gui.startup_cache import CachedCrontab, Findings, StartupCache
+from cron_gui.crontab_document import (
+    SPECIAL_SCHEDULES,
+    CronLine,
+    CrontabDocument,
+    format_job,
+)
+from cron_gui.crontab_merge import (
+    PREFER_OURS,
+    PREFER_THEIRS,
+    MergeConflict,
+    merge_lines,
+)
+from cron_gui.profiling import profiled, profiler
+
+
+# Times a write is merged and retried while others keep writing
+MAX_MERGE_ATTEMPTS = 10
+
+
+class ConflictError(RuntimeError):
+    """Raised when the same job was changed here and outside Cron GUI."""
+
+    def __init__(self, conflicts: List[MergeConflict]):
+        super().__init__(f"{len(conflicts)} job(s) were also changed elsewhere")
+        self.conflicts = conflicts
+
+
+class _PendingEdit(NamedTuple):
+    """An edit that was rolled back because of conflicts."""
+
+    label: Optional[str]
+    history_label: Optional[str]
+    content: str
+    conflicts: List[MergeConflict]
+
+
+def _is_valid_schedule(schedule: str) -> bool:
+    """
+    Check a schedule expression for a crontab line.
+
+    Macros such as @reboot are accepted. A seconds field and the L/W/#
+    extensions the engine previews are not, since cron refuses such lines;
+    see cron_dialect_error.
+    """
+    if schedule.startswith("@"):
+        return schedule.lower() in SPECIAL_SCHEDULES
+    return validate_cron_expression(schedule) and cron_dialect_error(schedule) is None
+
+
+def _is_single_line(*values: str) -> bool:
+    """Check that none of the values would break the line structure."""
+    return not any("\n" in value or "\r" in value for value in values)
+
+
+def _toggled_text(line: CronLine, enabled: bool) -> str:
+    """Get the text of a job line enabled or disabled, otherwise untouched."""
+    if enabled:
+        # Uncomment in place so the rest of the line stays untouched
+        new_text = line.text.lstrip().lstrip("#")
+        if new_text.startswith(" "):
+            new_text = new_text[1:]
+        return new_text
+    return "# " + line.text
+
+
+def _plural(verb: str, count: int) -> str:
+    """Label an edit of several jobs, e.g. "Delete 3 jobs"."""
+    return f"{verb} job" if count == 1 else f"{verb} {count} jobs"
 
 
 class CronManager:
-    """Manages cron jobs using python-crontab library."""
+    """Manages cron jobs in a crontab, preserving every line it does not edit."""
 
-    def __init__(self, user: Optional[str] = None):
+    def __init__(
+        self,
+        user: Optional[str] = None,
+        tabfile: Optional[str] = None,
+        backend: Optional[CrontabBackend] = None,
+        journal: Optional[EditJournal] = None,
+        history: Optional[HistoryStore] = None,
+        cache: Optional[StartupCache] = None,
+        persist: bool = True,
+    ):
         """
         Initialize the CronManager.
 
         Args:
             user: Username for crontab. If None, uses current user.
+            tabfile: Path of a crontab-format file to edit directly instead
+                of the user's crontab. No cron installation is needed.
+            backend: Explicit storage backend; overrides user and tabfile
+            journal: Undo/redo history. Defaults to one persisted under
+                $XDG_STATE_HOME for this crontab.
+            history: Version history every write is stored in. Defaults to
+                one under $XDG_DATA_HOME for this crontab.
+            cache: Startup cache to start from. When it holds this crontab,
+                the crontab is not read until reload() is called, and
+                cached is set; see save_cache().
+            persist: Whether the default journal and version history are
+                kept on disk. Without it undo history is kept in memory and
+                there is no version history, so crontabs the user cannot
+                read (e.g. root's) are never copied into their files.
         """
         self.user = user or os.getenv("USER")
+        if backend is not None:
+            self.backend = backend
+        elif tabfile:
+            self.backend = TabfileBackend(tabfile)
+        else:
+            self.backend = UserCrontabBackend(self.user)
+
+        # Where the jobs come from, shown when grouping jobs by source
+        self.source = self.backend.describe()
+        self.host = self.backend.host or socket.gethostname()
+
+        if history is None and persist:
+            history = HistoryStore(default_history_dir(self.source))
+        # None when versions are not kept
+        self.history: Optional[HistoryStore] = history
+
+        # Fingerprint of the crontab as last read or written; a write only
+        # goes through unchanged while the crontab still matches it
+        self._content_hash = ""
+        # Edit waiting for resolve_conflicts()
+        self._pending: Optional[_PendingEdit] = None
+        # Whether the last write merged in changes made elsewhere
+        self.merged = False
+        self.cache = cache
+        # State started from, until reload() has read the crontab; its jobs
+        # are handed out by the first list_jobs()
+        self.cached: Optional[CachedCrontab] = None
+        self._cached_jobs: Optional[List[Dict]] = None
+        # Fingerprint the cache holds, while its lint findings are fresh
+        self._cache_fingerprint = ""
         try:
-            self.cron = CronTab(user=self.user)
+            if cache is not None:
+                self.cached = cache.load(self.source)
+            if self.cached is not None:
+                self.document = CrontabDocument.parse(self.cached.content)
+                self._content_hash = self.cached.fingerprint
+                self._cached_jobs = self.cached.jobs
+                if self.cached.lint:
+                    self._cache_fingerprint = self.cached.fingerprint
+            else:
+                self.document = self._load()
         except Exception as e:
             raise RuntimeError(f"Failed to initialize crontab: {e}")
 
+        if journal is None:
+            journal = EditJournal(
+                default_journal_path(self.source) if persist else None
+            )
+        self.journal = journal
+        self.journal.attach(self._content_hash)
+
+    def _load(self, text: Optional[str] = None) -> Optional[CrontabDocument]:
+        """
+        Read and parse the crontab from the backend.
+
+        Args:
+            text: Crontab already read from the backend
+
+        Returns:
+            The parsed crontab, or None if it has the same fingerprint as
+            when it was last read or written, so the current document
+            can be kept
+        """
+        if text is None:
+            text = self.backend.read()
+        fingerprint = content_hash(text)
+        if fingerprint == self._content_hash:
+            return None
+        self._content_hash = fingerprint
+        # Catches edits made with crontab -e and other tools since last time;
+        # who made them is unknown
+        self._record_version(text, "Changed outside Cron GUI", user="")
+        return CrontabDocument.parse(text)
+
+    def _record_version(self, content: str, label: str, user: Optional[str] = None):
+        """Store a version in the history; failures only cost the history."""
+        if self.history is None:
+            return
+        try:
+            if self.history.latest() is None:
+                label = "First seen by Cron GUI"
+            self.history.commit(content, label, user)
+        except Exception as e:
+            print(f"Error recording crontab history: {e}")
+
+    def restore_version(self, number: int) -> bool:
+        """
+        Restore a version from the history with a single crontab write.
+
+        The restore is itself an edit, so it can be undone.
+
+        Args:
+            number: Version number, see HistoryStore.versions()
+
+        Returns:
+            True if successful, False otherwise
+        """
+        if self.history is None:
+            return False
+        try:
+            content = self.history.checkout(number)
+            with self._editing(f"Restore version {number}") as document:
+                document.replace_all(content)
+            return True
+        except Exception as e:
+            print(f"Error restoring version: {e}")
+            return False
+
+    def iter_jobs(self) -> Iterator[Dict]:
+        """
+        Lazily yield cron jobs.
+
+        Yields:
+            Dictionaries containing job information, in crontab order
+        """
+        scopes = self.document.env_scopes()
+        for idx, line in enumerate(self.document.jobs()):
+            yield self._job_dict(idx, line, scopes[idx])
+
+    def _job_dict(self, idx: int, line: CronLine, env) -> Dict:
+        """Describe a job line as the dictionary the UI works with."""
+        return {
+            "id": idx,
+            "command": line.command,
+            "schedule": line.schedule,
+            "comment": line.comment,
+            "enabled": line.enabled,
+            "valid": _is_valid_schedule(line.schedule),
+            # Shared, read-only mapping; do not copy per job
+            "env": env,
+            "source": self.source,
+            "user": self.user,
+            "host": self.host,
+        }
+
+    def get_job(self, job_id: int) -> Optional[Dict]:
+        """
+        Get a single job.
+
+        Args:
+            job_id: Index of the job
+
+        Returns:
+            Job dictionary as produced by iter_jobs, or None if out of range
+        """
+        line = self.document.job(job_id)
+        if line is None:
+            return None
+        return self._job_dict(job_id, line, self.document.env_scopes()[job_id])
+
+    def job_counts(self) -> Tuple[int, int]:
+        """
+        Count the jobs.
+
+        Returns:
+            (total, enabled)
+        """
+        jobs = self.document.jobs()
+        return len(jobs), sum(1 for line in jobs if line.enabled)
+
+    @profiled("manager.list_jobs", "manager")
     def list_jobs(self) -> List[Dict]:
         """
         Get all cron jobs.
@@ -30,21 +305,49 @@ class CronManager:
         Returns:
             List of dictionaries containing job information.
         """
-        jobs = []
-        for idx, job in enumerate(self.cron):
-            jobs.append(
-                {
-                    "id": idx,
-                    "command": str(job.command),
-                    "schedule": str(job.slices),
-                    "comment": job.comment or "",
-                    "enabled": job.is_enabled(),
-                    "valid": job.is_valid(),
-                }
-            )
-        return jobs
+        if self._cached_jobs is not None:
+            jobs, self._cached_jobs = self._cached_jobs, None
+            return jobs
+        return list(self.iter_jobs())
+
+    def save_cache(
+        self, jobs: List[Dict], lint: Findings, schedules: Dict[str, str]
+    ) -> bool:
+        """
+        Save the crontab to the startup cache for the next start.
+
+        Args:
+            jobs: The current jobs, as list_jobs returned them
+            lint: Findings to reuse, see CrontabLinter.cached_state
+            schedules: Normalized schedules, see CrontabLinter.cached_state
+
+        Returns:
+            True if saved or the cache is up to date, False if there is no
+            cache, the jobs do not match the crontab or writing failed
+        """
+        if self.cache is None or len(jobs) != len(self.document.jobs()):
+            return False
+        if self._content_hash == self._cache_fingerprint:
+            return True
+        saved = self.cache.save(
+            self.source,
+            self._content_hash,
+            self.document.render(),
+            jobs,
+            lint,
+            schedules,
+        )
+        if saved:
+            self._cache_fingerprint = self._content_hash
+        return saved
 
-    def add_job(self, command: str, schedule: str, comment: str = "") -> bool:
+    def add_job(
+        self,
+        command: str,
+        schedule: str,
+        comment: str = "",
+        env: Optional[Dict[str, str]] = None,
+    ) -> bool:
         """
         Add a new cron job.
 
@@ -52,25 +355,74 @@ class CronManager:
             command: Command to execute
             schedule: Cron schedule expression (e.g., "0 * * * *")
             comment: Optional comment/description
+            env: Optional environment lines to write directly above the job
 
         Returns:
             True if successful, False otherwise
         """
         try:
-            job = self.cron.new(command=command, comment=comment)
-            job.setall(schedule)
-
-            if not job.is_valid():
+            if not _is_valid_schedule(schedule) or not _is_single_line(command, comment):
                 return False
 
-            self.cron.write()
+            with self._editing("Add job") as document:
+                line = document.append(format_job(schedule, command, comment))
+                if env:
+                    document.set_env_block(line, env)
             return True
         except Exception as e:
             print(f"Error adding job: {e}")
             return False
 
+    def add_jobs(
+        self,
+        jobs: Iterable[Tuple[str, str, str]],
+        label: Optional[str] = None,
+        env: Optional[Dict[str, str]] = None,
+    ) -> bool:
+        """
+        Add many jobs with a single crontab write.
+
+        Args:
+            jobs: (schedule, command, comment) per job, appended in order
+            label: Label of the edit; "Add N jobs" by default
+            env: Optional environment lines to write directly above the
+                first job; they apply to all the jobs added
+
+        Returns:
+            True if successful, False if any job is invalid (then none is
+            added) or writing failed
+        """
+        try:
+            lines = []
+            # Generated jobs share a few schedules, each validated once
+            valid = set()
+            for schedule, command, comment in jobs:
+                if schedule not in valid:
+                    if not _is_valid_schedule(schedule):
+                        return False
+                    valid.add(schedule)
+                if not _is_single_line(command, comment):
+                    return False
+                lines.append(format_job(schedule, command, comment))
+            if not lines:
+                return True
+
+            with self._editing(label or _plural("Add", len(lines))) as document:
+                appended = [document.append(text) for text in lines]
+                if env:
+                    document.set_env_block(appended[0], env)
+            return True
+        except Exception as e:
+            print(f"Error adding jobs: {e}")
+            return False
+
     def update_job(
-        self, job_id: int, command: str, schedule: str, comment: str = ""
+        self,
+        job_id: int,
+        command: str,
+        schedule: str,
+        comment: str = "",
+        env: Optional[Dict[str, str]] = None,
     ) -> bool:
         """
         Update an existing cron job.
@@ -80,24 +432,25 @@ class CronManager:
             command: New command
             schedule: New schedule expression
             comment: New comment
+            env: If given, replaces the environment lines directly above
+                the job. Note that they also apply to the jobs below it.
 
         Returns:
             True if successful, False otherwise
         """
         try:
-            jobs = list(self.cron)
-            if job_id < 0 or job_id >= len(jobs):
+            line = self.document.job(job_id)
+            if line is None:
                 return False
-
-            job = jobs[job_id]
-            job.set_command(command)
-            job.setall(schedule)
-            job.set_comment(comment)
-
-            if not job.is_valid():
+            if not _is_valid_schedule(schedule) or not _is_single_line(command, comment):
                 return False
 
-            self.cron.write()
+            with self._editing("Edit job") as document:
+                document.replace(
+                    line, format_job(schedule, command, comment, line.enabled)
+                )
+                if env is not None:
+                    document.set_env_block(line, env)
             return True
         except Exception as e:
             print(f"Error updating job: {e}")
@@ -113,45 +466,443 @@ class CronManager:
         Returns:
             True if successful, False otherwise
         """
-        try:
-            jobs = list(self.cron)
+        return self.delete_jobs([job_id])
+
+    def toggle_job(self, job_id: int, enabled: bool) -> bool:
+        """
+        Enable or disable a cron job.
+
+        Args:
+            job_id: Index of the job to toggle
+            enabled: True to enable, False to disable
+
+        Returns:
+            True if successful, False otherwise
+        """
+        return self.toggle_jobs([job_id], enabled)
+
+    def _job_lines(self, job_ids: Iterable[int]) -> Optional[List[CronLine]]:
+        """Resolve job indexes to lines, or None if any is out of range."""
+        jobs = self.document.jobs()
+        lines = []
+        for job_id in job_ids:
             if job_id < 0 or job_id >= len(jobs):
+                return None
+            lines.append(jobs[job_id])
+        return lines
+
+    def delete_jobs(self, job_ids: Iterable[int]) -> bool:
+        """
+        Delete several cron jobs with a single crontab write.
+
+        Args:
+            job_ids: Indexes of the jobs to delete
+
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            lines = self._job_lines(job_ids)
+            if lines is None:
                 return False
 
-            self.cron.remove(jobs[job_id])
-            self.cron.write()
+            with self._editing(_plural("Delete", len(lines))) as document:
+                document.remove_many(lines)
             return True
         except Exception as e:
-            print(f"Error deleting job: {e}")
+            print(f"Error deleting jobs: {e}")
             return False
 
-    def toggle_job(self, job_id: int, enabled: bool) -> bool:
+    def toggle_jobs(self, job_ids: Iterable[int], enabled: bool) -> bool:
         """
-        Enable or disable a cron job.
+        Enable or disable several cron jobs with a single crontab write.
 
         Args:
-            job_id: Index of the job to toggle
+            job_ids: Indexes of the jobs to toggle
             enabled: True to enable, False to disable
 
         Returns:
             True if successful, False otherwise
         """
         try:
-            jobs = list(self.cron)
-            if job_id < 0 or job_id >= len(jobs):
+            lines = self._job_lines(job_ids)
+            if lines is None:
+                return False
+            lines = [line for line in lines if line.enabled != enabled]
+            if not lines:
+                return True
+
+            verb = "Enable" if enabled else "Disable"
+            with self._editing(_plural(verb, len(lines))) as document:
+                for line in lines:
+                    document.replace(line, _toggled_text(line, enabled))
+            return True
+        except Exception as e:
+            print(f"Error toggling jobs: {e}")
+            return False
+
+    def retag_jobs(self, job_ids: Iterable[int], comment: str) -> bool:
+        """
+        Set the comment of several cron jobs with a single crontab write.
+
+        Args:
+            job_ids: Indexes of the jobs to change
+            comment: New comment; empty to remove it
+
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            lines = self._job_lines(job_ids)
+            if lines is None or not _is_single_line(comment):
                 return False
+            lines = [line for line in lines if line.comment != comment]
+            if not lines:
+                return True
 
-            job = jobs[job_id]
-            job.enable(enabled)
-            self.cron.write()
+            with self._editing(_plural("Comment", len(lines))) as document:
+                for line in lines:
+                    document.replace(
+                        line,
+                        format_job(line.schedule, line.command, comment, line.enabled),
+                    )
             return True
         except Exception as e:
-            print(f"Error toggling job: {e}")
+            print(f"Error retagging jobs: {e}")
             return False
 
-    def reload(self):
-        """Reload the crontab from disk."""
+    def reschedule_jobs(self, job_ids: Iterable[int], schedule: str) -> bool:
+        """
+        Set the schedule of several cron jobs with a single crontab write.
+
+        Args:
+            job_ids: Indexes of the jobs to change
+            schedule: New schedule expression
+
+        Returns:
+            True if successful, False otherwise
+        """
         try:
-            self.cron = CronTab(user=self.user)
+            lines = self._job_lines(job_ids)
+            if lines is None or not _is_valid_schedule(schedule):
+                return False
+            lines = [line for line in lines if line.schedule != schedule]
+            if not lines:
+                return True
+
+            with self._editing(_plural("Reschedule", len(lines))) as document:
+                for line in lines:
+                    document.replace(
+                        line,
+                        format_job(schedule, line.command, line.comment, line.enabled),
+                    )
+            return True
         except Exception as e:
-            raise RuntimeError(f"Failed to reload crontab: {e}")
+            print(f"Error rescheduling jobs: {e}")
+            return False
+
+    def apply_job_changes(
+        self,
+        replace: Dict[int, str],
+        delete: Iterable[int],
+        insert: Sequence[Tuple[Optional[int], str]],
+        label: str = "Change jobs",
+    ) -> bool:
+        """
+        Rewrite, delete and insert job lines with a single crontab write.
+
+        Args:
+            replace: New line text per job index
+            delete: Indexes of the jobs to delete
+            insert: (index of the job to insert above, or None to append,
+                line text) per new job; several above the same job keep
+                their order
+            label: Label of the edit in the journal and history
+
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            jobs = self.document.jobs()
+            delete = list(delete)
+            anchors = [idx for idx, _ in insert if idx is not None]
+            if any(not 0 <= idx < len(jobs) for idx in [*replace, *delete, *anchors]):
+                return False
+
+            with self._editing(label) as document:
+                for idx, text in replace.items():
+                    if jobs[idx].text != text:
+                        document.replace(jobs[idx], text)
+                for idx, text in insert:
+                    if idx is None:
+                        document.append(text)
+                    else:
+                        document.insert_before(jobs[idx], text)
+                document.remove_many(jobs[idx] for idx in delete)
+            return True
+        except Exception as e:
+            print(f"Error changing jobs: {e}")
+            return False
+
+    def merge_jobs(
+        self, keep_id: int, delete_ids: Iterable[int], schedule: Optional[str] = None
+    ) -> bool:
+        """
+        Merge duplicate jobs into one with a single crontab write.
+
+        Args:
+            keep_id: Index of the job to keep
+            delete_ids: Indexes of its duplicates, which are deleted
+            schedule: New schedule of the kept job, e.g. one covering the
+                runs of all the jobs; None to keep its schedule
+
+        Returns:
+            True if successful, False otherwise
+        """
+        delete_ids = [job_id for job_id in delete_ids if job_id != keep_id]
+        kept = self.document.job(keep_id)
+        if kept is None or (schedule is not None and not _is_valid_schedule(schedule)):
+            return False
+        replace = {}
+        if schedule is not None and schedule != kept.schedule:
+            replace[keep_id] = format_job(
+                schedule, kept.command, kept.comment, kept.enabled
+            )
+        return self.apply_job_changes(
+            replace, delete_ids, [], f"Merge {len(delete_ids) + 1} jobs"
+        )
+
+    def get_env_block(self, job_id: int) -> Dict[str, str]:
+        """
+        Get the environment lines written directly above a job.
+
+        Args:
+            job_id: Index of the job
+
+        Returns:
+            Variables in file order; empty if there are none
+        """
+        line = self.document.job(job_id)
+        if line is None:
+            return {}
+        return dict(env_line.env for env_line in self.document.env_block(line))
+
+    def undo(self) -> Optional[str]:
+        """
+        Revert the last edit with a single crontab write.
+
+        Returns:
+            Label of the reverted edit, or None if there was nothing to undo
+            or it failed
+        """
+        return self._replay(undo=True)
+
+    def redo(self) -> Optional[str]:
+        """
+        Reapply the last undone edit with a single crontab write.
+
+        Returns:
+            Label of the reapplied edit, or None if there was nothing to redo
+            or it failed
+        """
+        return self._replay(undo=False)
+
+    def _replay(self, undo: bool) -> Optional[str]:
+        """Apply a journal entry backwards or forwards."""
+        entry = self.journal.undo_entry() if undo else self.journal.redo_entry()
+        if entry is None:
+            return None
+        try:
+            expected = entry.after if undo else entry.before
+            if expected != self._content_hash:
+                # The crontab was changed outside the journal
+                self.journal.clear()
+                return None
+
+            action = "Undo" if undo else "Redo"
+            history_label = f"{action}: {entry.label}"
+            with self._editing(history_label=history_label) as document:
+                document.apply_hunks(entry.hunks, undo=undo)
+            if undo:
+                self.journal.undone()
+            else:
+                self.journal.redone()
+            return entry.label
+        except Exception as e:
+            print(f"Error {'undoing' if undo else 'redoing'} edit: {e}")
+            return None
+
+    def reload(self, content: Optional[str] = None) -> bool:
+        """
+        Reload the crontab from disk.
+
+        Args:
+            content: Crontab already read from the backend, e.g. on a
+                worker thread; read now by default
+
+        Returns:
+            True if it changed since it was last read or written; otherwise
+            the parsed document is kept as it is
+        """
+        with profiler.span("manager.reload", "manager"):
+            try:
+                document = self._load(content)
+            except Exception as e:
+                raise RuntimeError(f"Failed to reload crontab: {e}")
+            if document is not None:
+                self.document = document
+                self._cached_jobs = None
+            self.cached = None
+            self.journal.attach(self._content_hash)
+            self._pending = None
+        return document is not None
+
+    @property
+    def fingerprint(self) -> str:
+        """Content hash of the crontab as last read or written."""
+        return self._content_hash
+
+    @property
+    def conflicts(self) -> List[MergeConflict]:
+        """Jobs the last failed edit changed that were also changed elsewhere."""
+        return self._pending.conflicts if self._pending else []
+
+    def resolve_conflicts(self, keep_ours: bool) -> bool:
+        """
+        Redo the edit that failed with conflicts, resolving them one way.
+
+        Changes that did not conflict are merged as usual, from both sides.
+
+        Args:
+            keep_ours: Keep our version of the conflicting jobs; otherwise
+                keep the version written elsewhere
+
+        Returns:
+            True if successful, False otherwise
+        """
+        pending = self._pending
+        if pending is None:
+            return False
+        self._pending = None
+        try:
+            prefer = PREFER_OURS if keep_ours else PREFER_THEIRS
+            with self._editing(
+                pending.label, pending.history_label, prefer
+            ) as document:
+                document.replace_all(pending.content)
+            return True
+        except Exception as e:
+            print(f"Error resolving conflicts: {e}")
+            return False
+
+    @contextmanager
+    def _editing(
+        self,
+        label: Optional[str] = None,
+        history_label: Optional[str] = None,
+        prefer: Optional[str] = None,
+    ):
+        """
+        Edit the document and write it, rolling back if anything fails.
+
+        Args:
+            label: Record the edit in the journal under this label; None
+                for edits that must not be recorded, such as undo itself
+            history_label: Label of the version stored in the history;
+                defaults to label
+            prefer: How to resolve conflicts with changes made elsewhere,
+                see crontab_merge; None raises ConflictError
+
+        Raises:
+            ConflictError: The edit was rolled back and kept for
+                resolve_conflicts()
+            BackendError: The crontab is read-only; nothing was edited
+        """
+        if self.backend.read_only:
+            raise BackendError(f"{self.source} is read-only")
+        snapshot = self.document.snapshot()
+        before_hash = self._content_hash
+        self._cached_jobs = None
+        try:
+            yield self.document
+            merged_from = self._write(
+                history_label or label or "Edit", snapshot[1], prefer
+            )
+        except ConflictError as e:
+            self._pending = _PendingEdit(
+                label, history_label, self.document.render(), e.conflicts
+            )
+            self.document.restore(snapshot)
+            raise
+        except Exception:
+            self.document.restore(snapshot)
+            raise
+
+        if label is not None:
+            if merged_from is None:
+                lines, texts = snapshot
+                hunks = diff_lines(lines, texts, self.document.lines)
+            else:
+                # Undoing must keep the changes made elsewhere
+                texts, before_hash = merged_from
+                hunks = diff_texts(texts, [line.text for line in self.document.lines])
+            if hunks:
+                self.journal.record(label, hunks, before_hash, self._content_hash)
+
+    def _write(
+        self, label: str, base_texts: List[str], prefer: Optional[str] = None
+    ) -> Optional[Tuple[List[str], str]]:
+        """
+        Write the in-memory crontab back to the backend.
+
+        The write only goes through if the crontab is unchanged since it was
+        last read or written. Otherwise the changes made elsewhere are merged
+        into the document, which is then written instead.
+
+        Args:
+            label: Label of the version stored in the history
+            base_texts: Line texts the edit started from
+            prefer: How to resolve conflicts, see _editing
+
+        Returns:
+            None if the crontab was unchanged, otherwise the line texts and
+            content hash of the last version merged in
+
+        Raises:
+            ConflictError: The same job was changed on both sides
+        """
+        merged_from = None
+        expected = self._content_hash
+        with profiler.span("manager.write", "manager"):
+            content = self.document.render()
+            for _ in range(MAX_MERGE_ATTEMPTS):
+                current = self.backend.write_if_unchanged(content, expected)
+                if current is None:
+                    break
+                with profiler.span("manager.merge", "manager"):
+                    theirs = CrontabDocument.parse(current)
+                    theirs_texts = [line.text for line in theirs.lines]
+                    result = merge_lines(
+                        base_texts,
+                        [line.text for line in self.document.lines],
+                        theirs_texts,
+                        prefer,
+                    )
+                    if result.conflicts:
+                        raise ConflictError(result.conflicts)
+                    self._record_version(current, "Changed outside Cron GUI", user="")
+                    merged = "\n".join(result.lines)
+                    if theirs.trailing_newline and result.lines:
+                        merged += "\n"
+                    self.document.replace_all(merged)
+                expected = content_hash(current)
+                merged_from = (theirs_texts, expected)
+                base_texts = theirs_texts
+                content = self.document.render()
+            else:
+                raise BackendError("The crontab keeps changing; try again")
+            self._content_hash = content_hash(content)
+            self.merged = merged_from is not None
+        with profiler.span("manager.history", "manager"):
+            self._record_version(content, label)
+        return merged_from
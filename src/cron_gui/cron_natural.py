@@ -0,0 +1,582 @@
+"""
+Cron Natural - Compile schedules written in plain English to cron lines.
+
+Phrases such as "every 15 minutes on weekdays between 9 and 17" or "at
+02:30 on the 1st of each month" are turned into cron expressions. The
+grammar is two tables compiled once at import: WORDS maps every word to
+grammar tokens, and RULES are regular expressions over token kinds (one
+character per token) with the method that applies each. A phrase is
+tokenized with one regex scan and at every position the longest matching
+rule wins, so parsing a phrase costs a few dozen regex matches and is fast
+enough to run on every keystroke.
+
+When no single cron line can express a schedule, several are made: "at
+9:15 and 17:45" needs a line per minute, and "every 15 minutes between 9:30
+and 17:00" needs its first, middle and last hours apart. The end of a time
+window is included, so "between 9 and 17" runs at 17:00 but not after it.
+Repetitions start over at midnight and on the first of the month, as
+cron's own steps do.
+
+Phrases only cron's extensions could express, such as "first Monday" or
+"last day of the month" (``1#1``, ``L``), are understood but refused:
+vixie cron and cronie reject those lines.
+"""
+
+import re
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from cron_gui.cron_schedule import compile_schedule, cron_dialect_error
+
+# Most cron lines one phrase may turn into
+MAX_LINES = 24
+
+_WEEKDAYS = tuple("sunday monday tuesday wednesday thursday friday saturday".split())
+_MONTHS = tuple(
+    (
+        "january february march april may june july august september october "
+        "november december"
+    ).split()
+)
+
+
+class _Token(NamedTuple):
+    """A grammar token: its kind code, value and the text it came from."""
+
+    kind: str
+    value: object
+    text: str
+
+
+# Token kinds, one character each so rules can be regular expressions:
+#   E every/each   A at   O on   I in   B between   F from   P past
+#   & and/,   T to/through/-   L last   x other   H half   Q quarter
+#   n number   o ordinal   t clock time   w weekday   W weekday group
+#   v "weekday"   m month   u minute   h hour   d day   k week   M month
+#   y year
+def _build_words() -> Dict[str, Tuple[Tuple[str, object], ...]]:
+    """Build the word table; each word stands for one or more tokens."""
+    words: Dict[str, Tuple[Tuple[str, object], ...]] = {}
+    for kind, names in (
+        ("E", "every each"),
+        ("A", "at"),
+        ("O", "on"),
+        ("I", "in during"),
+        ("B", "between"),
+        ("F", "from"),
+        ("P", "past after"),
+        ("&", "and"),
+        ("T", "to through thru until till"),
+        ("L", "last"),
+        ("x", "other"),
+        ("H", "half"),
+        ("Q", "quarter"),
+        ("v", "weekday workday"),
+        ("u", "minute minutes min mins"),
+        ("h", "hour hours hr hrs"),
+        ("d", "day days"),
+        ("k", "week weeks"),
+        ("M", "month months"),
+        ("y", "year years"),
+    ):
+        for name in names.split():
+            words[name] = ((kind, None),)
+    for name in ("the", "of", "a", "an", "o'clock", "oclock"):
+        words[name] = ()
+    for name, unit in (
+        ("minutely", "u"),
+        ("hourly", "h"),
+        ("daily", "d"),
+        ("everyday", "d"),
+        ("nightly", "d"),
+        ("weekly", "k"),
+        ("monthly", "M"),
+        ("yearly", "y"),
+        ("annually", "y"),
+    ):
+        words[name] = (("E", None), (unit, None))
+
+    for value, name in enumerate(_WEEKDAYS):
+        for spelling in (name, name + "s", name[:3]):
+            words[spelling] = (("w", value),)
+    for spelling, value in (("tues", 2), ("weds", 3), ("thur", 4), ("thurs", 4)):
+        words[spelling] = (("w", value),)
+    words["weekdays"] = words["workdays"] = (("W", (1, 2, 3, 4, 5)),)
+    words["weekends"] = words["weekend"] = (("W", (0, 6)),)
+
+    for value, name in enumerate(_MONTHS, 1):
+        words[name] = words[name[:3]] = (("m", value),)
+    words["sept"] = (("m", 9),)
+
+    for value, name in enumerate(("first", "second", "third", "fourth", "fifth"), 1):
+        words[name] = (("o", value),)
+    for value, name in enumerate(
+        "one two three four five six seven eight nine ten eleven twelve".split(), 1
+    ):
+        words[name] = (("n", value),)
+    for value, name in ((15, "fifteen"), (20, "twenty"), (30, "thirty")):
+        words[name] = (("n", value),)
+    words["noon"] = words["midday"] = (("t", (12, 0)),)
+    words["midnight"] = (("t", (0, 0)),)
+    return words
+
+
+WORDS = _build_words()
+
+# One alternative per token shape; tried at each position of the phrase
+_SCAN = re.compile(
+    r"\s*(?:"
+    r"(?P<hour>\d{1,2})(?::(?P<minute>\d{2}))?\s*(?P<half>[ap])\.?m\b\.?"
+    r"|(?P<clock_hour>\d{1,2}):(?P<clock_minute>\d{2})\b"
+    r"|(?P<ordinal>\d{1,2})(?:st|nd|rd|th)\b"
+    r"|(?P<number>\d+)\b"
+    r"|(?P<word>[a-z]+(?:'[a-z]+)?)"
+    r"|(?P<sep>[,&])"
+    r"|(?P<range>-)"
+    r"|(?P<stop>\.)"
+    r")"
+)
+
+
+def tokenize(text: str) -> List[_Token]:
+    """
+    Split a phrase into grammar tokens.
+
+    Raises:
+        ValueError: For words and characters the grammar does not know
+    """
+    tokens = []
+    text = text.strip().lower()
+    pos = 0
+    while pos < len(text):
+        match = _SCAN.match(text, pos)
+        if match is None:
+            raise ValueError(f"Did not understand {text[pos:].split()[0]!r}")
+        pos = match.end()
+        source = match.group().strip()
+        if match.group("half"):
+            hour = int(match.group("hour"))
+            if not 1 <= hour <= 12:
+                raise ValueError(f"{source} is not a time")
+            hour = hour % 12 + (12 if match.group("half") == "p" else 0)
+            tokens.append(_Token("t", (hour, int(match.group("minute") or 0)), source))
+        elif match.group("clock_hour"):
+            tokens.append(
+                _Token(
+                    "t",
+                    (int(match.group("clock_hour")), int(match.group("clock_minute"))),
+                    source,
+                )
+            )
+        elif match.group("ordinal"):
+            tokens.append(_Token("o", int(match.group("ordinal")), source))
+        elif match.group("number"):
+            tokens.append(_Token("n", int(match.group("number")), source))
+        elif match.group("word"):
+            meaning = WORDS.get(source)
+            if meaning is None:
+                raise ValueError(f"Did not understand {source!r}")
+            tokens.extend(_Token(kind, value, source) for kind, value in meaning)
+        elif match.group("sep"):
+            tokens.append(_Token("&", None, source))
+        elif match.group("range"):
+            tokens.append(_Token("T", None, source))
+    for token in tokens:
+        if token.kind == "t" and not (token.value[0] < 24 and token.value[1] < 60):
+            raise ValueError(f"{token.text} is not a time")
+    return tokens
+
+
+# (pattern over token kinds, method of _Schedule applying the match)
+RULES = (
+    (r"E[nx]?[uhdkMy]", "every"),
+    (r"E[HQ]h", "every_fraction"),
+    (r"(?:A[tn]|t)(?:&[tn])*", "at_times"),
+    (r"Aun|A?nu?Ph?", "at_minute"),
+    (r"[BF][tn][&T][tn]", "between"),
+    (r"[OEF]?[wWv](?:[&T][wWv])*", "on_weekdays"),
+    (r"[OE]?[oL](?:&[oL])*w", "on_nth_weekdays"),
+    (r"O?Lv", "on_last_weekday"),
+    (r"O?[oL](?:&[oL])*d?|O?dn(?:&n)*", "on_days"),
+    (r"[IEF]?m(?:[&T]m)*", "in_months"),
+    (r"O?m[on]|O?[on]m", "on_date"),
+    (r"[&M]", "skip"),
+)
+
+_COMPILED_RULES = tuple((re.compile(pattern), method) for pattern, method in RULES)
+
+
+class _Schedule:
+    """What a phrase asked for so far; see RULES for how it is filled."""
+
+    def __init__(self):
+        self.minutes_step: Optional[int] = None
+        self.hours_step: Optional[int] = None
+        self.days_step: Optional[int] = None
+        self.months_step: Optional[int] = None
+        # "day", "week", "month" or "year" from "every day" etc.; the last
+        # three pick a day when no other is given
+        self.periods: set = set()
+        self.times: List[Tuple[int, int]] = []
+        self.minute: Optional[int] = None
+        self.window: Optional[Tuple[Tuple[int, int], Tuple[int, int]]] = None
+        self.weekdays: set = set()
+        # Day of month numbers
+        self.days: List[int] = []
+        self.months: set = set()
+
+    def every(self, tokens: Sequence[_Token]):
+        """every [N|other] minutes/hours/days/weeks/months/years"""
+        count = 1
+        if len(tokens) == 3:
+            count = 2 if tokens[1].kind == "x" else tokens[1].value
+        unit = tokens[-1].kind
+        if count < 1:
+            raise ValueError("Cannot repeat every 0")
+        if unit == "u":
+            self._set_step("minutes_step", count, 1440, "minutes")
+        elif unit == "h":
+            self._set_step("hours_step", count, 24, "hours")
+        elif unit == "d":
+            if count > 1:
+                self._set_step("days_step", count, 31, "days")
+            self.periods.add("day")
+        elif unit == "M":
+            if count > 1:
+                self._set_step("months_step", count, 12, "months")
+            self.periods.add("month")
+        elif count > 1:
+            noun = "weeks" if unit == "k" else "years"
+            raise ValueError(f"Cron cannot repeat every {count} {noun}")
+        else:
+            self.periods.add("week" if unit == "k" else "year")
+
+    def every_fraction(self, tokens: Sequence[_Token]):
+        """every half hour, every quarter hour"""
+        self._set_step("minutes_step", 30 if tokens[1].kind == "H" else 15, 60, "")
+
+    def at_times(self, tokens: Sequence[_Token]):
+        """at 9, at 9:30 and 17:00, 2pm"""
+        for token in tokens:
+            if token.kind == "t":
+                self.times.append(token.value)
+            elif token.kind == "n":
+                if token.value > 23:
+                    raise ValueError(f"{token.text} is not an hour")
+                self.times.append((token.value, 0))
+
+    def at_minute(self, tokens: Sequence[_Token]):
+        """at minute 15, 15 minutes past the hour"""
+        (token,) = [token for token in tokens if token.kind == "n"]
+        if token.value > 59:
+            raise ValueError(f"{token.text} is not a minute")
+        if self.minute is not None:
+            raise ValueError("Give the minute past the hour only once")
+        self.minute = token.value
+
+    def between(self, tokens: Sequence[_Token]):
+        """between 9 and 17, from 9:30 to 17:00"""
+        if self.window is not None:
+            raise ValueError("Give only one time window")
+        ends = []
+        for token in (tokens[1], tokens[3]):
+            if token.kind == "n":
+                if token.value > 23:
+                    raise ValueError(f"{token.text} is not an hour")
+                ends.append((token.value, 0))
+            else:
+                ends.append(token.value)
+        self.window = (ends[0], ends[1])
+
+    def on_weekdays(self, tokens: Sequence[_Token]):
+        """on Monday, every Tuesday and Friday, Mon-Fri, on weekdays"""
+        previous = None
+        ranged = False
+        for token in tokens:
+            if token.kind == "T":
+                ranged = True
+                continue
+            if token.kind == "w":
+                days = (token.value,)
+                if ranged and previous is not None:
+                    # Wraps around the week, e.g. Friday through Monday
+                    days = tuple(
+                        (previous + offset) % 7
+                        for offset in range((token.value - previous) % 7 + 1)
+                    )
+                self.weekdays.update(days)
+                previous = token.value
+            elif token.kind == "W":
+                self.weekdays.update(token.value)
+                previous = None
+            elif token.kind == "v":
+                self.weekdays.update((1, 2, 3, 4, 5))
+                previous = None
+            if token.kind != "&":
+                ranged = False
+
+    def on_nth_weekdays(self, tokens: Sequence[_Token]):
+        """first Monday, first and third Tuesday, last Friday: refused"""
+        name = _WEEKDAYS[tokens[-1].value].capitalize()
+        nths = [token for token in tokens if token.kind in ("o", "L")]
+        for token in nths:
+            if token.kind == "o" and token.value > 5:
+                raise ValueError(f"No month has a {token.text} {name}")
+        which = " and ".join(token.text for token in nths)
+        raise ValueError(
+            f"Cron cannot run on the {which} {name} of a month, only on days "
+            "of the month or on weekdays"
+        )
+
+    def on_last_weekday(self, tokens: Sequence[_Token]):
+        """on the last weekday of the month: refused"""
+        raise ValueError("Cron cannot run on the last weekday of a month")
+
+    def on_days(self, tokens: Sequence[_Token]):
+        """on the 1st and 15th, on day 5; not on the last day"""
+        for token in tokens:
+            if token.kind == "L":
+                raise ValueError(
+                    "Cron cannot run on the last day of a month, whose length varies"
+                )
+            if token.kind in ("o", "n"):
+                if not 1 <= token.value <= 31:
+                    raise ValueError(f"{token.text} is not a day of the month")
+                self.days.append(token.value)
+
+    def in_months(self, tokens: Sequence[_Token]):
+        """in January, every March and September, January through March"""
+        previous = None
+        ranged = False
+        for token in tokens:
+            if token.kind == "T":
+                ranged = True
+            elif token.kind == "m":
+                if ranged and previous is not None:
+                    # Wraps around the year, e.g. November through February
+                    count = (token.value - previous) % 12 + 1
+                    self.months.update(
+                        (previous + offset - 1) % 12 + 1 for offset in range(count)
+                    )
+                else:
+                    self.months.add(token.value)
+                previous = token.value
+                ranged = False
+
+    def on_date(self, tokens: Sequence[_Token]):
+        """on December 25, 1st of January"""
+        self.in_months([token for token in tokens if token.kind == "m"])
+        self.on_days([token for token in tokens if token.kind in ("o", "n")])
+
+    def skip(self, tokens: Sequence[_Token]):
+        """An "and" between two parts of the phrase, "month" in "of the month"."""
+
+    def _set_step(self, name: str, count: int, limit: int, noun: str):
+        """Set how often something repeats, once."""
+        if getattr(self, name) is not None:
+            raise ValueError("Say how often only once")
+        if count > limit:
+            raise ValueError(f"Cannot repeat every {count} {noun}".rstrip())
+        setattr(self, name, count)
+
+    def lines(self) -> List[str]:
+        """
+        Turn the schedule into cron lines.
+
+        Raises:
+            ValueError: If the parts contradict each other or cron cannot
+                express them
+        """
+        day, month, weekday = self._day_fields()
+        return [
+            f"{minute} {hour} {day} {month} {weekday}"
+            for minute, hour in self._time_fields()
+        ]
+
+    def _day_fields(self) -> Tuple[str, str, str]:
+        """Get the day of month, month and day of week fields."""
+        weekday = "*"
+        if self.weekdays:
+            weekday = _field_text(self.weekdays, 0, 6, steps=False)
+
+        if self.days and self.days_step:
+            raise ValueError("Give either days of the month or how often, not both")
+        day = "*"
+        if self.days:
+            day = _field_text(self.days, 1, 31)
+        elif self.days_step:
+            day = f"*/{self.days_step}"
+        if day != "*" and weekday != "*":
+            raise ValueError(
+                "Cron would run this on those days of the month and also on "
+                "those weekdays; give only one of them"
+            )
+
+        if self.months and self.months_step:
+            raise ValueError("Give either months or how often, not both")
+        month = "*"
+        if self.months:
+            month = _field_text(self.months, 1, 12)
+        elif self.months_step:
+            month = f"*/{self.months_step}"
+
+        # "every week", "every month" and "every year" need some day
+        if day == "*" and weekday == "*":
+            if "week" in self.periods:
+                weekday = "0"
+            elif self.periods & {"month", "year"} or self.months_step:
+                day = "1"
+        if "year" in self.periods and month == "*":
+            month = "1"
+        return day, month, weekday
+
+    def _time_fields(self) -> List[Tuple[str, str]]:
+        """Get the minute and hour fields of each line."""
+        if self.minutes_step:
+            if self.times or self.minute is not None:
+                raise ValueError("Give either times or every how many minutes")
+            step = self.minutes_step
+            if self.window is None and 60 % step == 0:
+                return [("*" if step == 1 else f"*/{step}", "*")]
+            runs = self._window_runs(step)
+        elif self.hours_step:
+            if self.times:
+                raise ValueError("Give either times or every how many hours")
+            minute = self.minute or 0
+            if self.window is None:
+                step = self.hours_step
+                hours = "*" if step == 1 else f"*/{step}" if step < 24 else "0"
+                return [(str(minute), hours)]
+            runs = self._window_runs(self.hours_step * 60, minute)
+        elif self.times:
+            if self.window is not None or self.minute is not None:
+                raise ValueError("Give either times or a time window")
+            runs = [hour * 60 + minute for hour, minute in self.times]
+        elif self.minute is not None:
+            runs = self._window_runs(60, self.minute)
+        elif self.window is not None:
+            raise ValueError("Say how often to run in that window, e.g. every hour")
+        elif self._has_days():
+            runs = [0]
+        else:
+            raise ValueError("Say when to run, e.g. every day at 9:00")
+        if not runs:
+            raise ValueError("The job would never run in that window")
+        return _compress(runs)
+
+    def _window_runs(self, step: int, offset: int = 0) -> List[int]:
+        """Get the minutes of the day from the window's start to its end."""
+        start, end = self.window or ((0, 0), (23, 59))
+        first = start[0] * 60 + start[1] + offset
+        last = end[0] * 60 + end[1]
+        if last < start[0] * 60 + start[1]:
+            last += 1440  # Over midnight, e.g. between 22 and 6
+        return [minute % 1440 for minute in range(first, last + 1, step)]
+
+    def _has_days(self) -> bool:
+        """Check whether the phrase said anything about days."""
+        return bool(
+            self.periods
+            or self.days_step
+            or self.months_step
+            or self.weekdays
+            or self.days
+            or self.months
+        )
+
+
+def _field_text(values, low: int, high: int, steps: bool = True) -> str:
+    """
+    Write a set of values as a cron field, as compactly as possible.
+
+    Args:
+        values: Values of the field
+        low: Lowest value of the field
+        high: Highest value of the field
+        steps: Whether "*/n" and "a-b/n" may be used
+    """
+    values = sorted(set(values))
+    if len(values) == high - low + 1:
+        return "*"
+    # Two values read better as a list, e.g. 1,7 rather than */6
+    if steps and len(values) >= 3:
+        step = values[1] - values[0]
+        if step > 1 and all(b - a == step for a, b in zip(values, values[1:])):
+            if values[0] == low and values[-1] + step > high:
+                return f"*/{step}"
+            return f"{values[0]}-{values[-1]}/{step}"
+
+    # Runs of three or more consecutive values become ranges
+    parts = []
+    idx = 0
+    while idx < len(values):
+        end = idx
+        while end + 1 < len(values) and values[end + 1] == values[end] + 1:
+            end += 1
+        if end - idx >= 2:
+            parts.append(f"{values[idx]}-{values[end]}")
+        else:
+            parts.extend(str(value) for value in values[idx : end + 1])
+        idx = end + 1
+    return ",".join(parts)
+
+
+def _compress(runs: Sequence[int]) -> List[Tuple[str, str]]:
+    """
+    Group minutes of the day into as few (minute, hour) field pairs as cron
+    needs: hours that run at the same minutes share a line.
+    """
+    by_hour: Dict[int, set] = {}
+    for run in runs:
+        by_hour.setdefault(run // 60, set()).add(run % 60)
+    by_minutes: Dict[Tuple[int, ...], List[int]] = {}
+    for hour in sorted(by_hour):
+        by_minutes.setdefault(tuple(sorted(by_hour[hour])), []).append(hour)
+    if len(by_minutes) > MAX_LINES:
+        raise ValueError(
+            f"This needs {len(by_minutes)} cron lines; at most {MAX_LINES} are made"
+        )
+    return [
+        (_field_text(minutes, 0, 59), _field_text(hours, 0, 23))
+        for minutes, hours in by_minutes.items()
+    ]
+
+
+def parse_schedule_phrase(text: str) -> List[str]:
+    """
+    Compile a schedule written in English to cron expressions.
+
+    Args:
+        text: Phrase, e.g. "every 15 minutes on weekdays between 9 and 17"
+
+    Returns:
+        One cron expression, or several when one cannot express the
+        schedule; together they run at exactly the described times
+
+    Raises:
+        ValueError: If the phrase is not understood or cannot be scheduled
+    """
+    tokens = tokenize(text)
+    if not tokens:
+        raise ValueError("Describe when to run, e.g. every day at 9:00")
+    codes = "".join(token.kind for token in tokens)
+    schedule = _Schedule()
+    pos = 0
+    while pos < len(codes):
+        best = None
+        for pattern, method in _COMPILED_RULES:
+            match = pattern.match(codes, pos)
+            if match and (best is None or match.end() > best[0]):
+                best = (match.end(), method)
+        if best is None:
+            raise ValueError(f"Did not expect {tokens[pos].text!r} there")
+        end, method = best
+        getattr(schedule, method)(tokens[pos:end])
+        pos = end
+
+    lines = schedule.lines()
+    for line in lines:
+        compile_schedule(line)
+        refused = cron_dialect_error(line)
+        if refused:
+            raise ValueError(refused[0].upper() + refused[1:])
+    return lines
@@ -2,15 +2,34 @@
 Cron Parser - Utilities for parsing and validating cron expressions.
 """
 
-from croniter import croniter
-from datetime import datetime
-from typing import List, Optional
-
-
+from datetime import datetime, timezone
+from functools import lru_cache
+from itertools import islice
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from cron_gui.cron_describe import describe_expression
+from cron_gui.cron_natural import parse_schedule_phrase
+from cron_gui.cron_schedule import (
+    compile_schedule,
+    iter_run_timestamps,
+    iter_runs,
+    zone_transitions,
+)
+from cron_gui.profiling import profiled
+
+# Size of the memoization caches for pure expression functions
+PARSER_CACHE_SIZE = 4096
+
+
+@profiled("parser.validate", "parser")
+@lru_cache(maxsize=PARSER_CACHE_SIZE)
 def validate_cron_expression(expression: str) -> bool:
     """
     Validate a cron expression.
 
+    Accepts everything the compiled engine understands: macros such as
+    "@daily", names, a sixth seconds field and ``L``/``W``/``#``.
+
     Args:
         expression: Cron expression to validate (e.g., "0 * * * *")
 
@@ -18,120 +37,122 @@ def validate_cron_expression(expression: str) -> bool:
         True if valid, False otherwise
     """
     try:
-        croniter(expression)
+        compile_schedule(expression)
         return True
-    except Exception:
+    except ValueError:
         return False
 
 
-def get_next_runs(expression: str, count: int = 5) -> List[str]:
+@profiled("parser.next_runs", "parser")
+def get_next_runs(expression: str, count: int = 5, tz: Optional[str] = None) -> List[str]:
     """
     Get the next N execution times for a cron expression.
 
+    Daylight saving changes are handled the way cron handles them, see
+    cron_schedule.
+
     Args:
         expression: Cron expression
         count: Number of next runs to calculate
+        tz: Optional IANA time zone the schedule is evaluated in
+            (the job's CRON_TZ). Defaults to local time.
 
     Returns:
         List of formatted datetime strings
     """
+    fmt = "%Y-%m-%d %H:%M:%S %Z" if tz else "%Y-%m-%d %H:%M:%S"
+    return [run.strftime(fmt) for run in iter_next_runs(expression, count, tz=tz)]
+
+
+def iter_next_runs(
+    expression: str,
+    count: Optional[int] = None,
+    start: Optional[datetime] = None,
+    tz: Optional[str] = None,
+) -> Iterator[datetime]:
+    """
+    Generate upcoming execution times for a cron expression.
+
+    Args:
+        expression: Cron expression
+        count: Stop after this many runs; None for no limit
+        start: Only runs after this time are produced. Defaults to now.
+        tz: Optional IANA time zone; defaults to local time
+
+    Yields:
+        Time-zone aware datetimes. Nothing for invalid expressions or zones.
+    """
+    try:
+        zone = zone_transitions(tz) if tz else None
+    except ValueError:
+        return
+
+    try:
+        schedule = compile_schedule(expression)
+    except ValueError:
+        return
+    yield from islice(iter_runs(schedule, start, zone), count)
+
+
+def next_run_timestamp(
+    expression: str, after: Optional[float] = None, tz: Optional[str] = None
+) -> Optional[int]:
+    """
+    Get the first execution time of a cron expression after a point in time.
+
+    Args:
+        expression: Cron expression
+        after: UTC timestamp; defaults to now
+        tz: Optional IANA time zone; defaults to local time
+
+    Returns:
+        UTC timestamp, or None for invalid expressions or zones and for
+        schedules that never fire (such as @reboot)
+    """
     try:
-        cron = croniter(expression, datetime.now())
-        runs = []
-        for _ in range(count):
-            next_run = cron.get_next(datetime)
-            runs.append(next_run.strftime("%Y-%m-%d %H:%M:%S"))
-        return runs
-    except Exception:
-        return []
+        schedule = compile_schedule(expression)
+        zone = zone_transitions(tz) if tz else None
+    except ValueError:
+        return None
+    start = None if after is None else datetime.fromtimestamp(after, timezone.utc)
+    return next(iter_run_timestamps(schedule, start, zone), None)
 
 
-def cron_to_human_readable(expression: str) -> str:
+@profiled("parser.describe", "parser")
+@lru_cache(maxsize=PARSER_CACHE_SIZE)
+def cron_to_human_readable(expression: str, language: Optional[str] = None) -> str:
     """
     Convert a cron expression to human-readable format.
 
     Args:
         expression: Cron expression (e.g., "0 * * * *")
+        language: Language of the description; defaults to the user's locale
 
     Returns:
-        Human-readable description
+        Human-readable description, e.g. "At minutes 0 and 30, between
+        09:00 and 17:59, on Monday through Friday"
     """
-    try:
-        parts = expression.split()
-        if len(parts) != 5:
-            return "Invalid cron expression"
-
-        minute, hour, day, month, weekday = parts
-
-        # Build human-readable description
-        desc_parts = []
-
-        # Minute
-        if minute == "*":
-            desc_parts.append("every minute")
-        elif "/" in minute:
-            interval = minute.split("/")[1]
-            desc_parts.append(f"every {interval} minutes")
-        else:
-            desc_parts.append(f"at minute {minute}")
-
-        # Hour
-        if hour != "*":
-            if "/" in hour:
-                interval = hour.split("/")[1]
-                desc_parts.append(f"every {interval} hours")
-            else:
-                desc_parts.append(f"at hour {hour}")
-
-        # Day of month
-        if day != "*":
-            desc_parts.append(f"on day {day}")
-
-        # Month
-        if month != "*":
-            months = [
-                "Jan",
-                "Feb",
-                "Mar",
-                "Apr",
-                "May",
-                "Jun",
-                "Jul",
-                "Aug",
-                "Sep",
-                "Oct",
-                "Nov",
-                "Dec",
-            ]
-            try:
-                month_idx = int(month) - 1
-                if 0 <= month_idx < 12:
-                    desc_parts.append(f"in {months[month_idx]}")
-            except ValueError:
-                desc_parts.append(f"in month {month}")
-
-        # Weekday
-        if weekday != "*":
-            days = [
-                "Sunday",
-                "Monday",
-                "Tuesday",
-                "Wednesday",
-                "Thursday",
-                "Friday",
-                "Saturday",
-            ]
-            try:
-                day_idx = int(weekday)
-                if 0 <= day_idx < 7:
-                    desc_parts.append(f"on {days[day_idx]}")
-            except ValueError:
-                desc_parts.append(f"on weekday {weekday}")
-
-        return ", ".join(desc_parts).capitalize()
-
-    except Exception:
-        return "Invalid cron expression"
+    return describe_expression(expression, language)
+
+
+@profiled("parser.natural", "parser")
+@lru_cache(maxsize=PARSER_CACHE_SIZE)
+def natural_to_cron(text: str) -> Tuple[str, ...]:
+    """
+    Convert a schedule written in words to cron expressions.
+
+    Args:
+        text: Phrase, e.g. "at 02:30 on the 1st of each month"
+
+    Returns:
+        One expression, or several when one cannot express the schedule,
+        e.g. ("*/15 9-16 * * 1-5", "0 17 * * 1-5") for "every 15 minutes
+        on weekdays between 9 and 17"
+
+    Raises:
+        ValueError: If the phrase is not understood or cannot be scheduled
+    """
+    return tuple(parse_schedule_phrase(text.strip().lower()))
 
 
 def build_cron_expression(
@@ -140,6 +161,7 @@ def build_cron_expression(
     day: str = "*",
     month: str = "*",
     weekday: str = "*",
+    second: str = "",
 ) -> str:
     """
     Build a cron expression from individual components.
@@ -147,11 +169,39 @@ def build_cron_expression(
     Args:
         minute: Minute field (0-59 or *)
         hour: Hour field (0-23 or *)
-        day: Day of month field (1-31 or *)
+        day: Day of month field (1-31, *, L, 15W)
         month: Month field (1-12 or *)
-        weekday: Day of week field (0-6 or *)
+        weekday: Day of week field (0-6, *, 5L, 5#2)
+        second: Optional seconds field; omitted when empty or "0"
 
     Returns:
         Cron expression string
     """
-    return f"{minute} {hour} {day} {month} {weekday}"
+    expression = f"{minute} {hour} {day} {month} {weekday}"
+    if second and second != "0":
+        expression += f" {second}"
+    return expression
+
+
+def parser_cache_stats() -> Dict[str, Dict[str, float]]:
+    """
+    Get hit/miss statistics for the parser memoization caches.
+
+    Returns:
+        Mapping of function name to hits, misses, size and hit rate
+    """
+    stats = {}
+    for name, func in (
+        ("validate_cron_expression", validate_cron_expression),
+        ("cron_to_human_readable", cron_to_human_readable),
+        ("natural_to_cron", natural_to_cron),
+    ):
+        info = func.__wrapped__.cache_info()
+        lookups = info.hits + info.misses
+        stats[name] = {
+            "hits": info.hits,
+            "misses": info.misses,
+            "size": info.currsize,
+            "hit_rate": info.hits / lookups if lookups else 0.0,
+        }
+    return stats
@@ -0,0 +1,927 @@
+"""
+Cron Schedule - Compiled cron schedules and a time-zone aware run engine.
+
+An expression is compiled once into bit masks per field. Wall-clock firing
+times are generated directly from the masks, and time zones are handled with
+per-zone transition tables that are computed once per year and cached, so
+forecasting many jobs does not repeatedly query the tz database.
+
+Besides the classic five fields the grammar covers the schedule macros
+(``@daily``, ``@reboot``, ...), month and weekday names, an optional sixth
+field for seconds (croniter's convention), ``?`` for an unrestricted day
+field, ``L`` / ``LW`` / ``15W`` in the day of month field and ``5L`` (or
+``L5``) / ``5#2`` in the day of week field. The ``L``/``W``/``#`` items are
+resolved into plain day masks once per month, so they cost no more than
+ordinary fields when generating runs.
+
+Daylight saving time follows vixie cron / cronie:
+
+* When the clock jumps forward, fixed-time jobs (no wildcard in the minute
+  or hour field) that fall in the skipped interval run once, right after
+  the jump. Wildcard jobs simply skip the missing times.
+* When the clock jumps back, fixed-time jobs run only once, in the first
+  pass of the repeated interval. Wildcard jobs run in both passes.
+"""
+
+import calendar
+import heapq
+import os
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, timedelta, timezone, tzinfo
+from functools import lru_cache
+from typing import Iterator, List, Optional, Tuple, Union
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+# (low, high) bounds per field: minute, hour, day of month, month, weekday
+# and the optional trailing seconds field
+FIELD_RANGES = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7), (0, 59))
+FIELD_NAMES = ("minute", "hour", "day of month", "month", "day of week", "second")
+
+MONTH_NAMES = {
+    name: idx + 1
+    for idx, name in enumerate(
+        "jan feb mar apr may jun jul aug sep oct nov dec".split()
+    )
+}
+WEEKDAY_NAMES = {
+    name: idx for idx, name in enumerate("sun mon tue wed thu fri sat".split())
+}
+
+# Schedule macros and the expression each stands for; @reboot never fires on
+# a calendar
+MACROS = {
+    "@reboot": None,
+    "@yearly": "0 0 1 1 *",
+    "@annually": "0 0 1 1 *",
+    "@monthly": "0 0 1 * *",
+    "@weekly": "0 0 * * 0",
+    "@daily": "0 0 * * *",
+    "@midnight": "0 0 * * *",
+    "@hourly": "0 * * * *",
+}
+
+# How far past the last match to look for another matching day before giving
+# up (e.g. "0 0 30 2 *" never matches)
+MAX_SEARCH_YEARS = 30
+
+_EPOCH = datetime(1970, 1, 1)
+_EPOCH_ORDINAL = _EPOCH.toordinal()
+
+# Bits 0, 7, 14, 21 and 28: a weekday's days of a month, shifted to its first
+_WEEKLY_DAYS = sum(1 << day for day in range(0, 31, 7))
+
+
+def _parse_value(token: str, field: int) -> int:
+    """Parse a single number or name in a field."""
+    names = MONTH_NAMES if field == 3 else WEEKDAY_NAMES if field == 4 else None
+    lowered = token.lower()
+    if names and lowered in names:
+        return names[lowered]
+    if not token.isdigit():
+        raise ValueError(f"Invalid {FIELD_NAMES[field]} value: {token!r}")
+    value = int(token)
+    low, high = FIELD_RANGES[field]
+    if not low <= value <= high:
+        raise ValueError(f"{FIELD_NAMES[field]} value {value} out of range {low}-{high}")
+    return value
+
+
+# A parsed field item: (kind, start, end, step). Kinds are "*" (the whole
+# range), "range" ("a-b"), "value" ("a"), "from" ("a/n") and the special day
+# items "L", "LW", "W" (start=day) in the day of month field and "L"
+# (start=weekday), "#" (start=weekday, end=nth) in the day of week field.
+FieldItem = Tuple[str, int, int, int]
+
+SPECIAL_KINDS = frozenset(("L", "LW", "W", "#"))
+
+
+def _parse_special(item: str, field: int) -> Optional[FieldItem]:
+    """
+    Parse an ``L``, ``W`` or ``#`` item of the day fields.
+
+    Returns:
+        The item for a special one, None for an ordinary one
+    """
+    upper = item.upper()
+    if field == 2:
+        if upper == "L":
+            return ("L", 0, 0, 0)
+        if upper == "LW":
+            return ("LW", 0, 0, 0)
+        if upper.endswith("W") and upper[:-1].isdigit():
+            return ("W", _parse_value(item[:-1], field), 0, 0)
+    elif field == 4:
+        if "#" in item:
+            weekday, _, nth = item.partition("#")
+            if not nth.isdigit() or not 1 <= int(nth) <= 5:
+                raise ValueError(f"Invalid day of week: {item!r}")
+            return ("#", _parse_value(weekday, field) % 7, int(nth), 0)
+        # Last <weekday> of the month: "5L" (Quartz) or "L5" (croniter)
+        if len(upper) > 1 and (upper.endswith("L") or upper.startswith("L")):
+            weekday = item[:-1] if upper.endswith("L") else item[1:]
+            if weekday.lower() not in WEEKDAY_NAMES and not weekday.isdigit():
+                return None
+            return ("L", _parse_value(weekday, field) % 7, 0, 0)
+    return None
+
+
+@lru_cache(maxsize=4096)
+def parse_field_items(text: str, field: int) -> Tuple[FieldItem, ...]:
+    """
+    Parse one field into its comma-separated items.
+
+    Args:
+        text: Field text, e.g. "*/15", "1-5", "mon,wed,fri", "5#2"
+        field: Field index into FIELD_RANGES
+
+    Returns:
+        Items in field order; names are resolved to numbers
+
+    Raises:
+        ValueError: If the field is not valid
+    """
+    low, high = FIELD_RANGES[field]
+    if text == "?" and field in (2, 4):
+        text = "*"
+    items = []
+    for item in text.split(","):
+        if not item:
+            raise ValueError(f"Empty item in {FIELD_NAMES[field]} field")
+        if field in (2, 4):
+            special = _parse_special(item, field)
+            if special:
+                items.append(special)
+                continue
+
+        base, _, step_text = item.partition("/")
+        step = 1
+        if step_text:
+            if not step_text.isdigit() or int(step_text) == 0:
+                raise ValueError(f"Invalid step in {FIELD_NAMES[field]}: {item!r}")
+            step = int(step_text)
+
+        if base == "*":
+            items.append(("*", low, 6 if field == 4 else high, step))
+        elif "-" in base:
+            first, _, last = base.partition("-")
+            start, end = _parse_value(first, field), _parse_value(last, field)
+            if start > end:
+                if field != 4:
+                    raise ValueError(f"Invalid range in {FIELD_NAMES[field]}: {item!r}")
+                # Weekday ranges may wrap around the weekend, e.g. "fri-mon"
+                end += 7
+            items.append(("range", start, end, step))
+        elif step_text:
+            # "5/15" means 5, 20, 35, 50
+            items.append(("from", _parse_value(base, field), high, step))
+        else:
+            value = _parse_value(base, field)
+            items.append(("value", value, value, 1))
+    return tuple(items)
+
+
+def _parse_field(
+    text: str, field: int, specials: Optional[List[Tuple[str, int, int]]] = None
+) -> int:
+    """
+    Compile one field into a bit mask.
+
+    Args:
+        text: Field text, e.g. "*/15", "1-5", "mon,wed,fri"
+        field: Field index into FIELD_RANGES
+        specials: For the day fields, collects ``L``/``W``/``#`` items as
+            (kind, value, nth) instead of rejecting them
+
+    Returns:
+        Integer whose bit N is set when value N matches
+    """
+    mask = 0
+    for kind, start, end, step in parse_field_items(text, field):
+        if kind in SPECIAL_KINDS:
+            if specials is None:
+                raise ValueError(f"{kind} is not allowed in {FIELD_NAMES[field]}")
+            specials.append((kind, start, end))
+            continue
+        for value in range(start, end + 1, step):
+            mask |= 1 << (value % 7 if field == 4 and value > 7 else value)
+
+    if field == 4 and mask & (1 << 7):
+        # Sunday can be written as 0 or 7
+        mask = (mask | 1) & ~(1 << 7)
+    return mask
+
+
+def _bits(mask: int) -> List[int]:
+    """List the set bit positions of a mask, ascending."""
+    result = []
+    position = 0
+    while mask:
+        if mask & 1:
+            result.append(position)
+        mask >>= 1
+        position += 1
+    return result
+
+
+class CronSchedule:
+    """A cron expression compiled into per-field bit masks."""
+
+    __slots__ = (
+        "expression",
+        "seconds",
+        "minutes",
+        "hours",
+        "days",
+        "months",
+        "weekdays",
+        "dom_star",
+        "dow_star",
+        "wildcard",
+        "reboot",
+        "_offset_list",
+        "_hour_list",
+        "_dom_specials",
+        "_dow_specials",
+        "_special_masks",
+    )
+
+    def __init__(self, expression: str):
+        """
+        Compile an expression.
+
+        Args:
+            expression: Five-field cron expression, five fields plus a
+                trailing seconds field, or a macro such as "@daily"
+
+        Raises:
+            ValueError: If the expression is not valid
+        """
+        fields = expression.split()
+        self.reboot = False
+        if len(fields) == 1 and fields[0].startswith("@"):
+            macro = fields[0].lower()
+            if macro not in MACROS:
+                raise ValueError(f"Unknown schedule macro: {fields[0]}")
+            self.expression = macro
+            self.reboot = macro == "@reboot"
+            fields = (MACROS[macro] or "0 0 1 1 *").split()
+        elif len(fields) in (5, 6):
+            self.expression = " ".join(fields)
+        else:
+            raise ValueError("Cron expression must have 5 or 6 fields")
+
+        self.seconds = _parse_field(fields[5], 5) if len(fields) == 6 else 1
+        self.minutes = _parse_field(fields[0], 0)
+        self.hours = _parse_field(fields[1], 1)
+        self._dom_specials: List[Tuple[str, int, int]] = []
+        self._dow_specials: List[Tuple[str, int, int]] = []
+        self.days = _parse_field(fields[2], 2, self._dom_specials)
+        self.months = _parse_field(fields[3], 3)
+        self.weekdays = _parse_field(fields[4], 4, self._dow_specials)
+        self._special_masks = {}
+        # Like cron, a field starting with "*" counts as unrestricted when
+        # deciding whether day of month and day of week are ANDed or ORed
+        self.dom_star = fields[2].startswith(("*", "?"))
+        self.dow_star = fields[4].startswith(("*", "?"))
+        # Wildcard jobs are treated differently across DST changes
+        self.wildcard = any(
+            field.startswith("*") for field in fields[:2] + fields[5:]
+        )
+        # Firing offsets within an hour, in seconds
+        self._offset_list = [
+            minute * 60 + second
+            for minute in _bits(self.minutes)
+            for second in _bits(self.seconds)
+        ]
+        self._hour_list = _bits(self.hours)
+
+    def __repr__(self) -> str:
+        return f"CronSchedule({self.expression!r})"
+
+    @property
+    def has_seconds(self) -> bool:
+        """Whether the schedule fires at other seconds than :00."""
+        return self.seconds != 1
+
+    def _month_masks(self, year: int, month: int) -> Tuple[int, int]:
+        """
+        Resolve the ``L``, ``W`` and ``#`` items for one month.
+
+        Returns:
+            (day of month, day of week) masks over the days of the month,
+            computed once per month and cached
+        """
+        key = year * 12 + month
+        masks = self._special_masks.get(key)
+        if masks is not None:
+            return masks
+
+        first_weekday, length = calendar.monthrange(year, month)
+        # calendar uses Monday=0; cron uses Sunday=0
+        first_dow = (first_weekday + 1) % 7
+
+        def weekday_of(day: int) -> int:
+            return (first_dow + day - 1) % 7
+
+        dom = 0
+        for kind, value, _ in self._dom_specials:
+            if kind == "L":
+                dom |= 1 << length
+            elif kind == "LW":
+                day = length
+                day -= {6: 1, 0: 2}.get(weekday_of(day), 0)
+                dom |= 1 << day
+            else:
+                # Nearest weekday to the given day (clamped to the month's
+                # length), without leaving the month
+                day = min(value, length)
+                weekday = weekday_of(day)
+                if weekday == 6:
+                    day = day - 1 if day > 1 else day + 2
+                elif weekday == 0:
+                    day = day + 1 if day < length else day - 2
+                dom |= 1 << day
+
+        dow = 0
+        for kind, weekday, nth in self._dow_specials:
+            first = 1 + (weekday - first_dow) % 7
+            if kind == "#":
+                day = first + 7 * (nth - 1)
+                if day <= length:
+                    dow |= 1 << day
+            else:
+                dow |= 1 << (first + 7 * ((length - first) // 7))
+
+        masks = self._special_masks[key] = (dom, dow)
+        return masks
+
+    def day_matches(self, day: date) -> bool:
+        """Check whether the schedule fires at some time on a date."""
+        if self.reboot or not self.months >> day.month & 1:
+            return False
+        dom = self.days >> day.day & 1
+        # date.weekday() is Monday=0; cron uses Sunday=0
+        dow = self.weekdays >> ((day.weekday() + 1) % 7) & 1
+        if self._dom_specials or self._dow_specials:
+            dom_extra, dow_extra = self._month_masks(day.year, day.month)
+            dom = dom or dom_extra >> day.day & 1
+            dow = dow or dow_extra >> day.day & 1
+        if self.dom_star or self.dow_star:
+            return bool(dom and dow)
+        return bool(dom or dow)
+
+    def month_days(self, year: int, month: int) -> int:
+        """
+        Find the days of a month on which the schedule fires.
+
+        Like day_matches for every day of the month at once, with a few
+        mask operations instead of a check per day.
+
+        Returns:
+            Mask whose bit N is set when the schedule fires on day N
+        """
+        if self.reboot or not self.months >> month & 1:
+            return 0
+        month_mask, weekday_masks = _month_shape(year, month)
+        dom = self.days & month_mask
+        dow = weekday_masks[self.weekdays]
+        if self._dom_specials or self._dow_specials:
+            dom_extra, dow_extra = self._month_masks(year, month)
+            dom |= dom_extra
+            dow |= dow_extra
+        if self.dom_star or self.dow_star:
+            return dom & dow
+        return dom | dow
+
+    def matches(self, moment: datetime) -> bool:
+        """Check whether the schedule fires at a wall-clock second."""
+        return bool(
+            self.seconds >> moment.second & 1
+            and self.minutes >> moment.minute & 1
+            and self.hours >> moment.hour & 1
+            and self.day_matches(moment.date())
+        )
+
+    def runs_per_day(self) -> int:
+        """Number of firings on a matching day."""
+        return len(self._offset_list) * len(self._hour_list)
+
+    def firing_hours(self) -> Tuple[List[int], List[int]]:
+        """
+        Get when the schedule fires on a matching day.
+
+        Returns:
+            (hours of the day, seconds into each of those hours), ascending
+        """
+        return self._hour_list, self._offset_list
+
+    def iter_wall_seconds(self, after: datetime) -> Iterator[int]:
+        """
+        Generate wall-clock firing times as seconds since 1970-01-01 00:00.
+
+        Args:
+            after: Naive datetime; only times strictly after it are produced
+
+        Yields:
+            Wall-clock seconds in ascending order
+        """
+        if self.reboot:
+            return
+        after = after.replace(tzinfo=None, microsecond=0)
+        day = after.date()
+        last_day = day + timedelta(days=366 * MAX_SEARCH_YEARS)
+        offsets = self._offset_list
+        hour_offsets = [hour * 3600 for hour in self._hour_list]
+        first = True
+
+        while day <= last_day:
+            if not self.months >> day.month & 1:
+                # Skip the rest of a month that never matches
+                days_left = calendar.monthrange(day.year, day.month)[1] - day.day
+                day += timedelta(days=days_left + 1)
+                first = False
+                continue
+
+            if self.day_matches(day):
+                last_day = day + timedelta(days=366 * MAX_SEARCH_YEARS)
+                base = (day.toordinal() - _EPOCH_ORDINAL) * 86400
+                if first:
+                    cutoff = after.hour * 3600 + after.minute * 60 + after.second
+                    for hour in hour_offsets:
+                        if hour + 3599 <= cutoff:
+                            continue
+                        for offset in offsets:
+                            if hour + offset > cutoff:
+                                yield base + hour + offset
+                else:
+                    for hour in hour_offsets:
+                        day_hour = base + hour
+                        for offset in offsets:
+                            yield day_hour + offset
+
+            first = False
+            day += timedelta(days=1)
+
+    def iter_wall(self, after: datetime) -> Iterator[datetime]:
+        """
+        Generate wall-clock firing times.
+
+        Args:
+            after: Naive datetime; only times strictly after it are produced
+
+        Yields:
+            Naive datetimes in ascending order
+        """
+        for wall in self.iter_wall_seconds(after):
+            yield _EPOCH + timedelta(seconds=wall)
+
+    def next_after(self, after: datetime) -> Optional[datetime]:
+        """Get the next wall-clock firing time after a naive datetime."""
+        return next(self.iter_wall(after), None)
+
+
+@lru_cache(maxsize=64)
+def _month_shape(year: int, month: int) -> Tuple[int, Tuple[int, ...]]:
+    """
+    Get the day masks of a month.
+
+    Returns:
+        (mask of all its days, masks of the days on each set of weekdays,
+        indexed by a day of week field mask)
+    """
+    first_weekday, length = calendar.monthrange(year, month)
+    # calendar uses Monday=0; cron uses Sunday=0
+    first_dow = (first_weekday + 1) % 7
+    month_mask = (1 << (length + 1)) - 2
+    weekly = [
+        _WEEKLY_DAYS << (1 + (weekday - first_dow) % 7) & month_mask
+        for weekday in range(7)
+    ]
+    masks = [0] * 128
+    for weekdays in range(1, 128):
+        lowest = weekdays & -weekdays
+        masks[weekdays] = masks[weekdays ^ lowest] | weekly[lowest.bit_length() - 1]
+    return month_mask, tuple(masks)
+
+
+def cron_dialect_error(expression: str) -> Optional[str]:
+    """
+    Tell why cron would refuse an expression the engine accepts.
+
+    The engine also reads croniter's and Quartz's extensions, which are
+    fine for previews and descriptions, but vixie cron and cronie refuse
+    the whole line, so they must not be written to a crontab.
+
+    Args:
+        expression: Cron expression or macro that compiles
+
+    Returns:
+        What cron does not accept, or None if it accepts the expression
+    """
+    fields = expression.split()
+    if expression.startswith("@") or len(fields) < 5:
+        return None
+    if len(fields) == 6:
+        return "cron has no seconds field"
+    for field in (2, 4):
+        text = fields[field]
+        if text == "?":
+            return f"cron does not accept ? in the {FIELD_NAMES[field]} field; use *"
+        if any(item[0] in SPECIAL_KINDS for item in parse_field_items(text, field)):
+            return f"cron does not accept L, W or # in the {FIELD_NAMES[field]} field"
+    for item in fields[4].split(","):
+        first, dash, last = item.partition("/")[0].partition("-")
+        if dash and _parse_value(first, 4) > _parse_value(last, 4):
+            return f"cron does not wrap {item} around the weekend; list both parts"
+    return None
+
+
+@lru_cache(maxsize=4096)
+def compile_schedule(expression: str) -> CronSchedule:
+    """
+    Compile a cron expression, memoized.
+
+    Args:
+        expression: Cron expression or macro
+
+    Returns:
+        Compiled schedule
+
+    Raises:
+        ValueError: If the expression is not valid
+    """
+    return CronSchedule(expression)
+
+
+# Size of the schedule normalization cache
+NORMALIZE_CACHE_SIZE = 4096
+
+
+def _render_mask(mask: int) -> str:
+    """Render a field mask as ascending values and ranges, e.g. "1-5,7"."""
+    parts = []
+    value = 0
+    while mask:
+        if mask & 1:
+            start = value
+            while mask & 2:
+                mask >>= 1
+                value += 1
+            parts.append(str(start) if start == value else f"{start}-{value}")
+        mask >>= 1
+        value += 1
+    return ",".join(parts)
+
+
+def _normalize_field(text: str, mask: int, field: int) -> str:
+    """
+    Get the canonical text of one field.
+
+    Args:
+        text: Field as written
+        mask: Its compiled bit mask
+        field: Field index into FIELD_RANGES
+    """
+    low, high = FIELD_RANGES[field]
+    if field == 4:
+        # Sunday is folded into 0 when compiling
+        high = 6
+    full = ((1 << (high + 1)) - 1) & ~((1 << low) - 1)
+    if field not in (2, 4):
+        return "*" if mask == full else _render_mask(mask)
+
+    # A day field starting with "*" changes how cron combines the two day
+    # fields, and L/W/# items are resolved per month; keep those as written
+    starred = text.startswith(("*", "?"))
+    if starred and mask == full:
+        return "*"
+    if starred or any(
+        item[0] in SPECIAL_KINDS for item in parse_field_items(text, field)
+    ):
+        return text.upper()
+    return _render_mask(mask)
+
+
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
+def normalize_schedule(schedule: str) -> str:
+    """
+    Get the canonical form of a schedule.
+
+    Schedules that fire at the same times under cron's rules get the same
+    form: macros are expanded, names, steps and lists become sorted values
+    and ranges, and a seconds field of just 0 is dropped.
+
+    Args:
+        schedule: Cron expression or macro
+
+    Returns:
+        Canonical expression; an invalid schedule only has its whitespace
+        collapsed
+    """
+    try:
+        compiled = compile_schedule(schedule)
+    except ValueError:
+        return " ".join(schedule.split())
+    if compiled.reboot:
+        return "@reboot"
+
+    fields = (MACROS.get(compiled.expression) or compiled.expression).split()
+    masks = (
+        compiled.minutes,
+        compiled.hours,
+        compiled.days,
+        compiled.months,
+        compiled.weekdays,
+    )
+    parts = [
+        _normalize_field(text, mask, field)
+        for field, (text, mask) in enumerate(zip(fields, masks))
+    ]
+    if compiled.has_seconds:
+        parts.append(_render_mask(compiled.seconds))
+    return " ".join(parts)
+
+
+class ZoneTransitions:
+    """Cached UTC offset transitions of a time zone, computed per year."""
+
+    def __init__(self, zone: tzinfo):
+        self.zone = zone
+        # year -> (initial offset, [transition utc], [offset after], max offset)
+        self._years = {}
+
+    def _offset_at_utc(self, ts: int) -> int:
+        """Ask the zone for the UTC offset in seconds at a UTC timestamp."""
+        moment = datetime.fromtimestamp(ts, timezone.utc).astimezone(self.zone)
+        return int(moment.utcoffset().total_seconds())
+
+    def _year(self, year: int):
+        """Get (and compute on first use) the transition table of a year."""
+        table = self._years.get(year)
+        if table is not None:
+            return table
+
+        start = calendar.timegm((year, 1, 1, 0, 0, 0))
+        end = calendar.timegm((year + 1, 1, 1, 0, 0, 0))
+        initial = self._offset_at_utc(start)
+        utcs, offsets = [], []
+
+        previous_ts, previous = start, initial
+        ts = start
+        while ts < end:
+            ts = min(ts + 86400, end)
+            offset = self._offset_at_utc(ts)
+            if offset != previous:
+                # Bisect down to the exact second of the change
+                low, high = previous_ts, ts
+                while high - low > 1:
+                    middle = (low + high) // 2
+                    if self._offset_at_utc(middle) == previous:
+                        low = middle
+                    else:
+                        high = middle
+                utcs.append(high)
+                offsets.append(offset)
+            previous_ts, previous = ts, offset
+
+        table = (initial, utcs, offsets, max([initial] + offsets), min([initial] + offsets))
+        self._years[year] = table
+        return table
+
+    def offset_at(self, ts: int) -> int:
+        """Get the UTC offset in seconds at a UTC timestamp."""
+        initial, utcs, offsets, _, _ = self._year(_utc_year(ts))
+        idx = bisect_right(utcs, ts)
+        return offsets[idx - 1] if idx else initial
+
+    def offset_bounds(self, ts: int) -> Tuple[int, int]:
+        """Get the (min, max) offset in effect around a timestamp's year."""
+        year = _utc_year(ts)
+        tables = [self._year(y) for y in (year - 1, year, year + 1)]
+        return min(t[4] for t in tables), max(t[3] for t in tables)
+
+    def segment(self, ts: int) -> Tuple[int, int, int, int, int]:
+        """
+        Get the stretch of time around a timestamp with a constant offset.
+
+        Args:
+            ts: UTC timestamp
+
+        Returns:
+            (start, end, offset, min offset, max offset). Any wall time whose
+            instant ``wall - offset`` lies in [start, end) maps to exactly
+            that instant. The bounds are conservative at year boundaries.
+        """
+        year = _utc_year(ts)
+        initial, utcs, offsets, _, _ = self._year(year)
+        low, high = self.offset_bounds(ts)
+        margin = high - low
+        idx = bisect_right(utcs, ts)
+        start = utcs[idx - 1] if idx else calendar.timegm((year, 1, 1, 0, 0, 0))
+        if idx < len(utcs):
+            end = utcs[idx]
+        else:
+            end = calendar.timegm((year + 1, 1, 1, 0, 0, 0))
+        offset = offsets[idx - 1] if idx else initial
+        return start + margin, end - margin, offset, low, high
+
+    def resolve(self, wall: int) -> List[int]:
+        """
+        Map wall-clock seconds to the UTC timestamps that show that time.
+
+        Args:
+            wall: Local wall time as seconds since 1970-01-01 00:00
+
+        Returns:
+            Empty list for times skipped by a forward jump, two timestamps for
+            times repeated by a backward jump, otherwise one
+        """
+        candidates = {self.offset_at(wall - 86400), self.offset_at(wall + 86400)}
+        return sorted(
+            wall - offset
+            for offset in candidates
+            if self.offset_at(wall - offset) == offset
+        )
+
+    def gap_end(self, wall: int) -> int:
+        """Get the UTC timestamp at which a skipped wall time's gap ends."""
+        ts = wall - self.offset_at(wall - 86400)
+        year = _utc_year(ts)
+        for y in (year, year + 1):
+            utcs = self._year(y)[1]
+            idx = bisect_left(utcs, ts - 86400)
+            while idx < len(utcs):
+                if utcs[idx] + self.offset_at(utcs[idx]) > wall:
+                    return utcs[idx]
+                idx += 1
+        return ts
+
+
+def _utc_year(ts: int) -> int:
+    """Get the UTC calendar year of a timestamp."""
+    return (_EPOCH + timedelta(seconds=ts)).year
+
+
+def _wall_seconds(moment: datetime) -> int:
+    """Convert a naive wall-clock datetime to seconds since 1970-01-01."""
+    return int((moment - _EPOCH).total_seconds())
+
+
+# Fallback when no zone information is available
+_UTC = ZoneTransitions(timezone.utc)
+
+
+@lru_cache(maxsize=None)
+def zone_transitions(key: str) -> ZoneTransitions:
+    """
+    Get the cached transition table for an IANA time zone.
+
+    Args:
+        key: Zone name, e.g. "Europe/Berlin"
+
+    Raises:
+        ValueError: If the zone is unknown
+    """
+    try:
+        return ZoneTransitions(ZoneInfo(key))
+    except (ZoneInfoNotFoundError, ValueError) as e:
+        raise ValueError(f"Unknown time zone: {key}") from e
+
+
+@lru_cache(maxsize=1)
+def local_zone() -> Optional[ZoneTransitions]:
+    """
+    Get the transition table of the system's local time zone.
+
+    Returns:
+        None if the local zone cannot be determined
+    """
+    key = os.environ.get("TZ", "").lstrip(":")
+    if key:
+        try:
+            return zone_transitions(key)
+        except ValueError:
+            pass
+    try:
+        with open("/etc/localtime", "rb") as fh:
+            return ZoneTransitions(ZoneInfo.from_file(fh, key="localtime"))
+    except (OSError, ValueError):
+        return None
+
+
+def get_zone(tz: Union[str, ZoneTransitions, None] = None) -> ZoneTransitions:
+    """
+    Get the transition table runs are computed in.
+
+    Args:
+        tz: Zone name or table; defaults to the local zone (UTC if the
+            local zone cannot be determined)
+
+    Raises:
+        ValueError: If a zone name is unknown
+    """
+    zone = zone_transitions(tz) if isinstance(tz, str) else tz or local_zone()
+    return zone or _UTC
+
+
+def iter_run_timestamps(
+    schedule: CronSchedule,
+    start: Optional[datetime] = None,
+    tz: Union[str, ZoneTransitions, None] = None,
+) -> Iterator[int]:
+    """
+    Generate firing times in a time zone, honouring DST like cronie.
+
+    This is the allocation-free core of iter_runs, meant for forecasting
+    many jobs at once.
+
+    Args:
+        schedule: Compiled schedule
+        start: Only times strictly after this are produced. Naive values
+            are taken as wall time in the zone. Defaults to now.
+        tz: Zone name or table; defaults to the local zone (UTC if the
+            local zone cannot be determined)
+
+    Yields:
+        UTC timestamps in ascending order
+    """
+    zone = get_zone(tz)
+
+    if start is None:
+        start_ts = int(datetime.now(timezone.utc).timestamp())
+    elif start.tzinfo is None:
+        wall = _wall_seconds(start.replace(microsecond=0))
+        resolved = zone.resolve(wall)
+        start_ts = resolved[0] if resolved else zone.gap_end(wall)
+    else:
+        start_ts = int(start.timestamp())
+    start_wall = _EPOCH + timedelta(seconds=start_ts + zone.offset_at(start_ts))
+
+    # The earliest wall time whose UTC instant can still be after start_ts
+    low, high = zone.offset_bounds(start_ts)
+    search_from = start_wall - timedelta(seconds=high - low + 60)
+
+    pending: List[int] = []
+    last_emitted = None
+    seg_start = seg_end = seg_offset = seg_high = 0
+    for wall in schedule.iter_wall_seconds(search_from):
+        instant = wall - seg_offset
+
+        if not seg_start <= instant < seg_end:
+            seg_start, seg_end, seg_offset, _, seg_high = zone.segment(
+                wall - zone.offset_at(wall - 86400)
+            )
+            instant = wall - seg_offset
+
+        if seg_start <= instant < seg_end:
+            # Fast path: far enough from any transition to be unambiguous
+            instants = (instant,)
+        else:
+            instants = zone.resolve(wall)
+            if not instants:
+                # Skipped by a forward jump: fixed-time jobs run right after it
+                instants = () if schedule.wildcard else (zone.gap_end(wall),)
+            elif len(instants) > 1 and not schedule.wildcard:
+                # Repeated by a backward jump: fixed-time jobs run once
+                instants = instants[:1]
+
+        for instant in instants:
+            if instant > start_ts:
+                heapq.heappush(pending, instant)
+
+        # Anything earlier than the smallest instant a later wall time can
+        # map to is final and can be emitted in order
+        threshold = wall - seg_high
+        while pending and pending[0] <= threshold:
+            instant = heapq.heappop(pending)
+            if instant != last_emitted:
+                last_emitted = instant
+                yield instant
+
+    while pending:
+        instant = heapq.heappop(pending)
+        if instant != last_emitted:
+            last_emitted = instant
+            yield instant
+
+
+def iter_runs(
+    schedule: CronSchedule,
+    start: Optional[datetime] = None,
+    tz: Union[str, ZoneTransitions, None] = None,
+) -> Iterator[datetime]:
+    """
+    Generate firing times in a time zone, honouring DST like cronie.
+
+    Args:
+        schedule: Compiled schedule
+        start: Only times strictly after this are produced. Naive values
+            are taken as wall time in the zone. Defaults to now.
+        tz: Zone name or table; defaults to the local zone
+
+    Yields:
+        Aware datetimes in ascending order
+    """
+    zone = get_zone(tz)
+    for instant in iter_run_timestamps(schedule, start, zone):
+        yield datetime.fromtimestamp(instant, zone.zone)
@@ -0,0 +1,648 @@
+"""
+Crontab Document - Streaming, line-preserving crontab parser.
+
+Every line of the crontab is kept with its exact original text, including
+comments, blank lines and environment assignments, so a document renders back
+byte-for-byte. Lines are only classified while streaming; the schedule,
+command and comment of a job are split out the first time they are accessed.
+Edited lines are re-rendered, all other lines are written back untouched.
+"""
+
+import mmap
+import re
+from collections.abc import Mapping
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+# Line kinds
+LINE_BLANK = "blank"
+LINE_COMMENT = "comment"
+LINE_ENV = "env"
+LINE_JOB = "job"
+
+# Characters a minute field (the first field of a job) can start with
+_JOB_START = frozenset("0123456789*@")
+
+_WEEKDAYS = "sun mon tue wed thu fri sat".split()
+
+# Names accepted in the month and day-of-week fields, plus the L/W items of
+# the day fields ("L", "LW", "15W", "friL", "Lfri")
+_FIELD_NAMES = frozenset(
+    "jan feb mar apr may jun jul aug sep oct nov dec l w lw".split()
+    + _WEEKDAYS
+    + [day + "l" for day in _WEEKDAYS]
+    + ["l" + day for day in _WEEKDAYS]
+)
+
+# Macros accepted in place of the five schedule fields
+SPECIAL_SCHEDULES = frozenset(
+    "@reboot @yearly @annually @monthly @weekly @daily @midnight @hourly".split()
+)
+
+# Fast path: five purely numeric/wildcard fields followed by the command
+_NUMERIC_JOB_RE = re.compile(
+    r"([0-9*/,\-]+)[ \t]+([0-9*/,\-]+)[ \t]+([0-9*/,\-]+)[ \t]+"
+    r"([0-9*/,\-]+)[ \t]+([0-9*/,\-]+)[ \t]+(\S.*)"
+)
+_FIELD_RE = re.compile(r"[0-9*/,\-#?]+")
+_ENV_RE = re.compile(r"\s*([A-Za-z_][A-Za-z0-9_]*)\s*=\s*(.*)$")
+_COMMENT_SPLIT_RE = re.compile(r"\s+#\s*")
+_NAME_RE = re.compile(r"[a-z]+")
+
+Source = Union[str, bytes, bytearray, memoryview, mmap.mmap, Iterable]
+
+# Environment variables that change how cron runs a job
+CRON_ENV_VARS = ("MAILTO", "PATH", "SHELL", "CRON_TZ")
+
+
+def _is_schedule_field(token: str) -> bool:
+    """Cheaply check whether a token can be a schedule field."""
+    if _FIELD_RE.fullmatch(token):
+        return True
+    lowered = token.lower()
+    names = _NAME_RE.findall(lowered)
+    if not names or _FIELD_RE.sub("", _NAME_RE.sub("", lowered)):
+        return False
+    return all(name in _FIELD_NAMES for name in names)
+
+
+def _split_comment(rest: str) -> Tuple[str, str]:
+    """Split an inline `` # comment`` off a command."""
+    match = _COMMENT_SPLIT_RE.search(rest)
+    if match is None:
+        return rest.rstrip(), ""
+    return rest[: match.start()], rest[match.end() :].rstrip()
+
+
+def _parse_job_body(body: str) -> Optional[Tuple[str, str, str]]:
+    """
+    Split the body of a job line into schedule, command and comment.
+
+    Args:
+        body: The line without any leading ``#`` used to disable it
+
+    Returns:
+        (schedule, command, comment) or None if the text is not a job
+    """
+    body = body.strip()
+    if not body or body[0] not in _JOB_START:
+        return None
+
+    if body[0] == "@":
+        parts = body.split(None, 1)
+        if len(parts) < 2 or parts[0].lower() not in SPECIAL_SCHEDULES:
+            return None
+        command, comment = _split_comment(parts[1])
+        return parts[0].lower(), command, comment
+
+    match = _NUMERIC_JOB_RE.match(body)
+    if match is not None:
+        command, comment = _split_comment(match.group(6))
+        return " ".join(match.group(1, 2, 3, 4, 5)), command, comment
+
+    parts = body.split(None, 5)
+    if len(parts) < 6 or not all(_is_schedule_field(p) for p in parts[:5]):
+        return None
+    command, comment = _split_comment(parts[5])
+    if not command:
+        return None
+    return " ".join(parts[:5]), command, comment
+
+
+def classify(text: str) -> str:
+    """
+    Classify a single crontab line.
+
+    Args:
+        text: Line text without the trailing newline
+
+    Returns:
+        One of LINE_BLANK, LINE_COMMENT, LINE_ENV or LINE_JOB
+    """
+    stripped = text.lstrip()
+    if not stripped:
+        return LINE_BLANK
+
+    first = stripped[0]
+    if first == "#":
+        body = stripped.lstrip("#")
+        if body[:1] in (" ", "\t"):
+            body = body.lstrip()
+        # A commented-out job is still a job, just disabled
+        if body[:1] in _JOB_START and _parse_job_body(body) is not None:
+            return LINE_JOB
+        return LINE_COMMENT
+
+    if first in _JOB_START:
+        return LINE_JOB
+    if _ENV_RE.match(stripped):
+        return LINE_ENV
+    # Anything else is not valid crontab syntax; keep it verbatim
+    return LINE_COMMENT
+
+
+def format_env(name: str, value: str) -> str:
+    """
+    Render an environment assignment line.
+
+    Args:
+        name: Variable name
+        value: Variable value; quoted if it has surrounding whitespace
+
+    Returns:
+        Crontab line without trailing newline
+    """
+    if value != value.strip() or not value:
+        value = f'"{value}"'
+    return f"{name}={value}"
+
+
+def format_job(schedule: str, command: str, comment: str = "", enabled: bool = True) -> str:
+    """
+    Render a job line.
+
+    Args:
+        schedule: Cron schedule expression or macro
+        command: Command to execute
+        comment: Optional inline comment
+        enabled: False to comment the job out
+
+    Returns:
+        Crontab line without trailing newline
+    """
+    text = f"{schedule} {command}"
+    if comment:
+        text += f" # {comment}"
+    if not enabled:
+        text = "# " + text
+    return text
+
+
+def common_prefix_length(a: Sequence, b: Sequence) -> int:
+    """
+    Get the length of the common prefix of two lists.
+
+    Compares slices in C with a binary search, so long identical runs of
+    lines cost almost nothing.
+    """
+    low, high = 0, min(len(a), len(b))
+    while low < high:
+        mid = (low + high + 1) // 2
+        if a[low:mid] == b[low:mid]:
+            low = mid
+        else:
+            high = mid - 1
+    return low
+
+
+class CronLine:
+    """A single crontab line with lazily parsed job fields."""
+
+    __slots__ = ("text", "kind", "_fields", "dirty")
+
+    def __init__(self, text: str, kind: Optional[str] = None):
+        self.text = text
+        self.kind = kind if kind is not None else classify(text)
+        self._fields = None
+        # True once the line was created or changed after parsing
+        self.dirty = False
+
+    def __repr__(self) -> str:
+        return f"CronLine({self.kind}, {self.text!r})"
+
+    @property
+    def is_job(self) -> bool:
+        return self.kind == LINE_JOB
+
+    def _job_fields(self) -> Tuple[bool, str, str, str]:
+        """Parse and cache (enabled, schedule, command, comment)."""
+        if self._fields is None:
+            stripped = self.text.lstrip()
+            enabled = not stripped.startswith("#")
+            body = stripped if enabled else stripped.lstrip("#")
+            parsed = _parse_job_body(body)
+            if parsed is None:
+                # Enabled lines that start like a job but do not parse
+                schedule, command, comment = "", stripped, ""
+            else:
+                schedule, command, comment = parsed
+            self._fields = (enabled, schedule, command, comment)
+        return self._fields
+
+    @property
+    def fields(self) -> Tuple[bool, str, str, str]:
+        """Get (enabled, schedule, command, comment) of a job line at once."""
+        return self._job_fields()
+
+    @property
+    def enabled(self) -> bool:
+        return self._job_fields()[0]
+
+    @property
+    def schedule(self) -> str:
+        return self._job_fields()[1]
+
+    @property
+    def command(self) -> str:
+        return self._job_fields()[2]
+
+    @property
+    def comment(self) -> str:
+        return self._job_fields()[3]
+
+    @property
+    def env(self) -> Optional[Tuple[str, str]]:
+        """Get (name, value) for environment lines, else None."""
+        if self.kind != LINE_ENV:
+            return None
+        name, value = _ENV_RE.match(self.text).groups()
+        value = value.rstrip()
+        if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'":
+            value = value[1:-1]
+        return name, value
+
+    def set_text(self, text: str):
+        """Replace the line text and drop cached fields."""
+        self.text = text
+        self.kind = classify(text)
+        self._fields = None
+        self.dirty = True
+
+
+class EnvScope(Mapping):
+    """
+    Read-only environment in effect for the jobs below an assignment.
+
+    Scopes are created once per environment line while walking the crontab
+    forwards and are shared by every job they apply to. A new scope copies
+    its parent's variables only when an assignment changes them.
+    """
+
+    __slots__ = ("_vars", "parent", "line")
+
+    def __init__(
+        self,
+        parent: Optional["EnvScope"] = None,
+        line: Optional[CronLine] = None,
+        variables: Optional[Dict[str, str]] = None,
+    ):
+        self.parent = parent
+        # The environment line that created this scope (None for the root)
+        self.line = line
+        self._vars = variables if variables is not None else {}
+
+    def assign(self, name: str, value: str, line: CronLine) -> "EnvScope":
+        """Get the scope that results from an assignment on ``line``."""
+        variables = dict(self._vars)
+        variables[name] = value
+        return EnvScope(self, line, variables)
+
+    def __getitem__(self, name: str) -> str:
+        return self._vars[name]
+
+    def __iter__(self):
+        return iter(self._vars)
+
+    def __len__(self) -> int:
+        return len(self._vars)
+
+    def __repr__(self) -> str:
+        return f"EnvScope({self._vars!r})"
+
+
+# Shared scope for jobs with no environment lines above them
+EMPTY_SCOPE = EnvScope()
+
+
+def _iter_text_lines(source: Source) -> Iterator[str]:
+    """Yield lines without newlines from text, bytes, mmap or a file."""
+    if isinstance(source, str):
+        source = source.encode("utf-8", errors="surrogateescape")
+
+    if isinstance(source, memoryview):
+        source = source.tobytes()
+
+    if isinstance(source, (bytes, bytearray, mmap.mmap)):
+        data = source
+        start = 0
+        end = len(data)
+        while start < end:
+            newline = data.find(b"\n", start)
+            if newline == -1:
+                newline = end
+            yield data[start:newline].decode("utf-8", errors="surrogateescape").rstrip("\r")
+            start = newline + 1
+        return
+
+    # File objects and other iterables of lines
+    for line in source:
+        if isinstance(line, bytes):
+            line = line.decode("utf-8", errors="surrogateescape")
+        yield line.rstrip("\r\n")
+
+
+def iter_lines(source: Source) -> Iterator[CronLine]:
+    """
+    Stream crontab lines.
+
+    Args:
+        source: Crontab text, a bytes-like buffer (including mmap), an open
+            file or any iterable of lines
+
+    Yields:
+        CronLine objects, in file order
+    """
+    for text in _iter_text_lines(source):
+        yield CronLine(text)
+
+
+def iter_jobs(source: Source) -> Iterator[CronLine]:
+    """
+    Stream only the job lines of a crontab (enabled and disabled).
+
+    Args:
+        source: See iter_lines
+
+    Yields:
+        CronLine objects whose kind is LINE_JOB
+    """
+    for line in iter_lines(source):
+        if line.kind == LINE_JOB:
+            yield line
+
+
+class CrontabDocument:
+    """An editable crontab that preserves every line it does not change."""
+
+    def __init__(self, lines: Optional[List[CronLine]] = None, trailing_newline: bool = True):
+        """
+        Initialize the document.
+
+        Args:
+            lines: Parsed lines
+            trailing_newline: Whether the rendered text ends with a newline
+        """
+        self.lines: List[CronLine] = lines or []
+        self.trailing_newline = trailing_newline
+        self._jobs: Optional[List[CronLine]] = None
+        self._scopes: Optional[List[EnvScope]] = None
+
+    @classmethod
+    def parse(cls, source: Source) -> "CrontabDocument":
+        """
+        Parse a whole crontab.
+
+        Args:
+            source: See iter_lines
+
+        Returns:
+            A new CrontabDocument
+        """
+        if isinstance(source, str):
+            trailing_newline = source.endswith("\n") or not source
+            texts = source.split("\n")
+            if trailing_newline and texts and texts[-1] == "":
+                texts.pop()
+            lines = [CronLine(text.rstrip("\r")) for text in texts]
+            return cls(lines, trailing_newline)
+        return cls(list(iter_lines(source)))
+
+    def jobs(self) -> List[CronLine]:
+        """Get the job lines, in file order."""
+        if self._jobs is None:
+            self._jobs = [line for line in self.lines if line.kind == LINE_JOB]
+        return self._jobs
+
+    def env_scopes(self) -> List[EnvScope]:
+        """
+        Get the environment in effect for each job.
+
+        Computed in a single forward pass; consecutive jobs share the same
+        EnvScope object.
+
+        Returns:
+            List aligned with jobs()
+        """
+        if self._scopes is None:
+            scope = EMPTY_SCOPE
+            scopes = []
+            for line in self.lines:
+                if line.kind == LINE_JOB:
+                    scopes.append(scope)
+                elif line.kind == LINE_ENV:
+                    name, value = line.env
+                    if scope.get(name) != value:
+                        scope = scope.assign(name, value, line)
+            self._scopes = scopes
+        return self._scopes
+
+    def env_block(self, line: CronLine) -> List[CronLine]:
+        """
+        Get the environment lines directly above a line.
+
+        Args:
+            line: Usually a job line
+
+        Returns:
+            The contiguous environment lines immediately preceding it
+        """
+        position = self.index_of(line)
+        start = position
+        while start > 0 and self.lines[start - 1].kind == LINE_ENV:
+            start -= 1
+        return self.lines[start:position]
+
+    def set_env_block(self, line: CronLine, env: Dict[str, str]):
+        """
+        Replace the environment lines directly above a line.
+
+        Assignments whose value is unchanged keep their original text.
+
+        Args:
+            line: Line the block belongs to
+            env: New variables, in the order they should be written
+        """
+        existing = {}
+        for env_line in self.env_block(line):
+            name, value = env_line.env
+            existing[name] = (value, env_line)
+            self.lines.remove(env_line)
+
+        position = self.index_of(line)
+        for name, value in env.items():
+            old = existing.get(name)
+            if old is not None and old[0] == value:
+                env_line = old[1]
+            else:
+                env_line = CronLine(format_env(name, value))
+                env_line.dirty = True
+            self.lines.insert(position, env_line)
+            position += 1
+        self._invalidate()
+
+    def job(self, index: int) -> Optional[CronLine]:
+        """Get the job at an index, or None if it is out of range."""
+        jobs = self.jobs()
+        if index < 0 or index >= len(jobs):
+            return None
+        return jobs[index]
+
+    def _invalidate(self):
+        """Forget cached indexes after a structural change."""
+        self._jobs = None
+        self._scopes = None
+
+    def append(self, text: str) -> CronLine:
+        """
+        Append a line at the end of the document.
+
+        Args:
+            text: Line text
+
+        Returns:
+            The new line
+        """
+        line = CronLine(text)
+        line.dirty = True
+        self.lines.append(line)
+        self._invalidate()
+        return line
+
+    def insert(self, index: int, line: CronLine):
+        """
+        Insert an existing line object at a position.
+
+        Args:
+            index: Position in the document
+            line: Line to insert
+        """
+        self.lines.insert(index, line)
+        self._invalidate()
+
+    def insert_before(self, anchor: CronLine, text: str) -> CronLine:
+        """
+        Insert a new line directly above an existing one.
+
+        Args:
+            anchor: Existing line
+            text: Line text
+
+        Returns:
+            The new line
+        """
+        line = CronLine(text)
+        line.dirty = True
+        self.lines.insert(self.index_of(anchor), line)
+        self._invalidate()
+        return line
+
+    def remove(self, line: CronLine):
+        """Remove a line from the document."""
+        del self.lines[self.index_of(line)]
+        self._invalidate()
+
+    def remove_many(self, lines: Iterable[CronLine]):
+        """Remove several lines in a single pass over the document."""
+        doomed = {id(line) for line in lines}
+        if doomed:
+            self.lines = [line for line in self.lines if id(line) not in doomed]
+            self._invalidate()
+
+    def replace(self, line: CronLine, text: str):
+        """
+        Change the text of a line in place.
+
+        Args:
+            line: Line to change
+            text: New text
+        """
+        old_kind = line.kind
+        line.set_text(text)
+        if LINE_ENV in (old_kind, line.kind) or old_kind != line.kind:
+            self._invalidate()
+
+    def snapshot(self) -> Tuple[List[CronLine], List[str]]:
+        """Capture the line structure and texts so edits can be rolled back."""
+        return list(self.lines), [line.text for line in self.lines]
+
+    def restore(self, snapshot: Tuple[List[CronLine], List[str]]):
+        """Roll back to a state captured with snapshot()."""
+        lines, texts = snapshot
+        for line, text in zip(lines, texts):
+            if line.text is not text:
+                line.set_text(text)
+        self.lines = lines
+        self._invalidate()
+
+    def replace_all(self, source: Source):
+        """
+        Replace the whole content, e.g. to restore an older version.
+
+        Line objects of the unchanged head and tail are kept, so the edit
+        journal records only the lines in between.
+
+        Args:
+            source: New crontab text
+        """
+        new = CrontabDocument.parse(source)
+        old_texts = [line.text for line in self.lines]
+        new_texts = [line.text for line in new.lines]
+        head = common_prefix_length(old_texts, new_texts)
+        tail = common_prefix_length(old_texts[head:][::-1], new_texts[head:][::-1])
+        middle = new.lines[head : len(new.lines) - tail]
+        for line in middle:
+            line.dirty = True
+        self.lines = self.lines[:head] + middle + self.lines[len(self.lines) - tail :]
+        self.trailing_newline = new.trailing_newline
+        self._invalidate()
+
+    def apply_hunks(
+        self, hunks: Sequence[Tuple[int, int, List[str], List[str]]], undo: bool = False
+    ):
+        """
+        Apply line hunks recorded by edit_journal.diff_lines, in one pass.
+
+        Args:
+            hunks: (position before, position after, texts before, texts after)
+            undo: Go from the after state back to the before state
+
+        Raises:
+            ValueError: If the lines do not match the hunks
+        """
+        lines = self.lines
+        new_lines: List[CronLine] = []
+        cursor = 0
+        for before_pos, after_pos, before, after in hunks:
+            if undo:
+                pos, old, new = after_pos, after, before
+            else:
+                pos, old, new = before_pos, before, after
+            if pos < cursor or [line.text for line in lines[pos : pos + len(old)]] != old:
+                raise ValueError("Crontab does not match the recorded edit")
+            new_lines.extend(lines[cursor:pos])
+            for text in new:
+                line = CronLine(text)
+                line.dirty = True
+                new_lines.append(line)
+            cursor = pos + len(old)
+        new_lines.extend(lines[cursor:])
+        self.lines = new_lines
+        self._invalidate()
+
+    def index_of(self, line: CronLine) -> int:
+        """Get the position of a line; identity based."""
+        for idx, candidate in enumerate(self.lines):
+            if candidate is line:
+                return idx
+        raise ValueError("Line is not part of this document")
+
+    def render(self) -> str:
+        """
+        Render the document.
+
+        Returns:
+            Crontab text. Unchanged lines are emitted exactly as read.
+        """
+        text = "\n".join([line.text for line in self.lines])
+        if self.trailing_newline and self.lines:
+            text += "\n"
+        return text
@@ -0,0 +1,400 @@
+"""
+Crontab Lint - Find jobs that are valid but probably do not do what was meant.
+
+Each job is run through a pipeline of rules. The schedule is compiled once
+and every rule looks at the same compiled schedule and command, so adding
+a rule costs no extra parsing. Findings depend only on a job's schedule,
+command and MAILTO, and are cached under those, so after an edit only the
+changed jobs are linted again. Very large crontabs are linted in a process
+pool. Duplicate jobs are found afterwards with one hashing pass over all
+jobs.
+"""
+
+import calendar
+import multiprocessing
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from cron_gui.cron_schedule import (
+    CronSchedule,
+    compile_schedule,
+    cron_dialect_error,
+    normalize_schedule,
+)
+from cron_gui.profiling import profiled
+
+SEVERITY_ERROR = "error"
+SEVERITY_WARNING = "warning"
+SEVERITY_INFO = "info"
+
+# Most findings cached across lint runs
+LINT_CACHE_SIZE = 65536
+
+# Jobs to lint before a process pool pays for its start-up
+PROCESS_POOL_THRESHOLD = 20000
+
+# Jobs handed to a worker process at a time
+CHUNK_SIZE = 2000
+
+# How far ahead a job must run not to be reported as (almost) never running
+HORIZON = timedelta(days=366)
+
+_UNESCAPED_PERCENT = re.compile(r"(?<!\\)%")
+_COMMAND_SEPARATOR = re.compile(r"&&|\|\||[;|]")
+_ASSIGNMENT = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*=")
+_REDIRECT = re.compile(r">|\|\s*(?:logger|tee|systemd-cat)\b")
+
+
+class LintFinding(NamedTuple):
+    """Something a rule noticed about a job."""
+
+    rule: str
+    severity: str
+    message: str
+
+
+# (schedule, command, MAILTO or None)
+LintKey = Tuple[str, str, Optional[str]]
+
+
+class _Job:
+    """What the rules see of a job; the schedule is compiled once."""
+
+    __slots__ = ("schedule", "command", "mailto", "now", "compiled", "_next_run")
+
+    def __init__(self, key: LintKey, now: datetime):
+        self.schedule, self.command, self.mailto = key
+        self.now = now
+        try:
+            self.compiled: Optional[CronSchedule] = compile_schedule(self.schedule)
+        except ValueError:
+            self.compiled = None
+        self._next_run = False
+
+    def next_run(self) -> Optional[datetime]:
+        """Get the first run after now, computed once; None if it never runs."""
+        if self._next_run is False:
+            self._next_run = self.compiled.next_after(self.now)
+        return self._next_run
+
+
+Rule = Callable[[_Job], Optional[LintFinding]]
+
+
+def _rule_invalid(job: _Job) -> Optional[LintFinding]:
+    """Report schedules the engine cannot compile."""
+    if job.compiled is None:
+        return LintFinding("invalid", SEVERITY_ERROR, "The schedule is not valid")
+    return None
+
+
+def _rule_cron_dialect(job: _Job) -> Optional[LintFinding]:
+    """Report extensions the engine reads but cron refuses, e.g. L or 1#1."""
+    if job.compiled is None:
+        return None
+    problem = cron_dialect_error(job.schedule)
+    if problem is None:
+        return None
+    return LintFinding(
+        "unsupported-syntax", SEVERITY_ERROR, f"Cron skips this line: {problem}"
+    )
+
+
+def _rule_impossible_date(job: _Job) -> Optional[LintFinding]:
+    """Report days of month that none of the months has, e.g. 31 February."""
+    schedule = job.compiled
+    if schedule is None or schedule.reboot:
+        return None
+    # With both day fields restricted, cron runs on either, so the day of
+    # week keeps the job running
+    if schedule.dom_star or not schedule.dow_star:
+        return None
+    if schedule.days == 0:
+        # Only L/W items, which always resolve to some day
+        return None
+    months = [month for month in range(1, 13) if schedule.months & (1 << month)]
+    # February is checked in a leap year
+    if any(
+        schedule.days & ((1 << (calendar.monthrange(2024, month)[1] + 1)) - 1)
+        for month in months
+    ):
+        return None
+    days = ",".join(str(day) for day in range(1, 32) if schedule.days & (1 << day))
+    names = ", ".join(calendar.month_name[month] for month in months)
+    return LintFinding(
+        "impossible-date", SEVERITY_ERROR, f"Never runs: {names} has no day {days}"
+    )
+
+
+def _rule_never_runs(job: _Job) -> Optional[LintFinding]:
+    """Report schedules that never run, or not within a year."""
+    if job.compiled is None or job.compiled.reboot:
+        return None
+    next_run = job.next_run()
+    if next_run is None:
+        return LintFinding("never-runs", SEVERITY_ERROR, "Never runs")
+    if next_run - job.now > HORIZON:
+        return LintFinding(
+            "rarely-runs",
+            SEVERITY_WARNING,
+            f"Does not run within a year; next run {next_run:%Y-%m-%d %H:%M}",
+        )
+    return None
+
+
+def _rule_day_or(job: _Job) -> Optional[LintFinding]:
+    """Report schedules restricting both day fields, which cron ORs."""
+    schedule = job.compiled
+    if schedule is None or schedule.reboot or schedule.dom_star or schedule.dow_star:
+        return None
+    return LintFinding(
+        "day-or",
+        SEVERITY_WARNING,
+        "Runs on days matching the day of month OR the day of week, "
+        "not only on days matching both",
+    )
+
+
+def _rule_percent(job: _Job) -> Optional[LintFinding]:
+    """Report % signs cron would turn into newlines."""
+    if not _UNESCAPED_PERCENT.search(job.command):
+        return None
+    return LintFinding(
+        "unescaped-percent",
+        SEVERITY_WARNING,
+        "cron turns % into a newline and feeds the rest to the command; "
+        "write \\% for a literal percent sign",
+    )
+
+
+def _rule_relative_path(job: _Job) -> Optional[LintFinding]:
+    """Report programs given by a path relative to the working directory."""
+    for segment in _COMMAND_SEPARATOR.split(job.command):
+        words = segment.split()
+        while words and _ASSIGNMENT.match(words[0]):
+            words.pop(0)
+        if not words:
+            continue
+        program = words[0]
+        if "/" in program and not program.startswith(("/", "~", "$")):
+            return LintFinding(
+                "relative-path",
+                SEVERITY_WARNING,
+                f"{program} is relative; cron starts jobs in the home directory",
+            )
+    return None
+
+
+def _rule_output(job: _Job) -> Optional[LintFinding]:
+    """Report output that is mailed or lost because it is not redirected."""
+    if _REDIRECT.search(job.command):
+        return None
+    if job.mailto == "":
+        return LintFinding(
+            "output-lost",
+            SEVERITY_WARNING,
+            "Output is not redirected and MAILTO is empty, so it is lost",
+        )
+    recipient = job.mailto or "the crontab's owner"
+    return LintFinding(
+        "output-mailed",
+        SEVERITY_INFO,
+        f"Output is not redirected; cron mails it to {recipient}",
+    )
+
+
+# Rules in the order they run. Once a rule reports an error the schedule
+# is not looked at again, since later schedule rules would only repeat it
+RULES: Tuple[Rule, ...] = (
+    _rule_invalid,
+    _rule_cron_dialect,
+    _rule_impossible_date,
+    _rule_never_runs,
+    _rule_day_or,
+    _rule_percent,
+    _rule_relative_path,
+    _rule_output,
+)
+
+
+def lint_key(job: Dict) -> LintKey:
+    """Get what a job's findings depend on, see CronManager.list_jobs."""
+    env = job.get("env") or {}
+    return job["schedule"], job["command"], env.get("MAILTO")
+
+
+def lint_one(
+    key: LintKey, now: Optional[datetime] = None
+) -> Tuple[LintFinding, ...]:
+    """
+    Run the rules over one job.
+
+    Args:
+        key: See lint_key
+        now: Time next runs are computed from; defaults to now
+
+    Returns:
+        Findings, most severe rule first
+    """
+    job = _Job(key, now or datetime.now())
+    findings = []
+    for rule in RULES:
+        finding = rule(job)
+        if finding is not None:
+            findings.append(finding)
+            if finding.severity == SEVERITY_ERROR:
+                job.compiled = None
+    return tuple(findings)
+
+
+def _lint_chunk(keys: List[LintKey], now: datetime) -> List[Tuple[LintFinding, ...]]:
+    """Lint several jobs in a worker process."""
+    return [lint_one(key, now) for key in keys]
+
+
+class CrontabLinter:
+    """Lints job lists, remembering the findings of jobs it has seen."""
+
+    def __init__(
+        self,
+        cache_size: int = LINT_CACHE_SIZE,
+        pool_threshold: int = PROCESS_POOL_THRESHOLD,
+    ):
+        """
+        Initialize the linter.
+
+        Args:
+            cache_size: Most jobs whose findings are kept
+            pool_threshold: Fewest uncached jobs linted in worker processes;
+                smaller batches, or a single CPU, are linted in-process
+        """
+        self.cache_size = cache_size
+        self.pool_threshold = pool_threshold
+        self._cache: Dict[LintKey, Tuple[LintFinding, ...]] = {}
+        # Normalized form of every schedule seen, for finding duplicates
+        self._normalized: Dict[str, str] = {}
+
+    @profiled("lint.jobs", "manager")
+    def lint(self, jobs: Sequence[Dict]) -> List[Tuple[LintFinding, ...]]:
+        """
+        Lint jobs as CronManager.list_jobs returns them.
+
+        Args:
+            jobs: Job dictionaries
+
+        Returns:
+            Findings of each job, aligned with jobs
+        """
+        keys = [lint_key(job) for job in jobs]
+        missing = list(dict.fromkeys(key for key in keys if key not in self._cache))
+        if missing:
+            self._store(missing, self._run(missing))
+
+        cache = self._cache
+        results = [cache[key] for key in keys]
+        for idx, first in self._duplicates(jobs).items():
+            number = jobs[first]["id"] + 1
+            results[idx] += (
+                LintFinding(
+                    "duplicate",
+                    SEVERITY_WARNING,
+                    f"Same schedule and command as job {number}",
+                ),
+            )
+        return results
+
+    def cached_state(
+        self,
+    ) -> Tuple[Dict[LintKey, Tuple[LintFinding, ...]], Dict[str, str]]:
+        """
+        Get what the linter has cached, e.g. to save it for the next start.
+
+        Returns:
+            (findings per lint key, normalized form per schedule)
+        """
+        return dict(self._cache), dict(self._normalized)
+
+    def prime(
+        self,
+        findings: Dict[LintKey, Tuple[Tuple[str, str, str], ...]],
+        normalized: Optional[Dict[str, str]] = None,
+    ):
+        """
+        Fill the caches with results computed earlier, see cached_state.
+
+        Args:
+            findings: Findings per lint key, as plain tuples or LintFindings
+            normalized: Normalized form per schedule
+        """
+        if normalized:
+            self._normalized.update(normalized)
+        if findings:
+            # Many jobs share a finding; each is made once
+            made = {
+                f: LintFinding(*f) for found in findings.values() for f in found
+            }
+            self._store(
+                list(findings),
+                [tuple(made[f] for f in found) for found in findings.values()],
+            )
+
+    def _run(self, keys: List[LintKey]) -> List[Tuple[LintFinding, ...]]:
+        """Lint uncached jobs, in worker processes if there are many."""
+        now = datetime.now()
+        workers = min(os.cpu_count() or 1, 8)
+        if len(keys) < self.pool_threshold or workers < 2:
+            return [lint_one(key, now) for key in keys]
+
+        chunks = [keys[i : i + CHUNK_SIZE] for i in range(0, len(keys), CHUNK_SIZE)]
+        # Forking a process that runs a GTK main loop is not safe
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context(
+            "forkserver" if "forkserver" in methods else "spawn"
+        )
+        try:
+            with ProcessPoolExecutor(workers, mp_context=context) as pool:
+                results = []
+                for chunk in pool.map(_lint_chunk, chunks, [now] * len(chunks)):
+                    results.extend(chunk)
+                return results
+        except Exception as e:
+            print(f"Error linting in worker processes: {e}")
+            return [lint_one(key, now) for key in keys]
+
+    def _store(self, keys: List[LintKey], findings: List[Tuple[LintFinding, ...]]):
+        """Cache findings, dropping the oldest entries beyond the cache size."""
+        self._cache.update(zip(keys, findings))
+        overflow = len(self._cache) - max(self.cache_size, len(keys))
+        if overflow > 0:
+            for key in list(self._cache)[:overflow]:
+                del self._cache[key]
+
+    def _duplicates(self, jobs: Sequence[Dict]) -> Dict[int, int]:
+        """
+        Find enabled jobs that repeat an earlier job.
+
+        Returns:
+            Index of every repeat -> index of the first job like it
+        """
+        normalized = self._normalized
+        if len(normalized) > self.cache_size:
+            normalized.clear()
+        first: Dict[Tuple, int] = {}
+        repeats: Dict[int, int] = {}
+        for idx, job in enumerate(jobs):
+            if not job["enabled"] or not job.get("valid", True):
+                continue
+            schedule = normalized.get(job["schedule"])
+            if schedule is None:
+                schedule = normalize_schedule(job["schedule"])
+                normalized[job["schedule"]] = schedule
+            # Jobs of different hosts are not duplicates of each other
+            key = (job.get("host"), schedule, job["command"])
+            if key in first:
+                repeats[idx] = first[key]
+            else:
+                first[key] = idx
+        return repeats
@@ -0,0 +1,265 @@
+"""
+Crontab Merge - Three-way merge of crontab lines.
+
+Used when the crontab was changed by someone else (e.g. ``crontab -e``)
+after Cron GUI read it. Lines are matched by stable keys rather than by
+position:
+
+- a job is keyed by its command and how many jobs before it have the same
+  command, so rescheduling, enabling, disabling or re-commenting it on
+  either side still refers to the same job; a job whose command was edited
+  keeps the key of the job it replaced at the same place: the most similar
+  command, or, when as many jobs were replaced as added there, the job in
+  the same position, however much its command changed;
+- any other line is keyed by its text and the job it sits above, so
+  comments and environment lines stay with their job.
+
+A job changed differently on both sides, or changed on one side and
+deleted on the other, is a conflict; everything else merges on its own.
+"""
+
+import difflib
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from cron_gui.crontab_document import CronLine, common_prefix_length
+
+Key = Tuple
+
+# Resolutions of conflicting jobs
+PREFER_OURS = "ours"
+PREFER_THEIRS = "theirs"
+
+# How similar an edited command must be to the one it replaced to be
+# treated as the same job
+RENAME_SIMILARITY = 0.6
+
+# Largest block of edited jobs compared pairwise
+MAX_PAIRINGS = 10000
+
+# Value of a line a side does not have
+_MISSING = None
+
+_UNPARSED = object()
+
+
+class MergeConflict(NamedTuple):
+    """A job changed on both sides; a missing version means it was deleted."""
+
+    command: str
+    base: Optional[str]
+    ours: Optional[str]
+    theirs: Optional[str]
+
+
+class MergeResult(NamedTuple):
+    """Merged line texts and the conflicts that were left unresolved."""
+
+    lines: List[str]
+    conflicts: List[MergeConflict]
+
+
+def _job_keys(
+    texts: Sequence[str], commands: Dict[str, Optional[str]]
+) -> List[Optional[Key]]:
+    """
+    Key every job by command and occurrence; None for other lines.
+
+    Args:
+        texts: Line texts
+        commands: Cache of the command of each line text, None for lines
+            that are not jobs; shared between the sides of a merge, whose
+            lines are mostly the same
+    """
+    seen: Dict[str, int] = {}
+    keys: List[Optional[Key]] = []
+    for text in texts:
+        command = commands.get(text, _UNPARSED)
+        if command is _UNPARSED:
+            line = CronLine(text)
+            command = commands[text] = line.command if line.is_job else None
+        if command is not None:
+            count = seen.get(command, 0)
+            seen[command] = count + 1
+            keys.append(("job", command, count))
+        else:
+            keys.append(None)
+    return keys
+
+
+def _pair_edited_commands(base_jobs: List[Key], side_jobs: List[Key]) -> Dict[Key, Key]:
+    """
+    Match jobs whose command was edited to the base jobs they replaced.
+
+    Returns:
+        Mapping of the side's new keys to base keys
+    """
+    base_set = set(base_jobs)
+    side_set = set(side_jobs)
+    head = common_prefix_length(base_jobs, side_jobs)
+    tail = common_prefix_length(base_jobs[head:][::-1], side_jobs[head:][::-1])
+    base_middle = base_jobs[head : len(base_jobs) - tail]
+    side_middle = side_jobs[head : len(side_jobs) - tail]
+
+    renames: Dict[Key, Key] = {}
+    matcher = difflib.SequenceMatcher(None, base_middle, side_middle, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag != "replace":
+            continue
+        gone = [key for key in base_middle[i1:i2] if key not in side_set]
+        new = [key for key in side_middle[j1:j2] if key not in base_set]
+        if len(gone) * len(new) > MAX_PAIRINGS:
+            continue
+        gone_paired: List[Key] = []
+        for old_key in gone:
+            # The most similar new command, if it is similar enough
+            best, best_ratio = None, RENAME_SIMILARITY
+            similar = difflib.SequenceMatcher(None, b=old_key[1], autojunk=False)
+            for new_key in new:
+                similar.set_seq1(new_key[1])
+                if similar.quick_ratio() < best_ratio:
+                    continue
+                ratio = similar.ratio()
+                if ratio >= best_ratio:
+                    best, best_ratio = new_key, ratio
+            if best is not None:
+                renames[best] = old_key
+                new.remove(best)
+                gone_paired.append(old_key)
+        # Rewritten commands: a block that lost as many jobs as it gained
+        # was edited in place, so its jobs are still the same jobs
+        gone = [key for key in gone if key not in gone_paired]
+        if gone and len(gone) == len(new):
+            renames.update(zip(new, gone))
+    return renames
+
+
+def line_keys(
+    texts: Sequence[str],
+    base_jobs: Optional[List[Key]] = None,
+    commands: Optional[Dict[str, Optional[str]]] = None,
+) -> List[Key]:
+    """
+    Compute the stable key of every line.
+
+    Args:
+        texts: Line texts
+        base_jobs: Job keys of the common ancestor, in order; when given,
+            jobs whose command was edited take the key of the base job
+            they replaced
+        commands: Cache of parsed commands, see _job_keys
+
+    Returns:
+        Keys aligned with texts
+    """
+    keys = _job_keys(texts, {} if commands is None else commands)
+    if base_jobs is not None:
+        renames = _pair_edited_commands(
+            base_jobs, [key for key in keys if key is not None]
+        )
+        if renames:
+            keys = [renames.get(key, key) for key in keys]
+
+    # Other lines are anchored to the next job below them
+    anchors: List[Optional[Key]] = [None] * len(keys)
+    anchor = None
+    for idx in range(len(keys) - 1, -1, -1):
+        if keys[idx] is not None:
+            anchor = keys[idx]
+        else:
+            anchors[idx] = anchor
+
+    seen: Dict[Tuple, int] = {}
+    result: List[Key] = []
+    for text, key, anchor in zip(texts, keys, anchors):
+        if key is None:
+            ident = (text, anchor)
+            count = seen.get(ident, 0)
+            seen[ident] = count + 1
+            key = ("line", text, anchor, count)
+        result.append(key)
+    return result
+
+
+def merge_lines(
+    base: Sequence[str],
+    ours: Sequence[str],
+    theirs: Sequence[str],
+    prefer: Optional[str] = None,
+) -> MergeResult:
+    """
+    Merge two edited versions of a crontab with their common ancestor.
+
+    The result follows the order of theirs, the version on disk; lines only
+    we added are placed after the line they follow in ours.
+
+    Args:
+        base: Line texts both sides started from
+        ours: Line texts with our edits
+        theirs: Line texts with the other editor's edits
+        prefer: PREFER_OURS or PREFER_THEIRS to resolve conflicts that way;
+            None to report them
+
+    Returns:
+        MergeResult; its lines are only meaningful when there are no
+        conflicts or prefer was given
+    """
+    # Lines neither side touched at the start and end are kept as they are
+    head = min(common_prefix_length(base, ours), common_prefix_length(base, theirs))
+    tail = min(
+        common_prefix_length(base[head:][::-1], ours[head:][::-1]),
+        common_prefix_length(base[head:][::-1], theirs[head:][::-1]),
+    )
+    kept_head = list(base[:head])
+    kept_tail = list(base[len(base) - tail :])
+    base = base[head : len(base) - tail]
+    ours = ours[head : len(ours) - tail]
+    theirs = theirs[head : len(theirs) - tail]
+
+    commands: Dict[str, Optional[str]] = {}
+    base_keys = line_keys(base, commands=commands)
+    base_jobs = [key for key in base_keys if key[0] == "job"]
+    ours_keys = line_keys(ours, base_jobs, commands)
+    theirs_keys = line_keys(theirs, base_jobs, commands)
+
+    base_map = dict(zip(base_keys, base))
+    ours_map = dict(zip(ours_keys, ours))
+    theirs_map = dict(zip(theirs_keys, theirs))
+    conflicts: List[MergeConflict] = []
+
+    def resolve(key: Key) -> Optional[str]:
+        """Pick the merged text of a line; _MISSING drops it."""
+        b = base_map.get(key, _MISSING)
+        o = ours_map.get(key, _MISSING)
+        t = theirs_map.get(key, _MISSING)
+        if o == t or o == b:
+            return t
+        if t == b:
+            return o
+        if prefer == PREFER_OURS:
+            return o
+        if prefer == PREFER_THEIRS:
+            return t
+        conflicts.append(MergeConflict(key[1], b, o, t))
+        return t
+
+    # Lines of ours that are not in theirs, grouped by the line of ours
+    # they follow that theirs does have
+    added: Dict[Optional[Key], List[str]] = {}
+    anchor: Optional[Key] = None
+    for key in ours_keys:
+        if key in theirs_map:
+            anchor = key
+            continue
+        text = resolve(key)
+        if text is not _MISSING:
+            added.setdefault(anchor, []).append(text)
+
+    merged = kept_head
+    merged.extend(added.get(None, ()))
+    for key in theirs_keys:
+        text = resolve(key)
+        if text is not _MISSING:
+            merged.append(text)
+        merged.extend(added.get(key, ()))
+    merged.extend(kept_tail)
+    return MergeResult(merged, conflicts)
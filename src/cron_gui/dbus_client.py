@@ -0,0 +1,261 @@
+"""
+D-Bus Client - Query and edit jobs through a running cron_gui service.
+
+ServiceClient wraps the calls of dbus_service for other Python code, such
+as a panel applet; ``main`` is the ``cron-gui-ctl`` command line tool.
+"""
+
+import argparse
+import sys
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from gi.repository import GLib, Gio
+
+from cron_gui.dbus_service import (
+    BUS_NAME,
+    INTERFACE,
+    JOB_SIGNATURE,
+    OBJECT_PATH,
+    STALE_ERROR,
+)
+
+# How long to wait for the service, in milliseconds
+DEFAULT_TIMEOUT_MS = 5000
+
+
+class ServiceJob(NamedTuple):
+    """A job as the service reports it."""
+
+    id: int
+    schedule: str
+    command: str
+    comment: str
+    enabled: bool
+    valid: bool
+    env: Dict[str, str]
+
+
+class ServiceClient:
+    """Calls the cron_gui service on the session bus."""
+
+    def __init__(
+        self,
+        connection: Optional[Gio.DBusConnection] = None,
+        timeout_ms: int = DEFAULT_TIMEOUT_MS,
+    ):
+        """
+        Initialize the client.
+
+        Args:
+            connection: Bus connection; defaults to the session bus
+            timeout_ms: How long to wait for each reply
+
+        Raises:
+            GLib.Error: If there is no session bus
+        """
+        self.connection = connection or Gio.bus_get_sync(Gio.BusType.SESSION, None)
+        self.timeout_ms = timeout_ms
+
+    def _call(
+        self, method: str, reply: str, parameters: Optional[GLib.Variant] = None
+    ) -> Tuple:
+        """
+        Call a service method and wait for the reply.
+
+        Raises:
+            GLib.Error: If the service is not running or the call failed
+        """
+        result = self.connection.call_sync(
+            BUS_NAME,
+            OBJECT_PATH,
+            INTERFACE,
+            method,
+            parameters,
+            GLib.VariantType(reply),
+            Gio.DBusCallFlags.NONE,
+            self.timeout_ms,
+            None,
+        )
+        return result.unpack()
+
+    def list_jobs(self) -> Tuple[str, List[ServiceJob]]:
+        """Get the crontab's fingerprint and its jobs."""
+        fingerprint, jobs = self._call("ListJobs", f"(sa{JOB_SIGNATURE})")
+        return fingerprint, [ServiceJob(*job) for job in jobs]
+
+    def get_job(self, job_id: int) -> ServiceJob:
+        """Get one job by id."""
+        (job,) = self._call(
+            "GetJob", f"({JOB_SIGNATURE})", GLib.Variant("(i)", (job_id,))
+        )
+        return ServiceJob(*job)
+
+    def add_job(
+        self,
+        schedule: str,
+        command: str,
+        comment: str = "",
+        env: Optional[Dict[str, str]] = None,
+        fingerprint: str = "",
+    ) -> bool:
+        """
+        Append a job; True if successful.
+
+        The edits take the fingerprint from list_jobs(). When it is given
+        and the crontab has changed since, the call fails with STALE_ERROR
+        instead of editing, since job ids may point at other jobs now.
+        """
+        parameters = GLib.Variant(
+            "(ssssa{ss})", (fingerprint, schedule, command, comment, env or {})
+        )
+        return self._call("AddJob", "(b)", parameters)[0]
+
+    def update_job(
+        self,
+        job_id: int,
+        schedule: str,
+        command: str,
+        comment: str = "",
+        env: Optional[Dict[str, str]] = None,
+        fingerprint: str = "",
+    ) -> bool:
+        """Replace a job's schedule, command, comment and environment."""
+        parameters = GLib.Variant(
+            "(sisssa{ss})",
+            (fingerprint, job_id, schedule, command, comment, env or {}),
+        )
+        return self._call("UpdateJob", "(b)", parameters)[0]
+
+    def delete_jobs(self, job_ids: List[int], fingerprint: str = "") -> bool:
+        """Delete jobs with one write; True if successful."""
+        parameters = GLib.Variant("(sai)", (fingerprint, job_ids))
+        return self._call("DeleteJobs", "(b)", parameters)[0]
+
+    def toggle_jobs(
+        self, job_ids: List[int], enabled: bool, fingerprint: str = ""
+    ) -> bool:
+        """Enable or disable jobs with one write; True if successful."""
+        parameters = GLib.Variant("(saib)", (fingerprint, job_ids, enabled))
+        return self._call("ToggleJobs", "(b)", parameters)[0]
+
+    def undo(self) -> Optional[str]:
+        """Revert the service's last edit; returns its label, or None."""
+        return self._call("Undo", "(s)")[0] or None
+
+    def redo(self) -> Optional[str]:
+        """Reapply the last undone edit; returns its label, or None."""
+        return self._call("Redo", "(s)")[0] or None
+
+    def reload(self) -> bool:
+        """Make the service read the crontab now; True if it changed."""
+        return self._call("Reload", "(b)")[0]
+
+    def next_runs(self, job_id: int, count: int = 5) -> List[int]:
+        """Get a job's next runs as UTC timestamps."""
+        parameters = GLib.Variant("(iu)", (job_id, count))
+        return self._call("NextRuns", "(ax)", parameters)[0]
+
+    def forecast(self, start: int, end: int, limit: int = 0) -> List[Tuple[int, int]]:
+        """
+        Get the runs of all enabled jobs in a time range.
+
+        Args:
+            start: UTC timestamp runs must come after
+            end: UTC timestamp runs must come before
+            limit: Most runs returned; 0 for the service's maximum
+
+        Returns:
+            (UTC timestamp, job id) per run, in time order
+        """
+        parameters = GLib.Variant("(xxu)", (start, end, limit))
+        return self._call("Forecast", "(a(xi))", parameters)[0]
+
+    def connect_changed(self, callback: Callable[[str], None]) -> int:
+        """
+        Call back with the new fingerprint whenever the jobs change.
+
+        Returns:
+            Subscription id for disconnect
+        """
+
+        def on_signal(connection, sender, path, interface, signal, parameters):
+            callback(parameters.unpack()[0])
+
+        return self.connection.signal_subscribe(
+            BUS_NAME,
+            INTERFACE,
+            "JobsChanged",
+            OBJECT_PATH,
+            None,
+            Gio.DBusSignalFlags.NONE,
+            on_signal,
+        )
+
+    def disconnect(self, subscription: int):
+        """Stop a connect_changed callback."""
+        self.connection.signal_unsubscribe(subscription)
+
+
+def is_stale(error: GLib.Error) -> bool:
+    """Tell whether a failed edit was refused for an old fingerprint."""
+    return Gio.DBusError.get_remote_error(error) == STALE_ERROR
+
+
+def _format_time(timestamp: int) -> str:
+    """Format a UTC timestamp in local time."""
+    return datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Query the running service.
+
+    Returns:
+        0 if successful, 2 if the service could not be reached or failed
+    """
+    parser = argparse.ArgumentParser(description="Query the cron_gui service")
+    commands = parser.add_subparsers(dest="action", required=True)
+    commands.add_parser("list", help="List the jobs")
+    next_parser = commands.add_parser("next", help="Show a job's next runs")
+    next_parser.add_argument("id", type=int, help="Job id, as listed")
+    next_parser.add_argument("-n", type=int, default=5, help="Number of runs")
+    forecast_parser = commands.add_parser("forecast", help="Show upcoming runs")
+    forecast_parser.add_argument(
+        "--hours", type=float, default=24, help="How far ahead (default: 24)"
+    )
+    commands.add_parser("watch", help="Print the fingerprint whenever jobs change")
+    args = parser.parse_args(argv)
+
+    try:
+        client = ServiceClient()
+        if args.action == "list":
+            _, jobs = client.list_jobs()
+            for job in jobs:
+                state = "" if job.enabled else "  (disabled)"
+                print(f"{job.id:>5}  {job.schedule:<20} {job.command}{state}")
+        elif args.action == "next":
+            for timestamp in client.next_runs(args.id, args.n):
+                print(_format_time(timestamp))
+        elif args.action == "forecast":
+            now = int(time.time())
+            labels = {job.id: job.command for job in client.list_jobs()[1]}
+            runs = client.forecast(now, now + int(args.hours * 3600))
+            for timestamp, job_id in runs:
+                print(f"{_format_time(timestamp)}  {labels.get(job_id, job_id)}")
+        else:
+            loop = GLib.MainLoop()
+            client.connect_changed(print)
+            try:
+                loop.run()
+            except KeyboardInterrupt:
+                pass
+    except GLib.Error as e:
+        print(f"Error: {e.message}", file=sys.stderr)
+        return 2
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,520 @@
+"""
+D-Bus Service - One warm CronManager shared with other processes.
+
+The service owns com.github.cron_gui.Service on the session bus and keeps a
+CronManager loaded, so tools such as cron-gui-ctl or a panel applet can ask
+for the jobs, their next runs or a forecast of all runs in milliseconds
+instead of each running ``crontab -l`` and parsing it again.
+
+Everything derived from the jobs is cached per crontab fingerprint: the
+ListJobs reply is built once and sent as is until the crontab changes, and
+schedules are compiled and grouped once for forecasts. A tabfile is watched
+with a Gio file monitor and a user crontab is polled; edits made through the
+service or elsewhere are announced with the JobsChanged signal.
+
+Run it with ``cron-gui-service``; to try it on a private bus:
+
+    dbus-run-session -- sh -c 'cron-gui-service --tabfile=jobs.cron &
+        sleep 1; cron-gui-ctl list'
+"""
+
+import argparse
+import heapq
+import signal
+import sys
+from datetime import datetime, timezone
+from itertools import islice
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from gi.repository import GLib, Gio
+
+from cron_gui.cron_backend import TabfileBackend
+from cron_gui.cron_manager import CronManager
+from cron_gui.cron_schedule import (
+    CronSchedule,
+    ZoneTransitions,
+    compile_schedule,
+    get_zone,
+    iter_run_timestamps,
+)
+from cron_gui.edit_journal import EditJournal
+from cron_gui.profiling import profiler
+
+BUS_NAME = "com.github.cron_gui.Service"
+OBJECT_PATH = "/com/github/cron_gui/Service"
+INTERFACE = "com.github.cron_gui.Service"
+
+# (id, schedule, command, comment, enabled, valid, environment)
+JOB_SIGNATURE = "(isssbba{ss})"
+
+INTROSPECTION = f"""
+<node>
+  <interface name="{INTERFACE}">
+    <method name="ListJobs">
+      <arg direction="out" name="fingerprint" type="s"/>
+      <arg direction="out" name="jobs" type="a{JOB_SIGNATURE}"/>
+    </method>
+    <method name="GetJob">
+      <arg direction="in" name="id" type="i"/>
+      <arg direction="out" name="job" type="{JOB_SIGNATURE}"/>
+    </method>
+    <method name="AddJob">
+      <arg direction="in" name="fingerprint" type="s"/>
+      <arg direction="in" name="schedule" type="s"/>
+      <arg direction="in" name="command" type="s"/>
+      <arg direction="in" name="comment" type="s"/>
+      <arg direction="in" name="env" type="a{{ss}}"/>
+      <arg direction="out" name="success" type="b"/>
+    </method>
+    <method name="UpdateJob">
+      <arg direction="in" name="fingerprint" type="s"/>
+      <arg direction="in" name="id" type="i"/>
+      <arg direction="in" name="schedule" type="s"/>
+      <arg direction="in" name="command" type="s"/>
+      <arg direction="in" name="comment" type="s"/>
+      <arg direction="in" name="env" type="a{{ss}}"/>
+      <arg direction="out" name="success" type="b"/>
+    </method>
+    <method name="DeleteJobs">
+      <arg direction="in" name="fingerprint" type="s"/>
+      <arg direction="in" name="ids" type="ai"/>
+      <arg direction="out" name="success" type="b"/>
+    </method>
+    <method name="ToggleJobs">
+      <arg direction="in" name="fingerprint" type="s"/>
+      <arg direction="in" name="ids" type="ai"/>
+      <arg direction="in" name="enabled" type="b"/>
+      <arg direction="out" name="success" type="b"/>
+    </method>
+    <method name="Undo">
+      <arg direction="out" name="label" type="s"/>
+    </method>
+    <method name="Redo">
+      <arg direction="out" name="label" type="s"/>
+    </method>
+    <method name="Reload">
+      <arg direction="out" name="changed" type="b"/>
+    </method>
+    <method name="NextRuns">
+      <arg direction="in" name="id" type="i"/>
+      <arg direction="in" name="count" type="u"/>
+      <arg direction="out" name="timestamps" type="ax"/>
+    </method>
+    <method name="Forecast">
+      <arg direction="in" name="start" type="x"/>
+      <arg direction="in" name="end" type="x"/>
+      <arg direction="in" name="limit" type="u"/>
+      <arg direction="out" name="runs" type="a(xi)"/>
+    </method>
+    <signal name="JobsChanged">
+      <arg name="fingerprint" type="s"/>
+    </signal>
+  </interface>
+</node>
+"""
+
+# Most runs returned by NextRuns and Forecast
+MAX_RUNS = 100000
+
+# How often a user crontab, which cannot be watched, is read again
+POLL_SECONDS = 10
+
+# How long to wait for more changes to a watched tabfile, in milliseconds
+SETTLE_DELAY_MS = 200
+
+_INVALID_ARGS = "org.freedesktop.DBus.Error.InvalidArgs"
+_FAILED = "org.freedesktop.DBus.Error.Failed"
+
+# Error of an edit whose fingerprint no longer matches the crontab
+STALE_ERROR = f"{INTERFACE}.Error.Stale"
+
+# Enabled jobs sharing a schedule and time zone, forecast together
+_Group = Tuple[CronSchedule, ZoneTransitions, List[int]]
+
+
+class _InvalidArgs(ValueError):
+    """Raised by method handlers for arguments that name nothing."""
+
+
+class _Stale(RuntimeError):
+    """Raised by edit handlers when the client's view of the crontab is old."""
+
+
+class CronService:
+    """Serves a CronManager's jobs on a D-Bus connection."""
+
+    def __init__(self, manager: CronManager):
+        """
+        Initialize the service.
+
+        Args:
+            manager: Manager whose crontab is served
+        """
+        self.manager = manager
+        self.connection: Optional[Gio.DBusConnection] = None
+        self._registration = 0
+        self._monitor: Optional[Gio.FileMonitor] = None
+        self._timer = 0
+        # Caches of the current fingerprint, see _snapshot and _groups
+        self._fingerprint: Optional[str] = None
+        self._jobs: List[Dict] = []
+        self._reply: Optional[GLib.Variant] = None
+        self._forecast_groups: Optional[List[_Group]] = None
+        self._handlers = {
+            "ListJobs": self._list_jobs,
+            "GetJob": self._get_job,
+            "AddJob": self._add_job,
+            "UpdateJob": self._update_job,
+            "DeleteJobs": self._delete_jobs,
+            "ToggleJobs": self._toggle_jobs,
+            "Undo": self._undo,
+            "Redo": self._redo,
+            "Reload": self._reload,
+            "NextRuns": self._next_runs,
+            "Forecast": self._forecast,
+        }
+
+    def register(self, connection: Gio.DBusConnection):
+        """Export the service object on a connection and start watching."""
+        info = Gio.DBusNodeInfo.new_for_xml(INTROSPECTION).interfaces[0]
+        self.connection = connection
+        self._registration = connection.register_object(
+            OBJECT_PATH, info, self._on_method_call, None, None
+        )
+        self._watch()
+
+    def close(self):
+        """Stop watching and unexport the object."""
+        if self._monitor is not None:
+            self._monitor.cancel()
+            self._monitor = None
+        if self._timer:
+            GLib.source_remove(self._timer)
+            self._timer = 0
+        if self.connection is not None and self._registration:
+            self.connection.unregister_object(self._registration)
+            self._registration = 0
+
+    def _watch(self):
+        """Watch a tabfile for changes, or poll a crontab that has no file."""
+        backend = self.manager.backend
+        if isinstance(backend, TabfileBackend):
+            try:
+                self._monitor = Gio.File.new_for_path(backend.path).monitor_file(
+                    Gio.FileMonitorFlags.WATCH_MOVES, None
+                )
+                self._monitor.connect("changed", self._on_file_changed)
+                return
+            except GLib.Error as e:
+                print(f"Error watching {backend.path}: {e}")
+        self._timer = GLib.timeout_add_seconds(POLL_SECONDS, self._on_poll)
+
+    def _on_file_changed(self, monitor, file, other_file, event):
+        """Reload once a burst of changes settles."""
+        if not self._timer:
+            self._timer = GLib.timeout_add(SETTLE_DELAY_MS, self._on_settled)
+
+    def _on_settled(self) -> bool:
+        """Reload after the tabfile changed."""
+        self._timer = 0
+        self._refresh()
+        return GLib.SOURCE_REMOVE
+
+    def _on_poll(self) -> bool:
+        """Reload the polled crontab."""
+        self._refresh()
+        return GLib.SOURCE_CONTINUE
+
+    def _refresh(self) -> bool:
+        """Read the crontab again and announce it if it changed."""
+        try:
+            changed = self.manager.reload()
+        except Exception as e:
+            print(f"Error reloading crontab: {e}")
+            return False
+        if changed:
+            self._emit_changed()
+        return changed
+
+    def _emit_changed(self):
+        """Tell clients the jobs changed."""
+        if self.connection is not None:
+            self.connection.emit_signal(
+                None,
+                OBJECT_PATH,
+                INTERFACE,
+                "JobsChanged",
+                GLib.Variant("(s)", (self.manager.fingerprint,)),
+            )
+
+    def _snapshot(self) -> List[Dict]:
+        """Get the jobs, listed once per crontab fingerprint."""
+        if self._fingerprint != self.manager.fingerprint:
+            self._jobs = self.manager.list_jobs()
+            self._reply = None
+            self._forecast_groups = None
+            self._fingerprint = self.manager.fingerprint
+        return self._jobs
+
+    def _groups(self) -> List[_Group]:
+        """Get the enabled jobs grouped by compiled schedule and time zone."""
+        jobs = self._snapshot()
+        if self._forecast_groups is None:
+            ids: Dict[Tuple[str, Optional[str]], List[int]] = {}
+            for job in jobs:
+                if job["enabled"] and job["valid"]:
+                    tz = (job.get("env") or {}).get("CRON_TZ") or None
+                    ids.setdefault((job["schedule"], tz), []).append(job["id"])
+            groups = []
+            for (schedule, tz), job_ids in ids.items():
+                try:
+                    groups.append((compile_schedule(schedule), get_zone(tz), job_ids))
+                except ValueError:
+                    continue  # Unknown CRON_TZ; cron would not run it either
+            self._forecast_groups = groups
+        return self._forecast_groups
+
+    def _on_method_call(
+        self,
+        connection,
+        sender,
+        object_path,
+        interface_name,
+        method_name,
+        parameters,
+        invocation,
+    ):
+        """Dispatch a method call and return its reply or error."""
+        handler = self._handlers.get(method_name)
+        if handler is None:
+            invocation.return_dbus_error(
+                "org.freedesktop.DBus.Error.UnknownMethod", method_name
+            )
+            return
+        try:
+            with profiler.span(f"service.{method_name}", "service"):
+                reply = handler(*parameters.unpack())
+        except _InvalidArgs as e:
+            invocation.return_dbus_error(_INVALID_ARGS, str(e))
+            return
+        except _Stale as e:
+            invocation.return_dbus_error(STALE_ERROR, str(e))
+            return
+        except Exception as e:
+            print(f"Error handling {method_name}: {e}")
+            invocation.return_dbus_error(_FAILED, str(e))
+            return
+        invocation.return_value(reply)
+
+    def _list_jobs(self) -> GLib.Variant:
+        """ListJobs: the fingerprint and every job; built once per change."""
+        jobs = self._snapshot()
+        if self._reply is None:
+            self._reply = GLib.Variant(
+                f"(sa{JOB_SIGNATURE})",
+                (self._fingerprint, [_job_tuple(job) for job in jobs]),
+            )
+        return self._reply
+
+    def _get_job(self, job_id: int) -> GLib.Variant:
+        """GetJob: one job by id."""
+        return GLib.Variant(f"({JOB_SIGNATURE})", (_job_tuple(self._job(job_id)),))
+
+    def _add_job(
+        self,
+        fingerprint: str,
+        schedule: str,
+        command: str,
+        comment: str,
+        env: Dict[str, str],
+    ) -> GLib.Variant:
+        """AddJob: append a job."""
+        self._check_fingerprint(fingerprint)
+        return self._mutated(self.manager.add_job(command, schedule, comment, env))
+
+    def _update_job(
+        self,
+        fingerprint: str,
+        job_id: int,
+        schedule: str,
+        command: str,
+        comment: str,
+        env: Dict[str, str],
+    ) -> GLib.Variant:
+        """UpdateJob: replace a job's schedule, command, comment and env."""
+        self._check_fingerprint(fingerprint)
+        return self._mutated(
+            self.manager.update_job(job_id, command, schedule, comment, env)
+        )
+
+    def _delete_jobs(self, fingerprint: str, job_ids: List[int]) -> GLib.Variant:
+        """DeleteJobs: delete jobs with one write."""
+        self._check_fingerprint(fingerprint)
+        return self._mutated(self.manager.delete_jobs(job_ids))
+
+    def _toggle_jobs(
+        self, fingerprint: str, job_ids: List[int], enabled: bool
+    ) -> GLib.Variant:
+        """ToggleJobs: enable or disable jobs with one write."""
+        self._check_fingerprint(fingerprint)
+        return self._mutated(self.manager.toggle_jobs(job_ids, enabled))
+
+    def _undo(self) -> GLib.Variant:
+        """Undo: revert the service's last edit; "" if there is none."""
+        label = self.manager.undo()
+        self._mutated(label is not None)
+        return GLib.Variant("(s)", (label or "",))
+
+    def _redo(self) -> GLib.Variant:
+        """Redo: reapply the last undone edit; "" if there is none."""
+        label = self.manager.redo()
+        self._mutated(label is not None)
+        return GLib.Variant("(s)", (label or "",))
+
+    def _reload(self) -> GLib.Variant:
+        """Reload: read the crontab now instead of waiting for the watch."""
+        return GLib.Variant("(b)", (self._refresh(),))
+
+    def _next_runs(self, job_id: int, count: int) -> GLib.Variant:
+        """NextRuns: a job's next runs as UTC timestamps; none if it never runs."""
+        job = self._job(job_id)
+        try:
+            schedule = compile_schedule(job["schedule"])
+            zone = get_zone((job.get("env") or {}).get("CRON_TZ") or None)
+        except ValueError:
+            return GLib.Variant("(ax)", ([],))
+        runs = iter_run_timestamps(schedule, None, zone)
+        return GLib.Variant("(ax)", (list(islice(runs, min(count, MAX_RUNS))),))
+
+    def _forecast(self, start: int, end: int, limit: int) -> GLib.Variant:
+        """Forecast: runs of all enabled jobs between two UTC timestamps."""
+        if end <= start:
+            raise _InvalidArgs("The forecast must end after it starts")
+        limit = min(limit, MAX_RUNS) if limit else MAX_RUNS
+        return GLib.Variant("(a(xi))", (forecast(self._groups(), start, end, limit),))
+
+    def _job(self, job_id: int) -> Dict:
+        """Get a job by id, or fail the call."""
+        job = self.manager.get_job(job_id)
+        if job is None:
+            raise _InvalidArgs(f"No job {job_id}")
+        return job
+
+    def _check_fingerprint(self, fingerprint: str):
+        """
+        Refuse an edit made against another state of the crontab.
+
+        Job ids are positions, so an edit based on an old listing could hit
+        the wrong job. The crontab is read first, so changes the file
+        monitor has not reported yet are caught too.
+
+        Args:
+            fingerprint: Fingerprint the client listed the jobs at; ""
+                skips the check
+        """
+        if not fingerprint:
+            return
+        self._refresh()
+        if fingerprint != self.manager.fingerprint:
+            raise _Stale("The crontab changed; list the jobs again")
+
+    def _mutated(self, success: bool) -> GLib.Variant:
+        """Announce a successful edit and build the reply."""
+        if success:
+            self._emit_changed()
+        return GLib.Variant("(b)", (success,))
+
+
+def _job_tuple(job: Dict) -> Tuple:
+    """Turn a job dictionary into a JOB_SIGNATURE value."""
+    return (
+        job["id"],
+        job["schedule"],
+        job["command"],
+        job["comment"],
+        job["enabled"],
+        job["valid"],
+        dict(job.get("env") or {}),
+    )
+
+
+def forecast(
+    groups: List[_Group], start: int, end: int, limit: int
+) -> List[Tuple[int, int]]:
+    """
+    Merge the runs of many jobs in time order.
+
+    Args:
+        groups: Compiled schedule, zone and job ids per group of jobs
+        start: Only runs after this UTC timestamp are included
+        end: Only runs before this UTC timestamp are included
+        limit: Most runs returned
+
+    Returns:
+        (UTC timestamp, job id) per run, in time order
+    """
+    after = datetime.fromtimestamp(start, timezone.utc)
+
+    def runs(schedule: CronSchedule, zone, job_ids: List[int]) -> Iterator:
+        for instant in iter_run_timestamps(schedule, after, zone):
+            if instant >= end:
+                return
+            for job_id in job_ids:
+                yield instant, job_id
+
+    return list(islice(heapq.merge(*(runs(*group) for group in groups)), limit))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Run the service until it is stopped or replaced.
+
+    Returns:
+        0 when stopped, 1 if the bus name could not be owned or was lost,
+        2 if the crontab could not be loaded
+    """
+    parser = argparse.ArgumentParser(description="Serve cron jobs on the session bus")
+    parser.add_argument("--tabfile", help="Crontab-format file to serve instead")
+    parser.add_argument(
+        "--replace", action="store_true", help="Take over from a running service"
+    )
+    args = parser.parse_args(argv)
+
+    try:
+        # Undo history is the service's own; the window keeps its own too
+        manager = CronManager(tabfile=args.tabfile, journal=EditJournal())
+    except RuntimeError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+
+    service = CronService(manager)
+    loop = GLib.MainLoop()
+    status = {"code": 0}
+
+    def on_name_lost(connection, name):
+        print(f"Error: lost or could not own {name}", file=sys.stderr)
+        status["code"] = 1
+        loop.quit()
+
+    flags = Gio.BusNameOwnerFlags.ALLOW_REPLACEMENT
+    if args.replace:
+        flags |= Gio.BusNameOwnerFlags.REPLACE
+    owner = Gio.bus_own_name(
+        Gio.BusType.SESSION,
+        BUS_NAME,
+        flags,
+        lambda connection, name: service.register(connection),
+        None,
+        on_name_lost,
+    )
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        GLib.unix_signal_add(GLib.PRIORITY_DEFAULT, signum, loop.quit)
+
+    loop.run()
+    service.close()
+    Gio.bus_unown_name(owner)
+    return status["code"]
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,231 @@
+"""
+Duplicates Window - Find copies of the same job and merge them.
+"""
+
+import gi
+
+gi.require_version("Gtk", "4.0")
+gi.require_version("Adw", "1")
+from gi.repository import Gtk, Adw, Pango
+from typing import Callable, Dict, List, Optional
+
+from cron_gui.cron_parser import cron_to_human_readable
+from cron_gui.job_duplicates import (
+    IDENTICAL,
+    SAME_COMMAND,
+    SIMILARITY,
+    DuplicateGroup,
+    find_duplicates,
+)
+from cron_gui.profiling import profiler
+
+# Most groups listed; the rest are summarized
+MAX_GROUPS = 1000
+
+
+class DuplicatesWindow(Adw.Window):
+    """Lists groups of duplicate jobs and merges the selected group."""
+
+    def __init__(
+        self,
+        parent,
+        manager,
+        on_merge: Callable[[int, List[int], Optional[str]], None],
+    ):
+        """
+        Initialize the window.
+
+        Args:
+            parent: Main window
+            manager: CronManager or FleetManager whose jobs are searched
+            on_merge: Called with the id of the job to keep, the ids of the
+                jobs to delete and the kept job's new schedule (None to keep
+                its schedule)
+        """
+        super().__init__(transient_for=parent, modal=False)
+        self.set_title("Duplicate Jobs")
+        self.set_default_size(900, 600)
+
+        self.manager = manager
+        self.on_merge = on_merge
+        self.jobs: Dict[int, Dict] = {}
+        self.group: Optional[DuplicateGroup] = None
+        self.choices: List[Gtk.CheckButton] = []
+
+        toolbar = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
+        header = Adw.HeaderBar()
+
+        self.merge_button = Gtk.Button(label="Merge")
+        self.merge_button.add_css_class("suggested-action")
+        self.merge_button.set_tooltip_text(
+            "Keep the selected job and delete the others in the group"
+        )
+        self.merge_button.set_sensitive(False)
+        self.merge_button.connect("clicked", self._on_merge_clicked)
+        header.pack_end(self.merge_button)
+
+        # Whether near-identical commands are searched for too
+        self.scope_dropdown = Gtk.DropDown.new_from_strings(
+            ["Copies and similar commands", "Copies only"]
+        )
+        self.scope_dropdown.connect("notify::selected", self._on_scope_changed)
+        header.pack_start(self.scope_dropdown)
+        toolbar.append(header)
+
+        # Groups, in crontab order
+        self.group_list = Gtk.ListBox()
+        self.group_list.add_css_class("navigation-sidebar")
+        self.group_list.connect("row-selected", self._on_group_selected)
+        groups_scrolled = Gtk.ScrolledWindow()
+        groups_scrolled.set_policy(Gtk.PolicyType.NEVER, Gtk.PolicyType.AUTOMATIC)
+        groups_scrolled.set_child(self.group_list)
+        groups_scrolled.set_size_request(320, -1)
+
+        # Suggestion and jobs of the selected group
+        self.suggestion_label = Gtk.Label()
+        self.suggestion_label.set_xalign(0)
+        self.suggestion_label.set_wrap(True)
+        self.job_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=6)
+        detail_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=12)
+        detail_box.set_margin_top(12)
+        detail_box.set_margin_bottom(12)
+        detail_box.set_margin_start(12)
+        detail_box.set_margin_end(12)
+        detail_box.append(self.suggestion_label)
+        detail_box.append(self.job_box)
+        detail_scrolled = Gtk.ScrolledWindow()
+        detail_scrolled.set_hexpand(True)
+        detail_scrolled.set_child(detail_box)
+
+        paned = Gtk.Paned(orientation=Gtk.Orientation.HORIZONTAL)
+        paned.set_start_child(groups_scrolled)
+        paned.set_end_child(detail_scrolled)
+        paned.set_resize_start_child(False)
+        paned.set_vexpand(True)
+        toolbar.append(paned)
+
+        self.set_content(toolbar)
+        self.reload()
+
+    def reload(self):
+        """Search the jobs again, e.g. after a merge."""
+        row = self.group_list.get_row_at_index(0)
+        while row is not None:
+            self.group_list.remove(row)
+            row = self.group_list.get_row_at_index(0)
+
+        jobs = self.manager.list_jobs()
+        self.jobs = {job["id"]: job for job in jobs}
+        threshold = SIMILARITY if self.scope_dropdown.get_selected() == 0 else 1.0
+        groups = find_duplicates(jobs, threshold)
+
+        with profiler.span("duplicates.render", "ui"):
+            for group in groups[:MAX_GROUPS]:
+                self.group_list.append(self._create_row(group))
+        if len(groups) > MAX_GROUPS:
+            more = Gtk.Label(label=f"… and {len(groups) - MAX_GROUPS} more groups")
+            more.add_css_class("dim-label")
+            row = Gtk.ListBoxRow(selectable=False, activatable=False)
+            row.set_child(more)
+            self.group_list.append(row)
+
+        if groups:
+            self.group_list.select_row(self.group_list.get_row_at_index(0))
+        else:
+            self._show_group(None, "No duplicate jobs found.")
+
+    def _create_row(self, group: DuplicateGroup) -> Gtk.ListBoxRow:
+        """Create the list row of a group."""
+        count = len(group.job_ids)
+        if group.kind == IDENTICAL:
+            summary = f"{count} identical jobs"
+        elif group.kind == SAME_COMMAND:
+            summary = f"{count} jobs running the same command"
+        else:
+            summary = f"{count} similar commands ({group.similarity:.0%} alike)"
+        title = Gtk.Label(label=summary)
+        title.set_xalign(0)
+        subtitle = Gtk.Label(label=self.jobs[group.job_ids[0]]["command"])
+        subtitle.set_xalign(0)
+        subtitle.set_ellipsize(Pango.EllipsizeMode.MIDDLE)
+        subtitle.add_css_class("dim-label")
+        subtitle.add_css_class("caption")
+
+        box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=2)
+        box.set_margin_top(6)
+        box.set_margin_bottom(6)
+        box.append(title)
+        box.append(subtitle)
+
+        row = Gtk.ListBoxRow()
+        row.set_child(box)
+        row.group = group
+        return row
+
+    def _on_scope_changed(self, dropdown, param):
+        """Search with the other scope."""
+        self.reload()
+
+    def _on_group_selected(self, listbox, row):
+        """Show the selected group and what merging it would do."""
+        if row is not None:
+            self._show_group(row.group, self._suggestion(row.group))
+
+    def _suggestion(self, group: DuplicateGroup) -> str:
+        """Describe what merging a group does."""
+        if group.kind == IDENTICAL:
+            return (
+                "These jobs run the same command at the same times. Keep one "
+                "and delete the copies; nothing changes about when it runs."
+            )
+        if group.kind == SAME_COMMAND and group.schedule is not None:
+            description = cron_to_human_readable(group.schedule)
+            return (
+                f"These jobs run the same command. Merged, the kept job runs "
+                f"at {group.schedule} ({description}), covering every run of "
+                "the others."
+            )
+        if group.kind == SAME_COMMAND:
+            return (
+                "These jobs run the same command, but their schedules cannot "
+                "be combined into one. Merge only if the kept job's runs are "
+                "enough."
+            )
+        return (
+            "These commands are almost the same. Merge only if the kept job "
+            "does the work of the others."
+        )
+
+    def _show_group(self, group: Optional[DuplicateGroup], text: str):
+        """Show a group's jobs to choose the one to keep, or just a message."""
+        self.group = group
+        self.suggestion_label.set_text(text)
+        child = self.job_box.get_first_child()
+        while child is not None:
+            self.job_box.remove(child)
+            child = self.job_box.get_first_child()
+        self.choices = []
+        self.merge_button.set_sensitive(group is not None)
+        if group is None:
+            return
+
+        for job_id in group.job_ids:
+            job = self.jobs[job_id]
+            choice = Gtk.CheckButton(label=f"{job['schedule']}  {job['command']}")
+            if job.get("comment"):
+                choice.set_tooltip_text(job["comment"])
+            if self.choices:
+                choice.set_group(self.choices[0])
+            else:
+                choice.set_active(True)
+            choice.job_id = job_id
+            self.choices.append(choice)
+            self.job_box.append(choice)
+
+    def _on_merge_clicked(self, button):
+        """Keep the chosen job of the group and delete the others."""
+        keep = next(choice.job_id for choice in self.choices if choice.get_active())
+        delete = [job_id for job_id in self.group.job_ids if job_id != keep]
+        schedule = self.group.schedule if self.group.kind == SAME_COMMAND else None
+        self.on_merge(keep, delete, schedule)
+        self.reload()
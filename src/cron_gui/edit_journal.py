@@ -0,0 +1,384 @@
+"""
+Edit Journal - Undo/redo history of crontab edits.
+
+Every edit is stored as hunks holding the line texts it replaced and the
+ones it put in their place, so one entry both undoes and redoes the edit
+and costs memory in proportion to the change rather than to the crontab.
+Each entry is anchored by content hashes of the crontab before and after
+it; when the crontab changes behind the journal's back the history no
+longer applies and is dropped.
+
+A journal can be persisted as an append-only JSON lines file, which is
+compacted once it holds mostly dead records, so history survives restarts.
+"""
+
+import difflib
+import hashlib
+import json
+import os
+import tempfile
+from typing import List, Optional, Sequence, Tuple
+
+from cron_gui.crontab_document import common_prefix_length
+
+# (position before, position after, texts before, texts after)
+Hunk = Tuple[int, int, List[str], List[str]]
+
+# Bounds on the history kept in memory and on disk
+MAX_ENTRIES = 500
+MAX_BYTES = 8 * 1024 * 1024
+
+
+def content_hash(text: str) -> str:
+    """Get the fingerprint of a crontab's text."""
+    # Backends decode with surrogateescape, so hash the original bytes back
+    data = text.encode("utf-8", errors="surrogateescape")
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def open_private(path: str, binary: bool = False):
+    """
+    Open a file for appending that only the user can read.
+
+    Journals and histories copy the whole crontab, environment lines and
+    their secrets included, so they get the crontab spool's 0600.
+
+    Args:
+        path: File to open; created if missing
+        binary: Open in bytes mode instead of UTF-8 text
+
+    Returns:
+        The open file object
+    """
+    fd = os.open(path, os.O_CREAT | os.O_APPEND | os.O_WRONLY, 0o600)
+    if binary:
+        return os.fdopen(fd, "ab")
+    return os.fdopen(fd, "a", encoding="utf-8")
+
+
+def default_journal_path(source: str) -> str:
+    """
+    Get where the journal of a crontab is kept.
+
+    Args:
+        source: Description of the crontab, e.g. the backend's describe()
+
+    Returns:
+        Path under $XDG_STATE_HOME/cron_gui/journal
+    """
+    state_home = os.environ.get("XDG_STATE_HOME") or os.path.expanduser(
+        "~/.local/state"
+    )
+    data = source.encode("utf-8", errors="surrogateescape")
+    name = hashlib.blake2b(data, digest_size=8).hexdigest()
+    return os.path.join(state_home, "cron_gui", "journal", f"{name}.jsonl")
+
+
+def diff_lines(
+    before_lines: Sequence, before_texts: Sequence[str], after_lines: Sequence
+) -> List[Hunk]:
+    """
+    Compute the hunks between two states of a document's lines.
+
+    The unchanged head and tail are skipped with slice comparisons; in
+    between, lines are matched by identity, which CrontabDocument keeps for
+    every line it does not insert or remove, so this is a single linear pass
+    over the edited region only.
+
+    Args:
+        before_lines: Line objects before the edit
+        before_texts: Their texts before the edit
+        after_lines: Line objects after the edit
+
+    Returns:
+        Hunks in document order
+    """
+    after_texts = [line.text for line in after_lines]
+    head = common_prefix_length(before_texts, after_texts)
+    tail = common_prefix_length(before_texts[head:][::-1], after_texts[head:][::-1])
+    count_before = len(before_lines) - tail
+    count_after = len(after_lines) - tail
+
+    before_ids = {id(line) for line in before_lines[head:count_before]}
+    after_ids = {id(line) for line in after_lines[head:count_after]}
+
+    hunks: List[Hunk] = []
+    i = j = head
+    while i < count_before or j < count_after:
+        if (
+            i < count_before
+            and j < count_after
+            and before_lines[i] is after_lines[j]
+            and before_texts[i] == after_texts[j]
+        ):
+            i += 1
+            j += 1
+            continue
+
+        start_i, start_j = i, j
+        while True:
+            if i < count_before and id(before_lines[i]) not in after_ids:
+                i += 1
+            elif j < count_after and id(after_lines[j]) not in before_ids:
+                j += 1
+            elif (
+                i < count_before
+                and j < count_after
+                and before_lines[i] is after_lines[j]
+                and before_texts[i] != after_texts[j]
+            ):
+                i += 1
+                j += 1
+            else:
+                break
+        if i == start_i and j == start_j:
+            # Lines were reordered; describe the rest as a single hunk
+            i, j = count_before, count_after
+        hunks.append(
+            (start_i, start_j, list(before_texts[start_i:i]), after_texts[start_j:j])
+        )
+    return hunks
+
+
+def diff_texts(before_texts: Sequence[str], after_texts: Sequence[str]) -> List[Hunk]:
+    """
+    Compute the hunks between two lists of line texts.
+
+    Used where line identity is not available, e.g. after merging in
+    changes made outside Cron GUI. Only the region between the unchanged
+    head and tail is compared.
+
+    Args:
+        before_texts: Line texts before the edit
+        after_texts: Line texts after the edit
+
+    Returns:
+        Hunks in document order
+    """
+    head = common_prefix_length(before_texts, after_texts)
+    tail = common_prefix_length(before_texts[head:][::-1], after_texts[head:][::-1])
+    before = before_texts[head : len(before_texts) - tail]
+    after = after_texts[head : len(after_texts) - tail]
+    matcher = difflib.SequenceMatcher(None, before, after, autojunk=False)
+    return [
+        (head + i1, head + j1, list(before[i1:i2]), list(after[j1:j2]))
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes()
+        if tag != "equal"
+    ]
+
+
+class JournalEntry:
+    """One recorded edit."""
+
+    __slots__ = ("label", "hunks", "before", "after", "size")
+
+    def __init__(self, label: str, hunks: List[Hunk], before: str, after: str):
+        """
+        Initialize the entry.
+
+        Args:
+            label: Short description, e.g. "Delete 3 jobs"
+            hunks: Line changes of the edit
+            before: Content hash of the crontab before the edit
+            after: Content hash of the crontab after the edit
+        """
+        self.label = label
+        self.hunks = hunks
+        self.before = before
+        self.after = after
+        self.size = sum(
+            sum(map(len, old)) + sum(map(len, new)) + 16 for _, _, old, new in hunks
+        )
+
+    def to_record(self) -> dict:
+        """Get the JSON record persisted for the entry."""
+        return {
+            "op": "edit",
+            "label": self.label,
+            "before": self.before,
+            "after": self.after,
+            "hunks": self.hunks,
+        }
+
+    @classmethod
+    def from_record(cls, record: dict) -> "JournalEntry":
+        """Rebuild an entry from its JSON record."""
+        hunks = [
+            (int(before), int(after), list(old), list(new))
+            for before, after, old, new in record["hunks"]
+        ]
+        return cls(record["label"], hunks, record["before"], record["after"])
+
+
+class EditJournal:
+    """
+    Bounded undo/redo history.
+
+    entries[:position] can be undone, newest last; entries[position:] can be
+    redone, next first.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        max_entries: int = MAX_ENTRIES,
+        max_bytes: int = MAX_BYTES,
+    ):
+        """
+        Initialize the journal.
+
+        Args:
+            path: JSON lines file to persist to and load from; None keeps
+                the history in memory only
+            max_entries: Most edits kept; the oldest are dropped first
+            max_bytes: Most line text kept across all entries
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries: List[JournalEntry] = []
+        self.position = 0
+        self._bytes = 0
+        self._records = 0
+        if path:
+            self._load()
+
+    def can_undo(self) -> bool:
+        return self.position > 0
+
+    def can_redo(self) -> bool:
+        return self.position < len(self.entries)
+
+    def undo_entry(self) -> Optional[JournalEntry]:
+        """Get the edit the next undo reverts."""
+        return self.entries[self.position - 1] if self.can_undo() else None
+
+    def redo_entry(self) -> Optional[JournalEntry]:
+        """Get the edit the next redo reapplies."""
+        return self.entries[self.position] if self.can_redo() else None
+
+    def state(self) -> Optional[str]:
+        """Get the content hash the crontab must have for the history to apply."""
+        if self.position:
+            return self.entries[self.position - 1].after
+        if self.entries:
+            return self.entries[0].before
+        return None
+
+    def attach(self, current_hash: str):
+        """
+        Check the history against the crontab's current content.
+
+        Args:
+            current_hash: content_hash() of the crontab as just read
+        """
+        state = self.state()
+        if state is not None and state != current_hash:
+            # Changed outside this journal; the hunks no longer line up
+            self.clear()
+
+    def record(self, label: str, hunks: List[Hunk], before: str, after: str):
+        """
+        Record an edit; anything that could be redone is discarded.
+
+        Args:
+            label: Short description of the edit
+            hunks: Line changes, see diff_lines
+            before: Content hash before the edit
+            after: Content hash after the edit
+        """
+        entry = JournalEntry(label, hunks, before, after)
+        self._push(entry)
+        self._append(entry.to_record())
+
+    def _push(self, entry: JournalEntry):
+        """Add an entry in memory, dropping redo entries and old history."""
+        for dropped in self.entries[self.position :]:
+            self._bytes -= dropped.size
+        del self.entries[self.position :]
+        self.entries.append(entry)
+        self._bytes += entry.size
+        drop = 0
+        while len(self.entries) - drop > 1 and (
+            len(self.entries) - drop > self.max_entries or self._bytes > self.max_bytes
+        ):
+            self._bytes -= self.entries[drop].size
+            drop += 1
+        del self.entries[:drop]
+        self.position = len(self.entries)
+
+    def undone(self):
+        """Note that the entry from undo_entry() was reverted."""
+        self.position -= 1
+        self._append({"op": "undo"})
+
+    def redone(self):
+        """Note that the entry from redo_entry() was reapplied."""
+        self.position += 1
+        self._append({"op": "redo"})
+
+    def clear(self):
+        """Forget the whole history."""
+        self.entries = []
+        self.position = 0
+        self._bytes = 0
+        if self.path:
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                print(f"Error clearing edit journal: {e}")
+        self._records = 0
+
+    def _load(self):
+        """Replay the persisted records."""
+        try:
+            with open(self.path, "r", encoding="utf-8") as fh:
+                for line in fh:
+                    record = json.loads(line)
+                    op = record.get("op")
+                    if op == "edit":
+                        self._push(JournalEntry.from_record(record))
+                    elif op == "undo" and self.can_undo():
+                        self.position -= 1
+                    elif op == "redo" and self.can_redo():
+                        self.position += 1
+                    self._records += 1
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"Error loading edit journal: {e}")
+            self.clear()
+
+    def _append(self, record: dict):
+        """Persist a record, compacting the file when it is mostly dead."""
+        if not self.path:
+            return
+        try:
+            if self._records > 2 * len(self.entries) + 32:
+                self._compact()
+                return
+            os.makedirs(os.path.dirname(self.path), mode=0o700, exist_ok=True)
+            with open_private(self.path) as fh:
+                fh.write(json.dumps(record, separators=(",", ":")) + "\n")
+            self._records += 1
+        except OSError as e:
+            print(f"Error writing edit journal: {e}")
+
+    def _compact(self):
+        """Rewrite the file with only the live history, atomically."""
+        directory = os.path.dirname(self.path)
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        records = [entry.to_record() for entry in self.entries]
+        records += [{"op": "undo"}] * (len(self.entries) - self.position)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".journal-")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as fh:
+                for record in records:
+                    fh.write(json.dumps(record, separators=(",", ":")) + "\n")
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        self._records = len(records)
@@ -0,0 +1,386 @@
+"""
+Fleet Diff - Compare the crontabs of several hosts or files and sync them.
+
+Each job is reduced to a record of its command, normalized schedule,
+enabled state and comment, so "*/15" and "0,15,30,45", or "@daily" and
+"0 0 * * *", compare equal while "0 0 1-31 * 1" and "0 0 * * 1" (which cron
+runs on different days) do not.
+
+Records are hashed once, when a crontab is read, so comparing a host with
+the target is a set difference of plain integers rather than a line-by-line
+diff, and the majority vote is a count of the same integers. Only the jobs
+left over are looked at one by one: those running the same command on both
+sides differ, the rest are missing or extra.
+
+Syncing turns the differences of each host into one batched CronManager
+edit: jobs that differ are rewritten in place, missing jobs are inserted
+above the job that follows them in the target, and extra jobs are deleted.
+Comments, environment lines and matching jobs are left untouched.
+"""
+
+import argparse
+import sys
+from collections import Counter
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from cron_gui.cron_manager import CronManager
+from cron_gui.cron_schedule import normalize_schedule
+from cron_gui.crontab_document import CronLine, CrontabDocument
+from cron_gui.profiling import profiled
+
+# Hash of a job's command, normalized schedule, enabled state and comment,
+# and of how many identical jobs precede it
+Digest = int
+
+# Name of the target that takes every job from the majority of crontabs
+MAJORITY = "majority"
+
+class CrontabState:
+    """The jobs of one crontab, reduced to comparable digests."""
+
+    __slots__ = ("name", "jobs", "commands", "_ids")
+
+    def __init__(self, name: str, lines: Iterable[CronLine]):
+        """
+        Reduce job lines to digests.
+
+        Args:
+            name: Host or file the crontab belongs to
+            lines: Job lines in crontab order
+        """
+        self.name = name
+        # Every job by its digest, in crontab order
+        self.jobs: Dict[Digest, CronLine] = {}
+        # How many jobs run each command
+        self.commands: Dict[str, int] = {}
+        self._ids: Optional[Dict[Digest, int]] = None
+        jobs = self.jobs
+        commands = self.commands
+        seen: Dict[Tuple, int] = {}
+        for line in lines:
+            enabled, schedule, command, comment = line.fields
+            record = (command, normalize_schedule(schedule), enabled, comment)
+            # Identical jobs are told apart by how many came before
+            count = seen.get(record, 0)
+            seen[record] = count + 1
+            jobs[hash((record, count))] = line
+            commands[command] = commands.get(command, 0) + 1
+
+    @classmethod
+    def from_manager(cls, manager: CronManager) -> "CrontabState":
+        """Get the state of a manager's crontab, named after its host."""
+        return cls(manager.host, manager.document.jobs())
+
+    @classmethod
+    def from_file(cls, path: str) -> "CrontabState":
+        """Get the state of a crontab-format file without opening a manager."""
+        with open(path, "r", encoding="utf-8", errors="surrogateescape") as fh:
+            return cls(path, CrontabDocument.parse(fh.read()).jobs())
+
+    def job_ids(self) -> Dict[Digest, int]:
+        """Map every job's digest to its index in the crontab."""
+        if self._ids is None:
+            self._ids = {digest: idx for idx, digest in enumerate(self.jobs)}
+        return self._ids
+
+
+class HostDiff(NamedTuple):
+    """How one crontab differs from the target, each list in crontab order."""
+
+    name: str
+    # Target jobs the crontab does not have
+    missing: List[Digest]
+    # (job, target job) pairs that run the same command but differ in
+    # schedule, enabled state or comment
+    differ: List[Tuple[Digest, Digest]]
+    # Jobs the target does not have
+    extra: List[Digest]
+
+    @property
+    def same(self) -> bool:
+        return not (self.missing or self.differ or self.extra)
+
+
+def majority_state(states: Sequence[CrontabState]) -> CrontabState:
+    """
+    Build the target that holds what most crontabs agree on.
+
+    A command is run by as many jobs as more than half of the crontabs have
+    at least; those jobs are the versions most crontabs have, ties going to
+    the crontab listed first.
+
+    Args:
+        states: Crontabs to vote
+
+    Returns:
+        State named MAJORITY, jobs ordered by first appearance
+    """
+    # Counting and collecting runs in C; only the few distinct versions and
+    # job counts are looked at one by one
+    counts: Counter = Counter()
+    lines: Dict[Digest, CronLine] = {}
+    job_counts: Counter = Counter()
+    for state in states:
+        counts.update(state.jobs.keys())
+        lines.update(state.jobs)
+        job_counts.update(state.commands.items())
+
+    # Hosts having at least n jobs of a command, from how many have exactly n
+    quorum = len(states) // 2
+    tallies: Dict[str, Dict[int, int]] = {}
+    for (command, count), hosts in job_counts.items():
+        tallies.setdefault(command, {})[count] = hosts
+    wanted: Dict[str, int] = {}
+    for command, tally in tallies.items():
+        hosts = 0
+        for count in sorted(tally, reverse=True):
+            hosts += tally[count]
+            if hosts > quorum:
+                wanted[command] = count
+                break
+
+    versions: Dict[str, List[Digest]] = {}
+    for digest, line in lines.items():
+        if line.command in wanted:
+            versions.setdefault(line.command, []).append(digest)
+    chosen = set()
+    for command, digests in versions.items():
+        # sorted() is stable, so equal counts keep their first appearance
+        digests.sort(key=counts.__getitem__, reverse=True)
+        chosen.update(digests[: wanted[command]])
+
+    target = CrontabState(MAJORITY, ())
+    for digest, line in lines.items():
+        if digest in chosen:
+            target.jobs[digest] = line
+            target.commands[line.command] = target.commands.get(line.command, 0) + 1
+    return target
+
+
+def diff_state(state: CrontabState, target: CrontabState) -> HostDiff:
+    """
+    Compare one crontab with the target.
+
+    Jobs that match exactly are set members on both sides; of the rest, jobs
+    running the same command are paired up in order as differing, and the
+    leftovers are missing or extra.
+
+    Args:
+        state: Crontab to compare
+        target: Desired state
+
+    Returns:
+        HostDiff of the crontab
+    """
+    mine = state.jobs.keys()
+    theirs = target.jobs.keys()
+    if mine == theirs:
+        return HostDiff(state.name, [], [], [])
+
+    surplus: Dict[str, List[Digest]] = {}
+    unmatched = sorted(mine - theirs, key=state.job_ids().__getitem__)
+    for digest in unmatched:
+        surplus.setdefault(state.jobs[digest].command, []).append(digest)
+
+    missing: List[Digest] = []
+    differ: List[Tuple[Digest, Digest]] = []
+    for digest in sorted(theirs - mine, key=target.job_ids().__getitem__):
+        candidates = surplus.get(target.jobs[digest].command)
+        if candidates:
+            differ.append((candidates.pop(0), digest))
+        else:
+            missing.append(digest)
+    paired = {mine_digest for mine_digest, _ in differ}
+    extra = [digest for digest in unmatched if digest not in paired]
+    return HostDiff(state.name, missing, differ, extra)
+
+
+@profiled("fleet.diff", "manager")
+def diff_states(
+    states: Sequence[CrontabState], target: Optional[str] = None
+) -> Tuple[CrontabState, List[HostDiff]]:
+    """
+    Compare crontabs with a target.
+
+    Args:
+        states: Crontabs to compare
+        target: Name of the crontab the others should match; None or
+            MAJORITY for majority_state()
+
+    Returns:
+        (target state, diff of every crontab in order)
+
+    Raises:
+        KeyError: If no crontab has the target's name
+    """
+    if target is None or target == MAJORITY:
+        target_state = majority_state(states)
+    else:
+        target_state = next((s for s in states if s.name == target), None)
+        if target_state is None:
+            raise KeyError(target)
+    return target_state, [diff_state(state, target_state) for state in states]
+
+
+def sync_changes(
+    state: CrontabState,
+    target: CrontabState,
+    diff: HostDiff,
+    delete_extra: bool = True,
+) -> Tuple[Dict[int, str], List[int], List[Tuple[Optional[int], str]]]:
+    """
+    Plan the edits that make a crontab match the target.
+
+    Args:
+        state: Crontab to change; must be current
+        target: Desired state
+        diff: diff_state(state, target)
+        delete_extra: Whether to delete jobs the target does not have
+
+    Returns:
+        (line text per job id to rewrite, job ids to delete, (job id to
+        insert above or None to append, line text) per missing job), as
+        CronManager.apply_job_changes takes them
+    """
+    ids = state.job_ids()
+    replace = {ids[mine]: target.jobs[theirs].text for mine, theirs in diff.differ}
+    delete = [ids[digest] for digest in diff.extra] if delete_extra else []
+
+    insert: List[Tuple[Optional[int], str]] = []
+    if diff.missing:
+        # Each missing job goes above the next target job the crontab keeps
+        missing = set(diff.missing)
+        kept = {theirs: ids[mine] for mine, theirs in diff.differ}
+        anchor: Optional[int] = None
+        for digest in reversed(list(target.jobs)):
+            if digest in missing:
+                insert.append((anchor, target.jobs[digest].text))
+            elif digest in ids:
+                anchor = ids[digest]
+            elif digest in kept:
+                anchor = kept[digest]
+        insert.reverse()
+    return replace, delete, insert
+
+
+def sync_manager(
+    manager: CronManager,
+    target: CrontabState,
+    delete_extra: bool = True,
+    state: Optional[CrontabState] = None,
+) -> Optional[bool]:
+    """
+    Make a manager's crontab match the target with a single write.
+
+    Args:
+        manager: Crontab to change
+        target: Desired state
+        delete_extra: Whether to delete jobs the target does not have
+        state: Current state of the manager, if already computed
+
+    Returns:
+        None if nothing had to change, otherwise whether the write succeeded
+    """
+    state = state or CrontabState.from_manager(manager)
+    diff = diff_state(state, target)
+    if not (diff.missing or diff.differ or (delete_extra and diff.extra)):
+        return None
+    replace, delete, insert = sync_changes(state, target, diff, delete_extra)
+    return manager.apply_job_changes(
+        replace, delete, insert, f"Sync with {target.name}"
+    )
+
+
+def format_diff(diff: HostDiff, state: CrontabState, target: CrontabState) -> List[str]:
+    """
+    Describe a crontab's differences as text lines.
+
+    Missing jobs are prefixed with "+", extra jobs with "-" and jobs that
+    differ show their line and the target's, prefixed with "-" and "+".
+    """
+    lines = [
+        f"@@ {diff.name}: {len(diff.missing)} missing, "
+        f"{len(diff.differ)} differ, {len(diff.extra)} extra"
+    ]
+    for digest in diff.missing:
+        lines.append(f"+ {target.jobs[digest].text}")
+    for mine, theirs in diff.differ:
+        lines.append(f"- {state.jobs[mine].text}")
+        lines.append(f"+ {target.jobs[theirs].text}")
+    for digest in diff.extra:
+        lines.append(f"- {state.jobs[digest].text}")
+    return lines
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Compare crontab files or the crontabs of hosts, and optionally sync them.
+
+    Returns:
+        0 if every crontab matches the target, 1 if some differ, 2 on errors
+    """
+    parser = argparse.ArgumentParser(
+        description="Compare crontabs across hosts or files"
+    )
+    parser.add_argument("files", nargs="*", help="Crontab-format files to compare")
+    parser.add_argument("--hosts", help="File listing hosts to compare over SSH")
+    parser.add_argument(
+        "--target",
+        default=MAJORITY,
+        help="Host or file the others should match (default: majority)",
+    )
+    parser.add_argument(
+        "--apply", action="store_true", help="Change every crontab to match the target"
+    )
+    parser.add_argument(
+        "--keep-extra",
+        action="store_true",
+        help="Do not delete jobs the target does not have when applying",
+    )
+    args = parser.parse_args(argv)
+
+    managers: List[CronManager] = []
+    if args.hosts:
+        from cron_gui.fleet_manager import FleetManager, read_host_file, ssh_backends
+
+        fleet = FleetManager(ssh_backends(read_host_file(args.hosts)))
+        for host, error in fleet.errors.items():
+            print(f"Error reading {host}: {error}", file=sys.stderr)
+        managers = fleet.managers
+        states = [CrontabState.from_manager(manager) for manager in managers]
+    elif args.apply:
+        # Comparing files is no edit session; keep them out of the history
+        managers = [CronManager(tabfile=path, persist=False) for path in args.files]
+        states = [
+            CrontabState(path, manager.document.jobs())
+            for path, manager in zip(args.files, managers)
+        ]
+    else:
+        states = [CrontabState.from_file(path) for path in args.files]
+    if len(states) < 2:
+        parser.error("need at least two crontabs to compare")
+
+    try:
+        target, diffs = diff_states(states, args.target)
+    except KeyError:
+        parser.error(f"no crontab named {args.target}")
+
+    differing = 0
+    failed = 0
+    for idx, (state, diff) in enumerate(zip(states, diffs)):
+        if diff.same:
+            continue
+        differing += 1
+        print("\n".join(format_diff(diff, state, target)))
+        if args.apply:
+            if sync_manager(managers[idx], target, not args.keep_extra, state) is False:
+                print(f"Error syncing {diff.name}", file=sys.stderr)
+                failed += 1
+    print(f"{len(states) - differing} of {len(states)} crontabs match {target.name}")
+    if failed:
+        return 2
+    return 1 if differing and not args.apply else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
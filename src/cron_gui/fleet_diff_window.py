@@ -0,0 +1,203 @@
+"""
+Fleet Diff Window - Compare the crontabs of all hosts and sync them.
+"""
+
+import gi
+
+gi.require_version("Gtk", "4.0")
+gi.require_version("Adw", "1")
+from gi.repository import Gtk, Adw, Pango
+from typing import Callable, List, Optional
+
+from cron_gui.fleet_diff import MAJORITY, CrontabState, HostDiff, format_diff
+from cron_gui.fleet_manager import FleetManager
+from cron_gui.profiling import profiler
+
+# Longest diff shown; the rest is summarized
+MAX_DIFF_LINES = 5000
+
+
+class FleetDiffWindow(Adw.Window):
+    """Lists hosts that differ from a target and shows how."""
+
+    def __init__(
+        self,
+        parent,
+        fleet: FleetManager,
+        on_sync: Callable[[Optional[str], bool], None],
+    ):
+        """
+        Initialize the window.
+
+        Args:
+            parent: Main window
+            fleet: Hosts to compare
+            on_sync: Called with the target host (None for the majority)
+                and whether to delete extra jobs to sync every host
+        """
+        super().__init__(transient_for=parent, modal=False)
+        self.set_title("Compare Hosts")
+        self.set_default_size(900, 600)
+
+        self.fleet = fleet
+        self.on_sync = on_sync
+        self.target = None
+        self.diffs: List[HostDiff] = []
+
+        toolbar = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
+        header = Adw.HeaderBar()
+
+        self.sync_button = Gtk.Button(label="Sync All")
+        self.sync_button.add_css_class("suggested-action")
+        self.sync_button.set_tooltip_text("Change every host to match the target")
+        self.sync_button.set_sensitive(False)
+        self.sync_button.connect("clicked", self._on_sync_clicked)
+        header.pack_end(self.sync_button)
+
+        self.delete_check = Gtk.CheckButton(label="Delete extra jobs")
+        self.delete_check.set_active(True)
+        self.delete_check.set_tooltip_text(
+            "Also delete jobs the target does not have when syncing"
+        )
+        header.pack_end(self.delete_check)
+
+        # What every host is compared with
+        self.target_names = [None] + fleet.hosts()
+        self.target_dropdown = Gtk.DropDown.new_from_strings(
+            ["Majority of hosts"] + fleet.hosts()
+        )
+        self.target_dropdown.connect("notify::selected", self._on_target_changed)
+        header.pack_start(self.target_dropdown)
+        toolbar.append(header)
+
+        # Hosts, those that differ first
+        self.host_list = Gtk.ListBox()
+        self.host_list.add_css_class("navigation-sidebar")
+        self.host_list.connect("row-selected", self._on_host_selected)
+        hosts_scrolled = Gtk.ScrolledWindow()
+        hosts_scrolled.set_policy(Gtk.PolicyType.NEVER, Gtk.PolicyType.AUTOMATIC)
+        hosts_scrolled.set_child(self.host_list)
+        hosts_scrolled.set_size_request(300, -1)
+
+        # Differences of the selected host
+        self.diff_view = Gtk.TextView()
+        self.diff_view.set_editable(False)
+        self.diff_view.set_cursor_visible(False)
+        self.diff_view.set_monospace(True)
+        self.diff_view.set_left_margin(12)
+        self.diff_view.set_top_margin(12)
+        buffer = self.diff_view.get_buffer()
+        buffer.create_tag("added", foreground="#26a269")
+        buffer.create_tag("removed", foreground="#c01c28")
+        buffer.create_tag("hunk", foreground="#1c71d8", weight=Pango.Weight.BOLD)
+        diff_scrolled = Gtk.ScrolledWindow()
+        diff_scrolled.set_hexpand(True)
+        diff_scrolled.set_child(self.diff_view)
+
+        paned = Gtk.Paned(orientation=Gtk.Orientation.HORIZONTAL)
+        paned.set_start_child(hosts_scrolled)
+        paned.set_end_child(diff_scrolled)
+        paned.set_resize_start_child(False)
+        paned.set_vexpand(True)
+        toolbar.append(paned)
+
+        self.set_content(toolbar)
+        self.reload()
+
+    def reload(self):
+        """Compare the hosts again, e.g. after a sync."""
+        row = self.host_list.get_row_at_index(0)
+        while row is not None:
+            self.host_list.remove(row)
+            row = self.host_list.get_row_at_index(0)
+
+        name = self.target_names[self.target_dropdown.get_selected()]
+        try:
+            self.target, self.diffs = self.fleet.compare(name)
+        except KeyError:
+            self._show_text(f"{name} is no longer reachable.")
+            self.sync_button.set_sensitive(False)
+            return
+
+        # compare() lists the hosts in the same order as states()
+        rows = list(zip(self.diffs, self.fleet.states()))
+        differing = [row for row in rows if not row[0].same]
+        self.sync_button.set_sensitive(bool(differing))
+        if not differing:
+            self._show_text(f"All {len(rows)} hosts match {self._target_label()}.")
+        for diff, state in differing + [row for row in rows if row[0].same]:
+            self.host_list.append(self._create_row(diff, state))
+        if differing:
+            self.host_list.select_row(self.host_list.get_row_at_index(0))
+
+    def _create_row(self, diff: HostDiff, state: CrontabState) -> Gtk.ListBoxRow:
+        """Create the list row of a host."""
+        title = Gtk.Label(label=diff.name)
+        title.set_xalign(0)
+        title.set_ellipsize(Pango.EllipsizeMode.MIDDLE)
+        if diff.same:
+            summary = "matches"
+        else:
+            summary = (
+                f"{len(diff.missing)} missing · {len(diff.differ)} differ · "
+                f"{len(diff.extra)} extra"
+            )
+        subtitle = Gtk.Label(label=summary)
+        subtitle.set_xalign(0)
+        subtitle.add_css_class("dim-label")
+        subtitle.add_css_class("caption")
+
+        box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=2)
+        box.set_margin_top(6)
+        box.set_margin_bottom(6)
+        box.append(title)
+        box.append(subtitle)
+
+        row = Gtk.ListBoxRow()
+        row.set_child(box)
+        row.diff = diff
+        row.state = state
+        return row
+
+    def _on_target_changed(self, dropdown, param):
+        """Compare with another target."""
+        self.reload()
+
+    def _on_host_selected(self, listbox, row):
+        """Show the differences of the selected host."""
+        if row is None:
+            self._show_text("")
+            return
+        if row.diff.same:
+            self._show_text(f"{row.diff.name} matches {self._target_label()}.")
+            return
+
+        with profiler.span("fleet_diff.render", "ui"):
+            lines = format_diff(row.diff, row.state, self.target)
+        buffer = self.diff_view.get_buffer()
+        buffer.set_text("")
+        end = buffer.get_end_iter()
+        for line in lines[:MAX_DIFF_LINES]:
+            tag = {"+": "added", "-": "removed", "@": "hunk"}.get(line[:1])
+            if tag:
+                buffer.insert_with_tags_by_name(end, line + "\n", tag)
+            else:
+                buffer.insert(end, line + "\n")
+        if len(lines) > MAX_DIFF_LINES:
+            buffer.insert(end, f"… diff truncated after {MAX_DIFF_LINES} lines\n")
+
+    def _target_label(self) -> str:
+        """Describe the target for messages."""
+        if self.target is None or self.target.name == MAJORITY:
+            return "the majority"
+        return self.target.name
+
+    def _show_text(self, text: str):
+        """Show a plain message instead of a diff."""
+        self.diff_view.get_buffer().set_text(text)
+
+    def _on_sync_clicked(self, button):
+        """Sync every host with the target."""
+        name = self.target_names[self.target_dropdown.get_selected()]
+        self.on_sync(name, self.delete_check.get_active())
+        self.reload()
@@ -0,0 +1,553 @@
+"""
+Fleet Manager - The crontabs of many hosts as one job list.
+
+Each host gets its own CronManager, so edits, merges and undo work exactly
+as for a single crontab; this class only routes job ids to hosts. Jobs are
+numbered across hosts in host order, which keeps ids positional like the
+ids of a single crontab.
+
+Crontabs are fetched in parallel by a bounded thread pool. Combined with
+SshTransport's multiplexed connections, opening a few hundred hosts takes
+about as long as the slowest few round trips rather than the sum of all of
+them. Every manager keeps the fingerprint of its crontab, so a refresh
+only re-parses the hosts whose crontab changed.
+
+compare() and sync() check the hosts against a target with fleet_diff and
+bring them in line; the digests of each crontab are kept until its
+fingerprint changes.
+"""
+
+import bisect
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from cron_gui.cron_backend import CrontabBackend, SshBackend, SshTransport
+from cron_gui.cron_manager import CronManager
+from cron_gui.crontab_merge import MergeConflict
+from cron_gui.fleet_diff import CrontabState, HostDiff, diff_states, sync_manager
+from cron_gui.profiling import profiled, profiler
+
+# Most crontabs fetched at once
+MAX_PARALLEL = 16
+
+
+def read_host_file(path: str) -> List[Tuple[str, Optional[str]]]:
+    """
+    Read a list of hosts.
+
+    Each line holds a host, optionally as login@host, and optionally the
+    user whose crontab to edit there. Blank lines and # comments are
+    skipped.
+
+    Args:
+        path: File to read
+
+    Returns:
+        (host, crontab user or None) pairs in file order
+    """
+    hosts = []
+    with open(path, "r", encoding="utf-8") as fh:
+        for line in fh:
+            fields = line.split("#", 1)[0].split()
+            if fields:
+                hosts.append((fields[0], fields[1] if len(fields) > 1 else None))
+    return hosts
+
+
+def ssh_backends(
+    hosts: Iterable[Tuple[str, Optional[str]]],
+    transport: Optional[SshTransport] = None,
+) -> List[SshBackend]:
+    """
+    Create SSH backends sharing one transport.
+
+    Args:
+        hosts: (host, crontab user or None) pairs, see read_host_file
+        transport: Transport to use; a default SshTransport if None
+
+    Returns:
+        One backend per host
+    """
+    transport = transport or SshTransport()
+    return [SshBackend(host, user, transport) for host, user in hosts]
+
+
+class _FleetJournal:
+    """What the window asks the journal of a manager, for the whole fleet."""
+
+    def __init__(self, fleet: "FleetManager"):
+        self.fleet = fleet
+
+    def can_undo(self) -> bool:
+        return bool(self.fleet._undo)
+
+    def can_redo(self) -> bool:
+        return bool(self.fleet._redo)
+
+
+class FleetManager:
+    """Manages the crontabs of several hosts with the interface of CronManager."""
+
+    def __init__(
+        self,
+        backends: Sequence[CrontabBackend],
+        max_parallel: int = MAX_PARALLEL,
+        manager_factory: Optional[Callable[[CrontabBackend], CronManager]] = None,
+    ):
+        """
+        Initialize the FleetManager and fetch every crontab.
+
+        Args:
+            backends: One backend per host, in the order jobs are listed
+            max_parallel: Most crontabs fetched at once
+            manager_factory: Creates the manager of a backend; defaults to
+                CronManager(backend=backend)
+        """
+        self.backends = list(backends)
+        self.max_parallel = max_parallel
+        self.manager_factory = manager_factory or (
+            lambda backend: CronManager(backend=backend)
+        )
+        self.source = f"{len(self.backends)} hosts"
+        self.user = None
+        self.journal = _FleetJournal(self)
+
+        # Managers of the hosts that could be read, in backend order
+        self.managers: List[CronManager] = []
+        # Error message of every host that could not be read
+        self.errors: Dict[str, str] = {}
+        # Hosts whose crontab changed in the last refresh
+        self.changed: List[str] = []
+        # Managers touched by each edit, for undo and redo
+        self._undo: List[List[CronManager]] = []
+        self._redo: List[List[CronManager]] = []
+        self.merged = False
+        # Comparable state of each manager's crontab, by fingerprint
+        self._states: Dict[int, Tuple[str, CrontabState]] = {}
+
+        self._open(self.backends)
+
+    def _parallel(self, function: Callable, items: Sequence) -> List:
+        """
+        Call a function on every item with bounded concurrency.
+
+        Returns:
+            (result, None) or (None, exception) per item, in item order
+        """
+
+        def call(item):
+            try:
+                return function(item), None
+            except Exception as e:
+                return None, e
+
+        if len(items) <= 1:
+            return [call(item) for item in items]
+        workers = max(1, min(self.max_parallel, len(items)))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(call, items))
+
+    @profiled("fleet.open", "manager")
+    def _open(self, backends: Sequence[CrontabBackend]):
+        """Create the managers of backends, recording the hosts that fail."""
+        opened = {}
+        for backend, (manager, error) in zip(
+            backends, self._parallel(self.manager_factory, backends)
+        ):
+            if error is None:
+                opened[id(backend)] = manager
+                self.errors.pop(backend.host, None)
+            else:
+                self.errors[backend.host] = str(error)
+
+        managers = {id(manager.backend): manager for manager in self.managers}
+        managers.update(opened)
+        self.managers = [
+            managers[id(backend)]
+            for backend in self.backends
+            if id(backend) in managers
+        ]
+
+    def hosts(self) -> List[str]:
+        """Get the hosts whose crontab could be read, in list order."""
+        return [manager.host for manager in self.managers]
+
+    def _offsets(self) -> List[int]:
+        """Get the global id of each manager's first job."""
+        offsets = []
+        total = 0
+        for manager in self.managers:
+            offsets.append(total)
+            total += len(manager.document.jobs())
+        return offsets
+
+    def _locate(self, job_id: int) -> Optional[Tuple[CronManager, int]]:
+        """Map a global job id to its manager and the id there."""
+        if job_id < 0 or not self.managers:
+            return None
+        offsets = self._offsets()
+        idx = bisect.bisect_right(offsets, job_id) - 1
+        manager = self.managers[idx]
+        local_id = job_id - offsets[idx]
+        if local_id >= len(manager.document.jobs()):
+            return None
+        return manager, local_id
+
+    def _group(self, job_ids: Iterable[int]) -> Optional[Dict[int, Tuple]]:
+        """
+        Group global job ids by manager.
+
+        Returns:
+            Manager index -> (manager, local ids), or None if any id is out
+            of range
+        """
+        offsets = self._offsets()
+        groups: Dict[int, Tuple[CronManager, List[int]]] = {}
+        for job_id in job_ids:
+            idx = bisect.bisect_right(offsets, job_id) - 1
+            if job_id < 0 or idx < 0:
+                return None
+            manager = self.managers[idx]
+            local_id = job_id - offsets[idx]
+            if local_id >= len(manager.document.jobs()):
+                return None
+            groups.setdefault(idx, (manager, []))[1].append(local_id)
+        return groups
+
+    def iter_jobs(self) -> Iterator[Dict]:
+        """
+        Lazily yield the jobs of all hosts.
+
+        Yields:
+            Job dictionaries as CronManager produces them, with global ids
+        """
+        offset = 0
+        for manager in self.managers:
+            count = 0
+            for job in manager.iter_jobs():
+                job["id"] += offset
+                count += 1
+                yield job
+            offset += count
+
+    @profiled("fleet.list_jobs", "manager")
+    def list_jobs(self) -> List[Dict]:
+        """Get the jobs of all hosts."""
+        return list(self.iter_jobs())
+
+    def get_job(self, job_id: int) -> Optional[Dict]:
+        """Get a single job by global id."""
+        located = self._locate(job_id)
+        if located is None:
+            return None
+        manager, local_id = located
+        job = manager.get_job(local_id)
+        job["id"] = job_id
+        return job
+
+    def job_counts(self) -> Tuple[int, int]:
+        """
+        Count the jobs of all hosts.
+
+        Returns:
+            (total, enabled)
+        """
+        total = enabled = 0
+        for manager in self.managers:
+            count, enabled_count = manager.job_counts()
+            total += count
+            enabled += enabled_count
+        return total, enabled
+
+    def get_env_block(self, job_id: int) -> Dict[str, str]:
+        """Get the environment lines written directly above a job."""
+        located = self._locate(job_id)
+        if located is None:
+            return {}
+        manager, local_id = located
+        return manager.get_env_block(local_id)
+
+    def reload(self) -> bool:
+        """
+        Re-read every crontab in parallel and retry unreachable hosts.
+
+        Returns:
+            True if any crontab changed
+        """
+        with profiler.span("fleet.reload", "manager"):
+            managers = list(self.managers)
+            results = self._parallel(lambda manager: manager.reload(), managers)
+            self.changed = []
+            for manager, (changed, error) in zip(managers, results):
+                if error is not None:
+                    self.errors[manager.host] = str(error)
+                    continue
+                self.errors.pop(manager.host, None)
+                if changed:
+                    self.changed.append(manager.host)
+
+            reachable = {id(manager.backend) for manager in self.managers}
+            retry = [
+                backend for backend in self.backends if id(backend) not in reachable
+            ]
+            if retry:
+                self._open(retry)
+                self.changed += [
+                    manager.host
+                    for manager in self.managers
+                    if id(manager.backend) not in reachable
+                ]
+        return bool(self.changed)
+
+    def _record(self, managers: List[CronManager]):
+        """Remember which managers an edit touched."""
+        if managers:
+            self._undo.append(managers)
+            self._redo.clear()
+        self.merged = any(manager.merged for manager in managers)
+
+    def add_job(
+        self,
+        command: str,
+        schedule: str,
+        comment: str = "",
+        env: Optional[Dict[str, str]] = None,
+        host: Optional[str] = None,
+    ) -> bool:
+        """
+        Add a new cron job to one host.
+
+        Args:
+            command: Command to execute
+            schedule: Cron schedule expression
+            comment: Optional comment/description
+            env: Optional environment lines to write directly above the job
+            host: Host to add it to; the first host if None
+
+        Returns:
+            True if successful, False otherwise
+        """
+        manager = next(
+            (m for m in self.managers if host is None or m.host == host), None
+        )
+        if manager is None:
+            return False
+        success = manager.add_job(command, schedule, comment, env)
+        if success:
+            self._record([manager])
+        return success
+
+    def add_jobs(
+        self,
+        jobs: Iterable[Tuple[str, str, str]],
+        label: Optional[str] = None,
+        host: Optional[str] = None,
+        env: Optional[Dict[str, str]] = None,
+    ) -> bool:
+        """Add many jobs to one host, see CronManager.add_jobs."""
+        manager = next(
+            (m for m in self.managers if host is None or m.host == host), None
+        )
+        if manager is None:
+            return False
+        success = manager.add_jobs(jobs, label, env)
+        if success:
+            self._record([manager])
+        return success
+
+    def update_job(
+        self,
+        job_id: int,
+        command: str,
+        schedule: str,
+        comment: str = "",
+        env: Optional[Dict[str, str]] = None,
+    ) -> bool:
+        """Update an existing cron job, see CronManager.update_job."""
+        located = self._locate(job_id)
+        if located is None:
+            return False
+        manager, local_id = located
+        success = manager.update_job(local_id, command, schedule, comment, env)
+        if success:
+            self._record([manager])
+        return success
+
+    def _edit_many(self, job_ids: Iterable[int], edit: Callable) -> bool:
+        """
+        Apply an edit to the jobs of each host, one write per host.
+
+        A host that fails does not stop the others; the hosts that were
+        edited can be undone together.
+        """
+        groups = self._group(job_ids)
+        if groups is None:
+            return False
+        touched = []
+        success = True
+        for idx in sorted(groups):
+            manager, local_ids = groups[idx]
+            if edit(manager, local_ids):
+                touched.append(manager)
+            else:
+                success = False
+        self._record(touched)
+        return success
+
+    def delete_job(self, job_id: int) -> bool:
+        return self.delete_jobs([job_id])
+
+    def toggle_job(self, job_id: int, enabled: bool) -> bool:
+        return self.toggle_jobs([job_id], enabled)
+
+    def delete_jobs(self, job_ids: Iterable[int]) -> bool:
+        """Delete jobs on any hosts, see CronManager.delete_jobs."""
+        return self._edit_many(job_ids, lambda m, ids: m.delete_jobs(ids))
+
+    def toggle_jobs(self, job_ids: Iterable[int], enabled: bool) -> bool:
+        """Enable or disable jobs on any hosts, see CronManager.toggle_jobs."""
+        return self._edit_many(job_ids, lambda m, ids: m.toggle_jobs(ids, enabled))
+
+    def retag_jobs(self, job_ids: Iterable[int], comment: str) -> bool:
+        """Set the comment of jobs on any hosts, see CronManager.retag_jobs."""
+        return self._edit_many(job_ids, lambda m, ids: m.retag_jobs(ids, comment))
+
+    def reschedule_jobs(self, job_ids: Iterable[int], schedule: str) -> bool:
+        """Set the schedule of jobs on any hosts, see CronManager.reschedule_jobs."""
+        return self._edit_many(
+            job_ids, lambda m, ids: m.reschedule_jobs(ids, schedule)
+        )
+
+    def merge_jobs(
+        self, keep_id: int, delete_ids: Iterable[int], schedule: Optional[str] = None
+    ) -> bool:
+        """Merge duplicate jobs of one host, see CronManager.merge_jobs."""
+        delete_ids = list(delete_ids)
+        groups = self._group([keep_id, *delete_ids])
+        if groups is None or len(groups) != 1:
+            return False
+        ((manager, local_ids),) = groups.values()
+        success = manager.merge_jobs(local_ids[0], local_ids[1:], schedule)
+        if success:
+            self._record([manager])
+        return success
+
+    def undo(self) -> Optional[str]:
+        """
+        Revert the last edit on every host it touched.
+
+        Returns:
+            Label of the reverted edit, or None if there was nothing to undo
+            or it failed
+        """
+        return self._replay(self._undo, self._redo, lambda m: m.undo())
+
+    def redo(self) -> Optional[str]:
+        """
+        Reapply the last undone edit on every host it touched.
+
+        Returns:
+            Label of the reapplied edit, or None if there was nothing to redo
+            or it failed
+        """
+        return self._replay(self._redo, self._undo, lambda m: m.redo())
+
+    def _replay(
+        self,
+        source: List[List[CronManager]],
+        target: List[List[CronManager]],
+        replay: Callable[[CronManager], Optional[str]],
+    ) -> Optional[str]:
+        """Undo or redo the newest edit of source and move it to target."""
+        if not source:
+            return None
+        managers = source.pop()
+        labels = [replay(manager) for manager in managers]
+        if None in labels:
+            return None
+        target.append(managers)
+        if len(managers) == 1:
+            return labels[0]
+        return f"{labels[0]} on {len(managers)} hosts"
+
+    def _state(self, manager: CronManager) -> CrontabState:
+        """Get the comparable state of a host, reusing it while unchanged."""
+        cached = self._states.get(id(manager))
+        if cached is None or cached[0] != manager.fingerprint:
+            cached = (manager.fingerprint, CrontabState.from_manager(manager))
+            self._states[id(manager)] = cached
+        return cached[1]
+
+    def states(self) -> List[CrontabState]:
+        """Get the comparable state of every host, in list order."""
+        return [self._state(manager) for manager in self.managers]
+
+    def compare(
+        self, target: Optional[str] = None
+    ) -> Tuple[CrontabState, List[HostDiff]]:
+        """
+        Compare the crontab of every host with a target.
+
+        Args:
+            target: Host the others should match; None for the jobs most
+                hosts agree on, see fleet_diff.majority_state
+
+        Returns:
+            (target state, diff of every host in list order)
+
+        Raises:
+            KeyError: If target is not a reachable host
+        """
+        return diff_states(self.states(), target)
+
+    def sync(self, target: Optional[str] = None, delete_extra: bool = True) -> bool:
+        """
+        Make every host's crontab match a target, one write per host.
+
+        Hosts are written in parallel; the hosts that changed can be undone
+        together.
+
+        Args:
+            target: See compare
+            delete_extra: Whether to delete jobs the target does not have
+
+        Returns:
+            True if every host that differed was synced, False otherwise
+        """
+        try:
+            target_state, diffs = self.compare(target)
+        except KeyError:
+            return False
+        managers = [
+            manager
+            for manager, diff in zip(self.managers, diffs)
+            if diff.missing or diff.differ or (delete_extra and diff.extra)
+        ]
+        results = self._parallel(
+            lambda m: sync_manager(m, target_state, delete_extra, self._state(m)),
+            managers,
+        )
+        touched = []
+        for manager, (synced, error) in zip(managers, results):
+            if synced:
+                touched.append(manager)
+            elif error is not None:
+                print(f"Error syncing {manager.host}: {error}")
+        self._record(touched)
+        return len(touched) == len(managers)
+
+    @property
+    def conflicts(self) -> List[MergeConflict]:
+        """Conflicts of the last failed edit, across hosts."""
+        return [
+            conflict for manager in self.managers for conflict in manager.conflicts
+        ]
+
+    def resolve_conflicts(self, keep_ours: bool) -> bool:
+        """Resolve the pending conflicts of every host, see CronManager."""
+        managers = [manager for manager in self.managers if manager.conflicts]
+        if not managers:
+            return False
+        results = [manager.resolve_conflicts(keep_ours) for manager in managers]
+        self._record([m for m, ok in zip(managers, results) if ok])
+        return all(results)
@@ -0,0 +1,447 @@
+"""
+History Store - Versioned, content-addressed history of a crontab.
+
+Every distinct line text is stored once. A version is the sequence of
+line ids it consists of, stored as an edit script against the previous
+version (copy this run, insert these ids), so a version that differs in a
+few lines costs a few dozen bytes no matter how long the crontab is. Every
+KEYFRAME_INTERVAL versions the full sequence is stored instead, which
+bounds how many scripts a checkout replays. Three append-only files make up
+a store:
+
+- ``lines.pack``: zlib chunks with the new line texts of each version
+- ``versions.pack``: zlib-compressed edit scripts and keyframes
+- ``index.jsonl``: one record per chunk and per version (number, time,
+  user, label, content hash and where its data lives)
+
+Stores are shared safely between processes: appends happen under an
+exclusive lock on the index, after catching up with records written by
+others.
+"""
+
+import array
+import difflib
+import fcntl
+import getpass
+import hashlib
+import json
+import os
+import time
+import zlib
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence
+
+from cron_gui.crontab_document import common_prefix_length
+from cron_gui.edit_journal import content_hash, open_private
+
+
+def default_history_dir(source: str) -> str:
+    """
+    Get where the history of a crontab is kept.
+
+    Args:
+        source: Description of the crontab, e.g. the backend's describe()
+
+    Returns:
+        Directory under $XDG_DATA_HOME/cron_gui/history
+    """
+    data_home = os.environ.get("XDG_DATA_HOME") or os.path.expanduser(
+        "~/.local/share"
+    )
+    data = source.encode("utf-8", errors="surrogateescape")
+    name = hashlib.blake2b(data, digest_size=8).hexdigest()
+    return os.path.join(data_home, "cron_gui", "history", name)
+
+
+# A full line id sequence is stored every this many versions
+KEYFRAME_INTERVAL = 32
+
+# Edit script opcodes: (_COPY, start, length) and (_INSERT, count, *ids)
+_COPY = 0
+_INSERT = 1
+
+
+def _encode_delta(base: Sequence[int], ids: Sequence[int]) -> array.array:
+    """Describe ids as an edit script against base."""
+    head = common_prefix_length(base, ids)
+    tail = common_prefix_length(base[head:][::-1], ids[head:][::-1])
+    base_mid = base[head : len(base) - tail]
+    ids_mid = ids[head : len(ids) - tail]
+
+    script = array.array("i")
+    if head:
+        script.extend((_COPY, 0, head))
+    matcher = difflib.SequenceMatcher(None, base_mid, ids_mid, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            script.extend((_COPY, head + i1, i2 - i1))
+        elif j2 > j1:
+            script.extend((_INSERT, j2 - j1))
+            script.extend(ids_mid[j1:j2])
+    if tail:
+        script.extend((_COPY, len(base) - tail, tail))
+    return script
+
+
+def _apply_delta(base: Sequence[int], script: array.array) -> List[int]:
+    """Rebuild a line id sequence from its base and edit script."""
+    ids: List[int] = []
+    pos = 0
+    while pos < len(script):
+        op, value = script[pos], script[pos + 1]
+        if op == _COPY:
+            length = script[pos + 2]
+            ids.extend(base[value : value + length])
+            pos += 3
+        else:
+            ids.extend(script[pos + 2 : pos + 2 + value])
+            pos += 2 + value
+    return ids
+
+
+def _format_range(start: int, stop: int) -> str:
+    """Format a unified diff range like difflib does."""
+    length = stop - start
+    if length == 1:
+        return str(start + 1)
+    return f"{start + 1 if length else start},{length}"
+
+
+def _split(content: str):
+    """Split crontab text into lines and whether it ends with a newline."""
+    if not content:
+        return [], False
+    lines = content.split("\n")
+    trailing_newline = content.endswith("\n")
+    if trailing_newline:
+        lines.pop()
+    return lines, trailing_newline
+
+
+class Version:
+    """Metadata of one stored version."""
+
+    __slots__ = (
+        "number",
+        "time",
+        "user",
+        "label",
+        "hash",
+        "line_count",
+        "trailing_newline",
+        "base",
+        "offset",
+        "length",
+    )
+
+    def __init__(self, record: Dict):
+        self.number: int = record["n"]
+        self.time: float = record["time"]
+        self.user: str = record["user"]
+        self.label: str = record["label"]
+        self.hash: str = record["hash"]
+        self.line_count: int = record["lines"]
+        self.trailing_newline: bool = record["newline"]
+        # Version the edit script applies to; 0 for a keyframe
+        self.base: int = record["base"]
+        self.offset: int = record["offset"]
+        self.length: int = record["length"]
+
+    def __repr__(self) -> str:
+        return f"Version({self.number}, {self.label!r})"
+
+
+class HistoryStore:
+    """Content-addressed version history of one crontab."""
+
+    def __init__(self, directory: str):
+        """
+        Open a store; the directory is created on the first commit.
+
+        Args:
+            directory: Directory holding the store's files
+        """
+        self.directory = directory
+        self._index_path = os.path.join(directory, "index.jsonl")
+        self._lines_path = os.path.join(directory, "lines.pack")
+        self._versions_path = os.path.join(directory, "versions.pack")
+        self._versions: List[Version] = []
+        self._chunks: List[Dict] = []
+        self._index_offset = 0
+        # Line texts by id and ids by text, loaded on first use
+        self._texts: List[str] = []
+        self._ids: Dict[str, int] = {}
+        self._loaded_chunks = 0
+        # Recently rebuilt line id sequences by version number
+        self._id_cache: Dict[int, List[int]] = {}
+
+    def versions(self) -> List[Version]:
+        """Get all versions, oldest first."""
+        self._catch_up()
+        return list(self._versions)
+
+    def latest(self) -> Optional[Version]:
+        """Get the newest version, or None for an empty store."""
+        self._catch_up()
+        return self._versions[-1] if self._versions else None
+
+    def version(self, number: int) -> Version:
+        """
+        Get a version by number.
+
+        Raises:
+            KeyError: If there is no such version
+        """
+        self._catch_up()
+        if 1 <= number <= len(self._versions):
+            return self._versions[number - 1]
+        raise KeyError(f"No version {number}")
+
+    def commit(
+        self, content: str, label: str, user: Optional[str] = None
+    ) -> Optional[Version]:
+        """
+        Store a version of the crontab unless it equals the newest one.
+
+        Args:
+            content: Crontab text
+            label: What happened, e.g. "Delete 3 jobs"
+            user: Who did it; defaults to the current user, "" if unknown
+
+        Returns:
+            The new version, or None if the content was unchanged
+        """
+        digest = content_hash(content)
+        os.makedirs(self.directory, mode=0o700, exist_ok=True)
+        with self._locked():
+            self._catch_up()
+            if self._versions and self._versions[-1].hash == digest:
+                return None
+            self._load_lines()
+
+            texts, trailing_newline = _split(content)
+            ids = self._ids
+            new_texts = []
+            line_ids = list(map(ids.get, texts))
+            idx = -1
+            while True:
+                # Only new texts are visited; list.index scans in C
+                try:
+                    idx = line_ids.index(None, idx + 1)
+                except ValueError:
+                    break
+                text = texts[idx]
+                line_id = ids.get(text)
+                if line_id is None:
+                    line_id = ids[text] = len(self._texts)
+                    self._texts.append(text)
+                    new_texts.append(text)
+                line_ids[idx] = line_id
+
+            records = []
+            if new_texts:
+                # Lines that are not UTF-8 carry surrogates from the backend
+                data = "\n".join(new_texts).encode("utf-8", errors="surrogateescape")
+                data = zlib.compress(data)
+                offset = self._append(self._lines_path, data)
+                records.append(
+                    {
+                        "t": "lines",
+                        "first": len(self._texts) - len(new_texts),
+                        "count": len(new_texts),
+                        "offset": offset,
+                        "length": len(data),
+                    }
+                )
+
+            number = len(self._versions) + 1
+            base = 0
+            script = array.array("i", line_ids)
+            if self._versions and (number - 1) % KEYFRAME_INTERVAL:
+                delta = _encode_delta(self.line_ids(number - 1), line_ids)
+                if len(delta) < len(script):
+                    base, script = number - 1, delta
+            data = zlib.compress(script.tobytes())
+            offset = self._append(self._versions_path, data)
+            records.append(
+                {
+                    "t": "version",
+                    "n": number,
+                    "time": time.time(),
+                    "user": getpass.getuser() if user is None else user,
+                    "label": label,
+                    "hash": digest,
+                    "lines": len(line_ids),
+                    "newline": trailing_newline,
+                    "base": base,
+                    "offset": offset,
+                    "length": len(data),
+                }
+            )
+
+            with open_private(self._index_path) as fh:
+                for record in records:
+                    fh.write(json.dumps(record, separators=(",", ":")) + "\n")
+            self._catch_up()
+            self._loaded_chunks = len(self._chunks)
+            self._remember(number, line_ids)
+            return self._versions[-1]
+
+    def line_ids(self, number: int) -> List[int]:
+        """Get the line ids a version consists of."""
+        cached = self._id_cache.get(number)
+        if cached is not None:
+            return cached
+
+        # Walk back to a keyframe or cached version, then replay forwards
+        chain = []
+        version = self.version(number)
+        while True:
+            chain.append(version)
+            if version.base == 0 or version.base in self._id_cache:
+                break
+            version = self.version(version.base)
+
+        ids: List[int] = self._id_cache.get(chain[-1].base, [])
+        with open(self._versions_path, "rb") as fh:
+            for version in reversed(chain):
+                fh.seek(version.offset)
+                script = array.array("i", zlib.decompress(fh.read(version.length)))
+                ids = _apply_delta(ids, script) if version.base else script.tolist()
+        self._remember(number, ids)
+        return ids
+
+    def _remember(self, number: int, ids: List[int]):
+        """Cache a rebuilt sequence, keeping only a few."""
+        if len(self._id_cache) >= 8:
+            del self._id_cache[next(iter(self._id_cache))]
+        self._id_cache[number] = ids
+
+    def lines(self, number: int) -> List[str]:
+        """Get the line texts of a version."""
+        ids = self.line_ids(number)
+        self._load_lines()
+        texts = self._texts
+        return [texts[line_id] for line_id in ids]
+
+    def checkout(self, number: int) -> str:
+        """
+        Get the crontab text of a version.
+
+        Raises:
+            KeyError: If there is no such version
+            ValueError: If the stored data is corrupt
+        """
+        version = self.version(number)
+        text = "\n".join(self.lines(number))
+        if version.trailing_newline:
+            text += "\n"
+        if content_hash(text) != version.hash:
+            raise ValueError(f"Version {number} is corrupt")
+        return text
+
+    def diff(self, old: int, new: int, context: int = 3) -> Iterator[str]:
+        """
+        Compare two versions as a unified diff.
+
+        Only the line ids are compared, and the unchanged head and tail are
+        skipped before any matching, so diffs of large crontabs are quick.
+
+        Args:
+            old: Number of the older version; 0 for an empty crontab
+            new: Number of the newer version
+            context: Lines of context around changes
+
+        Yields:
+            Diff lines without trailing newlines, starting with "@@" hunk
+            headers
+        """
+        a = self.line_ids(old) if old else []
+        b = self.line_ids(new)
+        head = max(0, common_prefix_length(a, b) - context)
+        tail = common_prefix_length(a[head:][::-1], b[head:][::-1])
+        tail = max(0, tail - context)
+        a_mid = a[head : len(a) - tail]
+        b_mid = b[head : len(b) - tail]
+
+        self._load_lines()
+        texts = self._texts
+        matcher = difflib.SequenceMatcher(None, a_mid, b_mid, autojunk=False)
+        for group in matcher.get_grouped_opcodes(context):
+            first, last = group[0], group[-1]
+            a_start, a_end = first[1], last[2]
+            b_start, b_end = first[3], last[4]
+            yield (
+                f"@@ -{_format_range(head + a_start, head + a_end)} "
+                f"+{_format_range(head + b_start, head + b_end)} @@"
+            )
+            for tag, i1, i2, j1, j2 in group:
+                if tag == "equal":
+                    for line_id in a_mid[i1:i2]:
+                        yield " " + texts[line_id]
+                    continue
+                for line_id in a_mid[i1:i2]:
+                    yield "-" + texts[line_id]
+                for line_id in b_mid[j1:j2]:
+                    yield "+" + texts[line_id]
+
+    def disk_usage(self) -> int:
+        """Get the size of the store's files in bytes."""
+        total = 0
+        for path in (self._index_path, self._lines_path, self._versions_path):
+            try:
+                total += os.path.getsize(path)
+            except OSError:
+                pass
+        return total
+
+    @contextmanager
+    def _locked(self):
+        """Hold an exclusive lock on the store."""
+        with open_private(os.path.join(self.directory, ".lock")) as fh:
+            fcntl.flock(fh.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
+
+    def _catch_up(self):
+        """Read index records appended since the last call."""
+        try:
+            with open(self._index_path, "rb") as fh:
+                fh.seek(self._index_offset)
+                data = fh.read()
+        except FileNotFoundError:
+            return
+        # Ignore a partially written last record
+        end = data.rfind(b"\n") + 1
+        for line in data[:end].splitlines():
+            record = json.loads(line)
+            if record["t"] == "lines":
+                self._chunks.append(record)
+            elif record["t"] == "version":
+                self._versions.append(Version(record))
+        self._index_offset += end
+
+    def _load_lines(self):
+        """Decompress line chunks not loaded yet."""
+        self._catch_up()
+        if self._loaded_chunks == len(self._chunks):
+            return
+        with open(self._lines_path, "rb") as fh:
+            for chunk in self._chunks[self._loaded_chunks :]:
+                fh.seek(chunk["offset"])
+                data = zlib.decompress(fh.read(chunk["length"]))
+                texts = data.decode("utf-8", errors="surrogateescape")
+                for text in texts.split("\n"):
+                    self._ids.setdefault(text, len(self._texts))
+                    self._texts.append(text)
+        self._loaded_chunks = len(self._chunks)
+
+    @staticmethod
+    def _append(path: str, data: bytes) -> int:
+        """Append data to a pack file and return where it starts."""
+        with open_private(path, binary=True) as fh:
+            offset = fh.seek(0, os.SEEK_END)
+            fh.write(data)
+        return offset
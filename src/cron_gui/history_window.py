@@ -0,0 +1,198 @@
+"""
+History Window - Browse stored versions of the crontab and restore one.
+"""
+
+import gi
+
+gi.require_version("Gtk", "4.0")
+gi.require_version("Adw", "1")
+from gi.repository import Gtk, Adw, Pango
+from datetime import datetime
+from itertools import islice
+from typing import Callable, Optional
+
+from cron_gui.cron_manager import CronManager
+from cron_gui.history_store import Version
+from cron_gui.profiling import profiler
+
+# Longest diff shown; the rest is summarized
+MAX_DIFF_LINES = 5000
+
+
+class HistoryWindow(Adw.Window):
+    """Lists versions newest first and shows what each one changed."""
+
+    def __init__(
+        self, parent, manager: CronManager, on_restore: Callable[[int], None]
+    ):
+        """
+        Initialize the window.
+
+        Args:
+            parent: Main window
+            manager: Manager whose history is shown
+            on_restore: Called with a version number to restore it
+        """
+        super().__init__(transient_for=parent, modal=False)
+        self.set_title("Crontab History")
+        self.set_default_size(900, 600)
+
+        self.manager = manager
+        self.on_restore = on_restore
+        self.selected: Optional[Version] = None
+
+        toolbar = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
+        header = Adw.HeaderBar()
+
+        self.restore_button = Gtk.Button(label="Restore")
+        self.restore_button.add_css_class("suggested-action")
+        self.restore_button.set_tooltip_text("Make this version the current crontab")
+        self.restore_button.set_sensitive(False)
+        self.restore_button.connect("clicked", self._on_restore_clicked)
+        header.pack_end(self.restore_button)
+
+        # What the selected version is compared with
+        self.compare_dropdown = Gtk.DropDown.new_from_strings(
+            ["Changes in this version", "Difference to current crontab"]
+        )
+        self.compare_dropdown.connect("notify::selected", self._on_compare_changed)
+        header.pack_start(self.compare_dropdown)
+        toolbar.append(header)
+
+        # Versions, newest first
+        self.version_list = Gtk.ListBox()
+        self.version_list.add_css_class("navigation-sidebar")
+        self.version_list.connect("row-selected", self._on_version_selected)
+        versions_scrolled = Gtk.ScrolledWindow()
+        versions_scrolled.set_policy(Gtk.PolicyType.NEVER, Gtk.PolicyType.AUTOMATIC)
+        versions_scrolled.set_child(self.version_list)
+        versions_scrolled.set_size_request(300, -1)
+
+        # Diff of the selected version
+        self.diff_view = Gtk.TextView()
+        self.diff_view.set_editable(False)
+        self.diff_view.set_cursor_visible(False)
+        self.diff_view.set_monospace(True)
+        self.diff_view.set_left_margin(12)
+        self.diff_view.set_top_margin(12)
+        buffer = self.diff_view.get_buffer()
+        buffer.create_tag("added", foreground="#26a269")
+        buffer.create_tag("removed", foreground="#c01c28")
+        buffer.create_tag("hunk", foreground="#1c71d8", weight=Pango.Weight.BOLD)
+        diff_scrolled = Gtk.ScrolledWindow()
+        diff_scrolled.set_hexpand(True)
+        diff_scrolled.set_child(self.diff_view)
+
+        paned = Gtk.Paned(orientation=Gtk.Orientation.HORIZONTAL)
+        paned.set_start_child(versions_scrolled)
+        paned.set_end_child(diff_scrolled)
+        paned.set_resize_start_child(False)
+        paned.set_vexpand(True)
+        toolbar.append(paned)
+
+        self.set_content(toolbar)
+        self.reload()
+
+    def reload(self):
+        """Re-read the version list, e.g. after a restore."""
+        row = self.version_list.get_row_at_index(0)
+        while row is not None:
+            self.version_list.remove(row)
+            row = self.version_list.get_row_at_index(0)
+        try:
+            versions = self.manager.history.versions()
+        except Exception as e:
+            self._show_text(f"Cannot read the history: {e}")
+            return
+
+        if not versions:
+            self._show_text("No versions have been recorded yet.")
+            return
+        for version in reversed(versions):
+            self.version_list.append(self._create_row(version))
+        self.version_list.select_row(self.version_list.get_row_at_index(0))
+
+    def _create_row(self, version: Version) -> Gtk.ListBoxRow:
+        """Create the list row of a version."""
+        when = datetime.fromtimestamp(version.time).strftime("%Y-%m-%d %H:%M:%S")
+        title = Gtk.Label(label=f"#{version.number}  {version.label}")
+        title.set_xalign(0)
+        title.set_ellipsize(Pango.EllipsizeMode.END)
+        subtitle = Gtk.Label(
+            label=f"{when} · {version.user or 'unknown'} · {version.line_count} lines"
+        )
+        subtitle.set_xalign(0)
+        subtitle.add_css_class("dim-label")
+        subtitle.add_css_class("caption")
+
+        box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=2)
+        box.set_margin_top(6)
+        box.set_margin_bottom(6)
+        box.append(title)
+        box.append(subtitle)
+
+        row = Gtk.ListBoxRow()
+        row.set_child(box)
+        row.version = version
+        return row
+
+    def _on_version_selected(self, listbox, row):
+        """Show the diff of the selected version."""
+        self.selected = row.version if row is not None else None
+        latest = self.manager.history.latest()
+        self.restore_button.set_sensitive(
+            self.selected is not None
+            and latest is not None
+            and self.selected.hash != latest.hash
+        )
+        self._show_diff()
+
+    def _on_compare_changed(self, dropdown, param):
+        """Switch between the version's own changes and the current crontab."""
+        self._show_diff()
+
+    def _show_diff(self):
+        """Render the diff of the selected version into the text view."""
+        version = self.selected
+        if version is None:
+            self._show_text("")
+            return
+
+        history = self.manager.history
+        with profiler.span("history.diff", "ui"):
+            try:
+                if self.compare_dropdown.get_selected() == 0:
+                    lines = history.diff(version.number - 1, version.number)
+                else:
+                    latest = history.latest()
+                    lines = history.diff(version.number, latest.number)
+                lines = list(islice(lines, MAX_DIFF_LINES + 1))
+            except Exception as e:
+                self._show_text(f"Cannot compute the diff: {e}")
+                return
+
+        if not lines:
+            self._show_text("No differences.")
+            return
+
+        buffer = self.diff_view.get_buffer()
+        buffer.set_text("")
+        end = buffer.get_end_iter()
+        for line in lines[:MAX_DIFF_LINES]:
+            tag = {"+": "added", "-": "removed", "@": "hunk"}.get(line[:1])
+            if tag:
+                buffer.insert_with_tags_by_name(end, line + "\n", tag)
+            else:
+                buffer.insert(end, line + "\n")
+        if len(lines) > MAX_DIFF_LINES:
+            buffer.insert(end, f"… diff truncated after {MAX_DIFF_LINES} lines\n")
+
+    def _show_text(self, text: str):
+        """Show a plain message instead of a diff."""
+        self.diff_view.get_buffer().set_text(text)
+
+    def _on_restore_clicked(self, button):
+        """Restore the selected version."""
+        if self.selected is not None:
+            self.on_restore(self.selected.number)
+            self.reload()
@@ -4,21 +4,36 @@ Job Dialog - Modal dialog for adding and editing cron jobs.
 
 import gi
 import datetime
+from contextlib import contextmanager
 
 gi.require_version("Gtk", "4.0")
 from gi.repository import Gtk, GLib, Gio
-from typing import Optional, Dict
+from typing import Optional, Dict, List
+from cron_gui.command_check import DEFAULT_PATH
+from cron_gui.command_check_service import CommandCheckService
 from cron_gui.cron_parser import (
     validate_cron_expression,
     get_next_runs,
     build_cron_expression,
+    natural_to_cron,
 )
+from cron_gui.cron_schedule import MACROS, cron_dialect_error
+
+# How long typing must pause before the command is checked, in milliseconds
+CHECK_DELAY_MS = 300
 
 
 class JobDialog(Gtk.Dialog):
     """Dialog for adding or editing a cron job."""
 
-    def __init__(self, parent, job: Optional[Dict] = None):
+    def __init__(
+        self,
+        parent,
+        job: Optional[Dict] = None,
+        env_block: Optional[Dict[str, str]] = None,
+        hosts: Optional[List[str]] = None,
+        checks: Optional[CommandCheckService] = None,
+    ):
         super().__init__(
             title="✨ Edit Job" if job else "✨ Add New Job",
             transient_for=parent,
@@ -26,6 +41,17 @@ class JobDialog(Gtk.Dialog):
         )
 
         self.job = job
+        # Environment lines directly above the job, as read from the crontab
+        self.env_block = dict(env_block or {})
+        # Pre-flight checks of the command, for jobs on this machine
+        self.checks = checks
+        self._check_timer = None
+        # Set while widgets are filled in from an expression, so their change
+        # handlers do not rewrite the expression being shown
+        self._syncing = False
+        # Cron lines of the schedule typed in words, while it is the one shown;
+        # a phrase may need several lines, which are then added as several jobs
+        self._phrase_lines: List[str] = []
         self.set_default_size(550, 600)
         self.set_resizable(True)
 
@@ -42,6 +68,20 @@ class JobDialog(Gtk.Dialog):
         content.set_margin_top(18)
         content.set_margin_bottom(18)
 
+        # ==== HOST SECTION ====
+        # New jobs of a multi-host list need a host; edits stay where they are
+        self.hosts = list(hosts or []) if not job else []
+        self.host_dropdown = None
+        if self.hosts:
+            host_label = Gtk.Label(label="Host")
+            host_label.set_xalign(0)
+            host_label.add_css_class("title-4")
+            host_label.set_margin_bottom(6)
+            self.host_dropdown = Gtk.DropDown.new_from_strings(self.hosts)
+            self.host_dropdown.set_enable_search(True)
+            content.append(host_label)
+            content.append(self.host_dropdown)
+
         # ==== COMMAND SECTION ====
         command_label = Gtk.Label(label="Command")
         command_label.set_xalign(0)
@@ -59,6 +99,7 @@ class JobDialog(Gtk.Dialog):
         self.command_entry.set_hexpand(True)  # Allow entry to expand
         if job:
             self.command_entry.set_text(job["command"])
+        self.command_entry.connect("changed", self._on_command_changed)
 
         # Browse button with icon
         browse_button = Gtk.Button()
@@ -69,8 +110,17 @@ class JobDialog(Gtk.Dialog):
         command_box.append(self.command_entry)
         command_box.append(browse_button)
 
+        # Problems cron would have starting the command; they do not
+        # prevent saving
+        self.check_label = Gtk.Label()
+        self.check_label.set_xalign(0)
+        self.check_label.set_wrap(True)
+        self.check_label.add_css_class("caption")
+        self.check_label.set_visible(False)
+
         content.append(command_label)
         content.append(command_box)
+        content.append(self.check_label)
 
         # Separator
         separator1 = Gtk.Separator(orientation=Gtk.Orientation.HORIZONTAL)
@@ -85,6 +135,33 @@ class JobDialog(Gtk.Dialog):
         schedule_label.set_margin_bottom(12)
         content.append(schedule_label)
 
+        # Schedule in words, compiled as it is typed
+        phrase_label = Gtk.Label(label="In Words")
+        phrase_label.set_xalign(0)
+        phrase_label.add_css_class("dim-label")
+        phrase_label.set_margin_bottom(6)
+
+        self.phrase_entry = Gtk.Entry()
+        self.phrase_entry.set_placeholder_text(
+            "e.g., every 15 minutes on weekdays between 9 and 17"
+        )
+        self.phrase_entry.set_tooltip_text(
+            "Describe the schedule in English, e.g. at 02:30 on the 1st of each "
+            "month or every 2 hours from 8 to 20"
+        )
+        self.phrase_entry.connect("changed", self._on_phrase_changed)
+
+        self.phrase_preview_label = Gtk.Label()
+        self.phrase_preview_label.set_xalign(0)
+        self.phrase_preview_label.set_wrap(True)
+        self.phrase_preview_label.set_selectable(True)
+        self.phrase_preview_label.add_css_class("caption")
+        self.phrase_preview_label.set_visible(False)
+
+        content.append(phrase_label)
+        content.append(self.phrase_entry)
+        content.append(self.phrase_preview_label)
+
         # Recurrence selector with better layout
         recurrence_label = Gtk.Label(label="Recurrence")
         recurrence_label.set_xalign(0)
@@ -231,6 +308,7 @@ class JobDialog(Gtk.Dialog):
             ("Daily midnight", "0 0 * * *"),
             ("Weekly Sun", "0 0 * * 0"),
             ("Monthly 1st", "0 0 1 * *"),
+            ("At startup", "@reboot"),
         ]
 
         for name, expr in presets:
@@ -253,7 +331,10 @@ class JobDialog(Gtk.Dialog):
         self.schedule_entry = Gtk.Entry()
         self.schedule_entry.set_placeholder_text("e.g., 0 */2 * * *")
         self.schedule_entry.set_visible(False)
-        self.schedule_entry.set_tooltip_text("Enter a custom cron expression")
+        self.schedule_entry.set_tooltip_text(
+            "Enter a custom cron expression, e.g. 0 9 * * mon-fri, 0 0 L * *, "
+            "0 12 * * 5#2 or @daily"
+        )
         if job:
             self.schedule_entry.set_text(job["schedule"])
         self.schedule_entry.connect("changed", self._on_schedule_changed)
@@ -294,7 +375,7 @@ class JobDialog(Gtk.Dialog):
         # Day
         self.grid.attach(Gtk.Label(label="Day:", xalign=0), 0, 2, 1, 1)
         self.day_entry = Gtk.Entry()
-        self.day_entry.set_placeholder_text("* or 1-31")
+        self.day_entry.set_placeholder_text("* or 1-31, L, 15W")
         self.day_entry.set_text("*")
         self.day_entry.connect("changed", self._on_builder_changed)
         self.grid.attach(self.day_entry, 1, 2, 1, 1)
@@ -310,11 +391,21 @@ class JobDialog(Gtk.Dialog):
         # Weekday
         self.grid.attach(Gtk.Label(label="Weekday:", xalign=0), 0, 4, 1, 1)
         self.weekday_entry = Gtk.Entry()
-        self.weekday_entry.set_placeholder_text("* or 0-6 (0=Sun)")
+        self.weekday_entry.set_placeholder_text("* or 0-6 (0=Sun), 5L, 1#2")
         self.weekday_entry.set_text("*")
         self.weekday_entry.connect("changed", self._on_builder_changed)
         self.grid.attach(self.weekday_entry, 1, 4, 1, 1)
 
+        # Second (preview only: cron itself has no seconds field)
+        self.grid.attach(Gtk.Label(label="Second:", xalign=0), 0, 5, 1, 1)
+        self.second_entry = Gtk.Entry()
+        self.second_entry.set_placeholder_text("0 (optional)")
+        self.second_entry.set_tooltip_text(
+            "Seconds are shown in the preview only; cron runs jobs at most once a minute"
+        )
+        self.second_entry.connect("changed", self._on_builder_changed)
+        self.grid.attach(self.second_entry, 1, 5, 1, 1)
+
         content.append(self.grid)
 
         # Separator before validation
@@ -353,6 +444,42 @@ class JobDialog(Gtk.Dialog):
         content.append(comment_label)
         content.append(self.comment_entry)
 
+        # Environment block (MAILTO, PATH, SHELL, CRON_TZ, ...)
+        env_label = Gtk.Label(label="Environment (Optional)")
+        env_label.set_xalign(0)
+        env_label.add_css_class("dim-label")
+        env_label.set_margin_top(12)
+        env_label.set_margin_bottom(6)
+
+        self.env_view = Gtk.TextView()
+        self.env_view.set_monospace(True)
+        self.env_view.set_top_margin(6)
+        self.env_view.set_bottom_margin(6)
+        self.env_view.set_left_margin(6)
+        self.env_view.set_right_margin(6)
+        self.env_view.set_tooltip_text(
+            "NAME=value lines written directly above this job, "
+            "e.g. MAILTO=you@example.com or CRON_TZ=Europe/Berlin"
+        )
+        self.env_view.get_buffer().set_text(
+            "\n".join(f"{name}={value}" for name, value in self.env_block.items())
+        )
+        self.env_view.get_buffer().connect("changed", self._on_env_changed)
+
+        env_frame = Gtk.Frame()
+        env_frame.set_child(self.env_view)
+
+        env_hint = Gtk.Label(
+            label="These variables also apply to the jobs below this one."
+        )
+        env_hint.set_xalign(0)
+        env_hint.add_css_class("caption")
+        env_hint.add_css_class("dim-label")
+
+        content.append(env_label)
+        content.append(env_frame)
+        content.append(env_hint)
+
         # Initialize schedule entry with a default value
         if not job:
             self.schedule_entry.set_text("0 0 * * *")  # Daily at midnight
@@ -364,12 +491,22 @@ class JobDialog(Gtk.Dialog):
         # Update UI visibility and validate
         self._update_ui_visibility()
         self._validate_schedule()
+        self._on_command_changed()
 
     def _set_preset(self, expression: str):
         """Set a preset cron expression."""
+        # The schedule entry's change handler fills in the builder and simple UI
         self.schedule_entry.set_text(expression)
-        self._parse_schedule_to_builder(expression)
-        self._sync_simple_from_expression(expression)
+
+    @contextmanager
+    def _syncing_widgets(self):
+        """Suppress expression rebuilding while widgets are filled in."""
+        previous = self._syncing
+        self._syncing = True
+        try:
+            yield
+        finally:
+            self._syncing = previous
 
     def _on_browse_clicked(self, button):
         """Open file chooser dialog to select a command/script."""
@@ -416,68 +553,85 @@ class JobDialog(Gtk.Dialog):
     def _parse_schedule_to_builder(self, schedule: str):
         """Parse schedule into builder fields and simple UI fields."""
         parts = schedule.split()
-        if len(parts) == 5:
-            self.minute_entry.set_text(parts[0])
-            self.hour_entry.set_text(parts[1])
-            self.day_entry.set_text(parts[2])
-            self.month_entry.set_text(parts[3])
-            self.weekday_entry.set_text(parts[4])
-
-            # Update simple UI based on parsed schedule
-            try:
-                minute = int(parts[0])
-                hour = int(parts[1])
-                day = parts[2]
-                month = parts[3]
-                weekday = parts[4]
-
-                self.simple_hour_spin.set_value(hour)
-                self.simple_minute_spin.set_value(minute)
-
-                # Determine recurrence type
-                if day == "*" and month == "*" and weekday == "*":
-                    self.recurrence_combo.set_active(1)  # Daily
-                elif day == "*" and month == "*" and weekday != "*":
-                    self.recurrence_combo.set_active(2)  # Weekly
-                elif day != "*" and month == "*" and weekday == "*":
-                    self.recurrence_combo.set_active(3)  # Monthly
-                elif day != "*" and month != "*" and weekday == "*":
-                    self.recurrence_combo.set_active(4)  # Yearly
-                else:
-                    self.recurrence_combo.set_active(0)  # Once or custom
-
-                # Set calendar date if applicable
-                if day.isdigit() and month.isdigit():
-                    try:
-                        # Gtk.Calendar month is 0-indexed
-                        self.calendar.select_month(
-                            int(month) - 1, self.calendar.get_date().get_year()
-                        )
-                        self.calendar.select_day(int(day))
-                    except Exception:
-                        pass  # Invalid date for calendar
-            except ValueError:
-                pass  # Not a simple numeric schedule
+        macro = parts[0].lower() if len(parts) == 1 else ""
+        if macro in MACROS:
+            # Show what the macro stands for; @reboot has no calendar fields
+            parts = (MACROS[macro] or "").split()
+            self.grid.set_sensitive(macro != "@reboot")
+        else:
+            self.grid.set_sensitive(True)
+        if macro != "@reboot" and len(parts) not in (5, 6):
+            return
+
+        with self._syncing_widgets():
+            entries = (
+                self.minute_entry,
+                self.hour_entry,
+                self.day_entry,
+                self.month_entry,
+                self.weekday_entry,
+            )
+            for entry, value in zip(entries, parts or [""] * 5):
+                entry.set_text(value)
+            self.second_entry.set_text(parts[5] if len(parts) == 6 else "")
+            self._sync_simple_from_expression(schedule)
 
     def _on_builder_changed(self, entry):
         """Handle builder field changes."""
+        if self._syncing:
+            return
         expression = build_cron_expression(
             self.minute_entry.get_text() or "*",
             self.hour_entry.get_text() or "*",
             self.day_entry.get_text() or "*",
             self.month_entry.get_text() or "*",
             self.weekday_entry.get_text() or "*",
+            self.second_entry.get_text().strip(),
         )
-        self.schedule_entry.set_text(expression)
-        self._sync_simple_from_expression(
-            expression
-        )  # Sync simple UI when advanced fields change
+        with self._syncing_widgets():
+            self.schedule_entry.set_text(expression)
+            # Sync simple UI when advanced fields change
+            self._sync_simple_from_expression(expression)
+
+    def _on_phrase_changed(self, entry):
+        """Compile the schedule typed in words and show it."""
+        text = entry.get_text().strip()
+        if not text:
+            self._phrase_lines = []
+            self.phrase_preview_label.set_visible(False)
+            self._validate_schedule()
+            return
+        try:
+            lines = natural_to_cron(text)
+        except ValueError as e:
+            # Keep the last schedule; the phrase may just be half typed
+            self.phrase_preview_label.set_markup(
+                f"<span foreground='orange'>{GLib.markup_escape_text(str(e))}</span>"
+            )
+            self.phrase_preview_label.set_visible(True)
+            return
+
+        self.phrase_preview_label.set_markup(
+            "<tt>" + GLib.markup_escape_text("\n".join(lines)) + "</tt>"
+        )
+        self.phrase_preview_label.set_visible(True)
+        self._phrase_lines = list(lines)
+        if self.schedule_entry.get_text() == lines[0]:
+            self._validate_schedule()
+        else:
+            # Its change handler validates and fills in the other widgets
+            self.schedule_entry.set_text(lines[0])
 
     def _on_schedule_changed(self, entry):
         """Handle schedule entry changes."""
+        if self._phrase_lines and entry.get_text() != self._phrase_lines[0]:
+            # Changed elsewhere; the phrase no longer describes the schedule
+            self._phrase_lines = []
+            self.phrase_preview_label.set_visible(False)
         self._validate_schedule()
-        # Also update simple UI if manual entry changes
-        self._sync_simple_from_expression(entry.get_text())
+        if not self._syncing:
+            # Typed or preset expression: update the builder and simple UI
+            self._parse_schedule_to_builder(entry.get_text())
 
     def _validate_schedule(self):
         """Validate the current schedule."""
@@ -490,20 +644,41 @@ class JobDialog(Gtk.Dialog):
             self.next_runs_label.set_text("")
             return False
 
-        if validate_cron_expression(schedule):
+        if self._parse_env_text() is None:
             self.validation_label.set_markup(
-                "<span foreground='green'>✓ Valid cron expression</span>"
+                "<span foreground='red'>⚠ Environment lines must look like NAME=value</span>"
             )
+            self.next_runs_label.set_text("")
+            return False
 
-            # Show next runs
-            next_runs = get_next_runs(schedule, 3)
-            if next_runs:
-                runs_text = "Next runs:\n" + "\n".join(
-                    f"  • {run}" for run in next_runs
+        if len(self._phrase_lines) > 1:
+            return self._validate_phrase_lines()
+
+        if validate_cron_expression(schedule):
+            # Seconds and L/W/# are previewed but cannot be written to a crontab
+            refused = cron_dialect_error(schedule)
+            if refused:
+                self.validation_label.set_markup(
+                    f"<span foreground='orange'>⚠ {GLib.markup_escape_text(refused)}"
+                    "; change it to save</span>"
                 )
-                self.next_runs_label.set_text(runs_text)
+            else:
+                self.validation_label.set_markup(
+                    "<span foreground='green'>✓ Valid cron expression</span>"
+                )
+
+            # Show next runs
+            if schedule.strip().lower() == "@reboot":
+                self.next_runs_label.set_text("Runs once each time the system starts")
+                return True
+            next_runs = get_next_runs(schedule, 3, self._effective_tz())
+            self.next_runs_label.set_text(
+                "Next runs:\n" + "\n".join(f"  • {run}" for run in next_runs)
+                if next_runs
+                else "Never runs"
+            )
 
-            return True
+            return refused is None
         else:
             self.validation_label.set_markup(
                 "<span foreground='red'>⚠ Invalid cron expression</span>"
@@ -511,6 +686,127 @@ class JobDialog(Gtk.Dialog):
             self.next_runs_label.set_text("")
             return False
 
+    def _validate_phrase_lines(self) -> bool:
+        """Validate a schedule in words that needs several cron lines."""
+        count = len(self._phrase_lines)
+        if self.job:
+            self.validation_label.set_markup(
+                f"<span foreground='red'>⚠ This needs {count} cron lines; "
+                "an edited job keeps one</span>"
+            )
+            self.next_runs_label.set_text("")
+            return False
+
+        self.validation_label.set_markup(
+            f"<span foreground='green'>✓ Valid; adds {count} jobs with "
+            "these lines</span>"
+        )
+        # The lines run at different times; show the first runs of all
+        tz = self._effective_tz()
+        next_runs = sorted(
+            {run for line in self._phrase_lines for run in get_next_runs(line, 3, tz)}
+        )[:3]
+        self.next_runs_label.set_text(
+            "Next runs:\n" + "\n".join(f"  • {run}" for run in next_runs)
+            if next_runs
+            else "Never runs"
+        )
+        return True
+
+    def _parse_env_text(self) -> Optional[Dict[str, str]]:
+        """
+        Parse the environment editor.
+
+        Returns:
+            Variables in order, or None if a line is not NAME=value
+        """
+        buffer = self.env_view.get_buffer()
+        text = buffer.get_text(buffer.get_start_iter(), buffer.get_end_iter(), False)
+        env = {}
+        for line in text.splitlines():
+            line = line.strip()
+            if not line:
+                continue
+            name, sep, value = line.partition("=")
+            name = name.strip()
+            if not sep or not name.isidentifier():
+                return None
+            value = value.strip()
+            if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'":
+                value = value[1:-1]
+            env[name] = value
+        return env
+
+    def _effective_tz(self) -> Optional[str]:
+        """Get the CRON_TZ the schedule will be evaluated in."""
+        env = self._parse_env_text() or {}
+        if "CRON_TZ" in env:
+            return env["CRON_TZ"] or None
+        if "CRON_TZ" in self.env_block or not self.job:
+            # Removed from this job's block (or a new job): no inherited value known
+            return None
+        return (self.job.get("env") or {}).get("CRON_TZ")
+
+    def _on_env_changed(self, buffer):
+        """Handle environment editor changes."""
+        self._validate_schedule()
+        # PATH and HOME decide where the command is found
+        self._on_command_changed()
+
+    def _effective_env(self, name: str) -> Optional[str]:
+        """Get the value a variable will have for the job, if known."""
+        env = self._parse_env_text() or {}
+        if name in env:
+            return env[name]
+        if name in self.env_block or not self.job:
+            return None
+        return (self.job.get("env") or {}).get(name)
+
+    def _on_command_changed(self, entry=None):
+        """Check the command once typing pauses."""
+        if self.checks is None:
+            return
+        if self._check_timer is not None:
+            GLib.source_remove(self._check_timer)
+        self._check_timer = GLib.timeout_add(CHECK_DELAY_MS, self._check_command)
+
+    def _check_command(self) -> bool:
+        """Check the command in the background."""
+        self._check_timer = None
+        command = self.command_entry.get_text().strip()
+        if not command:
+            self.check_label.set_visible(False)
+            return GLib.SOURCE_REMOVE
+
+        key = (
+            command,
+            self._effective_env("PATH") or DEFAULT_PATH,
+            self._effective_env("HOME") or "",
+        )
+
+        def on_checked(results: Dict):
+            # Ignore results for a command that has been edited since
+            if self.command_entry.get_text().strip() == command:
+                self._show_check_results(results[key])
+
+        self.checks.check([key], on_checked)
+        return GLib.SOURCE_REMOVE
+
+    def _show_check_results(self, findings):
+        """Show what the command check found."""
+        self.check_label.set_visible(True)
+        if not findings:
+            self.check_label.set_markup(
+                "<span foreground='green'>✓ Command found</span>"
+            )
+            return
+        lines = []
+        for finding in findings:
+            color = "red" if finding.severity == "error" else "orange"
+            text = GLib.markup_escape_text(finding.message)
+            lines.append(f"<span foreground='{color}'>⚠ {text}</span>")
+        self.check_label.set_markup("\n".join(lines))
+
     def _update_ui_visibility(self):
         """Update visibility of UI elements based on recurrence type."""
         recurrence_idx = self.recurrence_combo.get_active()
@@ -544,6 +840,8 @@ class JobDialog(Gtk.Dialog):
         """Handle changes in simple UI elements (recurrence, time, date)."""
         # Update UI visibility first
         self._update_ui_visibility()
+        if self._syncing:
+            return
 
         recurrence_idx = self.recurrence_combo.get_active()
         hour = int(self.simple_hour_spin.get_value())
@@ -571,18 +869,19 @@ class JobDialog(Gtk.Dialog):
         else:
             expression = "* * * * *"
 
-        # Update the schedule entry
+        # Update the schedule entry; its handler fills in the builder
         self.schedule_entry.set_text(expression)
-        self._validate_schedule()
 
     def _sync_simple_from_expression(self, expression: str):
-        """Sync simple UI elements from a cron expression."""
+        """Sync simple UI elements from a cron expression, without rebuilding it."""
         parts = expression.split()
-        if len(parts) != 5:
+        if len(parts) == 1 and MACROS.get(parts[0].lower()):
+            parts = MACROS[parts[0].lower()].split()
+        if len(parts) not in (5, 6):
             return
 
         try:
-            minute_part, hour_part, day_part, month_part, weekday_part = parts
+            minute_part, hour_part, day_part, month_part, weekday_part = parts[:5]
 
             # Update time spinners if they're numeric
             if minute_part.isdigit():
@@ -640,7 +939,9 @@ class JobDialog(Gtk.Dialog):
         Get the job data from the dialog.
 
         Returns:
-            Dictionary with command, schedule, and comment, or None if invalid
+            Dictionary with command, schedule, comment and env (plus host
+            when the dialog offered hosts, and schedules when a schedule in
+            words needs several cron lines), or None if invalid
         """
         command = self.command_entry.get_text().strip()
         schedule = self.schedule_entry.get_text().strip()
@@ -652,4 +953,19 @@ class JobDialog(Gtk.Dialog):
         if not self._validate_schedule():
             return None
 
-        return {"command": command, "schedule": schedule, "comment": comment}
+        env = self._parse_env_text()
+        if env is None:
+            return None
+
+        data = {
+            "command": command,
+            "schedule": schedule,
+            "comment": comment,
+            # None means the environment block was left unchanged
+            "env": env if env != self.env_block else None,
+        }
+        if self.host_dropdown is not None:
+            data["host"] = self.hosts[self.host_dropdown.get_selected()]
+        if len(self._phrase_lines) > 1:
+            data["schedules"] = list(self._phrase_lines)
+        return data
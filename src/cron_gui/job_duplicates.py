@@ -0,0 +1,323 @@
+"""
+Job Duplicates - Find copies of the same job and suggest how to merge them.
+
+Jobs of one crontab are grouped three ways:
+
+- identical jobs have the same command and a schedule that normalizes to
+  the same form (see cron_schedule.normalize_schedule);
+- jobs with the same command but different schedules can often be merged
+  into one job, when the schedules differ in a single field;
+- jobs with near-identical commands, e.g. the same script with another
+  argument, are found with MinHash signatures over token shingles of the
+  commands. Locality-sensitive hashing of the signatures puts similar
+  commands into a shared bucket, so only commands sharing a bucket are
+  compared and the search stays far from quadratic on 100,000 jobs.
+
+Signatures are computed once per distinct command and the permuted hashes
+once per distinct shingle, which most commands of a crontab share.
+"""
+
+import random
+import re
+from collections import Counter
+from itertools import chain, repeat
+from operator import xor
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+from cron_gui.cron_schedule import (
+    SPECIAL_KINDS,
+    compile_schedule,
+    normalize_schedule,
+    parse_field_items,
+)
+from cron_gui.profiling import profiled
+
+# Kinds of duplicate groups
+IDENTICAL = "identical"
+SAME_COMMAND = "same-command"
+SIMILAR = "similar"
+
+# Shingle overlap (Jaccard similarity) of commands reported as similar
+SIMILARITY = 0.7
+
+# MinHash signature length, split into LSH bands of BAND_ROWS values; with
+# 8 bands of 4 rows, commands 70% alike share a bucket 89% of the time
+NUM_PERMUTATIONS = 32
+BAND_ROWS = 4
+
+# Shingles found in more than this share of the commands (and in at least
+# COMMON_SHINGLE_MIN of them), such as "bin run", are left out of the
+# signatures; they would put most commands into the same few buckets
+COMMON_SHINGLE_SHARE = 0.01
+COMMON_SHINGLE_MIN = 50
+
+# Most earlier commands of a bucket each command is compared with, so a
+# bucket of thousands of generic commands cannot make the search quadratic
+MAX_BUCKET_COMPARISONS = 50
+
+_HASH_MASK = (1 << 61) - 1
+
+# Each signature value is the smallest shingle hash XORed with its own
+# random mask, which estimates overlap as well as true permutations and
+# needs no Python arithmetic per value
+_rng = random.Random(651)
+_MASKS = [_rng.getrandbits(61) for _ in range(NUM_PERMUTATIONS)]
+del _rng
+
+# Words of a command; paths and options are split so "/opt/app/run --x=1"
+# and "/opt/api/run --x=1" share most of their shingles
+_TOKEN = re.compile(r"[^\s/=:,;|&<>'\"()]+")
+
+Shingle = Tuple[str, ...]
+Signature = Tuple[int, ...]
+
+
+class DuplicateGroup(NamedTuple):
+    """
+    Jobs of one crontab that repeat each other.
+
+    Attributes:
+        kind: IDENTICAL, SAME_COMMAND or SIMILAR
+        job_ids: Ids of the jobs, in crontab order
+        schedule: For SAME_COMMAND, one schedule covering all of the jobs'
+            runs if there is one
+        similarity: Lowest shingle overlap of two similar commands, 1.0
+            for the other kinds
+    """
+
+    kind: str
+    job_ids: List[int]
+    schedule: Optional[str] = None
+    similarity: float = 1.0
+
+
+def command_shingles(command: str) -> Set[Shingle]:
+    """
+    Split a command into overlapping pairs of words.
+
+    Args:
+        command: Shell command
+
+    Returns:
+        Shingles; a one-word command is its only shingle
+    """
+    tokens = _TOKEN.findall(command)
+    if len(tokens) < 2:
+        return {tuple(tokens)}
+    return set(zip(tokens, tokens[1:]))
+
+
+def jaccard(first: Set, second: Set) -> float:
+    """Get the share of elements two sets have in common."""
+    if not first and not second:
+        return 1.0
+    common = len(first & second)
+    return common / (len(first) + len(second) - common)
+
+
+def merge_schedules(schedules: Sequence[str]) -> Optional[str]:
+    """
+    Find one schedule that runs whenever any of several schedules runs.
+
+    That is only possible when the schedules differ in a single field,
+    whose values are then combined.
+
+    Args:
+        schedules: Normalized schedules, see cron_schedule.normalize_schedule
+
+    Returns:
+        Normalized merged schedule, or None if the schedules cannot be
+        merged
+    """
+    fields = [schedule.split() for schedule in schedules]
+    if any(len(parts) != len(fields[0]) for parts in fields) or any(
+        schedule.startswith("@") for schedule in schedules
+    ):
+        return None
+    differing = [
+        idx for idx in range(len(fields[0])) if len({f[idx] for f in fields}) > 1
+    ]
+    if len(differing) != 1:
+        return None
+
+    field = differing[0]
+    values = list(dict.fromkeys(parts[field] for parts in fields))
+    if field in (2, 4):
+        # A starred day field changes how cron combines the day fields,
+        # and L/W/# items cannot be listed with others reliably
+        if any(
+            value.startswith(("*", "?"))
+            or any(item[0] in SPECIAL_KINDS for item in parse_field_items(value, field))
+            for value in values
+        ):
+            return None
+        merged = ",".join(values)
+    elif "*" in values:
+        merged = "*"
+    else:
+        merged = ",".join(values)
+
+    parts = list(fields[0])
+    parts[field] = merged
+    try:
+        compile_schedule(" ".join(parts))
+    except ValueError:
+        return None
+    return normalize_schedule(" ".join(parts))
+
+
+class _DisjointSets:
+    """Union-find over the integers 0..size-1."""
+
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+
+    def find(self, item: int) -> int:
+        parent = self.parent
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    def union(self, first: int, second: int):
+        first, second = self.find(first), self.find(second)
+        if first != second:
+            self.parent[max(first, second)] = min(first, second)
+
+
+class _Signer:
+    """Computes MinHash signatures, caching the hashes of every shingle."""
+
+    def __init__(self):
+        self._hashes: Dict[Shingle, Tuple[int, ...]] = {}
+
+    def signature(self, shingles: Iterable[Shingle]) -> Signature:
+        """Get the MinHash signature of a set of shingles."""
+        hashes = self._hashes
+        columns = []
+        for shingle in shingles:
+            values = hashes.get(shingle)
+            if values is None:
+                base = hash(shingle) & _HASH_MASK
+                values = hashes[shingle] = tuple(
+                    map(xor, repeat(base, NUM_PERMUTATIONS), _MASKS)
+                )
+            columns.append(values)
+        return tuple(map(min, zip(*columns)))
+
+
+def _similar_commands(
+    commands: List[str], threshold: float, signer: _Signer
+) -> List[Tuple[List[int], float]]:
+    """
+    Cluster near-identical commands.
+
+    Args:
+        commands: Distinct commands of one crontab
+        threshold: Lowest shingle overlap of similar commands
+        signer: Signer whose shingle hashes are reused across crontabs
+
+    Returns:
+        (indexes into commands, lowest overlap) of every cluster
+    """
+    shingles = [command_shingles(command) for command in commands]
+    counts = Counter(chain.from_iterable(shingles))
+    limit = max(COMMON_SHINGLE_MIN, len(commands) * COMMON_SHINGLE_SHARE)
+    common = {shingle for shingle, count in counts.items() if count > limit}
+    signatures = [signer.signature((s - common) or s) for s in shingles]
+
+    sets = _DisjointSets(len(commands))
+    overlaps: Dict[int, float] = {}
+    tested: Set[Tuple[int, int]] = set()
+    for start in range(0, NUM_PERMUTATIONS, BAND_ROWS):
+        # Most buckets hold one command; lists are only made for the others
+        first: Dict[Tuple, int] = {}
+        shared: Dict[Tuple, List[int]] = {}
+        for idx, band in enumerate([s[start : start + BAND_ROWS] for s in signatures]):
+            other = first.setdefault(band, idx)
+            if other != idx:
+                shared.setdefault(band, [other]).append(idx)
+
+        for bucket in shared.values():
+            for position in range(1, len(bucket)):
+                idx = bucket[position]
+                earliest = max(0, position - MAX_BUCKET_COMPARISONS)
+                for other in bucket[earliest:position]:
+                    if (other, idx) in tested or sets.find(other) == sets.find(idx):
+                        continue
+                    tested.add((other, idx))
+                    overlap = jaccard(shingles[other], shingles[idx])
+                    if overlap >= threshold:
+                        sets.union(other, idx)
+                        overlaps[idx] = min(overlap, overlaps.get(idx, 1.0))
+                        overlaps[other] = min(overlap, overlaps.get(other, 1.0))
+
+    clusters: Dict[int, List[int]] = {}
+    for idx in overlaps:
+        clusters.setdefault(sets.find(idx), []).append(idx)
+    return [
+        (sorted(members), min(overlaps[idx] for idx in members))
+        for members in clusters.values()
+        if len(members) > 1
+    ]
+
+
+@profiled("duplicates.find", "manager")
+def find_duplicates(
+    jobs: Sequence[Dict], threshold: float = SIMILARITY
+) -> List[DuplicateGroup]:
+    """
+    Find enabled jobs that repeat each other.
+
+    Args:
+        jobs: Job dictionaries as CronManager.list_jobs returns them
+        threshold: Lowest shingle overlap of commands reported as similar;
+            1.0 to only report jobs with the same command
+
+    Returns:
+        Groups ordered by their first job. A job is in at most one
+        IDENTICAL or SAME_COMMAND group, and in at most one SIMILAR group,
+        where its command is represented by its first job
+    """
+    normalized: Dict[str, str] = {}
+    # Crontab -> command -> normalized schedule -> job ids; the jobs of
+    # several crontabs are never duplicates of each other
+    crontabs: Dict[Optional[str], Dict[str, Dict[str, List[int]]]] = {}
+    for job in jobs:
+        if not job["enabled"] or not job.get("valid", True):
+            continue
+        schedule = normalized.get(job["schedule"])
+        if schedule is None:
+            schedule = normalized[job["schedule"]] = normalize_schedule(
+                job["schedule"]
+            )
+        commands = crontabs.setdefault(job.get("source"), {})
+        commands.setdefault(job["command"], {}).setdefault(schedule, []).append(
+            job["id"]
+        )
+
+    groups: List[DuplicateGroup] = []
+    signer = _Signer()
+    for commands in crontabs.values():
+        for schedules in commands.values():
+            if len(schedules) > 1:
+                job_ids = sorted(chain.from_iterable(schedules.values()))
+                schedule = merge_schedules(list(schedules))
+                groups.append(DuplicateGroup(SAME_COMMAND, job_ids, schedule))
+            else:
+                (job_ids,) = schedules.values()
+                if len(job_ids) > 1:
+                    groups.append(DuplicateGroup(IDENTICAL, job_ids))
+
+        if threshold < 1.0 and len(commands) > 1:
+            # Each command is represented by its first job
+            names = list(commands)
+            for members, overlap in _similar_commands(names, threshold, signer):
+                job_ids = sorted(
+                    min(job_ids[0] for job_ids in commands[names[idx]].values())
+                    for idx in members
+                )
+                groups.append(DuplicateGroup(SIMILAR, job_ids, None, overlap))
+
+    groups.sort(key=lambda group: (group.job_ids[0], group.kind))
+    return groups
@@ -1,71 +1,293 @@
 """
-Job List - GTK4 ListBox for displaying cron jobs.
+Job List - GTK4 ListView for displaying cron jobs.
+
+Jobs live in a Gio.ListStore of JobItem objects, ordered by a
+Gtk.SortListModel, filtered by a Gtk.FilterListModel and shown through a
+Gtk.MultiSelection. Row widgets are recycled by the ListView, so only the
+visible rows are ever bound, and changes to a few jobs update just those
+items instead of rebuilding the list.
+
+Sorting compares a precomputed integer rank per item in C (see job_sort for
+the cached keys the ranks come from), so reordering never touches widgets.
+
+The "runs in 3m 12s" countdowns of all rows share one CountdownClock. Only
+bound rows are tracked, each is woken only when its text would change, and
+the clock stops while the list is not mapped.
+
+Every job is linted (see crontab_lint) when the list changes and its
+findings are shown as badges; findings are cached per job, so an edit only
+lints the jobs it changed. Commands of local crontabs are also checked on
+a worker thread (see command_check_service), and their findings join the
+badges when they arrive.
 """
 
 import gi
 
 gi.require_version("Gtk", "4.0")
-from gi.repository import Gtk, GLib
-from typing import List, Dict, Callable
-
-
-class JobRow(Gtk.ListBoxRow):
-    """Custom row widget for displaying a single cron job."""
+from gi.repository import Gtk, GLib, Gio, GObject, Pango
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+import time
+
+from cron_gui.command_check import check_key
+from cron_gui.command_check_service import CommandCheckService
+from cron_gui.cron_parser import cron_to_human_readable
+from cron_gui.crontab_document import CRON_ENV_VARS
+from cron_gui.crontab_lint import (
+    SEVERITY_ERROR,
+    SEVERITY_INFO,
+    SEVERITY_WARNING,
+    CrontabLinter,
+    LintFinding,
+)
+from cron_gui.job_sort import (
+    GROUP_FIELDS,
+    NEVER,
+    SORT_FIELDS,
+    JobKeys,
+    NextRunQueue,
+    countdown,
+    matches_search,
+    rank_jobs,
+)
+from cron_gui.profiling import profiled, profiler
+
+# Group headers need list sections, added in GTK 4.12
+HAS_SECTIONS = hasattr(Gtk.ListView, "set_header_factory")
+
+# Lint badges: severity, icon and style class
+BADGES = (
+    (SEVERITY_ERROR, "⛔", "error"),
+    (SEVERITY_WARNING, "⚠", "warning"),
+    (SEVERITY_INFO, "ℹ", "dim-label"),
+)
+
+# What makes two job dictionaries the same job, apart from their ids
+_JOB_FIELDS = ("command", "schedule", "comment", "enabled", "valid", "env", "host")
+
+
+def _same_job(old: Dict, new: Dict) -> bool:
+    """Check whether two job dictionaries describe the same job."""
+    return all(old.get(field) == new.get(field) for field in _JOB_FIELDS)
+
+
+class JobItem(GObject.Object):
+    """A job in the list model."""
+
+    __gtype_name__ = "CronGuiJobItem"
+
+    __gsignals__ = {
+        # Emitted after the job dictionary was replaced
+        "changed": (GObject.SignalFlags.RUN_FIRST, None, ()),
+    }
+
+    # Position in the current sort order and index of the item's group
+    rank = GObject.Property(type=int, default=0)
+    group_rank = GObject.Property(type=int, default=0)
+
+    def __init__(self, job: Dict):
+        super().__init__()
+        self.job = job
+        self.keys = JobKeys(job)
+        self.group_label = ""
+        # Lint findings of the job, and pre-flight findings of its command,
+        # which arrive later
+        self.findings: Tuple[LintFinding, ...] = ()
+        self.checks: Tuple[LintFinding, ...] = ()
+
+    def set_job(self, job: Dict):
+        """Replace the job and notify bound rows."""
+        self.job = job
+        self.keys = JobKeys(job)
+        self.emit("changed")
+
+
+class CountdownClock:
+    """
+    One shared timer for the next-run countdowns of all bound rows.
+
+    Rows are kept in a heap by the time their text next changes, so a tick
+    refreshes only the rows that are due instead of every row every second.
+    """
+
+    def __init__(self):
+        self._rows: Set["JobRow"] = set()
+        self._queue = NextRunQueue()
+        self._timer: Optional[int] = None
+        self._timer_deadline: Optional[float] = None
+        self._paused = False
+
+    def track(self, row: "JobRow", now: Optional[float] = None):
+        """Refresh a row's countdown and wake up when it next changes."""
+        if now is None:
+            now = time.time()
+        self._rows.add(row)
+        deadline = row.update_countdown(now)
+        if deadline is None:
+            return
+        if len(self._queue) > 2 * len(self._rows) + 64:
+            # Drop entries left behind by recycled rows
+            self._queue.rebuild(
+                [
+                    (tracked.countdown_deadline, (tracked, tracked.countdown_deadline))
+                    for tracked in self._rows
+                    if tracked.countdown_deadline is not None
+                ]
+            )
+        else:
+            self._queue.push(deadline, (row, deadline))
+        self._schedule()
+
+    def untrack(self, row: "JobRow"):
+        """Stop refreshing a row; its queued entries become stale."""
+        self._rows.discard(row)
+        row.countdown_deadline = None
+
+    def pause(self):
+        """Stop ticking, e.g. while the list is not shown."""
+        self._paused = True
+        self._cancel()
+
+    def resume(self):
+        """Start ticking again; overdue rows are refreshed right away."""
+        self._paused = False
+        self._schedule()
+
+    def _schedule(self):
+        """Make sure the timer fires at the earliest deadline."""
+        deadline = self._queue.deadline()
+        if self._paused or deadline is None:
+            return
+        if self._timer is not None:
+            if self._timer_deadline <= deadline:
+                return
+            self._cancel()
+        delay_ms = max(0, int((deadline - time.time()) * 1000) + 1)
+        self._timer_deadline = deadline
+        self._timer = GLib.timeout_add(delay_ms, self._on_tick)
+
+    def _cancel(self):
+        """Remove a pending tick."""
+        if self._timer is not None:
+            GLib.source_remove(self._timer)
+            self._timer = None
+            self._timer_deadline = None
+
+    def _on_tick(self):
+        """Refresh the rows whose countdown text has changed."""
+        self._timer = None
+        self._timer_deadline = None
+        now = time.time()
+        with profiler.span("list.countdown", "ui"):
+            for row, deadline in self._queue.pop_due(now):
+                # Skip entries of rows that were rebound or refreshed since
+                if row in self._rows and row.countdown_deadline == deadline:
+                    self.track(row, now)
+        self._schedule()
+        return GLib.SOURCE_REMOVE
+
+
+class JobRow(Gtk.Box):
+    """Custom row widget for displaying a single cron job, recycled across items."""
 
     def __init__(
-        self, job: Dict, on_edit: Callable, on_delete: Callable, on_toggle: Callable
+        self,
+        on_edit: Callable,
+        on_delete: Callable,
+        on_toggle: Callable,
+        clock: Optional[CountdownClock] = None,
+        show_host: bool = False,
+        read_only: bool = False,
     ):
-        super().__init__()
+        super().__init__(orientation=Gtk.Orientation.HORIZONTAL, spacing=12)
 
-        self.job = job
+        self.item: Optional[JobItem] = None
         self.on_edit = on_edit
         self.on_delete = on_delete
         self.on_toggle = on_toggle
+        self.clock = clock
+        # When the countdown text next changes; None if it is not shown
+        self.countdown_deadline: Optional[float] = None
+        self._changed_handler = None
+        # Set while widgets are filled in, so the switch does not report it
+        self._updating = False
 
         # Main horizontal box
-        hbox = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=12)
-        hbox.set_margin_start(12)
-        hbox.set_margin_end(12)
-        hbox.set_margin_top(8)
-        hbox.set_margin_bottom(8)
+        self.set_margin_start(12)
+        self.set_margin_end(12)
+        self.set_margin_top(8)
+        self.set_margin_bottom(8)
 
         # Left side - job info
         vbox = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=4)
         vbox.set_hexpand(True)
 
+        # Comment label if exists
+        self.comment_label = Gtk.Label()
+        self.comment_label.set_xalign(0)
+        self.comment_label.add_css_class("caption")
+
         # Command label (bold)
-        command_label = Gtk.Label(label=job["command"])
-        command_label.set_xalign(0)
-        command_label.set_wrap(True)
-        command_label.add_css_class("heading")
+        self.command_label = Gtk.Label()
+        self.command_label.set_xalign(0)
+        self.command_label.set_wrap(True)
+        self.command_label.add_css_class("heading")
 
         # Schedule label (smaller, gray)
-        from cron_gui.cron_parser import cron_to_human_readable
-
-        schedule_text = f"{job['schedule']} - {cron_to_human_readable(job['schedule'])}"
-        schedule_label = Gtk.Label(label=schedule_text)
-        schedule_label.set_xalign(0)
-        schedule_label.add_css_class("dim-label")
-        schedule_label.add_css_class("caption")
-
-        # Comment label if exists
-        if job["comment"]:
-            comment_label = Gtk.Label(label=f"💬 {job['comment']}")
-            comment_label.set_xalign(0)
-            comment_label.add_css_class("caption")
-            vbox.append(comment_label)
-
-        vbox.append(command_label)
-        vbox.append(schedule_label)
+        self.schedule_label = Gtk.Label()
+        self.schedule_label.set_xalign(0)
+        self.schedule_label.add_css_class("dim-label")
+        self.schedule_label.add_css_class("caption")
+
+        # Environment that changes how cron runs this job
+        self.env_label = Gtk.Label()
+        self.env_label.set_xalign(0)
+        self.env_label.set_ellipsize(Pango.EllipsizeMode.END)
+        self.env_label.add_css_class("dim-label")
+        self.env_label.add_css_class("caption")
+
+        # Live countdown to the next run
+        self.next_run_label = Gtk.Label()
+        self.next_run_label.set_xalign(0)
+        self.next_run_label.add_css_class("dim-label")
+        self.next_run_label.add_css_class("caption")
+        self.next_run_label.add_css_class("numeric")
+        self.next_run_label.set_visible(False)
+
+        # Lint findings, one badge per severity
+        self.badge_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=6)
+        self.badges: Dict[str, Gtk.Label] = {}
+        for severity, icon, css_class in BADGES:
+            badge = Gtk.Label()
+            badge.set_ellipsize(Pango.EllipsizeMode.END)
+            badge.add_css_class("caption")
+            badge.add_css_class(css_class)
+            self.badge_box.append(badge)
+            self.badges[severity] = badge
+
+        vbox.append(self.comment_label)
+        vbox.append(self.command_label)
+        vbox.append(self.schedule_label)
+        vbox.append(self.badge_box)
+        vbox.append(self.next_run_label)
+        vbox.append(self.env_label)
+
+        # Host column, when jobs of several hosts are listed
+        self.host_label = Gtk.Label()
+        self.host_label.set_xalign(0)
+        self.host_label.set_width_chars(16)
+        self.host_label.set_max_width_chars(16)
+        self.host_label.set_ellipsize(Pango.EllipsizeMode.MIDDLE)
+        self.host_label.add_css_class("dim-label")
+        self.host_label.add_css_class("monospace")
+        self.host_label.set_visible(show_host)
 
         # Right side - action buttons
         action_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=6)
 
         # Enable/Disable switch
-        toggle_switch = Gtk.Switch()
-        toggle_switch.set_active(job["enabled"])
-        toggle_switch.set_valign(Gtk.Align.CENTER)
-        toggle_switch.connect("state-set", self._on_toggle_clicked)
+        self.toggle_switch = Gtk.Switch()
+        self.toggle_switch.set_valign(Gtk.Align.CENTER)
+        self.toggle_switch.connect("state-set", self._on_toggle_clicked)
 
         # Edit button
         edit_button = Gtk.Button(icon_name="document-edit-symbolic")
@@ -80,14 +302,106 @@ class JobRow(Gtk.ListBoxRow):
         delete_button.add_css_class("destructive-action")
         delete_button.connect("clicked", self._on_delete_clicked)
 
-        action_box.append(toggle_switch)
+        action_box.append(self.toggle_switch)
         action_box.append(edit_button)
         action_box.append(delete_button)
+        action_box.set_visible(not read_only)
+
+        self.append(self.host_label)
+        self.append(vbox)
+        self.append(action_box)
+
+    @property
+    def job(self) -> Dict:
+        """The job currently shown by the row."""
+        return self.item.job
+
+    def bind(self, item: JobItem):
+        """Show an item and follow its changes."""
+        self.item = item
+        self._changed_handler = item.connect("changed", self._on_item_changed)
+        self._update()
+
+    def unbind(self):
+        """Stop showing the current item."""
+        if self.item is not None and self._changed_handler is not None:
+            self.item.disconnect(self._changed_handler)
+        if self.clock is not None:
+            self.clock.untrack(self)
+        self.item = None
+        self._changed_handler = None
+
+    def _on_item_changed(self, item):
+        """Re-render after the item's job was replaced."""
+        self._update()
+
+    def update_countdown(self, now: float) -> Optional[float]:
+        """
+        Show the time until the job's next run.
 
-        hbox.append(vbox)
-        hbox.append(action_box)
+        Args:
+            now: Current UTC timestamp
 
-        self.set_child(hbox)
+        Returns:
+            When the text next changes, or None if there is no next run
+        """
+        next_run = self.item.keys.next_run(now) if self.item is not None else NEVER
+        if next_run == NEVER:
+            self.next_run_label.set_visible(False)
+            self.countdown_deadline = None
+            return None
+
+        text, self.countdown_deadline = countdown(next_run, now)
+        self.next_run_label.set_label(f"⏱ runs in {text}")
+        self.next_run_label.set_visible(True)
+        return self.countdown_deadline
+
+    def _update(self):
+        """Fill the widgets in from the current job."""
+        job = self.job
+        self._updating = True
+        try:
+            self.command_label.set_label(job["command"])
+            if self.host_label.get_visible():
+                host = job.get("host") or ""
+                self.host_label.set_label(host)
+                self.host_label.set_tooltip_text(job.get("source") or host)
+            self.schedule_label.set_label(
+                f"{job['schedule']} - {cron_to_human_readable(job['schedule'])}"
+            )
+
+            comment = job["comment"]
+            self.comment_label.set_label(f"💬 {comment}" if comment else "")
+            self.comment_label.set_visible(bool(comment))
+
+            env = job.get("env") or {}
+            env_text = "  ".join(
+                f"{name}={env[name]}" for name in CRON_ENV_VARS if name in env
+            )
+            self.env_label.set_label(f"⚙ {env_text}" if env_text else "")
+            self.env_label.set_tooltip_text(
+                "\n".join(f"{name}={value}" for name, value in env.items()) or None
+            )
+            self.env_label.set_visible(bool(env_text))
+
+            self._update_badges(self.item.findings + self.item.checks)
+            self.toggle_switch.set_active(job["enabled"])
+        finally:
+            self._updating = False
+
+        if self.clock is not None:
+            self.clock.track(self)
+
+    def _update_badges(self, findings: Tuple[LintFinding, ...]):
+        """Show the lint findings, grouped by severity."""
+        for severity, icon, css_class in BADGES:
+            badge = self.badges[severity]
+            found = [finding for finding in findings if finding.severity == severity]
+            badge.set_visible(bool(found))
+            if found:
+                badge.set_label(f"{icon} " + ", ".join(f.rule for f in found))
+                badge.set_tooltip_text("\n".join(f.message for f in found))
+        self.badge_box.set_visible(bool(findings))
 
     def _on_edit_clicked(self, button):
         """Handle edit button click."""
@@ -99,27 +413,94 @@ class JobRow(Gtk.ListBoxRow):
 
     def _on_toggle_clicked(self, switch, state):
         """Handle toggle switch change."""
-        self.on_toggle(self.job, state)
+        if not self._updating and self.item is not None:
+            self.on_toggle(self.job, state)
         return False
 
 
-class JobListView(Gtk.ScrolledWindow):
-    """Scrollable list view for displaying cron jobs."""
+class JobListView(Gtk.Box):
+    """Scrollable, multi-selectable list view for displaying cron jobs."""
 
-    def __init__(self, on_edit: Callable, on_delete: Callable, on_toggle: Callable):
-        super().__init__()
+    def __init__(
+        self,
+        on_edit: Callable,
+        on_delete: Callable,
+        on_toggle: Callable,
+        on_bulk_action: Optional[Callable] = None,
+        show_hosts: bool = False,
+        checks: Optional[CommandCheckService] = None,
+        read_only: bool = False,
+    ):
+        """
+        Initialize the view.
+
+        Args:
+            on_edit: Called with a job to edit it
+            on_delete: Called with a job to delete it
+            on_toggle: Called with a job and the requested enabled state
+            on_bulk_action: Called with an action name ("enable", "disable",
+                "retag", "reschedule" or "delete") and the selected jobs
+            show_hosts: Show the host of each job, for lists that span hosts
+            checks: Service checking commands in the background; None for
+                jobs whose files are not on this machine
+            read_only: Hide the buttons that edit a job, for crontabs that
+                can only be viewed
+        """
+        super().__init__(orientation=Gtk.Orientation.VERTICAL)
 
         self.on_edit = on_edit
         self.on_delete = on_delete
         self.on_toggle = on_toggle
+        self.on_bulk_action = on_bulk_action
+        self.show_hosts = show_hosts
+        self.read_only = read_only
 
         self.set_vexpand(True)
         self.set_hexpand(True)
 
-        # Create ListBox
-        self.listbox = Gtk.ListBox()
-        self.listbox.set_selection_mode(Gtk.SelectionMode.NONE)
-        self.listbox.add_css_class("boxed-list")
+        # Model: store -> sort -> filter -> multi selection
+        self._items: List[JobItem] = []
+        self.linter = CrontabLinter()
+        self.checks = checks
+        if checks is not None:
+            checks.connect_changed(self._check_commands)
+        self.store = Gio.ListStore(item_type=JobItem)
+        self.sorter = Gtk.NumericSorter.new(
+            Gtk.PropertyExpression.new(JobItem, None, "rank")
+        )
+        self.section_sorter = Gtk.NumericSorter.new(
+            Gtk.PropertyExpression.new(JobItem, None, "group-rank")
+        )
+        # No sorter while the list is in file order
+        self.sort_model = Gtk.SortListModel.new(self.store, None)
+        self.filter = Gtk.CustomFilter.new(self._filter_func)
+        self.filter_model = Gtk.FilterListModel.new(self.sort_model, self.filter)
+        self.selection = Gtk.MultiSelection.new(self.filter_model)
+        self.selection.connect("selection-changed", self._on_selection_changed)
+
+        factory = Gtk.SignalListItemFactory()
+        factory.connect("setup", self._on_factory_setup)
+        factory.connect("bind", self._on_factory_bind)
+        factory.connect("unbind", self._on_factory_unbind)
+
+        self.list_view = Gtk.ListView.new(self.selection, factory)
+        self.list_view.add_css_class("rich-list")
+
+        # Countdowns only tick while the list is on screen
+        self.clock = CountdownClock()
+        self.list_view.connect("map", lambda widget: self.clock.resume())
+        self.list_view.connect("unmap", lambda widget: self.clock.pause())
+
+        self.header_factory = None
+        if HAS_SECTIONS:
+            self.header_factory = Gtk.SignalListItemFactory()
+            self.header_factory.connect("setup", self._on_header_setup)
+            self.header_factory.connect("bind", self._on_header_bind)
+
+        scrolled = Gtk.ScrolledWindow()
+        scrolled.set_vexpand(True)
+        scrolled.set_hexpand(True)
+        scrolled.set_child(self.list_view)
 
         # Empty state
         self.empty_label = Gtk.Label(
@@ -134,39 +515,402 @@ class JobListView(Gtk.ScrolledWindow):
 
         # Stack to switch between list and empty state
         self.stack = Gtk.Stack()
-        self.stack.add_named(self.listbox, "list")
+        self.stack.set_vexpand(True)
+        self.stack.add_named(scrolled, "list")
         self.stack.add_named(self.empty_label, "empty")
+        self.append(self.stack)
+
+        # Bulk actions for the selected jobs
+        self.bulk_bar = Gtk.ActionBar()
+        self.bulk_bar.set_revealed(False)
+
+        self.selection_label = Gtk.Label()
+        self.bulk_bar.pack_start(self.selection_label)
+
+        clear_button = Gtk.Button(icon_name="edit-clear-symbolic")
+        clear_button.set_tooltip_text("Clear selection")
+        clear_button.connect("clicked", lambda b: self.clear_selection())
+        self.bulk_bar.pack_start(clear_button)
+
+        for action, label, tooltip in (
+            ("enable", "Enable", "Enable the selected jobs"),
+            ("disable", "Disable", "Disable the selected jobs"),
+            ("retag", "Comment…", "Set the comment of the selected jobs"),
+            ("reschedule", "Reschedule…", "Set the schedule of the selected jobs"),
+        ):
+            button = Gtk.Button(label=label)
+            button.set_tooltip_text(tooltip)
+            button.connect("clicked", self._on_bulk_clicked, action)
+            self.bulk_bar.pack_start(button)
+
+        delete_button = Gtk.Button(label="Delete")
+        delete_button.set_tooltip_text("Delete the selected jobs")
+        delete_button.add_css_class("destructive-action")
+        delete_button.connect("clicked", self._on_bulk_clicked, "delete")
+        self.bulk_bar.pack_end(delete_button)
 
-        self.set_child(self.stack)
+        self.append(self.bulk_bar)
 
-        # Filter function for search
-        self.listbox.set_filter_func(self._filter_func)
         self.search_text = ""
 
+        # Sorting and grouping; the window inserts self.actions so that the
+        # view menu's "sort-by", "group-by" and "descending" items work
+        self.sort_field = "file"
+        self.group_field = "none"
+        self.descending = False
+        self._next_runs = NextRunQueue()
+        self._next_run_timer: Optional[int] = None
+        self.actions = self._create_view_actions()
+
+    def _create_view_actions(self) -> Gio.SimpleActionGroup:
+        """Create the stateful sort and group actions."""
+        group = Gio.SimpleActionGroup()
+        for name, value in (("sort-by", "file"), ("group-by", "none")):
+            action = Gio.SimpleAction.new_stateful(
+                name, GLib.VariantType.new("s"), GLib.Variant.new_string(value)
+            )
+            action.connect("change-state", self._on_view_state_changed)
+            group.add_action(action)
+        action = Gio.SimpleAction.new_stateful(
+            "descending", None, GLib.Variant.new_boolean(False)
+        )
+        action.connect("change-state", self._on_view_state_changed)
+        group.add_action(action)
+        return group
+
+    def view_menu(self, prefix: str = "list") -> Gio.Menu:
+        """
+        Build the sort and group menu.
+
+        Args:
+            prefix: Name the window inserted actions under
+
+        Returns:
+            Menu model for a Gtk.MenuButton
+        """
+        menu = Gio.Menu()
+        sort_section = Gio.Menu()
+        for field, label in SORT_FIELDS:
+            sort_section.append(label, f"{prefix}.sort-by::{field}")
+        sort_section.append("Descending", f"{prefix}.descending")
+        menu.append_section("Sort By", sort_section)
+
+        group_section = Gio.Menu()
+        for field, label in GROUP_FIELDS:
+            group_section.append(label, f"{prefix}.group-by::{field}")
+        menu.append_section("Group By", group_section)
+        return menu
+
+    def _on_view_state_changed(self, action, value):
+        """Apply a sort or group choice from the view menu."""
+        action.set_state(value)
+        name = action.get_name()
+        if name == "sort-by":
+            self.set_sort(value.get_string(), self.group_field, self.descending)
+        elif name == "group-by":
+            self.set_sort(self.sort_field, value.get_string(), self.descending)
+        else:
+            self.set_sort(self.sort_field, self.group_field, value.get_boolean())
+
+    def set_sort(
+        self, sort_field: str, group_field: str = "none", descending: bool = False
+    ):
+        """
+        Set the order of the list.
+
+        Args:
+            sort_field: Field of job_sort.SORT_FIELDS
+            group_field: Field of job_sort.GROUP_FIELDS, or "none"
+            descending: Reverse the order
+        """
+        self.sort_field = sort_field
+        self.group_field = group_field
+        self.descending = descending
+        self._resort()
+
+    def _is_file_order(self) -> bool:
+        """Check whether the list simply follows the crontab."""
+        return (
+            self.sort_field == "file"
+            and self.group_field == "none"
+            and not self.descending
+        )
+
+    @profiled("list.sort", "ui")
+    def _resort(self):
+        """Re-rank the items from their cached keys and let GTK reorder them."""
+        self._stop_next_run_timer()
+        if self._is_file_order():
+            self.sort_model.set_sorter(None)
+            self._set_sections(False)
+            return
+
+        items = self._items
+        now = time.time()
+        ranks, group_ranks, labels = rank_jobs(
+            [item.keys for item in items],
+            self.sort_field,
+            self.group_field,
+            self.descending,
+            now,
+        )
+        for item, rank, group_rank, label in zip(items, ranks, group_ranks, labels):
+            # Setting a property notifies, so skip the unchanged ones
+            if item.rank != rank:
+                item.rank = rank
+            if item.group_rank != group_rank:
+                item.group_rank = group_rank
+            item.group_label = label
+
+        if self.sort_model.get_sorter() is None:
+            self.sort_model.set_sorter(self.sorter)
+        else:
+            self.sorter.changed(Gtk.SorterChange.DIFFERENT)
+        self._set_sections(self.group_field != "none")
+
+        if "next_run" in (self.sort_field, self.group_field):
+            # Ranks only go stale when one of these runs has passed
+            self._next_runs.rebuild([(item.keys.next_run(now), item) for item in items])
+            self._start_next_run_timer()
+
+    def _set_sections(self, grouped: bool):
+        """Show or hide the group headers."""
+        if not HAS_SECTIONS:
+            return
+        if grouped:
+            if self.sort_model.get_section_sorter() is None:
+                self.sort_model.set_section_sorter(self.section_sorter)
+            else:
+                self.section_sorter.changed(Gtk.SorterChange.DIFFERENT)
+            self.list_view.set_header_factory(self.header_factory)
+        else:
+            self.sort_model.set_section_sorter(None)
+            self.list_view.set_header_factory(None)
+
+    def _start_next_run_timer(self):
+        """Wake up when the earliest next run has passed."""
+        deadline = self._next_runs.deadline()
+        if deadline is None:
+            return
+        delay = max(0, int(deadline - time.time()) + 1)
+        self._next_run_timer = GLib.timeout_add_seconds(delay, self._on_next_run_due)
+
+    def _stop_next_run_timer(self):
+        """Cancel a pending next-run wake-up."""
+        if self._next_run_timer is not None:
+            GLib.source_remove(self._next_run_timer)
+            self._next_run_timer = None
+
+    def _on_next_run_due(self):
+        """Re-rank once runs have passed; only their keys are recomputed."""
+        self._next_run_timer = None
+        if self._next_runs.pop_due(time.time()):
+            self._resort()
+        else:
+            self._start_next_run_timer()
+        return GLib.SOURCE_REMOVE
+
+    def _on_header_setup(self, factory, header):
+        """Create a group header label."""
+        label = Gtk.Label()
+        label.set_xalign(0)
+        label.set_margin_start(12)
+        label.set_margin_top(6)
+        label.set_margin_bottom(6)
+        label.add_css_class("heading")
+        header.set_child(label)
+
+    def _on_header_bind(self, factory, header):
+        """Show the label of the group a section starts with."""
+        item = header.get_item()
+        header.get_child().set_label(item.group_label if item is not None else "")
+
+    def _on_factory_setup(self, factory, list_item):
+        """Create a row widget; it is reused for many items."""
+        list_item.set_child(
+            JobRow(
+                self.on_edit,
+                self.on_delete,
+                self.on_toggle,
+                self.clock,
+                self.show_hosts,
+                self.read_only,
+            )
+        )
+
+    def _on_factory_bind(self, factory, list_item):
+        """Show an item in a recycled row."""
+        list_item.get_child().bind(list_item.get_item())
+
+    def _on_factory_unbind(self, factory, list_item):
+        """Detach a row from its item."""
+        list_item.get_child().unbind()
+
+    @profiled("list.update_jobs", "ui")
     def update_jobs(self, jobs: List[Dict]):
         """
-        Update the list with new jobs.
+        Replace the list with new jobs.
 
         Args:
             jobs: List of job dictionaries
         """
-        # Clear existing rows
-        while True:
-            row = self.listbox.get_row_at_index(0)
-            if row is None:
-                break
-            self.listbox.remove(row)
-
-        # Add new rows
-        for job in jobs:
-            row = JobRow(job, self.on_edit, self.on_delete, self.on_toggle)
-            self.listbox.append(row)
-
-        # Show empty state if no jobs
-        if len(jobs) == 0:
-            self.stack.set_visible_child_name("empty")
-        else:
-            self.stack.set_visible_child_name("list")
+        self._items = [JobItem(job) for job in jobs]
+        for item, findings in zip(self._items, self.linter.lint(jobs)):
+            item.findings = findings
+        if not self._is_file_order():
+            # Rank before inserting so the sort model sorts only once
+            self._resort()
+        self.store.splice(0, self.store.get_n_items(), self._items)
+        self._update_empty_state()
+        self._check_commands()
+
+    @profiled("list.refresh_jobs", "ui")
+    def refresh_jobs(self, jobs: Iterable[Dict]):
+        """
+        Update changed jobs in place; only their bound rows re-render.
+
+        Args:
+            jobs: New dictionaries of existing jobs, matched by "id"
+        """
+        updates = {job["id"]: job for job in jobs if 0 <= job["id"] < len(self._items)}
+        self._relint(updates)
+        self._check_commands([self._items[idx] for idx in updates])
+        if not self._is_file_order():
+            # Only the replaced items compute new keys
+            self._resort()
+        if self.search_text:
+            self.filter.changed(Gtk.FilterChange.DIFFERENT)
+
+    @profiled("list.remove_jobs", "ui")
+    def remove_jobs(self, job_ids: Iterable[int]):
+        """
+        Remove jobs with a single model update and renumber the rest.
+
+        Args:
+            job_ids: Indexes of the removed jobs, as they were before removal
+        """
+        removed = set(job_ids)
+        kept = [item for idx, item in enumerate(self._items) if idx not in removed]
+        for idx, item in enumerate(kept):
+            # Ids are positions in the crontab; rows read them when clicked
+            item.job["id"] = idx
+        old_count = len(self._items)
+        self._items = kept
+        self.store.splice(0, old_count, kept)
+        # Removing a job can end a duplicate and renumbers the others
+        self._relint({})
+        self._update_empty_state()
+
+    @profiled("list.swap_jobs", "ui")
+    def swap_jobs(self, jobs: List[Dict]):
+        """
+        Replace the list with new jobs, keeping the items that did not change.
+
+        The unchanged head and tail of the list keep their items and rows;
+        only the jobs between them are replaced, with one model update.
+
+        Args:
+            jobs: List of job dictionaries, e.g. after the crontab was
+                changed elsewhere
+        """
+        items = self._items
+        limit = min(len(items), len(jobs))
+        start = 0
+        while start < limit and _same_job(items[start].job, jobs[start]):
+            start += 1
+        end = 0
+        while end < limit - start and _same_job(items[-1 - end].job, jobs[-1 - end]):
+            end += 1
+
+        removed = len(items) - start - end
+        added = [JobItem(job) for job in jobs[start : len(jobs) - end]]
+        if not removed and not added:
+            return
+        tail = items[len(items) - end :]
+        for idx, item in enumerate(tail, start + len(added)):
+            # Ids are positions in the crontab; rows read them when clicked
+            item.job["id"] = idx
+        self._items = items[:start] + added + tail
+        self._relint({})
+        if not self._is_file_order():
+            self._resort()
+        self.store.splice(start, removed, added)
+        self._update_empty_state()
+        self._check_commands(added)
+
+    def jobs(self) -> List[Dict]:
+        """Get the jobs in the list, in crontab order."""
+        return [item.job for item in self._items]
+
+    def _relint(self, updates: Dict[int, Dict]):
+        """
+        Lint the list again, replacing some jobs first.
+
+        Only replaced items and items whose findings changed notify their
+        rows; unchanged jobs come from the linter's cache.
+
+        Args:
+            updates: New dictionaries of existing jobs by id
+        """
+        jobs = [updates.get(idx, item.job) for idx, item in enumerate(self._items)]
+        linted = self.linter.lint(jobs)
+        for idx, (item, findings) in enumerate(zip(self._items, linted)):
+            if idx in updates:
+                item.findings = findings
+                item.set_job(updates[idx])
+            elif findings != item.findings:
+                item.findings = findings
+                item.emit("changed")
+
+    def _check_commands(self, items: Optional[List[JobItem]] = None):
+        """
+        Check the commands of jobs in the background, see command_check.
+
+        Args:
+            items: Items to check; all of them by default
+        """
+        if self.checks is None:
+            return
+        items = list(self._items if items is None else items)
+        jobs = [item.job for item in items]
+        keys = [check_key(job) for job in jobs]
+
+        def on_checked(results: Dict):
+            for item, job, key in zip(items, jobs, keys):
+                # Jobs replaced since are checked by a later request
+                if item.job is job and results[key] != item.checks:
+                    item.checks = results[key]
+                    item.emit("changed")
+
+        self.checks.check(keys, on_checked)
+
+    def _update_empty_state(self):
+        """Show the empty state when there are no jobs."""
+        self.stack.set_visible_child_name("list" if self._items else "empty")
+
+    def selected_jobs(self) -> List[Dict]:
+        """Get the selected jobs, in list order."""
+        bitset = self.selection.get_selection()
+        return [
+            self.selection.get_item(bitset.get_nth(idx)).job
+            for idx in range(bitset.get_size())
+        ]
+
+    def clear_selection(self):
+        """Unselect all jobs."""
+        self.selection.unselect_all()
+
+    def _on_selection_changed(self, selection, position, n_items):
+        """Show the bulk action bar while jobs are selected."""
+        count = selection.get_selection().get_size()
+        self.selection_label.set_label(f"{count} selected")
+        self.bulk_bar.set_revealed(count > 0 and self.on_bulk_action is not None)
+
+    def _on_bulk_clicked(self, button, action):
+        """Hand the selected jobs to the bulk action handler."""
+        jobs = self.selected_jobs()
+        if jobs and self.on_bulk_action is not None:
+            self.on_bulk_action(action, jobs)
 
     def set_search_text(self, text: str):
         """
@@ -175,20 +919,18 @@ class JobListView(Gtk.ScrolledWindow):
         Args:
             text: Search text
         """
-        self.search_text = text.lower()
-        self.listbox.invalidate_filter()
+        text = text.lower()
+        previous, self.search_text = self.search_text, text
+        # Let the filter model re-check only what can change
+        if previous in text:
+            change = Gtk.FilterChange.MORE_STRICT
+        elif text in previous:
+            change = Gtk.FilterChange.LESS_STRICT
+        else:
+            change = Gtk.FilterChange.DIFFERENT
+        with profiler.span("list.filter", "ui"):
+            self.filter.changed(change)
 
-    def _filter_func(self, row):
+    def _filter_func(self, item, *user_data):
         """Filter function for search."""
-        if not self.search_text:
-            return True
-
-        if isinstance(row, JobRow):
-            job = row.job
-            # Search in command, schedule, and comment
-            searchable = (
-                f"{job['command']} {job['schedule']} {job.get('comment', '')}".lower()
-            )
-            return self.search_text in searchable
-
-        return True
+        return matches_search(item.job, self.search_text)
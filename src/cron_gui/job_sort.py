@@ -0,0 +1,268 @@
+"""
+Job Sort - Sort, group and search keys for the job list.
+
+Keys are computed once per job and cached on a JobKeys object, which is
+replaced whenever the job changes. The next run is the exception: it goes
+stale as time passes, so it is only recomputed once it is in the past, and
+NextRunQueue tells the list when that next happens instead of every job
+being recomputed on a timer. countdown() says when a row's "runs in" text
+next changes, so rows are only refreshed then.
+"""
+
+import heapq
+import itertools
+import math
+import os
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from cron_gui.cron_parser import next_run_timestamp
+
+# (field, label) pairs offered for sorting and grouping
+SORT_FIELDS = (
+    ("file", "File Order"),
+    ("next_run", "Next Run"),
+    ("command", "Command"),
+    ("enabled", "Enabled"),
+    ("source", "Source"),
+    ("user", "User"),
+    ("host", "Host"),
+)
+GROUP_FIELDS = (
+    ("none", "No Grouping"),
+    ("next_run", "Next Run Date"),
+    ("enabled", "Enabled"),
+    ("source", "Source"),
+    ("user", "User"),
+    ("host", "Host"),
+    ("command", "Command"),
+)
+
+# Sort key of jobs that will not run: disabled, @reboot or never matching
+NEVER = float("inf")
+
+
+def command_prefix(command: str) -> str:
+    """
+    Get the program a command runs.
+
+    Leading variable assignments are skipped, so "LANG=C /opt/bin/backup.sh
+    --full" gives "backup.sh".
+    """
+    for token in command.split():
+        name, sep, _ = token.partition("=")
+        if sep and name.isidentifier():
+            continue
+        return os.path.basename(token.strip("'\"")) or token
+    return ""
+
+
+def matches_search(job: Dict, text: str) -> bool:
+    """
+    Check whether a job matches the search text.
+
+    Args:
+        job: Job dictionary
+        text: Lowercase search text; empty matches every job
+
+    Returns:
+        True if the command, schedule, comment or host contains the text
+    """
+    if not text:
+        return True
+    searchable = (
+        f"{job['command']} {job['schedule']} {job.get('comment') or ''} "
+        f"{job.get('host') or ''}"
+    ).lower()
+    return text in searchable
+
+
+class JobKeys:
+    """Cached sort and group keys of one job."""
+
+    __slots__ = ("job", "_keys", "_next_run")
+
+    def __init__(self, job: Dict):
+        self.job = job
+        self._keys: Dict[str, Any] = {}
+        self._next_run: Optional[float] = None
+
+    def next_run(self, now: float) -> float:
+        """
+        Get the job's next run as a UTC timestamp, NEVER if it will not run.
+
+        The cached value is kept until it is no longer in the future.
+        """
+        if self._next_run is None or self._next_run <= now:
+            job = self.job
+            timestamp = None
+            if job["enabled"] and job["valid"]:
+                timestamp = next_run_timestamp(
+                    job["schedule"], now, (job.get("env") or {}).get("CRON_TZ")
+                )
+            self._next_run = NEVER if timestamp is None else float(timestamp)
+        return self._next_run
+
+    def sort_key(self, field: str, now: float) -> Any:
+        """Get the key for sorting by a field of SORT_FIELDS."""
+        if field == "next_run":
+            return self.next_run(now)
+        if field == "file":
+            # Ids are renumbered after deletes, so they are not cached
+            return self.job["id"]
+        key = self._keys.get(field)
+        if key is None:
+            job = self.job
+            if field == "command":
+                key = job["command"].lower()
+            elif field == "enabled":
+                key = not job["enabled"]
+            else:
+                key = job.get(field) or ""
+            self._keys[field] = key
+        return key
+
+    def group(self, field: str, now: float) -> Tuple[Any, str]:
+        """
+        Get the group of the job for a field of GROUP_FIELDS.
+
+        Returns:
+            (key, label); groups are ordered by key
+        """
+        if field == "next_run":
+            next_run = self.next_run(now)
+            cached = self._keys.get("day")
+            if cached is None or cached[0] != next_run:
+                if next_run == NEVER:
+                    group = (NEVER, "Not Scheduled")
+                else:
+                    day = datetime.fromtimestamp(next_run).date()
+                    group = (day.toordinal(), day.strftime("%A, %d %B %Y"))
+                cached = self._keys["day"] = (next_run, group)
+            return cached[1]
+        if field == "enabled":
+            return (0, "Enabled") if self.job["enabled"] else (1, "Disabled")
+        if field == "command":
+            key = self._keys.get("prefix")
+            if key is None:
+                key = self._keys["prefix"] = command_prefix(self.job["command"])
+            return key, key or "(empty)"
+        value = self.job.get(field) or ""
+        return value, value or "(unknown)"
+
+
+def rank_jobs(
+    keys: Sequence[JobKeys],
+    sort_field: str,
+    group_field: str = "none",
+    descending: bool = False,
+    now: Optional[float] = None,
+) -> Tuple[List[int], List[int], List[str]]:
+    """
+    Order jobs by group and sort key; file order breaks ties.
+
+    Args:
+        keys: Keys of the jobs
+        sort_field: Field of SORT_FIELDS
+        group_field: Field of GROUP_FIELDS, or "none"
+        descending: Reverse the order, groups included
+        now: UTC timestamp the next runs are computed from; defaults to now
+
+    Returns:
+        (ranks, group ranks, group labels), each aligned with keys
+    """
+    if now is None:
+        now = datetime.now().timestamp()
+    grouped = group_field != "none"
+
+    decorated = []
+    for idx, entry in enumerate(keys):
+        group_key, label = entry.group(group_field, now) if grouped else (0, "")
+        decorated.append(
+            (group_key, entry.sort_key(sort_field, now), entry.job["id"], idx, label)
+        )
+    decorated.sort(reverse=descending)
+
+    count = len(decorated)
+    ranks = [0] * count
+    group_ranks = [0] * count
+    labels = [""] * count
+    group_rank = -1
+    previous = object()
+    for rank, (group_key, _, _, idx, label) in enumerate(decorated):
+        if group_key != previous:
+            group_rank += 1
+            previous = group_key
+        ranks[idx] = rank
+        group_ranks[idx] = group_rank
+        labels[idx] = label
+    return ranks, group_ranks, labels
+
+
+def countdown(next_run: float, now: float) -> Tuple[str, float]:
+    """
+    Format the time until a run, e.g. "3m 12s", "5h 2m" or "2d 4h".
+
+    Args:
+        next_run: UTC timestamp of the run
+        now: Current UTC timestamp
+
+    Returns:
+        (text, deadline), where deadline is the UTC timestamp at which the
+        text next changes
+    """
+    remaining = max(1, math.ceil(next_run - now))
+    if remaining < 3600:
+        minutes, seconds = divmod(remaining, 60)
+        text = f"{minutes}m {seconds}s" if minutes else f"{seconds}s"
+        unit = 1
+    elif remaining < 86400:
+        hours, minutes = divmod(remaining // 60, 60)
+        text, unit = f"{hours}h {minutes}m", 60
+    else:
+        days, hours = divmod(remaining // 3600, 24)
+        text, unit = f"{days}d {hours}h", 3600
+    # The text changes once fewer than (remaining // unit) units are left
+    return text, next_run - (remaining // unit) * unit + 1
+
+
+class NextRunQueue:
+    """Min-heap of upcoming run times, to find the ones that have passed."""
+
+    def __init__(self):
+        self._heap: List[Tuple[float, int, Any]] = []
+        self._counter = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def clear(self):
+        """Forget all entries."""
+        self._heap.clear()
+
+    def push(self, timestamp: float, value: Any):
+        """Add a value due at a UTC timestamp; NEVER is ignored."""
+        if timestamp != NEVER:
+            heapq.heappush(self._heap, (timestamp, next(self._counter), value))
+
+    def rebuild(self, entries: Sequence[Tuple[float, Any]]):
+        """Replace all entries with (timestamp, value) pairs in one pass."""
+        counter = self._counter
+        self._heap = [
+            (timestamp, next(counter), value)
+            for timestamp, value in entries
+            if timestamp != NEVER
+        ]
+        heapq.heapify(self._heap)
+
+    def deadline(self) -> Optional[float]:
+        """Get the earliest timestamp, or None if the queue is empty."""
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: float) -> List[Any]:
+        """Remove and return the values due at or before now."""
+        due = []
+        heap = self._heap
+        while heap and heap[0][0] <= now:
+            due.append(heapq.heappop(heap)[2])
+        return due
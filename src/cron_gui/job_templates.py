@@ -0,0 +1,277 @@
+"""
+Job Templates - Generate many similar jobs from one template.
+
+A template is a schedule, command and comment with ``{{name}}``
+placeholders (double braces, since shell commands use single ones), and is
+expanded once per row of a parameter list read from CSV, JSON or JSON
+Lines. Rows are read and jobs generated lazily, so previewing a list of a
+hundred thousand tenants holds one row at a time; a JSON array is the only
+format that has to be read whole. Templates are split into text and
+placeholders once, into str.format strings, so generating a job costs
+three format calls.
+
+Jobs can be staggered so they do not all start in the same minute: the
+n-th job is moved n minutes later, cycling within a window of minutes.
+"""
+
+import csv
+import json
+import os
+import re
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, TextIO, Tuple
+
+# {{name}}; spaces inside the braces are allowed
+PLACEHOLDER = re.compile(r"\{\{\s*([A-Za-z_][A-Za-z0-9_]*)\s*\}\}")
+
+# Placeholder filled with the number of the row, counting from 1
+ROW_NUMBER = "n"
+
+# Formats of parameter lists
+FORMAT_CSV = "csv"
+FORMAT_JSON = "json"
+FORMAT_JSON_LINES = "jsonl"
+
+_EXTENSIONS = {
+    ".csv": FORMAT_CSV,
+    ".json": FORMAT_JSON,
+    ".jsonl": FORMAT_JSON_LINES,
+    ".ndjson": FORMAT_JSON_LINES,
+}
+
+_STEP = re.compile(r"(?:\*|0|0-59)/(\d+)")
+_LINE_BREAK = re.compile(r"[\r\n]")
+
+
+class GeneratedJob(NamedTuple):
+    """A job generated from one parameter row."""
+
+    row: int
+    schedule: str
+    command: str
+    comment: str
+
+
+def _format_string(text: str) -> Tuple[str, List[str]]:
+    """
+    Turn template text into a str.format string.
+
+    Returns:
+        (format string, placeholder names in order of use)
+    """
+    # Literal text at even positions, placeholder names at odd ones
+    parts = PLACEHOLDER.split(text)
+    for idx in range(0, len(parts), 2):
+        parts[idx] = parts[idx].replace("{", "{{").replace("}", "}}")
+    for idx in range(1, len(parts), 2):
+        parts[idx] = "{" + parts[idx] + "}"
+    return "".join(parts), PLACEHOLDER.findall(text)
+
+
+def stagger_schedule(schedule: str, offset: int) -> str:
+    """
+    Move a schedule's minute field later, wrapping within the hour.
+
+    Args:
+        schedule: Five-field cron expression
+        offset: Minutes to move it by
+
+    Returns:
+        The schedule with a new minute field
+
+    Raises:
+        ValueError: If the minute field is not a minute, a list of minutes
+            or a step such as */15, so moving it has no clear meaning
+    """
+    fields = schedule.split()
+    if len(fields) != 5:
+        raise ValueError("Only five-field schedules can be staggered")
+    minute = fields[0]
+    step = _STEP.fullmatch(minute)
+    if step:
+        interval = int(step.group(1))
+        start = offset % interval
+        fields[0] = f"{start}-59/{interval}" if start else f"*/{interval}"
+    elif all(value.isdigit() for value in minute.split(",")):
+        minutes = sorted({(int(value) + offset) % 60 for value in minute.split(",")})
+        fields[0] = ",".join(map(str, minutes))
+    else:
+        raise ValueError(f"The minute field {minute} cannot be staggered")
+    return " ".join(fields)
+
+
+class JobTemplate:
+    """A schedule, command and comment with placeholders."""
+
+    def __init__(
+        self, schedule: str, command: str, comment: str = "", stagger: int = 0
+    ):
+        """
+        Initialize the template.
+
+        Args:
+            schedule: Schedule, e.g. "0 2 * * *" or "{{minute}} 2 * * *"
+            command: Command, e.g. "/opt/app/backup --tenant={{tenant}}"
+            comment: Optional comment
+            stagger: Window in minutes the jobs' start minutes are spread
+                over, 1-60; 0 to leave the schedule as it is
+
+        Raises:
+            ValueError: If stagger is out of range, or a field spans
+                several lines, which would break the crontab line
+        """
+        if not 0 <= stagger <= 60:
+            raise ValueError("Jobs can be staggered over at most 60 minutes")
+        for field, text in (
+            ("schedule", schedule),
+            ("command", command),
+            ("comment", comment),
+        ):
+            if _LINE_BREAK.search(text.strip()):
+                raise ValueError(f"The {field} spans several lines")
+        self.stagger = stagger
+        self._schedule, schedule_names = _format_string(schedule.strip())
+        self._command, command_names = _format_string(command.strip())
+        self._comment, comment_names = _format_string(comment.strip())
+        names = set(schedule_names + command_names + comment_names)
+        self._numbered = ROW_NUMBER in names
+        # Placeholders the parameter rows must fill
+        self.names = sorted(names - {ROW_NUMBER})
+
+    def expand(self, rows: Iterable[Dict[str, str]]) -> Iterator[GeneratedJob]:
+        """
+        Generate one job per parameter row, lazily.
+
+        Args:
+            rows: Values per placeholder name, e.g. from read_parameters;
+                extra names are ignored
+
+        Yields:
+            Generated jobs, in row order
+
+        Raises:
+            ValueError: When a row lacks a value, a value would break the
+                crontab line, or the schedule cannot be staggered
+        """
+        schedule_format = self._schedule.format_map
+        command_format = self._command.format_map
+        comment_format = self._comment.format_map
+        # Staggered schedules repeat every window, so each is made once
+        staggered: Dict[str, str] = {}
+        for number, row in enumerate(rows, 1):
+            values = {**row, ROW_NUMBER: str(number)} if self._numbered else row
+            try:
+                schedule = schedule_format(values)
+                command = command_format(values)
+                comment = comment_format(values)
+            except KeyError as e:
+                raise ValueError(
+                    f"Row {number} has no value for {e.args[0]}"
+                ) from None
+            if _LINE_BREAK.search(schedule + command + comment):
+                # The template has none, so a value brought it in
+                name = next(
+                    (n for n in self.names if _LINE_BREAK.search(row[n])), "a value"
+                )
+                raise ValueError(f"Row {number}: {name} spans several lines")
+
+            if self.stagger:
+                key = f"{(number - 1) % self.stagger} {schedule}"
+                moved = staggered.get(key)
+                if moved is None:
+                    if len(staggered) > 4096:
+                        staggered.clear()
+                    moved = staggered[key] = stagger_schedule(
+                        schedule, (number - 1) % self.stagger
+                    )
+                schedule = moved
+            yield GeneratedJob(number, schedule, command, comment)
+
+
+def detect_format(path: str) -> str:
+    """Guess a parameter file's format from its extension; CSV if unknown."""
+    return _EXTENSIONS.get(os.path.splitext(path)[1].lower(), FORMAT_CSV)
+
+
+def _as_text(value) -> str:
+    """Turn a JSON value into placeholder text."""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float)):
+        return str(value)
+    return json.dumps(value)
+
+
+def _json_row(value, number: int) -> Dict[str, str]:
+    """Check that a JSON row is an object and convert its values."""
+    if not isinstance(value, dict):
+        raise ValueError(f"Row {number} is not a JSON object")
+    # A null is treated like a missing value
+    return {
+        str(key): _as_text(item) for key, item in value.items() if item is not None
+    }
+
+
+def read_parameters(
+    stream: TextIO, fmt: str = FORMAT_CSV
+) -> Iterator[Dict[str, str]]:
+    """
+    Read parameter rows, lazily except for JSON arrays.
+
+    Args:
+        stream: Text stream; for CSV, opened with newline=""
+        fmt: FORMAT_CSV (first row names the columns), FORMAT_JSON (an
+            array of objects) or FORMAT_JSON_LINES (one object per line)
+
+    Yields:
+        Values per placeholder name
+
+    Raises:
+        ValueError: If the input is not valid in the format
+    """
+    if fmt == FORMAT_CSV:
+        reader = csv.reader(stream, skipinitialspace=True)
+        names = [name.strip() for name in next(reader, [])]
+        for row in reader:
+            # Missing trailing cells leave names out, which expand reports
+            if row:
+                yield dict(zip(names, row))
+    elif fmt == FORMAT_JSON_LINES:
+        for number, line in enumerate(stream, 1):
+            if line.strip():
+                try:
+                    value = json.loads(line)
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"Line {number} is not valid JSON: {e}") from e
+                yield _json_row(value, number)
+    elif fmt == FORMAT_JSON:
+        try:
+            data = json.load(stream)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Not valid JSON: {e}") from e
+        if not isinstance(data, list):
+            raise ValueError("A JSON parameter list must be an array of objects")
+        for number, value in enumerate(data, 1):
+            yield _json_row(value, number)
+    else:
+        raise ValueError(f"Unknown parameter format: {fmt}")
+
+
+def open_parameters(
+    path: str, fmt: Optional[str] = None
+) -> Iterator[Dict[str, str]]:
+    """
+    Read the parameter rows of a file lazily, closing it at the end.
+
+    Args:
+        path: CSV, JSON or JSON Lines file
+        fmt: Format; guessed from the extension by default
+
+    Raises:
+        OSError: If the file cannot be read
+        ValueError: If the file is not valid in its format
+    """
+    with open(path, newline="", encoding="utf-8") as stream:
+        yield from read_parameters(stream, fmt or detect_format(path))
+
@@ -0,0 +1,44 @@
+"""
+Phrase tables for schedule descriptions, one module per language.
+
+A table is only imported the first time a description in its language is
+needed. To add a language, copy ``en.py`` to ``<code>.py`` (e.g. ``de.py``)
+and translate the values; the keys and placeholders must stay the same.
+"""
+
+import importlib
+import os
+from functools import lru_cache
+from typing import Dict, Optional
+
+DEFAULT_LANGUAGE = "en"
+
+
+def current_language() -> str:
+    """Get the two-letter language code of the user's message locale."""
+    for variable in ("LC_ALL", "LC_MESSAGES", "LANG"):
+        value = os.environ.get(variable, "")
+        if value and value not in ("C", "POSIX"):
+            return value.split("_")[0].split(".")[0].lower()
+    return DEFAULT_LANGUAGE
+
+
+@lru_cache(maxsize=None)
+def load_phrases(language: Optional[str] = None) -> Dict:
+    """
+    Load the phrase table of a language, falling back to English.
+
+    Args:
+        language: Language code; defaults to the user's locale
+
+    Returns:
+        The language's PHRASES table
+    """
+    language = language or current_language()
+    if not language.isalpha():
+        language = DEFAULT_LANGUAGE
+    try:
+        module = importlib.import_module(f"{__name__}.{language}")
+    except ImportError:
+        module = importlib.import_module(f"{__name__}.{DEFAULT_LANGUAGE}")
+    return module.PHRASES
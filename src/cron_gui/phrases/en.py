@@ -0,0 +1,97 @@
+"""
+English phrases for schedule descriptions.
+
+Placeholders: {list} is a joined list of values, {start}/{end} are the ends
+of a range, {step} is an interval, {day} a weekday name and {nth} an
+ordinal. An empty string means the field adds nothing to the description.
+"""
+
+PHRASES = {
+    "invalid": "Invalid cron expression",
+    "reboot": "At system startup",
+    "at_times": "at {list}",
+    # Separator between items, and before the last one
+    "list": (", ", " and "),
+    "range": "{start} through {end}",
+    "or": "{0} or {1}",
+    "clause": ", ",
+    "month_names": (
+        "January",
+        "February",
+        "March",
+        "April",
+        "May",
+        "June",
+        "July",
+        "August",
+        "September",
+        "October",
+        "November",
+        "December",
+    ),
+    "weekday_names": (
+        "Sunday",
+        "Monday",
+        "Tuesday",
+        "Wednesday",
+        "Thursday",
+        "Friday",
+        "Saturday",
+    ),
+    "ordinals": ("first", "second", "third", "fourth", "fifth"),
+    # Per field: "*" and "*/" describe the whole range (every / every n),
+    # "values" is (singular, plural) around a list of values and ranges,
+    # "range" and "range/" describe a field that is one range, "from" an
+    # "a/n" item
+    "second": {
+        "*": "every second",
+        "*/": "every {step} seconds",
+        "values": ("at second {list}", "at seconds {list}"),
+        "range": "every second from {start} through {end}",
+        "range/": "every {step} seconds from {start} through {end}",
+        "from": "every {step} seconds starting at second {start}",
+    },
+    "minute": {
+        "*": "every minute",
+        "*/": "every {step} minutes",
+        "values": ("at minute {list}", "at minutes {list}"),
+        "hourly": ("at minute {list} of every hour", "at minutes {list} of every hour"),
+        "range": "every minute from {start} through {end} past the hour",
+        "range/": "every {step} minutes from {start} through {end} past the hour",
+        "from": "every {step} minutes starting at minute {start}",
+    },
+    "hour": {
+        "*": "",
+        "*/": "every {step} hours",
+        "values": ("during hour {list}", "during hours {list}"),
+        "range": "between {start} and {end}",
+        "range/": "every {step} hours between {start} and {end}",
+        "from": "every {step} hours starting at {start}",
+    },
+    "day": {
+        "*": "",
+        "*/": "every {step} days",
+        "values": ("on day {list} of the month", "on days {list} of the month"),
+        "range": "on days {start} through {end} of the month",
+        "range/": "every {step} days from day {start} through {end} of the month",
+        "from": "every {step} days starting on day {start} of the month",
+        "L": "on the last day of the month",
+        "LW": "on the last weekday of the month",
+        "W": "on the weekday nearest day {start} of the month",
+    },
+    "month": {
+        "*": "",
+        "*/": "every {step} months",
+        "values": ("in {list}", "in {list}"),
+        "range": "from {start} through {end}",
+        "range/": "every {step} months from {start} through {end}",
+        "from": "every {step} months starting in {start}",
+    },
+    "weekday": {
+        "*": "",
+        "values": ("on {list}", "on {list}"),
+        "range": "on {start} through {end}",
+        "L": "on the last {day} of the month",
+        "#": "on the {nth} {day} of the month",
+    },
+}
@@ -0,0 +1,451 @@
+"""
+Privileged Helper - Edit system and other users' crontabs as root.
+
+Editing /etc/crontab, /etc/cron.d or another user's crontab needs root.
+Instead of asking for a password for every read and write, the window
+starts one helper process through pkexec and keeps it for the session, so
+any number of edits cost one authentication and one process.
+
+The helper talks to the window over a socketpair that is its stdin and
+stdout. Every message is a 4-byte big-endian length followed by a JSON
+object. The helper first sends a greeting with its protocol version; after
+that each request carries a list of operations, which are run in order and
+answered with one result each. The protocol is deliberately narrow:
+
+- only read and write operations exist; a write may carry the fingerprint
+  the crontab must still have, checked under the file's lock
+- crontabs are named by target, never by path: ``system`` is
+  /etc/crontab, ``cron.d/NAME`` a file in /etc/cron.d (named as cron
+  accepts them) and ``user/NAME`` the crontab of an existing user
+- system crontabs are read-only: their jobs have a user field before the
+  command, which the crontab parser does not know, so an edit would write
+  jobs cron runs as the wrong user
+- content must be text without NUL bytes and at most MAX_CONTENT bytes
+
+Run with ``--root=DIR``, the helper maps the targets to files under DIR
+and needs no privileges, which is how it is tried and tested: set
+CRON_GUI_HELPER to the command line of such a stand-in helper.
+"""
+
+import argparse
+import json
+import os
+import pwd
+import re
+import shlex
+import socket
+import stat
+import struct
+import subprocess
+import sys
+import threading
+from typing import Dict, List, Optional, Sequence
+
+from cron_gui.cron_backend import (
+    BackendError,
+    CrontabBackend,
+    TabfileBackend,
+    UserCrontabBackend,
+)
+
+# Sent in the greeting; the window refuses helpers that speak another one
+PROTOCOL_VERSION = 1
+
+# Largest crontab accepted, in bytes
+MAX_CONTENT = 16 * 1024 * 1024
+
+# Largest message accepted, in bytes; a request may carry several crontabs
+MAX_MESSAGE = 64 * 1024 * 1024
+
+# Command line of a stand-in helper, split like a shell would
+HELPER_ENV_VAR = "CRON_GUI_HELPER"
+
+# Where packages install the helper; its polkit policy names this path
+HELPER_PATH = "/usr/libexec/cron-gui-helper"
+
+TARGET_SYSTEM = "system"
+
+# Names cron reads in /etc/cron.d; it skips files with dots in them
+_CRON_D_NAME = re.compile(r"[A-Za-z0-9_-]{1,64}")
+_USER_NAME = re.compile(r"[A-Za-z_][A-Za-z0-9_.-]{0,31}\$?")
+_FINGERPRINT = re.compile(r"[0-9a-f]{32}")
+
+_LENGTH = struct.Struct(">I")
+
+READ_ONLY_ERROR = (
+    "System crontabs have a user field Cron GUI cannot edit yet; they are read-only"
+)
+
+
+class ProtocolError(ValueError):
+    """Raised for messages that break the protocol."""
+
+
+def send_message(sock: socket.socket, message: Dict):
+    """Send one length-prefixed JSON message."""
+    data = json.dumps(message, separators=(",", ":")).encode(
+        "utf-8", errors="surrogateescape"
+    )
+    if len(data) > MAX_MESSAGE:
+        raise ProtocolError("Message is too large")
+    sock.sendall(_LENGTH.pack(len(data)) + data)
+
+
+def receive_message(sock: socket.socket) -> Optional[Dict]:
+    """
+    Receive one length-prefixed JSON message.
+
+    Returns:
+        The message, or None if the other side closed the connection
+
+    Raises:
+        ProtocolError: If the message is malformed or too large
+    """
+    header = _receive_exactly(sock, _LENGTH.size)
+    if header is None:
+        return None
+    (length,) = _LENGTH.unpack(header)
+    if length > MAX_MESSAGE:
+        raise ProtocolError("Message is too large")
+    data = _receive_exactly(sock, length)
+    if data is None:
+        raise ProtocolError("Connection closed in the middle of a message")
+    try:
+        message = json.loads(data.decode("utf-8", errors="surrogateescape"))
+    except ValueError as e:
+        raise ProtocolError(f"Message is not valid JSON: {e}") from None
+    if not isinstance(message, dict):
+        raise ProtocolError("Message is not a JSON object")
+    return message
+
+
+def _receive_exactly(sock: socket.socket, size: int) -> Optional[bytes]:
+    """Receive exactly size bytes; None on a clean end of stream."""
+    chunks = []
+    remaining = size
+    while remaining:
+        chunk = sock.recv(min(remaining, 1024 * 1024))
+        if not chunk:
+            if remaining == size:
+                return None
+            raise ProtocolError("Connection closed in the middle of a message")
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b"".join(chunks)
+
+
+def resolve_target(target: str, root: Optional[str] = None) -> CrontabBackend:
+    """
+    Get the backend of a target, checking its name.
+
+    Args:
+        target: ``system``, ``cron.d/NAME`` or ``user/NAME``
+        root: Directory standing in for /, for an unprivileged helper; user
+            crontabs are then files under var/spool/cron/crontabs
+
+    Returns:
+        Backend to read and write the target with
+
+    Raises:
+        ProtocolError: If the target is not one the helper edits
+    """
+    if not isinstance(target, str):
+        raise ProtocolError("Target must be a string")
+    base = root or "/"
+    if target == TARGET_SYSTEM:
+        return TabfileBackend(os.path.join(base, "etc", "crontab"))
+
+    kind, _, name = target.partition("/")
+    if kind == "cron.d" and _CRON_D_NAME.fullmatch(name):
+        return TabfileBackend(os.path.join(base, "etc", "cron.d", name))
+    if kind == "user" and _USER_NAME.fullmatch(name):
+        if root is not None:
+            return TabfileBackend(
+                os.path.join(root, "var", "spool", "cron", "crontabs", name)
+            )
+        try:
+            pwd.getpwnam(name)
+        except KeyError:
+            raise ProtocolError(f"No user named {name}") from None
+        return UserCrontabBackend(name)
+    raise ProtocolError(f"Unknown target {target!r}")
+
+
+def is_read_only_target(target: str) -> bool:
+    """Check whether a target is a system crontab, which is only read."""
+    return target == TARGET_SYSTEM or target.startswith("cron.d/")
+
+
+def _run_operation(operation: Dict, root: Optional[str]) -> Dict:
+    """
+    Run one operation of a request.
+
+    Returns:
+        Result: ``content`` for reads; ``written`` and, if the crontab had
+        changed, its ``current`` text for writes
+
+    Raises:
+        ProtocolError: If the operation is malformed
+        BackendError: If the crontab cannot be read or written
+    """
+    if not isinstance(operation, dict):
+        raise ProtocolError("Operation must be a JSON object")
+    backend = resolve_target(operation.get("target"), root)
+    kind = operation.get("op")
+    if kind == "read":
+        return {"ok": True, "content": backend.read()}
+    if kind != "write":
+        raise ProtocolError(f"Unknown operation {kind!r}")
+    if is_read_only_target(operation["target"]):
+        raise BackendError(READ_ONLY_ERROR)
+
+    content = operation.get("content")
+    if not isinstance(content, str) or "\0" in content:
+        raise ProtocolError("Content must be text without NUL bytes")
+    if len(content.encode("utf-8", errors="surrogateescape")) > MAX_CONTENT:
+        raise ProtocolError("Content is too large")
+    expected = operation.get("expected")
+    if expected is None:
+        backend.write(content)
+        return {"ok": True, "written": True}
+    if not isinstance(expected, str) or not _FINGERPRINT.fullmatch(expected):
+        raise ProtocolError("Expected fingerprint is malformed")
+    current = backend.write_if_unchanged(content, expected)
+    if current is None:
+        return {"ok": True, "written": True}
+    return {"ok": True, "written": False, "current": current}
+
+
+def handle_request(request: Dict, root: Optional[str] = None) -> Dict:
+    """
+    Run the operations of a request in order.
+
+    After an operation fails, the rest are skipped, so a batch never goes
+    on writing after a write it may depend on did not happen.
+
+    Args:
+        request: ``{"ops": [...]}``
+        root: See resolve_target
+
+    Returns:
+        ``{"results": [...]}``, one result per operation
+
+    Raises:
+        ProtocolError: If the request is not a list of operations
+    """
+    operations = request.get("ops")
+    if not isinstance(operations, list):
+        raise ProtocolError("Request must carry a list of operations")
+    results = []
+    failed = False
+    for operation in operations:
+        if failed:
+            results.append({"ok": False, "error": "Skipped after a failed operation"})
+            continue
+        try:
+            results.append(_run_operation(operation, root))
+        except (ProtocolError, BackendError) as e:
+            results.append({"ok": False, "error": str(e)})
+            failed = True
+    return {"results": results}
+
+
+def serve(sock: socket.socket, root: Optional[str] = None) -> int:
+    """
+    Answer requests until the window closes the connection.
+
+    Returns:
+        0 when the window closed the connection, 1 on a protocol error
+    """
+    send_message(sock, {"version": PROTOCOL_VERSION})
+    while True:
+        try:
+            request = receive_message(sock)
+            if request is None:
+                return 0
+            send_message(sock, handle_request(request, root))
+        except ProtocolError as e:
+            # The stream cannot be trusted any more; the window restarts us
+            print(f"Error: {e}", file=sys.stderr)
+            return 1
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Run the helper on the socket passed as stdin.
+
+    Returns:
+        0 when the window is done, 1 on protocol errors, 2 if stdin is not
+        a socket
+    """
+    parser = argparse.ArgumentParser(
+        description="Read and write crontabs for cron-gui; started by pkexec"
+    )
+    parser.add_argument(
+        "--root", help="Directory standing in for /, to run without privileges"
+    )
+    args = parser.parse_args(argv)
+
+    if not stat.S_ISSOCK(os.fstat(0).st_mode):
+        print("Error: the helper talks to cron-gui over stdin", file=sys.stderr)
+        return 2
+    os.umask(0o022)
+    sock = socket.socket(fileno=os.dup(0))
+    # Keep stray prints away from the protocol stream
+    os.dup2(2, 1)
+    with sock:
+        return serve(sock, os.path.abspath(args.root) if args.root else None)
+
+
+def default_helper_command() -> List[str]:
+    """Get the command line the helper is started with."""
+    stand_in = os.environ.get(HELPER_ENV_VAR)
+    if stand_in:
+        return shlex.split(stand_in)
+    if os.access(HELPER_PATH, os.X_OK):
+        return ["pkexec", HELPER_PATH]
+    return ["pkexec", sys.executable, "-m", "cron_gui.privileged_helper"]
+
+
+class PrivilegedHelper:
+    """
+    One running helper, started on first use and shared by its backends.
+
+    Requests from several threads are sent one at a time. If the helper
+    exits, e.g. because authentication was cancelled, the next request
+    starts it again.
+    """
+
+    def __init__(self, command: Optional[Sequence[str]] = None):
+        """
+        Initialize the helper.
+
+        Args:
+            command: Command line of the helper; defaults to
+                default_helper_command()
+        """
+        self.command = list(command) if command else default_helper_command()
+        self._process: Optional[subprocess.Popen] = None
+        self._sock: Optional[socket.socket] = None
+        self._lock = threading.Lock()
+
+    def request(self, operations: List[Dict]) -> List[Dict]:
+        """
+        Send a batch of operations and wait for their results.
+
+        Args:
+            operations: ``{"op": "read", "target": ...}`` or ``{"op":
+                "write", "target": ..., "content": ..., "expected": ...}``
+
+        Returns:
+            One result per operation, see handle_request
+
+        Raises:
+            BackendError: If the helper cannot be started or answered
+                something that breaks the protocol
+        """
+        with self._lock:
+            if self._sock is None:
+                self._start()
+            try:
+                send_message(self._sock, {"ops": operations})
+                reply = receive_message(self._sock)
+            except (OSError, ProtocolError) as e:
+                self._stop()
+                raise BackendError(f"Lost the privileged helper: {e}")
+            if reply is None or len(reply.get("results") or ()) != len(operations):
+                self._stop()
+                raise BackendError("The privileged helper stopped")
+            return reply["results"]
+
+    def _start(self):
+        """Start the helper and wait for its greeting, i.e. authentication."""
+        ours, theirs = socket.socketpair()
+        try:
+            self._process = subprocess.Popen(
+                self.command, stdin=theirs, stdout=theirs, close_fds=True
+            )
+        except OSError as e:
+            ours.close()
+            raise BackendError(f"Cannot start the privileged helper: {e}")
+        finally:
+            theirs.close()
+        self._sock = ours
+        try:
+            greeting = receive_message(ours)
+        except (OSError, ProtocolError):
+            greeting = None
+        if greeting is None:
+            self._stop()
+            raise BackendError("Authentication was cancelled or failed")
+        if greeting.get("version") != PROTOCOL_VERSION:
+            self._stop()
+            raise BackendError("The privileged helper is from another version")
+
+    def _stop(self):
+        """Close the connection, which makes the helper exit."""
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+        if self._process is not None:
+            try:
+                self._process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                # Cannot kill a root process; it exits on its next read
+                pass
+            self._process = None
+
+    def close(self):
+        """Stop the helper."""
+        with self._lock:
+            self._stop()
+
+
+class PrivilegedBackend(CrontabBackend):
+    """Reads and writes a system or other user's crontab through the helper."""
+
+    def __init__(self, target: str, helper: Optional[PrivilegedHelper] = None):
+        """
+        Initialize the backend.
+
+        Args:
+            target: ``system``, ``cron.d/NAME`` or ``user/NAME``
+            helper: Shared helper; one is created if None
+        """
+        self.target = target
+        self.helper = helper or PrivilegedHelper()
+        self.read_only = is_read_only_target(target)
+
+    def describe(self) -> str:
+        if self.target == TARGET_SYSTEM:
+            return "/etc/crontab"
+        kind, _, name = self.target.partition("/")
+        if kind == "user":
+            return f"crontab of {name}"
+        return f"/etc/{self.target}"
+
+    def _run(self, operation: Dict) -> Dict:
+        """Run one operation, raising its error."""
+        (result,) = self.helper.request([{**operation, "target": self.target}])
+        if not result.get("ok"):
+            raise BackendError(result.get("error") or "The helper failed")
+        return result
+
+    def read(self) -> str:
+        return self._run({"op": "read"})["content"]
+
+    def write(self, content: str):
+        if self.read_only:
+            raise BackendError(READ_ONLY_ERROR)
+        self._run({"op": "write", "content": content})
+
+    def write_if_unchanged(self, content: str, expected: str) -> Optional[str]:
+        if self.read_only:
+            raise BackendError(READ_ONLY_ERROR)
+        # Checked and written by the helper in one round trip
+        result = self._run({"op": "write", "content": content, "expected": expected})
+        return None if result["written"] else result["current"]
+
+
+if __name__ == "__main__":
+    sys.exit(main())
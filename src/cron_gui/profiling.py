@@ -0,0 +1,272 @@
+"""
+Profiling - Low-overhead timing spans for the manager, parser and UI.
+
+Profiling is off by default. It is switched on by setting the
+CRON_GUI_PROFILE environment variable or by starting the application with
+``--profile``. Spans are kept in a fixed-size ring buffer and can be exported
+as Chrome trace JSON (load it in chrome://tracing or https://ui.perfetto.dev).
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+PROFILE_ENV_VAR = "CRON_GUI_PROFILE"
+TRACE_FILE_ENV_VAR = "CRON_GUI_TRACE_FILE"
+DEFAULT_CAPACITY = 8192
+
+
+class Span:
+    """A single completed timing span."""
+
+    __slots__ = ("name", "category", "start_ns", "duration_ns", "thread_id")
+
+    def __init__(
+        self,
+        name: str,
+        category: str,
+        start_ns: int,
+        duration_ns: int,
+        thread_id: int,
+    ):
+        self.name = name
+        self.category = category
+        self.start_ns = start_ns
+        self.duration_ns = duration_ns
+        self.thread_id = thread_id
+
+    @property
+    def end_ns(self) -> int:
+        return self.start_ns + self.duration_ns
+
+    @property
+    def duration_ms(self) -> float:
+        return self.duration_ns / 1_000_000
+
+
+class _NullSpan:
+    """Context manager used when profiling is disabled."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _ActiveSpan:
+    """Context manager that records its duration into a profiler."""
+
+    __slots__ = ("_profiler", "_name", "_category", "_start")
+
+    def __init__(self, profiler: "Profiler", name: str, category: str):
+        self._profiler = profiler
+        self._name = name
+        self._category = category
+        self._start = 0
+
+    def __enter__(self):
+        self._start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter_ns()
+        self._profiler.record(self._name, self._category, self._start, end - self._start)
+        return False
+
+
+class Profiler:
+    """Collects timing spans into a bounded ring buffer."""
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        """
+        Initialize the Profiler.
+
+        Args:
+            capacity: Maximum number of spans kept; older spans are dropped.
+        """
+        self.enabled = False
+        self.trace_file: Optional[str] = None
+        self._spans = deque(maxlen=capacity)
+
+    def enable(self, trace_file: Optional[str] = None):
+        """
+        Start recording spans.
+
+        Args:
+            trace_file: Optional path the trace is written to on shutdown
+        """
+        self.enabled = True
+        if trace_file:
+            self.trace_file = trace_file
+
+    def disable(self):
+        """Stop recording spans. Recorded spans are kept."""
+        self.enabled = False
+
+    def clear(self):
+        """Drop all recorded spans."""
+        self._spans.clear()
+
+    def span(self, name: str, category: str = "app"):
+        """
+        Time a block of code.
+
+        Args:
+            name: Span name (e.g., "manager.reload")
+            category: Span category shown in the trace viewer
+
+        Returns:
+            A context manager; a shared no-op one when profiling is disabled
+        """
+        if not self.enabled:
+            return _NULL_SPAN
+        return _ActiveSpan(self, name, category)
+
+    def record(self, name: str, category: str, start_ns: int, duration_ns: int):
+        """Append a finished span to the ring buffer."""
+        # deque.append is atomic, so no lock is needed for worker threads
+        self._spans.append(
+            Span(name, category, start_ns, duration_ns, threading.get_ident())
+        )
+
+    def spans(self) -> List[Span]:
+        """Get a snapshot of the recorded spans, oldest first."""
+        return list(self._spans)
+
+    def last_breakdown(self, root: str) -> List[Span]:
+        """
+        Get the most recent span named ``root`` and the spans nested in it.
+
+        Args:
+            root: Name of the enclosing span (e.g., "window.refresh")
+
+        Returns:
+            List of spans, root first, then children in start order.
+            Empty if no such span was recorded.
+        """
+        spans = self.spans()
+        root_span = None
+        for span in reversed(spans):
+            if span.name == root:
+                root_span = span
+                break
+        if root_span is None:
+            return []
+
+        children = [
+            span
+            for span in spans
+            if span is not root_span
+            and span.thread_id == root_span.thread_id
+            and span.start_ns >= root_span.start_ns
+            and span.end_ns <= root_span.end_ns
+        ]
+        children.sort(key=lambda s: s.start_ns)
+        return [root_span] + children
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """
+        Aggregate recorded spans by name.
+
+        Returns:
+            Mapping of span name to count, total and max duration in ms
+        """
+        result: Dict[str, Dict[str, float]] = {}
+        for span in self.spans():
+            entry = result.setdefault(
+                span.name, {"count": 0, "total_ms": 0.0, "max_ms": 0.0}
+            )
+            entry["count"] += 1
+            entry["total_ms"] += span.duration_ms
+            entry["max_ms"] = max(entry["max_ms"], span.duration_ms)
+        return result
+
+    def to_chrome_trace(self) -> Dict:
+        """
+        Convert recorded spans to the Chrome trace event format.
+
+        Returns:
+            Dictionary ready to be serialized with json.dump
+        """
+        pid = os.getpid()
+        events = []
+        for span in self.spans():
+            events.append(
+                {
+                    "name": span.name,
+                    "cat": span.category,
+                    "ph": "X",
+                    "ts": span.start_ns / 1000,
+                    "dur": span.duration_ns / 1000,
+                    "pid": pid,
+                    "tid": span.thread_id,
+                }
+            )
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export_chrome_trace(self, path: str) -> bool:
+        """
+        Write recorded spans to a Chrome trace JSON file.
+
+        Args:
+            path: Destination file path
+
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            with open(path, "w", encoding="utf-8") as fh:
+                json.dump(self.to_chrome_trace(), fh)
+            return True
+        except OSError as e:
+            print(f"Error exporting trace: {e}")
+            return False
+
+
+# Process-wide profiler used by the instrumented modules
+profiler = Profiler()
+
+if os.environ.get(PROFILE_ENV_VAR, "") not in ("", "0"):
+    profiler.enable(os.environ.get(TRACE_FILE_ENV_VAR))
+
+
+def profiled(name: Optional[str] = None, category: str = "app") -> Callable:
+    """
+    Decorator that records a span around every call of a function.
+
+    Args:
+        name: Span name; defaults to the function's qualified name
+        category: Span category shown in the trace viewer
+
+    Returns:
+        Function decorator
+    """
+
+    def decorator(func: Callable) -> Callable:
+        span_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not profiler.enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter_ns()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profiler.record(
+                    span_name, category, start, time.perf_counter_ns() - start
+                )
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,420 @@
+"""
+Schedule Calendar - Count the firings of many jobs per day and per hour.
+
+The month view needs one number per day, so runs are counted from the
+compiled schedules instead of being generated: a schedule fires
+runs_per_day times on each day of CronSchedule.month_days, and schedules
+with the same day mask are summed before the mask is expanded, so a
+crontab costs a few mask operations per distinct schedule.
+
+Runs are only counted hour by hour where that is needed: on days the local
+clock changes, for jobs whose CRON_TZ is not the local zone, and for the
+day the user drills down into. Even then a schedule is counted per hour it
+fires in, not per run, so a ``* * * * *`` job costs 24 additions a day
+rather than 1,440. DST follows cron_schedule: fixed-time jobs skipped by a
+forward jump run right after it and run once in a repeated hour, wildcard
+jobs skip the missing hour and run in both passes of a repeated one.
+Clock changes of less than an hour, as on Lord Howe Island, are counted as
+if they did not happen.
+"""
+
+import calendar
+from collections import Counter
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from cron_gui.cron_schedule import (
+    CronSchedule,
+    ZoneTransitions,
+    compile_schedule,
+    get_zone,
+)
+from cron_gui.profiling import profiled
+
+# Kinds of hour table entries
+_NORMAL, _REPEAT, _GAP = range(3)
+
+# Days before and after a range whose runs can still land in it, since UTC
+# offsets differ by up to 26 hours
+_MARGIN_DAYS = 2
+
+# Most hour tables kept per calendar
+_TABLE_CACHE_SIZE = 64
+
+_EPOCH = datetime(1970, 1, 1)
+
+# (schedule, zone, ids of the jobs running it)
+_Group = Tuple[CronSchedule, ZoneTransitions, List[int]]
+
+
+def _wall(day: date) -> int:
+    """Get the wall-clock seconds since 1970-01-01 of a day's midnight."""
+    return (day.toordinal() - _EPOCH.toordinal()) * 86400
+
+
+def _bits(mask: int) -> Iterable[int]:
+    """Yield the set bit positions of a mask, ascending."""
+    position = 0
+    while mask:
+        if mask & 1:
+            yield position
+        mask >>= 1
+        position += 1
+
+
+class _HourTable:
+    """
+    Where the wall-clock hours of one zone fall in local time.
+
+    Attributes:
+        start: First wall day covered, _MARGIN_DAYS before the range
+        days: Number of wall days covered
+        entries: Per wall hour since start, (local hour, seconds into the
+            local hour, kind, local hour after the next local hour starts)
+            of each time the hour happens; local hours count from midnight
+            of the range's first day. For hours skipped by a forward jump,
+            the second value is the wall time the gap ends at instead
+        shift: Hours local time is ahead of the zone's wall time on most
+            days, and remainder the seconds beyond
+        irregular_masks: Per covered month, the wall days whose hours do
+            not map by shift and remainder, because a clock changes
+        irregular: Indexes of the range's days the local clock changes on,
+            when the zone is the local zone
+    """
+
+    def __init__(
+        self, zone: ZoneTransitions, local: ZoneTransitions, first: date, days: int
+    ):
+        self.start = first - timedelta(days=_MARGIN_DAYS)
+        self.days = days + 2 * _MARGIN_DAYS
+        origin = _wall(first)
+        base = _wall(self.start)
+
+        # (year, month, index of its day 0) of the months covered
+        self._months: List[Tuple[int, int, int]] = []
+        end = self.start + timedelta(days=self.days)
+        year, month = self.start.year, self.start.month
+        while date(year, month, 1) < end:
+            offset = (date(year, month, 1) - self.start).days - 1
+            self._months.append((year, month, offset))
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+        self.entries: List[Tuple[Tuple[int, int, int, int], ...]] = []
+        for hour in range(self.days * 24):
+            wall = base + hour * 3600
+            instants = zone.resolve(wall)
+            if not instants:
+                end = zone.gap_end(wall)
+                local_hour = (end + local.offset_at(end) - origin) // 3600
+                gap_wall = end + zone.offset_at(end)
+                self.entries.append(((local_hour, gap_wall, _GAP, local_hour),))
+                continue
+            if len(instants) == 1:
+                targets = ((instants[0], _NORMAL),)
+            else:
+                targets = ((instants[0], _NORMAL), (instants[1], _REPEAT))
+            entry = []
+            for instant, kind in targets:
+                local_hour, remainder = divmod(
+                    instant + local.offset_at(instant) - origin, 3600
+                )
+                # Zones offset by part of an hour spread an hour's runs over
+                # two local hours, which need not be adjacent across a jump
+                split = instant + 3600 - remainder
+                next_hour = (split + local.offset_at(split) - origin) // 3600
+                entry.append((local_hour, remainder, kind, next_hour))
+            self.entries.append(tuple(entry))
+
+        # Every hour happens once on most days and lands the same distance
+        # into local time; find that distance and the days that differ
+        shifts = Counter(
+            divmod(entries[0][0] * 3600 + entries[0][1] - hour * 3600, 3600)
+            for hour, entries in enumerate(self.entries, -_MARGIN_DAYS * 24)
+            if len(entries) == 1 and entries[0][2] == _NORMAL
+        )
+        self.shift, self.remainder = shifts.most_common(1)[0][0]
+        irregular_days = [
+            day
+            for day in range(self.days)
+            if not all(map(self._regular, range(day * 24, day * 24 + 24)))
+        ]
+        self.irregular_masks = tuple(
+            sum(
+                1 << (day - offset)
+                for day in irregular_days
+                if 1 <= day - offset <= calendar.monthrange(year, month)[1]
+            )
+            for year, month, offset in self._months
+        )
+        self.irregular = []
+        if zone is local:
+            self.irregular = [
+                day - _MARGIN_DAYS
+                for day in irregular_days
+                if 0 <= day - _MARGIN_DAYS < days
+            ]
+
+    def _regular(self, hour: int) -> bool:
+        """Check whether a wall hour maps to local time by the usual shift."""
+        entries = self.entries[hour]
+        if len(entries) > 1:
+            return False
+        local_hour, remainder, kind, next_hour = entries[0]
+        return (
+            kind == _NORMAL
+            and local_hour == hour - _MARGIN_DAYS * 24 + self.shift
+            and remainder == self.remainder
+            and (remainder == 0 or next_hour == local_hour + 1)
+        )
+
+    def day_shares(self, schedule: CronSchedule) -> Dict[int, int]:
+        """
+        Split a schedule's runs on a regular wall day over local days.
+
+        Returns:
+            Days the runs land after the wall day (-1 for the day before)
+            -> runs
+        """
+        hours, offsets = schedule.firing_hours()
+        # Runs of an hour carried into the next local hour
+        late = sum(1 for offset in offsets if self.remainder + offset >= 3600)
+        shares: Dict[int, int] = {}
+        for hour in hours:
+            local_hour = hour + self.shift
+            if late < len(offsets):
+                day = local_hour // 24
+                shares[day] = shares.get(day, 0) + len(offsets) - late
+            if late:
+                day = (local_hour + 1) // 24
+                shares[day] = shares.get(day, 0) + late
+        return shares
+
+    def masks(self, schedule: CronSchedule) -> Tuple[int, ...]:
+        """Get a schedule's day masks of the months the table covers."""
+        return tuple(
+            schedule.month_days(year, month) for year, month, _ in self._months
+        )
+
+    def matching_days(self, masks: Tuple[int, ...]) -> List[int]:
+        """Get the indexes of the covered wall days set in masks."""
+        days = []
+        for (_, _, offset), mask in zip(self._months, masks):
+            for day in _bits(mask):
+                if 0 <= offset + day < self.days:
+                    days.append(offset + day)
+        return days
+
+    def count(
+        self,
+        buckets: List[int],
+        schedule: CronSchedule,
+        days: Iterable[int],
+        jobs: int = 1,
+    ):
+        """
+        Add a schedule's runs on some wall days to local hour buckets.
+
+        Args:
+            buckets: Runs per local hour of the range
+            schedule: Compiled schedule
+            days: Indexes of covered wall days the schedule fires on
+            jobs: Number of jobs running the schedule
+        """
+        hours, offsets = schedule.firing_hours()
+        runs = len(offsets) * jobs
+        wildcard = schedule.wildcard
+        limit = len(buckets)
+        entries = self.entries
+        gaps = set()
+        for day in days:
+            base = day * 24
+            for hour in hours:
+                for local_hour, remainder, kind, next_hour in entries[base + hour]:
+                    if kind == _GAP:
+                        # Fixed-time jobs run once when the gap ends, unless
+                        # they run at that time anyway
+                        if wildcard or remainder in gaps:
+                            continue
+                        gaps.add(remainder)
+                        end = _EPOCH + timedelta(seconds=remainder)
+                        if not schedule.matches(end) and 0 <= local_hour < limit:
+                            buckets[local_hour] += jobs
+                        continue
+                    if kind == _REPEAT and not wildcard:
+                        continue
+                    if remainder == 0:
+                        if 0 <= local_hour < limit:
+                            buckets[local_hour] += runs
+                        continue
+                    for offset in offsets:
+                        slot = local_hour if remainder + offset < 3600 else next_hour
+                        if 0 <= slot < limit:
+                            buckets[slot] += jobs
+
+
+class ScheduleCalendar:
+    """Counts the firings of a list of jobs in local time."""
+
+    def __init__(self, jobs: Iterable[Dict]):
+        """
+        Initialize the calendar.
+
+        Args:
+            jobs: Job dictionaries as CronManager.list_jobs returns them;
+                disabled and invalid jobs, and jobs with an unknown CRON_TZ,
+                never fire
+        """
+        self.local = get_zone()
+        by_key: Dict[Tuple[str, Optional[str]], List[int]] = {}
+        for job in jobs:
+            if not job["enabled"] or not job.get("valid", True):
+                continue
+            tz = (job.get("env") or {}).get("CRON_TZ") or None
+            by_key.setdefault((job["schedule"], tz), []).append(job["id"])
+
+        self._groups: List[_Group] = []
+        for (expression, tz), job_ids in by_key.items():
+            try:
+                schedule = compile_schedule(expression)
+                zone = get_zone(tz)
+            except ValueError:
+                continue
+            if not schedule.reboot:
+                self._groups.append((schedule, zone, job_ids))
+        self._tables: Dict[Tuple[int, date, int], _HourTable] = {}
+
+    def _table(self, zone: ZoneTransitions, first: date, days: int) -> _HourTable:
+        """Get the hour table of a zone over a range of days, cached."""
+        key = (id(zone), first, days)
+        table = self._tables.get(key)
+        if table is None:
+            if len(self._tables) >= _TABLE_CACHE_SIZE:
+                self._tables.clear()
+            table = self._tables[key] = _HourTable(zone, self.local, first, days)
+        return table
+
+    @profiled("calendar.month", "manager")
+    def month_counts(self, year: int, month: int) -> List[int]:
+        """
+        Count the runs of all jobs on each day of a month.
+
+        Args:
+            year: Year
+            month: Month, 1-12
+
+        Returns:
+            Runs per day; index 0 is the 1st
+        """
+        first = date(year, month, 1)
+        length = calendar.monthrange(year, month)[1]
+        local_table = self._table(self.local, first, length)
+        irregular = local_table.irregular
+        irregular_mask = sum(1 << (day + 1) for day in irregular)
+
+        # Runs per day mask, for days counted whole; runs per local hour for
+        # the others
+        by_mask: Dict[int, int] = {}
+        buckets = [0] * (length * 24)
+        # Runs per (table, wall day masks, local days later), for the
+        # regular days of other zones
+        shifted: Dict[Tuple[_HourTable, Tuple[int, ...], int], int] = {}
+        for schedule, zone, job_ids in self._groups:
+            if zone is not self.local:
+                table = self._table(zone, first, length)
+                masks = table.masks(schedule)
+                if not any(masks):
+                    continue
+                regular = tuple(
+                    mask & ~irregular
+                    for mask, irregular in zip(masks, table.irregular_masks)
+                )
+                for later, runs in table.day_shares(schedule).items():
+                    key = (table, regular, later)
+                    shifted[key] = shifted.get(key, 0) + runs * len(job_ids)
+                if regular != masks:
+                    days = table.matching_days(
+                        tuple(mask & ~rest for mask, rest in zip(masks, regular))
+                    )
+                    table.count(buckets, schedule, days, len(job_ids))
+                continue
+            mask = schedule.month_days(year, month)
+            if not mask:
+                continue
+            regular = mask & ~irregular_mask
+            by_mask[regular] = (
+                by_mask.get(regular, 0) + schedule.runs_per_day() * len(job_ids)
+            )
+            if mask & irregular_mask:
+                days = [
+                    day + _MARGIN_DAYS for day in irregular if mask >> (day + 1) & 1
+                ]
+                local_table.count(buckets, schedule, days, len(job_ids))
+
+        counts = [sum(buckets[day * 24 : day * 24 + 24]) for day in range(length)]
+        for (table, masks, later), runs in shifted.items():
+            for day in table.matching_days(masks):
+                day += later - _MARGIN_DAYS
+                if 0 <= day < length:
+                    counts[day] += runs
+        for mask, runs in by_mask.items():
+            for day in _bits(mask):
+                counts[day - 1] += runs
+        return counts
+
+    def _day_buckets(
+        self, schedule: CronSchedule, zone: ZoneTransitions, day: date
+    ) -> Optional[List[int]]:
+        """Count one schedule's runs per local hour of a day; None if none."""
+        if zone is self.local:
+            table = self._table(zone, day, 1)
+            if not table.irregular:
+                if not schedule.day_matches(day):
+                    return None
+                hours, offsets = schedule.firing_hours()
+                buckets = [0] * 24
+                for hour in hours:
+                    buckets[hour] = len(offsets)
+                return buckets
+        else:
+            table = self._table(zone, day, 1)
+        buckets = [0] * 24
+        table.count(buckets, schedule, table.matching_days(table.masks(schedule)))
+        return buckets if any(buckets) else None
+
+    @profiled("calendar.day", "manager")
+    def day_hours(self, day: date) -> List[int]:
+        """
+        Count the runs of all jobs in each hour of a day.
+
+        Args:
+            day: Local date
+
+        Returns:
+            Runs per hour, 24 values; on days the clock changes a repeated
+            hour counts the runs of both passes
+        """
+        totals = [0] * 24
+        for schedule, zone, job_ids in self._groups:
+            buckets = self._day_buckets(schedule, zone, day)
+            if buckets is not None:
+                for hour, runs in enumerate(buckets):
+                    totals[hour] += runs * len(job_ids)
+        return totals
+
+    def hour_jobs(self, day: date, hour: int) -> List[Tuple[int, int]]:
+        """
+        List the jobs running in one hour of a day.
+
+        Args:
+            day: Local date
+            hour: Hour of the day, 0-23
+
+        Returns:
+            (job id, runs in the hour), ordered by job id
+        """
+        result = []
+        for schedule, zone, job_ids in self._groups:
+            buckets = self._day_buckets(schedule, zone, day)
+            if buckets is not None and buckets[hour]:
+                result.extend((job_id, buckets[hour]) for job_id in job_ids)
+        result.sort()
+        return result
@@ -0,0 +1,251 @@
+"""
+Startup Cache - Last state of a crontab, so the window can show it at once.
+
+The cache holds the crontab's text and fingerprint, the job records
+CronManager.list_jobs made from it and the linter's findings. On the next
+start the jobs are shown from the cache while the crontab is read in the
+background; only when its fingerprint differs is anything parsed, listed
+or linted again.
+
+Each crontab has one file under $XDG_CACHE_HOME/cron_gui/startup. The file
+starts with a header line naming the format version and a checksum of the
+rest, and is replaced atomically, so a torn or corrupted file is detected
+and ignored rather than shown. Lint findings depend on the date (a job may
+stop running within a year), so they are only reused for a day.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from cron_gui.crontab_document import EnvScope
+
+# Bumped whenever the payload changes shape or what it holds is computed
+# differently, e.g. job validity or lint rules; other versions are ignored
+CACHE_VERSION = 2
+
+# How long lint findings are reused, in seconds
+LINT_MAX_AGE = 24 * 3600
+
+_FORMAT = "cron_gui-startup"
+
+# (schedule, command, MAILTO) -> findings as (rule, severity, message), as
+# CrontabLinter.cached_state returns them and CrontabLinter.prime takes
+Findings = Dict[Tuple[str, str, Optional[str]], Tuple[Tuple[str, str, str], ...]]
+
+
+class CachedCrontab(NamedTuple):
+    """A crontab as it was when the cache was saved."""
+
+    fingerprint: str
+    content: str
+    # As CronManager.list_jobs returned them
+    jobs: List[Dict]
+    # Empty when the findings are too old to reuse
+    lint: Findings
+    # Normalized form per schedule, for finding duplicate jobs
+    schedules: Dict[str, str]
+    saved_at: float
+
+
+def default_cache_dir() -> str:
+    """Get the directory startup caches are kept in, under $XDG_CACHE_HOME."""
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(cache_home, "cron_gui", "startup")
+
+
+def _checksum(body: bytes) -> str:
+    """Get the checksum stored in the header."""
+    return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+
+class StartupCache:
+    """Saves and loads the last state of crontabs, one file per source."""
+
+    def __init__(self, directory: str):
+        """
+        Initialize the cache.
+
+        Args:
+            directory: Where the files are kept, e.g. default_cache_dir()
+        """
+        self.directory = directory
+
+    def path(self, source: str) -> str:
+        """Get the file of a crontab, by the backend's describe()."""
+        data = source.encode("utf-8", errors="surrogateescape")
+        name = hashlib.blake2b(data, digest_size=8).hexdigest()
+        return os.path.join(self.directory, f"{name}.json")
+
+    def load(self, source: str) -> Optional[CachedCrontab]:
+        """
+        Load the cached state of a crontab.
+
+        Args:
+            source: Description of the crontab
+
+        Returns:
+            The cached state, or None if there is none or it cannot be
+            trusted (another version, a bad checksum, another crontab)
+        """
+        try:
+            with open(self.path(source), "rb") as fh:
+                header = json.loads(fh.readline())
+                body = fh.read()
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            print(f"Error reading startup cache: {e}")
+            return None
+
+        if not isinstance(header, dict) or header.get("format") != _FORMAT:
+            return None
+        if header.get("version") != CACHE_VERSION:
+            return None
+        if header.get("checksum") != _checksum(body):
+            print("Ignoring corrupted startup cache")
+            return None
+
+        try:
+            payload = json.loads(body)
+            if payload["source"] != source:
+                return None
+            return CachedCrontab(
+                payload["fingerprint"],
+                payload["content"],
+                _decode_jobs(payload),
+                _decode_lint(payload),
+                payload["schedules"],
+                payload["saved_at"],
+            )
+        except (ValueError, KeyError, TypeError, IndexError) as e:
+            print(f"Error reading startup cache: {e}")
+            return None
+
+    def save(
+        self,
+        source: str,
+        fingerprint: str,
+        content: str,
+        jobs: List[Dict],
+        lint: Findings,
+        schedules: Dict[str, str],
+    ) -> bool:
+        """
+        Replace the cached state of a crontab, atomically.
+
+        Args:
+            source: Description of the crontab
+            fingerprint: Content hash of content
+            content: Crontab text
+            jobs: The crontab's jobs as CronManager.list_jobs returns them
+            lint: Lint findings to reuse
+            schedules: Normalized form per schedule
+
+        Returns:
+            True if successful, False otherwise
+        """
+        payload = {
+            "source": source,
+            "fingerprint": fingerprint,
+            "content": content,
+            "saved_at": time.time(),
+            **_encode_jobs(jobs),
+            "lint": [
+                [*key, [list(finding) for finding in findings]]
+                for key, findings in lint.items()
+            ],
+            "schedules": schedules,
+        }
+        body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        header = {
+            "format": _FORMAT,
+            "version": CACHE_VERSION,
+            "checksum": _checksum(body),
+        }
+
+        try:
+            # The cache holds the crontab's text; keep it to its owner
+            os.makedirs(self.directory, mode=0o700, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=".startup-")
+            try:
+                with os.fdopen(fd, "wb") as fh:
+                    fh.write(json.dumps(header).encode("utf-8") + b"\n")
+                    fh.write(body)
+                    fh.flush()
+                    os.fsync(fh.fileno())
+                os.replace(tmp_path, self.path(source))
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+            return True
+        except OSError as e:
+            print(f"Error writing startup cache: {e}")
+            return False
+
+
+def _encode_jobs(jobs: List[Dict]) -> Dict:
+    """Turn job dictionaries into compact records and a table of environments."""
+    # Jobs share environment scopes; each is stored once
+    env_index: Dict[int, int] = {}
+    envs = []
+    records = []
+    for job in jobs:
+        env = job.get("env")
+        idx = env_index.get(id(env))
+        if idx is None:
+            idx = env_index[id(env)] = len(envs)
+            envs.append(dict(env or {}))
+        records.append(
+            [
+                job["command"],
+                job["schedule"],
+                job["comment"],
+                job["enabled"],
+                job["valid"],
+                idx,
+            ]
+        )
+    first = jobs[0] if jobs else {}
+    return {
+        "user": first.get("user"),
+        "host": first.get("host"),
+        "envs": envs,
+        "jobs": records,
+    }
+
+
+def _decode_jobs(payload: Dict) -> List[Dict]:
+    """Rebuild job dictionaries from their records."""
+    source, user, host = payload["source"], payload["user"], payload["host"]
+    envs = [EnvScope(variables=dict(env)) for env in payload["envs"]]
+    return [
+        {
+            "id": idx,
+            "command": command,
+            "schedule": schedule,
+            "comment": comment,
+            "enabled": enabled,
+            "valid": valid,
+            "env": envs[env],
+            "source": source,
+            "user": user,
+            "host": host,
+        }
+        for idx, (command, schedule, comment, enabled, valid, env) in enumerate(
+            payload["jobs"]
+        )
+    ]
+
+
+def _decode_lint(payload: Dict) -> Findings:
+    """Rebuild lint findings, unless they are too old to reuse."""
+    if time.time() - payload["saved_at"] > LINT_MAX_AGE:
+        return {}
+    return {
+        (schedule, command, mailto): tuple(tuple(finding) for finding in findings)
+        for schedule, command, mailto, findings in payload["lint"]
+    }
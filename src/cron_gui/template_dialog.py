@@ -0,0 +1,289 @@
+"""
+Template Dialog - Create many jobs from a template and a parameter file.
+"""
+
+import gi
+
+gi.require_version("Gtk", "4.0")
+gi.require_version("Adw", "1")
+from gi.repository import Gtk, Adw, GLib, Gio, Pango
+from itertools import islice
+from typing import Callable, Iterator, List, Optional
+
+from cron_gui.crontab_document import format_job
+from cron_gui.job_templates import (
+    ROW_NUMBER,
+    GeneratedJob,
+    JobTemplate,
+    open_parameters,
+)
+
+# Jobs shown in the preview; the rest are only counted
+PREVIEW_ROWS = 100
+
+# Rows counted per main loop iteration, so long files do not freeze the UI
+COUNT_CHUNK = 5000
+
+# How long to wait after typing before updating the preview, in milliseconds
+PREVIEW_DELAY_MS = 300
+
+
+class TemplateDialog(Adw.Window):
+    """Edits a job template, previews the jobs and creates them."""
+
+    def __init__(
+        self,
+        parent,
+        on_create: Callable[[JobTemplate, str, Optional[str]], None],
+        hosts: Optional[List[str]] = None,
+    ):
+        """
+        Initialize the dialog.
+
+        Args:
+            parent: Main window
+            on_create: Called with the template, the parameter file and the
+                chosen host (None without hosts)
+            hosts: Hosts the jobs can be added to, when managing several
+        """
+        super().__init__(transient_for=parent, modal=True)
+        self.set_title("New Jobs from Template")
+        self.set_default_size(800, 600)
+
+        self.on_create = on_create
+        self.hosts = list(hosts or [])
+        self.path: Optional[str] = None
+        self.template: Optional[JobTemplate] = None
+        self._preview_source = 0
+        self._count_source = 0
+
+        toolbar = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
+        header = Adw.HeaderBar()
+
+        self.create_button = Gtk.Button(label="Create")
+        self.create_button.add_css_class("suggested-action")
+        self.create_button.set_sensitive(False)
+        self.create_button.connect("clicked", self._on_create_clicked)
+        header.pack_end(self.create_button)
+        toolbar.append(header)
+
+        content = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=12)
+        content.set_margin_top(12)
+        content.set_margin_bottom(12)
+        content.set_margin_start(12)
+        content.set_margin_end(12)
+        content.set_vexpand(True)
+
+        hint = Gtk.Label(
+            label=(
+                "Write {{name}} where a value from the parameter file goes; "
+                f"{{{{{ROW_NUMBER}}}}} is the row number."
+            )
+        )
+        hint.set_xalign(0)
+        hint.set_wrap(True)
+        hint.add_css_class("dim-label")
+        content.append(hint)
+
+        grid = Gtk.Grid(row_spacing=6, column_spacing=12)
+        self.schedule_entry = self._add_entry(grid, 0, "Schedule", "0 2 * * *")
+        self.command_entry = self._add_entry(
+            grid, 1, "Command", "/opt/app/backup --tenant={{tenant}}"
+        )
+        self.comment_entry = self._add_entry(grid, 2, "Comment", "Backup {{tenant}}")
+
+        # Stagger window; 0 leaves the schedule as it is
+        stagger_label = Gtk.Label(label="Stagger minutes", xalign=0)
+        self.stagger_spin = Gtk.SpinButton.new_with_range(0, 60, 1)
+        self.stagger_spin.set_tooltip_text(
+            "Start each job a minute after the previous one, cycling within "
+            "this many minutes; 0 keeps the schedule"
+        )
+        self.stagger_spin.connect("value-changed", self._on_changed)
+        grid.attach(stagger_label, 0, 3, 1, 1)
+        grid.attach(self.stagger_spin, 1, 3, 1, 1)
+
+        file_label = Gtk.Label(label="Parameters", xalign=0)
+        file_box = Gtk.Box(spacing=6)
+        self.file_button = Gtk.Button(label="Choose File…")
+        self.file_button.set_tooltip_text("CSV with a header row, JSON or JSON Lines")
+        self.file_button.connect("clicked", self._on_choose_file)
+        file_box.append(self.file_button)
+        grid.attach(file_label, 0, 4, 1, 1)
+        grid.attach(file_box, 1, 4, 1, 1)
+
+        self.host_dropdown = None
+        if self.hosts:
+            self.host_dropdown = Gtk.DropDown.new_from_strings(self.hosts)
+            self.host_dropdown.set_enable_search(True)
+            grid.attach(Gtk.Label(label="Host", xalign=0), 0, 5, 1, 1)
+            grid.attach(self.host_dropdown, 1, 5, 1, 1)
+        content.append(grid)
+
+        self.status_label = Gtk.Label(label="Choose a parameter file.")
+        self.status_label.set_xalign(0)
+        self.status_label.set_wrap(True)
+        content.append(self.status_label)
+
+        # First jobs as they will be written
+        self.preview_list = Gtk.ListBox()
+        self.preview_list.set_selection_mode(Gtk.SelectionMode.NONE)
+        self.preview_list.add_css_class("boxed-list")
+        scrolled = Gtk.ScrolledWindow()
+        scrolled.set_vexpand(True)
+        scrolled.set_child(self.preview_list)
+        content.append(scrolled)
+
+        toolbar.append(content)
+        self.set_content(toolbar)
+        self.connect("close-request", self._on_close_request)
+
+    def _add_entry(self, grid: Gtk.Grid, row: int, label: str, hint: str):
+        """Add a labelled template entry to the grid."""
+        grid.attach(Gtk.Label(label=label, xalign=0), 0, row, 1, 1)
+        entry = Gtk.Entry()
+        entry.set_hexpand(True)
+        entry.set_placeholder_text(hint)
+        entry.connect("changed", self._on_changed)
+        grid.attach(entry, 1, row, 1, 1)
+        return entry
+
+    def _on_choose_file(self, button):
+        """Ask for the parameter file."""
+        patterns = Gtk.FileFilter()
+        patterns.set_name("Parameter lists")
+        for pattern in ("*.csv", "*.json", "*.jsonl", "*.ndjson"):
+            patterns.add_pattern(pattern)
+        filters = Gio.ListStore.new(Gtk.FileFilter)
+        filters.append(patterns)
+
+        dialog = Gtk.FileDialog()
+        dialog.set_title("Choose Parameter File")
+        dialog.set_filters(filters)
+        dialog.open(self, None, self._on_file_chosen)
+
+    def _on_file_chosen(self, dialog, result):
+        """Preview the jobs of the chosen file."""
+        try:
+            file = dialog.open_finish(result)
+        except GLib.Error:
+            return  # User cancelled
+        if file:
+            self.path = file.get_path()
+            self.file_button.set_label(file.get_basename())
+            self._update_preview()
+
+    def _on_changed(self, widget):
+        """Update the preview once typing pauses."""
+        if self._preview_source:
+            GLib.source_remove(self._preview_source)
+        self._preview_source = GLib.timeout_add(
+            PREVIEW_DELAY_MS, self._update_preview
+        )
+
+    def _update_preview(self) -> bool:
+        """Show the first jobs and start counting the rest."""
+        self._preview_source = 0
+        self._stop_counting()
+        self.template = None
+        self.create_button.set_sensitive(False)
+        row = self.preview_list.get_row_at_index(0)
+        while row is not None:
+            self.preview_list.remove(row)
+            row = self.preview_list.get_row_at_index(0)
+
+        schedule = self.schedule_entry.get_text().strip()
+        command = self.command_entry.get_text().strip()
+        if not schedule or not command:
+            self.status_label.set_text("Enter a schedule and a command.")
+            return GLib.SOURCE_REMOVE
+        if not self.path:
+            self.status_label.set_text("Choose a parameter file.")
+            return GLib.SOURCE_REMOVE
+
+        try:
+            template = JobTemplate(
+                schedule,
+                command,
+                self.comment_entry.get_text(),
+                self.stagger_spin.get_value_as_int(),
+            )
+            jobs = template.expand(open_parameters(self.path))
+            shown = 0
+            for job in islice(jobs, PREVIEW_ROWS):
+                self.preview_list.append(self._create_row(job))
+                shown += 1
+        except (OSError, ValueError) as e:
+            self.status_label.set_text(f"Error: {e}")
+            return GLib.SOURCE_REMOVE
+
+        self.status_label.set_text("Counting jobs…")
+        self._count_source = GLib.idle_add(self._count_jobs, template, jobs, shown)
+        return GLib.SOURCE_REMOVE
+
+    def _count_jobs(
+        self, template: JobTemplate, jobs: Iterator[GeneratedJob], count: int
+    ) -> bool:
+        """Count a chunk of the remaining jobs; checks every row on the way."""
+        try:
+            counted = sum(1 for _ in islice(jobs, COUNT_CHUNK))
+        except (OSError, ValueError) as e:
+            self._count_source = 0
+            self.status_label.set_text(f"Error: {e}")
+            return GLib.SOURCE_REMOVE
+
+        count += counted
+        if counted == COUNT_CHUNK:
+            self.status_label.set_text(f"Counting jobs… {count}")
+            self._count_source = GLib.idle_add(
+                self._count_jobs, template, jobs, count
+            )
+            return GLib.SOURCE_REMOVE
+
+        self._count_source = 0
+        if not count:
+            self.status_label.set_text("The parameter file has no rows.")
+            return GLib.SOURCE_REMOVE
+        shown = min(count, PREVIEW_ROWS)
+        more = f"; showing the first {shown}" if count > shown else ""
+        self.status_label.set_text(f"{count} jobs will be created{more}.")
+        self.template = template
+        self.create_button.set_sensitive(True)
+        return GLib.SOURCE_REMOVE
+
+    def _stop_counting(self):
+        """Stop counting the jobs of an outdated template or file."""
+        if self._count_source:
+            GLib.source_remove(self._count_source)
+            self._count_source = 0
+
+    def _create_row(self, job: GeneratedJob) -> Gtk.ListBoxRow:
+        """Create the preview row of a job."""
+        label = Gtk.Label(label=format_job(job.schedule, job.command, job.comment))
+        label.set_xalign(0)
+        label.set_ellipsize(Pango.EllipsizeMode.END)
+        label.set_selectable(True)
+        label.add_css_class("monospace")
+        label.set_margin_top(4)
+        label.set_margin_bottom(4)
+        label.set_margin_start(8)
+        label.set_margin_end(8)
+        row = Gtk.ListBoxRow(activatable=False)
+        row.set_child(label)
+        return row
+
+    def _on_create_clicked(self, button):
+        """Create the jobs and close."""
+        host = None
+        if self.host_dropdown is not None:
+            host = self.hosts[self.host_dropdown.get_selected()]
+        self.on_create(self.template, self.path, host)
+        self.close()
+
+    def _on_close_request(self, window) -> bool:
+        """Stop pending work when the dialog closes."""
+        if self._preview_source:
+            GLib.source_remove(self._preview_source)
+            self._preview_source = 0
+        self._stop_counting()
+        return False
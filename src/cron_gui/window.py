@@ -7,15 +7,50 @@ import gi
 gi.require_version("Gtk", "4.0")
 gi.require_version("Adw", "1")
 from gi.repository import Gtk, Adw, GLib, Gio, GObject
+from typing import Callable, Dict, List, Optional
+import threading
+from cron_gui.calendar_view import CalendarView
+from cron_gui.command_check_service import CommandCheckService
+from cron_gui.duplicates_window import DuplicatesWindow
+from cron_gui.fleet_diff_window import FleetDiffWindow
+from cron_gui.history_window import HistoryWindow
 from cron_gui.job_list import JobListView
 from cron_gui.job_dialog import JobDialog
+from cron_gui.job_templates import JobTemplate, open_parameters
+from cron_gui.template_dialog import TemplateDialog
 from cron_gui.cron_manager import CronManager
+from cron_gui.fleet_manager import FleetManager, read_host_file, ssh_backends
+from cron_gui.privileged_helper import PrivilegedBackend
+from cron_gui.cron_parser import parser_cache_stats, validate_cron_expression
+from cron_gui.cron_schedule import cron_dialect_error
+from cron_gui.profiling import profiler
+from cron_gui.startup_cache import StartupCache, default_cache_dir
+
+
+# Toast button that undoes the edit just made
+_UNDO = ("Undo", "win.undo")
 
 
 class CronGuiWindow(Adw.ApplicationWindow):
     """Main application window."""
 
-    def __init__(self, app):
+    def __init__(
+        self,
+        app,
+        tabfile: Optional[str] = None,
+        hosts: Optional[str] = None,
+        target: Optional[str] = None,
+    ):
+        """
+        Initialize the window.
+
+        Args:
+            app: Application
+            tabfile: Crontab-format file to edit instead of the user's crontab
+            hosts: File listing hosts whose crontabs to edit over SSH
+            target: System or other user's crontab to edit as root through
+                the privileged helper, e.g. "system" or "user/alice"
+        """
         super().__init__(application=app)
 
         self.set_title("Cron GUI")
@@ -23,7 +58,23 @@ class CronGuiWindow(Adw.ApplicationWindow):
 
         # Initialize cron manager
         try:
-            self.cron_manager = CronManager()
+            if hosts:
+                with profiler.span("window.open_hosts", "ui"):
+                    self.cron_manager = FleetManager(
+                        ssh_backends(read_host_file(hosts))
+                    )
+            elif target:
+                # Not cached or persisted, so root-only crontabs are not
+                # copied into the user's cache, journal or history files
+                with profiler.span("window.open_privileged", "ui"):
+                    self.cron_manager = CronManager(
+                        backend=PrivilegedBackend(target), persist=False
+                    )
+            else:
+                # Starts from the jobs cached last time; see _validate_cache
+                self.cron_manager = CronManager(
+                    tabfile=tabfile, cache=StartupCache(default_cache_dir())
+                )
         except Exception as e:
             self._show_error_dialog(f"Failed to initialize cron manager: {e}")
             return
@@ -38,6 +89,7 @@ class CronGuiWindow(Adw.ApplicationWindow):
         add_button = Gtk.Button(icon_name="list-add-symbolic")
         add_button.set_tooltip_text("Add new cron job")
         add_button.connect("clicked", self._on_add_clicked)
+        add_button.set_sensitive(not self._is_read_only())
         header.pack_start(add_button)
 
         # Refresh button
@@ -46,12 +98,24 @@ class CronGuiWindow(Adw.ApplicationWindow):
         refresh_button.connect("clicked", self._on_refresh_clicked)
         header.pack_start(refresh_button)
 
+        # Switch between the job list and the calendar of runs
+        self.calendar_button = Gtk.ToggleButton(icon_name="x-office-calendar-symbolic")
+        self.calendar_button.set_tooltip_text("Calendar of job runs")
+        self.calendar_button.connect("toggled", self._on_calendar_toggled)
+        header.pack_start(self.calendar_button)
+
         # Menu button
         menu_button = Gtk.MenuButton(icon_name="open-menu-symbolic")
         menu_button.set_tooltip_text("Main menu")
 
         # Create menu
         menu = Gio.Menu()
+        menu.append("New Jobs from Template…", "win.new-from-template")
+        menu.append("History…", "win.history")
+        menu.append("Compare Hosts…", "win.compare-hosts")
+        menu.append("Find Duplicates…", "win.find-duplicates")
+        menu.append("Profiler Overlay", "win.toggle-profiler-overlay")
+        menu.append("Export Profile Trace…", "win.export-trace")
         menu.append("About", "app.about")
         menu_button.set_menu_model(menu)
 
@@ -81,14 +145,55 @@ class CronGuiWindow(Adw.ApplicationWindow):
 
         main_box.append(search_bar)
 
+        # Commands are only checked where the files they name are, here
+        self.command_checks = None if self._is_fleet() else CommandCheckService()
+        self.connect("close-request", self._on_close_request)
+
         # Job list view
         self.job_list = JobListView(
             on_edit=self._on_edit_job,
             on_delete=self._on_delete_job,
             on_toggle=self._on_toggle_job,
+            on_bulk_action=None if self._is_read_only() else self._on_bulk_action,
+            show_hosts=self._is_fleet(),
+            checks=self.command_checks,
+            read_only=self._is_read_only(),
+        )
+
+        # Sort and group menu
+        self.insert_action_group("list", self.job_list.actions)
+        sort_button = Gtk.MenuButton(icon_name="view-sort-ascending-symbolic")
+        sort_button.set_tooltip_text("Sort and group jobs")
+        sort_button.set_menu_model(self.job_list.view_menu("list"))
+        header.pack_end(sort_button)
+
+        # Profiler overlay drawn on top of the job list
+        self.profiler_label = Gtk.Label()
+        self.profiler_label.set_halign(Gtk.Align.END)
+        self.profiler_label.set_valign(Gtk.Align.START)
+        self.profiler_label.set_margin_top(12)
+        self.profiler_label.set_margin_end(12)
+        self.profiler_label.set_xalign(0)
+        self.profiler_label.add_css_class("osd")
+        self.profiler_label.add_css_class("monospace")
+        self.profiler_label.set_can_target(False)
+        self.profiler_label.set_visible(False)
+
+        list_overlay = Gtk.Overlay()
+        list_overlay.set_child(self.job_list)
+        list_overlay.add_overlay(self.profiler_label)
+
+        self.calendar_view = CalendarView(
+            self.cron_manager.list_jobs, on_edit=self._on_edit_job
         )
 
-        main_box.append(self.job_list)
+        self.view_stack = Gtk.Stack()
+        self.view_stack.set_vexpand(True)
+        self.view_stack.add_named(list_overlay, "list")
+        self.view_stack.add_named(self.calendar_view, "calendar")
+        main_box.append(self.view_stack)
+
+        self._create_profiler_actions(app)
 
         # Status bar
         self.status_label = Gtk.Label()
@@ -101,34 +206,383 @@ class CronGuiWindow(Adw.ApplicationWindow):
 
         main_box.append(self.status_label)
 
-        self.set_content(main_box)
+        self._create_undo_actions(app)
+
+        self.toast_overlay = Adw.ToastOverlay()
+        self.toast_overlay.set_child(main_box)
+        self.set_content(self.toast_overlay)
 
         # Load initial jobs
-        self._refresh_jobs()
+        if self._is_fleet() or self.cron_manager.cached is None:
+            self._refresh_jobs()
+        else:
+            self._show_cached_jobs()
 
     def _refresh_jobs(self):
         """Reload jobs from crontab."""
         try:
-            self.cron_manager.reload()
-            jobs = self.cron_manager.list_jobs()
-            self.job_list.update_jobs(jobs)
-
-            # Update status
-            count = len(jobs)
-            enabled_count = sum(1 for j in jobs if j["enabled"])
-            self.status_label.set_text(f"{count} job(s) total, {enabled_count} enabled")
+            with profiler.span("window.refresh", "ui"):
+                self.cron_manager.reload()
+                self._show_jobs()
+        except Exception as e:
+            self._show_error_dialog(f"Failed to load jobs: {e}")
+
+        self._update_profiler_overlay()
+
+    def _show_cached_jobs(self):
+        """Show the jobs of the startup cache, then check the crontab."""
+        cached = self.cron_manager.cached
+        with profiler.span("window.show_cached", "ui"):
+            self.job_list.linter.prime(cached.lint, cached.schedules)
+            self._show_jobs()
+        self._validate_cache()
+        self._update_profiler_overlay()
+
+    def _validate_cache(self):
+        """Read the crontab on a worker thread and swap in what changed."""
+        manager = self.cron_manager
+        fingerprint = manager.fingerprint
+
+        def read():
+            try:
+                content = manager.backend.read()
+            except Exception as e:
+                GLib.idle_add(self._show_error_dialog, f"Failed to load jobs: {e}")
+                return
+            GLib.idle_add(self._on_cache_validated, content, fingerprint)
+
+        threading.Thread(target=read, name="crontab-read", daemon=True).start()
+
+    def _on_cache_validated(self, content: str, fingerprint: str) -> bool:
+        """Swap in the jobs that changed since the cache was saved."""
+        manager = self.cron_manager
+        # An edit since wrote against the crontab itself, merging its changes
+        if manager.fingerprint != fingerprint:
+            return GLib.SOURCE_REMOVE
+        try:
+            with profiler.span("window.validate_cache", "ui"):
+                if manager.reload(content):
+                    self.job_list.swap_jobs(manager.list_jobs())
+                    self.calendar_view.invalidate()
+                    self._update_status()
+                self._update_undo_actions()
         except Exception as e:
             self._show_error_dialog(f"Failed to load jobs: {e}")
+        return GLib.SOURCE_REMOVE
+
+    def _show_jobs(self):
+        """Show the manager's jobs without reading the crontab again."""
+        self.job_list.update_jobs(self.cron_manager.list_jobs())
+        self.calendar_view.invalidate()
+        self._update_status()
+        self._update_undo_actions()
+
+    def _on_calendar_toggled(self, button):
+        """Show the calendar of job runs or the job list."""
+        self.view_stack.set_visible_child_name(
+            "calendar" if button.get_active() else "list"
+        )
+
+    def _on_close_request(self, window) -> bool:
+        """Stop background work and the privileged helper; save the startup cache."""
+        if self.command_checks is not None:
+            self.command_checks.close()
+        if not self._is_fleet():
+            if isinstance(self.cron_manager.backend, PrivilegedBackend):
+                self.cron_manager.backend.helper.close()
+            with profiler.span("window.save_cache", "ui"):
+                self.cron_manager.save_cache(
+                    self.job_list.jobs(), *self.job_list.linter.cached_state()
+                )
+        return False
+
+    def _is_fleet(self) -> bool:
+        """Check whether the jobs of several hosts are shown."""
+        return isinstance(self.cron_manager, FleetManager)
+
+    def _is_read_only(self) -> bool:
+        """Check whether the crontab can only be viewed, like /etc/crontab."""
+        return not self._is_fleet() and self.cron_manager.backend.read_only
+
+    def _update_status(self):
+        """Show the job counts in the status bar."""
+        count, enabled_count = self.cron_manager.job_counts()
+        text = f"{count} job(s) total, {enabled_count} enabled"
+        tooltip = None
+        if self._is_fleet():
+            text += f" on {len(self.cron_manager.managers)} host(s)"
+            errors = self.cron_manager.errors
+            if errors:
+                text += f", {len(errors)} unreachable"
+                tooltip = "\n".join(
+                    f"{host}: {error}" for host, error in errors.items()
+                )
+        if self._is_read_only():
+            text += " (read-only)"
+            tooltip = "System crontabs have a user field Cron GUI cannot edit yet"
+        self.status_label.set_text(text)
+        self.status_label.set_tooltip_text(tooltip)
+
+    def _apply_to_jobs(self, action: str, jobs: List[Dict], value: str = "") -> bool:
+        """
+        Apply an action to jobs as one crontab write and one list update.
+
+        Args:
+            action: "enable", "disable", "retag", "reschedule" or "delete"
+            jobs: Jobs to change
+            value: New comment for "retag", new schedule for "reschedule"
+
+        Returns:
+            True if successful, False otherwise
+        """
+        job_ids = [job["id"] for job in jobs]
+        with profiler.span("window.bulk", "ui"):
+            if action == "delete":
+                success = self.cron_manager.delete_jobs(job_ids)
+            elif action in ("enable", "disable"):
+                success = self.cron_manager.toggle_jobs(job_ids, action == "enable")
+            elif action == "retag":
+                success = self.cron_manager.retag_jobs(job_ids, value)
+            else:
+                success = self.cron_manager.reschedule_jobs(job_ids, value)
+
+            if self.cron_manager.merged and success:
+                # Changes made elsewhere were merged in; ids may have moved
+                self._show_jobs()
+            elif action == "delete" and success:
+                self.job_list.remove_jobs(job_ids)
+                self.calendar_view.invalidate()
+            else:
+                # Also puts a row's switch back if toggling it failed
+                self.job_list.refresh_jobs(
+                    job
+                    for job in map(self.cron_manager.get_job, job_ids)
+                    if job is not None
+                )
+                self.calendar_view.invalidate()
+            self._update_status()
+            self._update_undo_actions()
+
+        self._update_profiler_overlay()
+        return success
+
+    def _create_undo_actions(self, app):
+        """Create the undo and redo window actions."""
+        self.undo_action = Gio.SimpleAction.new("undo", None)
+        self.undo_action.connect("activate", self._on_undo)
+        self.add_action(self.undo_action)
+        app.set_accels_for_action("win.undo", ["<primary>z"])
+
+        self.redo_action = Gio.SimpleAction.new("redo", None)
+        self.redo_action.connect("activate", self._on_redo)
+        self.add_action(self.redo_action)
+        app.set_accels_for_action("win.redo", ["<primary><shift>z", "<primary>y"])
+
+        history_action = Gio.SimpleAction.new("history", None)
+        history_action.connect("activate", self._on_show_history)
+        # Each host has its own history; there is none for the whole list,
+        # nor for crontabs edited through the privileged helper
+        history_action.set_enabled(
+            not self._is_fleet() and self.cron_manager.history is not None
+        )
+        self.add_action(history_action)
+        app.set_accels_for_action("win.history", ["<primary>h"])
+
+        compare_action = Gio.SimpleAction.new("compare-hosts", None)
+        compare_action.connect("activate", self._on_compare_hosts)
+        compare_action.set_enabled(self._is_fleet())
+        self.add_action(compare_action)
+
+        duplicates_action = Gio.SimpleAction.new("find-duplicates", None)
+        duplicates_action.connect("activate", self._on_find_duplicates)
+        duplicates_action.set_enabled(not self._is_read_only())
+        self.add_action(duplicates_action)
+
+        template_action = Gio.SimpleAction.new("new-from-template", None)
+        template_action.connect("activate", self._on_new_from_template)
+        template_action.set_enabled(not self._is_read_only())
+        self.add_action(template_action)
+
+    def _update_undo_actions(self):
+        """Enable undo and redo only when the journal has something to replay."""
+        journal = self.cron_manager.journal
+        self.undo_action.set_enabled(journal.can_undo())
+        self.redo_action.set_enabled(journal.can_redo())
+
+    def _on_undo(self, action, param):
+        """Revert the last edit."""
+        with profiler.span("window.undo", "ui"):
+            label = self.cron_manager.undo()
+            self._show_jobs()
+        if label:
+            self._show_toast(f"Undone: {label}", "Redo", "win.redo")
+        else:
+            self._show_edit_error(
+                "Could not undo; the crontab may have been changed elsewhere"
+            )
+
+    def _on_redo(self, action, param):
+        """Reapply the last undone edit."""
+        with profiler.span("window.redo", "ui"):
+            label = self.cron_manager.redo()
+            self._show_jobs()
+        if label:
+            self._show_toast(f"Redone: {label}", "Undo", "win.undo")
+        else:
+            self._show_edit_error(
+                "Could not redo; the crontab may have been changed elsewhere"
+            )
+
+    def _on_show_history(self, action, param):
+        """Open the history browser."""
+        HistoryWindow(self, self.cron_manager, self._on_restore_version).present()
+
+    def _on_restore_version(self, number: int):
+        """Restore a version chosen in the history browser."""
+        with profiler.span("window.restore", "ui"):
+            success = self.cron_manager.restore_version(number)
+            self._show_jobs()
+        if success:
+            self._show_toast(f"Restored version {number}", *_UNDO)
+        else:
+            self._show_edit_error(f"Failed to restore version {number}")
+
+    def _on_compare_hosts(self, action, param):
+        """Open the host comparison."""
+        FleetDiffWindow(self, self.cron_manager, self._on_sync_hosts).present()
+
+    def _on_sync_hosts(self, target: Optional[str], delete_extra: bool):
+        """Sync every host with the target chosen in the host comparison."""
+        with profiler.span("window.sync_hosts", "ui"):
+            success = self.cron_manager.sync(target, delete_extra)
+            self._show_jobs()
+        if success:
+            self._show_toast(f"Synced hosts with {target or 'the majority'}", *_UNDO)
+        else:
+            self._show_edit_error("Some hosts could not be synced")
+
+    def _on_find_duplicates(self, action, param):
+        """Open the duplicate job finder."""
+        DuplicatesWindow(self, self.cron_manager, self._on_merge_jobs).present()
+
+    def _on_merge_jobs(
+        self, keep_id: int, delete_ids: List[int], schedule: Optional[str]
+    ):
+        """Merge a group of duplicate jobs chosen in the duplicate finder."""
+        with profiler.span("window.merge", "ui"):
+            success = self.cron_manager.merge_jobs(keep_id, delete_ids, schedule)
+            self._show_jobs()
+        if success:
+            self._show_toast(f"Merged {len(delete_ids) + 1} jobs", *_UNDO)
+        else:
+            self._show_edit_error("Failed to merge the jobs")
+
+    def _on_new_from_template(self, action, param):
+        """Open the job template dialog."""
+        hosts = self.cron_manager.hosts() if self._is_fleet() else None
+        TemplateDialog(self, self._on_create_from_template, hosts).present()
+
+    def _on_create_from_template(
+        self, template: JobTemplate, path: str, host: Optional[str]
+    ):
+        """Add the jobs generated from a template in one edit."""
+        with profiler.span("window.add_from_template", "ui"):
+            try:
+                jobs = [
+                    (job.schedule, job.command, job.comment)
+                    for job in template.expand(open_parameters(path))
+                ]
+            except (OSError, ValueError) as e:
+                self._show_edit_error(f"Failed to read {path}: {e}")
+                return
+            extra = {"host": host} if host else {}
+            success = self.cron_manager.add_jobs(jobs, **extra)
+            self._show_jobs()
+        if success:
+            self._show_toast(f"Added {len(jobs)} jobs", *_UNDO)
+        else:
+            self._show_edit_error("Failed to add the jobs")
+
+    def _create_profiler_actions(self, app):
+        """Create window actions for the profiler overlay and trace export."""
+        toggle_action = Gio.SimpleAction.new("toggle-profiler-overlay", None)
+        toggle_action.connect("activate", self._on_toggle_profiler_overlay)
+        self.add_action(toggle_action)
+        app.set_accels_for_action(
+            "win.toggle-profiler-overlay", ["<primary><shift>d"]
+        )
+
+        export_action = Gio.SimpleAction.new("export-trace", None)
+        export_action.connect("activate", self._on_export_trace)
+        export_action.set_enabled(profiler.enabled)
+        self.add_action(export_action)
+
+    def _on_toggle_profiler_overlay(self, action, param):
+        """Show or hide the profiler overlay."""
+        self.profiler_label.set_visible(not self.profiler_label.get_visible())
+        self._update_profiler_overlay()
+
+    def _update_profiler_overlay(self):
+        """Render the last refresh breakdown and parser cache hit rates."""
+        if not self.profiler_label.get_visible():
+            return
+
+        if not profiler.enabled:
+            self.profiler_label.set_text(
+                "Profiling disabled.\n"
+                "Start with --profile or set CRON_GUI_PROFILE=1."
+            )
+            return
+
+        lines = ["Last refresh:"]
+        breakdown = profiler.last_breakdown("window.refresh")
+        if breakdown:
+            for span in breakdown:
+                indent = "" if span is breakdown[0] else "  "
+                lines.append(f"{indent}{span.name:<24} {span.duration_ms:8.2f} ms")
+        else:
+            lines.append("  (no refresh recorded)")
+
+        lines.append("")
+        lines.append("Parser caches:")
+        for name, stats in parser_cache_stats().items():
+            lines.append(
+                f"  {name:<26} {stats['hit_rate']:6.1%} "
+                f"({stats['hits']}/{stats['hits'] + stats['misses']})"
+            )
+
+        self.profiler_label.set_text("\n".join(lines))
+
+    def _on_export_trace(self, action, param):
+        """Ask for a destination and export the Chrome trace."""
+        dialog = Gtk.FileDialog()
+        dialog.set_title("Export Profile Trace")
+        dialog.set_initial_name("cron-gui-trace.json")
+        dialog.save(self, None, self._on_export_trace_selected)
+
+    def _on_export_trace_selected(self, dialog, result):
+        """Write the trace to the file chosen in the save dialog."""
+        try:
+            file = dialog.save_finish(result)
+        except GLib.Error:
+            return  # User cancelled
+
+        if file and profiler.export_chrome_trace(file.get_path()):
+            self._show_toast("Profile trace exported")
+        else:
+            self._show_error_dialog("Failed to export profile trace")
 
     def _on_add_clicked(self, button):
         """Handle add button click."""
-        dialog = JobDialog(self)
+        hosts = self.cron_manager.hosts() if self._is_fleet() else None
+        dialog = JobDialog(self, hosts=hosts, checks=self.command_checks)
         dialog.connect("response", self._on_dialog_response, None)
         dialog.present()
 
     def _on_edit_job(self, job):
         """Handle edit job request."""
-        dialog = JobDialog(self, job)
+        env_block = self.cron_manager.get_env_block(job["id"])
+        dialog = JobDialog(self, job, env_block, checks=self.command_checks)
         dialog.connect("response", self._on_dialog_response, job)
         dialog.present()
 
@@ -145,20 +599,37 @@ class CronGuiWindow(Adw.ApplicationWindow):
                         job_data["command"],
                         job_data["schedule"],
                         job_data["comment"],
+                        job_data["env"],
                     )
-                    action = "updated"
+                    done, failed = "Job updated successfully", "Failed to update job"
+                elif "schedules" in job_data:
+                    # A schedule in words that needs several cron lines
+                    extra = {"host": job_data["host"]} if "host" in job_data else {}
+                    jobs = [
+                        (schedule, job_data["command"], job_data["comment"])
+                        for schedule in job_data["schedules"]
+                    ]
+                    success = self.cron_manager.add_jobs(
+                        jobs, env=job_data["env"], **extra
+                    )
+                    done, failed = f"Added {len(jobs)} jobs", "Failed to add the jobs"
                 else:
-                    # Add new job
+                    # Add new job, to the chosen host if there are several
+                    extra = {"host": job_data["host"]} if "host" in job_data else {}
                     success = self.cron_manager.add_job(
-                        job_data["command"], job_data["schedule"], job_data["comment"]
+                        job_data["command"],
+                        job_data["schedule"],
+                        job_data["comment"],
+                        job_data["env"],
+                        **extra,
                     )
-                    action = "added"
+                    done, failed = "Job added successfully", "Failed to add job"
 
                 if success:
                     self._refresh_jobs()
-                    self._show_toast(f"Job {action} successfully")
+                    self._show_toast(done, *_UNDO)
                 else:
-                    self._show_error_dialog(f"Failed to {action.rstrip('d')} job")
+                    self._show_edit_error(failed)
 
         dialog.close()
 
@@ -182,22 +653,111 @@ class CronGuiWindow(Adw.ApplicationWindow):
     def _on_delete_confirmed(self, dialog, response, job):
         """Handle delete confirmation."""
         if response == "delete":
-            if self.cron_manager.delete_job(job["id"]):
-                self._refresh_jobs()
-                self._show_toast("Job deleted successfully")
+            if self._apply_to_jobs("delete", [job]):
+                self._show_toast("Job deleted successfully", *_UNDO)
             else:
-                self._show_error_dialog("Failed to delete job")
+                self._show_edit_error("Failed to delete job")
 
         dialog.close()
 
     def _on_toggle_job(self, job, enabled):
         """Handle job enable/disable toggle."""
-        if self.cron_manager.toggle_job(job["id"], enabled):
-            self._refresh_jobs()
+        if self._apply_to_jobs("enable" if enabled else "disable", [job]):
             status = "enabled" if enabled else "disabled"
-            self._show_toast(f"Job {status}")
+            self._show_toast(f"Job {status}", *_UNDO)
         else:
-            self._show_error_dialog("Failed to toggle job")
+            self._show_edit_error("Failed to toggle job")
+
+    def _on_bulk_action(self, action: str, jobs: List[Dict]):
+        """Handle an action on the selected jobs."""
+        count = len(jobs)
+        if action in ("enable", "disable"):
+            if self._apply_to_jobs(action, jobs):
+                self.job_list.clear_selection()
+                self._show_toast(f"{count} job(s) {action}d", *_UNDO)
+            else:
+                self._show_edit_error(f"Failed to {action} jobs")
+        elif action == "delete":
+            dialog = Adw.MessageDialog.new(self)
+            dialog.set_heading(f"Delete {count} Job(s)?")
+            dialog.set_body("Are you sure you want to delete the selected jobs?")
+            dialog.add_response("cancel", "Cancel")
+            dialog.add_response("delete", "Delete")
+            dialog.set_response_appearance("delete", Adw.ResponseAppearance.DESTRUCTIVE)
+            dialog.set_default_response("cancel")
+            dialog.set_close_response("cancel")
+            dialog.connect("response", self._on_bulk_delete_confirmed, jobs)
+            dialog.present()
+        elif action == "retag":
+            common = {job["comment"] for job in jobs}
+            self._prompt_text(
+                f"Comment for {count} Job(s)",
+                "Leave empty to remove the comment.",
+                common.pop() if len(common) == 1 else "",
+                lambda text: self._finish_bulk_edit("retag", jobs, text),
+            )
+        elif action == "reschedule":
+            common = {job["schedule"] for job in jobs}
+            self._prompt_text(
+                f"Schedule for {count} Job(s)",
+                "Cron expression, e.g. 0 3 * * * or @daily",
+                common.pop() if len(common) == 1 else "",
+                lambda text: self._finish_bulk_edit("reschedule", jobs, text),
+            )
+
+    def _on_bulk_delete_confirmed(self, dialog, response, jobs):
+        """Handle confirmation of a bulk delete."""
+        if response == "delete":
+            if self._apply_to_jobs("delete", jobs):
+                self._show_toast(f"{len(jobs)} job(s) deleted", *_UNDO)
+            else:
+                self._show_edit_error("Failed to delete jobs")
+
+        dialog.close()
+
+    def _finish_bulk_edit(self, action: str, jobs: List[Dict], text: str):
+        """Apply a comment or schedule entered for the selected jobs."""
+        text = text.strip()
+        if action == "reschedule":
+            if len(text.split()) not in (1, 5) or not validate_cron_expression(text):
+                self._show_error_dialog(f"Invalid cron expression: {text}")
+                return
+            refused = cron_dialect_error(text)
+            if refused:
+                self._show_error_dialog(f"Cannot use {text}: {refused}")
+                return
+
+        if self._apply_to_jobs(action, jobs, text):
+            self.job_list.clear_selection()
+            self._show_toast(f"{len(jobs)} job(s) updated", *_UNDO)
+        else:
+            self._show_edit_error("Failed to update jobs")
+
+    def _prompt_text(
+        self, heading: str, body: str, initial: str, on_done: Callable[[str], None]
+    ):
+        """Ask for a line of text and pass it to on_done unless cancelled."""
+        entry = Gtk.Entry()
+        entry.set_text(initial)
+        entry.set_activates_default(True)
+
+        dialog = Adw.MessageDialog.new(self)
+        dialog.set_heading(heading)
+        dialog.set_body(body)
+        dialog.set_extra_child(entry)
+        dialog.add_response("cancel", "Cancel")
+        dialog.add_response("apply", "Apply")
+        dialog.set_response_appearance("apply", Adw.ResponseAppearance.SUGGESTED)
+        dialog.set_default_response("apply")
+        dialog.set_close_response("cancel")
+
+        def on_response(dialog, response):
+            if response == "apply":
+                on_done(entry.get_text())
+            dialog.close()
+
+        dialog.connect("response", on_response)
+        dialog.present()
 
     def _on_refresh_clicked(self, button):
         """Handle refresh button click."""
@@ -209,14 +769,69 @@ class CronGuiWindow(Adw.ApplicationWindow):
         text = entry.get_text()
         self.job_list.set_search_text(text)
 
-    def _show_toast(self, message):
-        """Show a toast notification."""
+    def _show_toast(
+        self,
+        message: str,
+        button_label: Optional[str] = None,
+        action_name: Optional[str] = None,
+    ):
+        """
+        Show a toast notification.
+
+        Args:
+            message: Text of the toast
+            button_label: Optional button, e.g. "Undo"
+            action_name: Action the button activates, e.g. "win.undo"
+        """
         toast = Adw.Toast.new(message)
-        toast.set_timeout(2)
+        toast.set_timeout(2 if button_label is None else 5)
+        if button_label is not None:
+            toast.set_button_label(button_label)
+            toast.set_action_name(action_name)
+        self.toast_overlay.add_toast(toast)
+
+    def _show_edit_error(self, message: str):
+        """Report a failed edit, offering to resolve it if it conflicted."""
+        conflicts = self.cron_manager.conflicts
+        if not conflicts:
+            self._show_error_dialog(message)
+            return
 
-        # Get the toast overlay (we'll need to add this)
-        # For now, just print to console
-        print(f"Toast: {message}")
+        commands = "\n".join(conflict.command for conflict in conflicts[:10])
+        if len(conflicts) > 10:
+            commands += f"\n… and {len(conflicts) - 10} more"
+        dialog = Adw.MessageDialog.new(self)
+        dialog.set_heading("Conflicting Changes")
+        dialog.set_body(
+            "The crontab was changed outside Cron GUI while you were editing. "
+            "These jobs were changed on both sides:\n\n"
+            f"{commands}\n\n"
+            "Your other changes and theirs can be combined."
+        )
+        dialog.add_response("discard", "Discard Mine")
+        dialog.add_response("theirs", "Keep Theirs")
+        dialog.add_response("ours", "Keep Mine")
+        dialog.set_response_appearance("discard", Adw.ResponseAppearance.DESTRUCTIVE)
+        dialog.set_response_appearance("ours", Adw.ResponseAppearance.SUGGESTED)
+        dialog.set_default_response("ours")
+        dialog.set_close_response("discard")
+        dialog.connect("response", self._on_conflict_response)
+        dialog.present()
+
+    def _on_conflict_response(self, dialog, response):
+        """Resolve conflicting changes as chosen."""
+        if response in ("ours", "theirs"):
+            with profiler.span("window.resolve", "ui"):
+                success = self.cron_manager.resolve_conflicts(response == "ours")
+                self._show_jobs()
+            if success:
+                self._show_toast("Changes combined", *_UNDO)
+            else:
+                self._show_edit_error("Failed to combine the changes")
+        else:
+            # Show what is on disk now
+            self._refresh_jobs()
+        dialog.close()
 
     def _show_error_dialog(self, message):
         """Show an error dialog."""
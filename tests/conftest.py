@@ -0,0 +1,21 @@
+"""
+Shared pytest setup: import cron_gui and the benchmarks from the source
+tree and keep cron_gui's files out of the real home directory.
+"""
+
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+sys.path.insert(1, ROOT)
+
+
+@pytest.fixture(autouse=True)
+def private_dirs(tmp_path, monkeypatch):
+    """Keep journals, histories and caches out of the real home directory."""
+    for name in ("XDG_DATA_HOME", "XDG_CACHE_HOME", "XDG_STATE_HOME"):
+        path = tmp_path / "xdg" / name.lower()
+        monkeypatch.setenv(name, str(path))
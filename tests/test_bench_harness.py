@@ -0,0 +1,42 @@
+"""
+Baseline comparison: regression flags and per-benchmark thresholds.
+"""
+
+from benchmarks.harness import compare
+
+
+def _results(**medians):
+    return {name.replace("_", "."): {"median_s": s} for name, s in medians.items()}
+
+
+def test_flags_slowdowns_past_the_threshold():
+    baseline = _results(parser_a=1.0, parser_b=1.0)
+    results = _results(parser_a=1.05, parser_b=1.2)
+    report = {entry["name"]: entry for entry in compare(results, baseline)}
+    assert not report["parser.a"]["regressed"]
+    assert report["parser.b"]["regressed"]
+
+
+def test_skips_benchmarks_missing_from_baseline():
+    report = compare(_results(parser_a=1.0), _results(parser_b=1.0))
+    assert report == []
+
+
+def test_longest_prefix_override_wins_whatever_the_order():
+    baseline = {"parser.validate[100]": {"median_s": 1.0}}
+    results = {"parser.validate[100]": {"median_s": 1.3}}
+    for overrides in (
+        {"parser.validate": 0.5, "parser.": 0.1},
+        {"parser.": 0.1, "parser.validate": 0.5},
+    ):
+        (entry,) = compare(results, baseline, overrides=overrides)
+        assert entry["threshold"] == 0.5
+        assert not entry["regressed"]
+
+
+def test_falls_back_to_default_threshold():
+    baseline = {"manager.list": {"median_s": 1.0}}
+    results = {"manager.list": {"median_s": 1.3}}
+    (entry,) = compare(results, baseline, 0.2, {"parser.": 0.5})
+    assert entry["threshold"] == 0.2
+    assert entry["regressed"]
@@ -0,0 +1,82 @@
+"""
+Bulk edits: many jobs changed with one crontab write and one undo step.
+"""
+
+from cron_gui.cron_backend import TabfileBackend
+from cron_gui.cron_manager import CronManager
+
+COUNT = 1000
+
+
+class CountingBackend(TabfileBackend):
+    """Tabfile backend that counts its writes."""
+
+    writes = 0
+
+    def write_if_unchanged(self, content, expected):
+        self.writes += 1
+        return super().write_if_unchanged(content, expected)
+
+
+def _manager(tmp_path):
+    path = tmp_path / "tab"
+    path.write_text(
+        "MAILTO=ops\n"
+        + "".join(f"{idx % 60} * * * * job-{idx} # team-a\n" for idx in range(COUNT))
+    )
+    backend = CountingBackend(str(path))
+    return path, backend, CronManager(backend=backend, persist=False)
+
+
+def test_each_bulk_action_is_one_write_and_one_undo_step(tmp_path):
+    path, backend, manager = _manager(tmp_path)
+    original = path.read_text()
+    ids = list(range(0, COUNT, 2))
+    assert manager.toggle_jobs(ids, False)
+    assert manager.retag_jobs(ids, "team-b")
+    assert manager.reschedule_jobs(ids, "@hourly")
+    assert manager.delete_jobs(ids[:10])
+    assert backend.writes == 4
+
+    jobs = manager.list_jobs()
+    assert len(jobs) == COUNT - 10
+    changed = [job for job in jobs if not job["enabled"]]
+    assert len(changed) == len(ids) - 10
+    assert {(job["schedule"], job["comment"]) for job in changed} == {
+        ("@hourly", "team-b")
+    }
+
+    for _ in range(4):
+        assert manager.undo() is not None
+    assert backend.writes == 8
+    assert path.read_text() == original
+
+
+def test_labels_name_the_job_count(tmp_path):
+    _, _, manager = _manager(tmp_path)
+    manager.toggle_jobs([3], False)
+    assert manager.journal.undo_entry().label == "Disable job"
+    manager.retag_jobs([1, 2, 3], "x")
+    assert manager.journal.undo_entry().label == "Comment 3 jobs"
+    manager.retag_jobs([1, 2, 3, 4], "x")
+    assert manager.journal.undo_entry().label == "Comment job"
+
+
+def test_unchanged_jobs_are_not_rewritten(tmp_path):
+    path, backend, manager = _manager(tmp_path)
+    assert manager.toggle_jobs([0, 1], True)
+    assert manager.retag_jobs([0, 1], "team-a")
+    assert manager.reschedule_jobs([0], "0 * * * *")
+    assert backend.writes == 0
+    assert not manager.journal.can_undo()
+
+
+def test_rejected_input_writes_nothing(tmp_path):
+    path, backend, manager = _manager(tmp_path)
+    original = path.read_text()
+    assert not manager.reschedule_jobs([0, 1], "61 * * * *")
+    assert not manager.reschedule_jobs([0, 1], "0 0 L * *")
+    assert not manager.retag_jobs([0, 1], "two\nlines")
+    assert not manager.delete_jobs([0, COUNT])
+    assert backend.writes == 0
+    assert path.read_text() == original
@@ -0,0 +1,134 @@
+"""
+Optimistic concurrency: concurrent writers of one tabfile lose no edits,
+and edits made elsewhere are merged or reported as conflicts.
+"""
+
+import threading
+
+from cron_gui.cron_backend import TabfileBackend
+from cron_gui.cron_manager import CronManager
+from cron_gui.crontab_merge import PREFER_OURS, PREFER_THEIRS, merge_lines
+from cron_gui.edit_journal import content_hash
+
+THREADS = 8
+EDITS_PER_THREAD = 25
+
+
+def _run_threads(target):
+    """Run target(index) in THREADS threads started together."""
+    barrier = threading.Barrier(THREADS)
+    errors = []
+
+    def run(index):
+        try:
+            barrier.wait()
+            target(index)
+        except Exception as e:  # Reported by the test, not lost in the thread
+            errors.append(e)
+
+    threads = [threading.Thread(target=run, args=(idx,)) for idx in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+
+
+def test_write_if_unchanged_loses_no_edits(tmp_path):
+    path = tmp_path / "crontab"
+    path.write_text("SHELL=/bin/sh\n")
+
+    def writer(index):
+        backend = TabfileBackend(str(path))
+        for edit in range(EDITS_PER_THREAD):
+            line = f"{edit} {index % 24} * * * /bin/job-{index}-{edit}\n"
+            while True:
+                current = backend.read()
+                expected = content_hash(current)
+                if backend.write_if_unchanged(current + line, expected) is None:
+                    break
+
+    _run_threads(writer)
+    lines = path.read_text().splitlines()
+    assert lines[0] == "SHELL=/bin/sh"
+    expected = {
+        f"/bin/job-{index}-{edit}"
+        for index in range(THREADS)
+        for edit in range(EDITS_PER_THREAD)
+    }
+    assert {line.split()[-1] for line in lines[1:]} == expected
+    assert len(lines) == 1 + len(expected)
+
+
+def test_concurrent_managers_merge_their_edits(tmp_path):
+    path = tmp_path / "crontab"
+    path.write_text("0 0 * * * /bin/existing\n")
+
+    def editor(index):
+        # Each thread is another Cron GUI with its own, soon stale, copy
+        manager = CronManager(tabfile=str(path), persist=False)
+        for edit in range(EDITS_PER_THREAD // 5):
+            command = f"/bin/job-{index}-{edit}"
+            # Under heavy contention a write may give up; it reports that
+            for _ in range(20):
+                if manager.add_job(command, f"{edit} * * * *"):
+                    break
+            else:
+                raise AssertionError(f"{command} was never written")
+
+    _run_threads(editor)
+    manager = CronManager(tabfile=str(path), persist=False)
+    commands = [job["command"] for job in manager.list_jobs()]
+    assert commands[0] == "/bin/existing"
+    assert sorted(commands[1:]) == sorted(
+        f"/bin/job-{index}-{edit}"
+        for index in range(THREADS)
+        for edit in range(EDITS_PER_THREAD // 5)
+    )
+
+
+def test_unrelated_edits_merge(tmp_path):
+    path = tmp_path / "crontab"
+    path.write_text("0 1 * * * /bin/a\n0 2 * * * /bin/b\n")
+    manager = CronManager(tabfile=str(path), persist=False)
+
+    # crontab -e elsewhere reschedules b
+    path.write_text("0 1 * * * /bin/a\n30 2 * * * /bin/b\n")
+    assert manager.update_job(0, "/bin/a", "15 1 * * *")
+    assert manager.merged
+    assert path.read_text() == "15 1 * * * /bin/a\n30 2 * * * /bin/b\n"
+
+
+def test_schedule_and_command_edit_is_one_job():
+    """One side reschedules a job, the other rewrites its command."""
+    base = ["0 1 * * * /bin/a", "0 2 * * * /bin/b"]
+    ours = ["5 1 * * * /bin/a", "0 2 * * * /bin/b"]
+    theirs = ["0 1 * * * python3 -m tool --flag", "0 2 * * * /bin/b"]
+
+    result = merge_lines(base, ours, theirs)
+    assert [(c.ours, c.theirs) for c in result.conflicts] == [(ours[0], theirs[0])]
+    assert merge_lines(base, ours, theirs, PREFER_OURS).lines == ours
+    assert merge_lines(base, ours, theirs, PREFER_THEIRS).lines == theirs
+
+
+def test_rewritten_command_merges_with_other_edits():
+    """A rewritten command is still the same job for unrelated edits."""
+    base = ["0 1 * * * /bin/a", "0 2 * * * /bin/b"]
+    ours = ["0 1 * * * /bin/a", "0 3 * * * /bin/b"]
+    theirs = ["0 1 * * * python3 -m tool --flag", "0 2 * * * /bin/b"]
+    result = merge_lines(base, ours, theirs)
+    assert result.conflicts == []
+    assert result.lines == ["0 1 * * * python3 -m tool --flag", "0 3 * * * /bin/b"]
+
+
+def test_keep_mine_leaves_one_copy(tmp_path):
+    path = tmp_path / "crontab"
+    path.write_text("0 1 * * * /bin/a\n0 2 * * * /bin/b\n")
+    manager = CronManager(tabfile=str(path), persist=False)
+
+    path.write_text("0 1 * * * python3 -m tool --flag\n0 2 * * * /bin/b\n")
+    assert not manager.update_job(0, "/bin/a", "5 1 * * *")
+    assert len(manager.conflicts) == 1
+
+    assert manager.resolve_conflicts(keep_ours=True)
+    assert path.read_text() == "5 1 * * * /bin/a\n0 2 * * * /bin/b\n"
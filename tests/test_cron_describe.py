@@ -0,0 +1,65 @@
+"""
+Schedule descriptions: fields, special items, macros and invalid input.
+"""
+
+import pytest
+
+from cron_gui.cron_describe import describe_expression
+
+
+@pytest.mark.parametrize(
+    "expression, text",
+    [
+        ("* * * * *", "Every minute"),
+        ("*/15 * * * *", "Every 15 minutes"),
+        ("5-10 * * * *", "Every minute from 5 through 10 past the hour"),
+        ("0,30 * * * *", "At minutes 0 and 30 of every hour"),
+        ("0 9 * * *", "At 09:00"),
+        ("0 9,17 * * 1-5", "At 09:00 and 17:00, on Monday through Friday"),
+        ("0 1,2,3,4,5 * * *", "At minute 0, during hours 1, 2, 3, 4 and 5"),
+        ("0 8-18/2 * * *", "At minute 0, every 2 hours between 08:00 and 18:59"),
+        ("0 */2 * * sat,sun", "At minute 0, every 2 hours, on Saturday and Sunday"),
+        ("0 9 * * fri-mon", "At 09:00, on Friday through Monday"),
+        ("0 0 1 * *", "At 00:00, on day 1 of the month"),
+        (
+            "0 0 1,15 jan,jul *",
+            "At 00:00, on days 1 and 15 of the month, in January and July",
+        ),
+        ("0 0 9 * * 30", "At 00:00:30, on day 9 of the month"),
+    ],
+)
+def test_describes_fields(expression, text):
+    assert describe_expression(expression, "en") == text
+
+
+def test_ors_restricted_day_fields_like_cron():
+    assert describe_expression("0 0 1 * mon", "en") == (
+        "At 00:00, on day 1 of the month or on Monday"
+    )
+
+
+@pytest.mark.parametrize(
+    "expression, text",
+    [
+        ("0 0 L * *", "At 00:00, on the last day of the month"),
+        ("0 0 15W * *", "At 00:00, on the weekday nearest day 15 of the month"),
+        ("0 0 * * 5L", "At 00:00, on the last Friday of the month"),
+        ("0 0 * * 1#2", "At 00:00, on the second Monday of the month"),
+    ],
+)
+def test_describes_special_items(expression, text):
+    assert describe_expression(expression, "en") == text
+
+
+def test_describes_macros():
+    assert describe_expression("@daily", "en") == "At 00:00"
+    assert describe_expression("@REBOOT", "en") == "At system startup"
+
+
+@pytest.mark.parametrize("expression", ["61 * * * *", "* * *", "@bogus", ""])
+def test_reports_invalid_expressions(expression):
+    assert describe_expression(expression, "en") == "Invalid cron expression"
+
+
+def test_unknown_language_falls_back_to_english():
+    assert describe_expression("0 9 * * *", "xx") == "At 09:00"
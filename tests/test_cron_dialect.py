@@ -0,0 +1,62 @@
+"""
+What cron accepts: schedules the engine previews but cron refuses are not
+written.
+"""
+
+import pytest
+
+from cron_gui.cron_manager import CronManager
+from cron_gui.cron_schedule import compile_schedule, cron_dialect_error
+
+
+@pytest.mark.parametrize(
+    "expression",
+    [
+        "0 0 * * *",
+        "@daily",
+        "@reboot",
+        "*/15 9-17 * * 1-5",
+        "0 0 1,15 jan-jun mon-fri",
+        "5/15 * * * *",
+        "0 0 * * 5-7",
+    ],
+)
+def test_cron_accepts(expression):
+    compile_schedule(expression)
+    assert cron_dialect_error(expression) is None
+
+
+@pytest.mark.parametrize(
+    "expression, problem",
+    [
+        ("0 0 * * * 30", "seconds"),
+        ("0 0 ? * 1", "?"),
+        ("0 0 L * *", "L, W or #"),
+        ("0 0 LW * *", "L, W or #"),
+        ("0 0 15W * *", "L, W or #"),
+        ("30 2 * * 1#1", "L, W or #"),
+        ("0 0 * * 5L", "L, W or #"),
+        ("0 0 * * fri-mon", "fri-mon"),
+        ("0 0 * * 1,6-2/2", "6-2/2"),
+    ],
+)
+def test_cron_refuses_extensions(expression, problem):
+    compile_schedule(expression)
+    assert problem in cron_dialect_error(expression)
+
+
+def test_manager_does_not_write_extensions(tmp_path):
+    path = tmp_path / "tab"
+    path.write_text("0 0 L * * /bin/hand-written\n")
+    manager = CronManager(tabfile=str(path), persist=False)
+    # cron skips the line, so it is shown as not valid
+    assert not manager.list_jobs()[0]["valid"]
+
+    assert not manager.add_job("/bin/x", "30 2 * * 1#1")
+    assert not manager.add_job("/bin/x", "0 0 * * * 30")
+    assert not manager.update_job(0, "/bin/hand-written", "0 0 LW * *")
+    assert not manager.reschedule_jobs([0], "0 0 ? * 1")
+    assert path.read_text() == "0 0 L * * /bin/hand-written\n"
+
+    assert manager.update_job(0, "/bin/hand-written", "0 0 28 * *")
+    assert manager.list_jobs()[0]["valid"]
@@ -0,0 +1,67 @@
+"""
+Schedules in words: the phrase grammar and the input it refuses.
+"""
+
+import pytest
+
+from cron_gui.cron_parser import natural_to_cron
+from cron_gui.cron_schedule import compile_schedule, cron_dialect_error
+
+
+@pytest.mark.parametrize(
+    "phrase, lines",
+    [
+        ("every minute", ["* * * * *"]),
+        ("every 5 minutes", ["*/5 * * * *"]),
+        ("every half hour", ["*/30 * * * *"]),
+        ("every other hour", ["0 */2 * * *"]),
+        ("every hour at minute 30", ["30 * * * *"]),
+        ("15 past the hour", ["15 * * * *"]),
+        ("every day at noon", ["0 12 * * *"]),
+        ("Mon-Fri at 7:30", ["30 7 * * 1-5"]),
+        ("every Sunday at 8pm", ["0 20 * * 0"]),
+        ("Friday through Monday at 18:00", ["0 18 * * 0,1,5,6"]),
+        ("at 02:30 on the 1st of each month", ["30 2 1 * *"]),
+        ("on the 1st and 15th of January through June", ["0 0 1,15 1-6 *"]),
+        ("on December 25", ["0 0 25 12 *"]),
+        ("every 2 hours from 8 to 20", ["0 8-20/2 * * *"]),
+        ("every 3 months", ["0 0 1 */3 *"]),
+        ("every week", ["0 0 * * 0"]),
+        ("between 22 and 6 every hour", ["0 0-6,22,23 * * *"]),
+        ("at 9:15 and 17:45", ["15 9 * * *", "45 17 * * *"]),
+        (
+            "every 15 minutes on weekdays between 9 and 17",
+            ["*/15 9-16 * * 1-5", "0 17 * * 1-5"],
+        ),
+        ("every 90 minutes", ["0 */3 * * *", "30 1-22/3 * * *"]),
+    ],
+)
+def test_phrases(phrase, lines):
+    assert list(natural_to_cron(phrase)) == lines
+    for line in lines:
+        compile_schedule(line)
+        assert cron_dialect_error(line) is None
+
+
+@pytest.mark.parametrize(
+    "phrase, error",
+    [
+        ("", "Describe when to run"),
+        ("blah", "Did not understand 'blah'"),
+        ("at 25:00", "25:00 is not a time"),
+        ("on day 32", "32 is not a day of the month"),
+        ("every 25 hours", "Cannot repeat every 25 hours"),
+        ("every minute at 9:00", "Give either times or every how many minutes"),
+        ("at 9:00 between 8 and 10", "Give either times or a time window"),
+        ("on Monday on the 1st at 1", "give only one of them"),
+        # Cron has no way to say these; 1#1, 5L, L and LW would be skipped
+        ("first Monday of each month at 02:30", "first Monday of a month"),
+        ("first and third Tuesday at 9", "first and third Tuesday of a month"),
+        ("last Friday at 5", "last Friday of a month"),
+        ("last weekday of the month at 18:00", "last weekday of a month"),
+        ("on the last day of the month", "last day of a month"),
+    ],
+)
+def test_refused_phrases(phrase, error):
+    with pytest.raises(ValueError, match=error):
+        natural_to_cron(phrase)
@@ -0,0 +1,144 @@
+"""
+Crontab documents: byte-for-byte round trips, line kinds and edits.
+"""
+
+import io
+
+import pytest
+
+from cron_gui.crontab_document import (
+    LINE_BLANK,
+    LINE_COMMENT,
+    LINE_ENV,
+    LINE_JOB,
+    CrontabDocument,
+    iter_jobs,
+)
+
+CRONTAB = (
+    "# m h dom mon dow command\n"
+    "MAILTO = ops@example.com\n"
+    "\n"
+    "*/5  *\t* * *   /usr/bin/check   # every five\n"
+    "#0 3 * * 1 backup --full\n"
+    "@reboot  start-agent\n"
+    "PATH='/usr/local/bin:/usr/bin'\n"
+    "0 9 * jan,jul mon-fri report\n"
+    "not a crontab line\n"
+    "#   free-form note\n"
+)
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        CRONTAB,
+        CRONTAB.rstrip("\n"),
+        "",
+        "\n\n",
+        "0 * * * * caf\udce9 --latin1\n",
+    ],
+)
+def test_renders_text_unchanged(text):
+    assert CrontabDocument.parse(text).render() == text
+
+
+def test_bytes_and_files_round_trip():
+    data = CRONTAB.encode() + b"0 * * * * caf\xe9\n"
+    text = data.decode("utf-8", errors="surrogateescape")
+    assert CrontabDocument.parse(data).render() == text
+    assert CrontabDocument.parse(io.BytesIO(data)).render() == text
+    assert CrontabDocument.parse(io.StringIO(CRONTAB)).render() == CRONTAB
+
+
+def test_drops_carriage_returns():
+    doc = CrontabDocument.parse("a=1\r\n0 * * * * run\r\n")
+    assert doc.job(0).command == "run"
+    assert doc.render() == "a=1\n0 * * * * run\n"
+
+
+def test_classifies_lines():
+    kinds = [line.kind for line in CrontabDocument.parse(CRONTAB).lines]
+    assert kinds == [
+        LINE_COMMENT,
+        LINE_ENV,
+        LINE_BLANK,
+        LINE_JOB,
+        LINE_JOB,
+        LINE_JOB,
+        LINE_ENV,
+        LINE_JOB,
+        LINE_COMMENT,
+        LINE_COMMENT,
+    ]
+
+
+def test_splits_job_fields():
+    fields = [line.fields for line in iter_jobs(CRONTAB)]
+    assert fields == [
+        (True, "*/5 * * * *", "/usr/bin/check", "every five"),
+        (False, "0 3 * * 1", "backup --full", ""),
+        (True, "@reboot", "start-agent", ""),
+        (True, "0 9 * jan,jul mon-fri", "report", ""),
+    ]
+
+
+def test_env_scopes_follow_assignments():
+    doc = CrontabDocument.parse(CRONTAB)
+    scopes = doc.env_scopes()
+    assert [dict(scope) for scope in scopes] == [
+        {"MAILTO": "ops@example.com"},
+        {"MAILTO": "ops@example.com"},
+        {"MAILTO": "ops@example.com"},
+        {"MAILTO": "ops@example.com", "PATH": "/usr/local/bin:/usr/bin"},
+    ]
+    assert scopes[0] is scopes[2]
+
+
+def test_edits_rewrite_only_changed_lines():
+    doc = CrontabDocument.parse(CRONTAB)
+    doc.replace(doc.job(0), "*/10 * * * * /usr/bin/check")
+    doc.remove(doc.job(1))
+    doc.insert_before(doc.job(1), "MAILTO=")
+    lines = doc.render().split("\n")
+    assert lines[3] == "*/10 * * * * /usr/bin/check"
+    assert lines[4:6] == ["MAILTO=", "@reboot  start-agent"]
+    assert lines[7] == "0 9 * jan,jul mon-fri report"
+    assert [line.dirty for line in doc.lines].count(True) == 2
+
+
+def test_set_env_block_keeps_unchanged_assignments():
+    doc = CrontabDocument.parse("A = 1\nB=2\n0 * * * * run\n")
+    original = doc.lines[0]
+    doc.set_env_block(doc.job(0), {"A": "1", "C": " padded "})
+    assert doc.render() == 'A = 1\nC=" padded "\n0 * * * * run\n'
+    assert doc.lines[0] is original
+
+
+def test_replace_all_keeps_unchanged_head_and_tail():
+    doc = CrontabDocument.parse("a=1\n0 * * * * one\n0 * * * * two\nb=2\n")
+    head, tail = doc.lines[0], doc.lines[-1]
+    doc.replace_all("a=1\n5 * * * * new\nb=2")
+    assert doc.render() == "a=1\n5 * * * * new\nb=2"
+    assert doc.lines[0] is head and doc.lines[-1] is tail
+    assert [line.dirty for line in doc.lines] == [False, True, False]
+
+
+def test_snapshot_restores_texts_and_structure():
+    doc = CrontabDocument.parse(CRONTAB)
+    snapshot = doc.snapshot()
+    doc.replace(doc.job(0), "1 * * * * other")
+    doc.remove_many(doc.jobs()[1:])
+    doc.restore(snapshot)
+    assert doc.render() == CRONTAB
+    assert len(doc.jobs()) == 4
+
+
+def test_apply_hunks_rejects_mismatched_lines():
+    doc = CrontabDocument.parse("a=1\nb=2\n")
+    with pytest.raises(ValueError, match="does not match"):
+        doc.apply_hunks([(0, 0, ["x=9"], ["y=1"])])
+    doc.apply_hunks([(1, 1, ["b=2"], ["c=3"])])
+    assert doc.render() == "a=1\nc=3\n"
+    doc.apply_hunks([(1, 1, ["b=2"], ["c=3"])], undo=True)
+    assert doc.render() == "a=1\nb=2\n"
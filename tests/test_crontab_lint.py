@@ -0,0 +1,146 @@
+"""
+Crontab lint: every rule, duplicates and the findings cache.
+"""
+
+from datetime import datetime
+
+import pytest
+
+from cron_gui import crontab_lint
+from cron_gui.crontab_lint import CrontabLinter, LintFinding, lint_key, lint_one
+
+NOW = datetime(2026, 3, 1, 12, 0)
+
+# Redirected and with an absolute path, so only schedule rules speak
+QUIET = "/bin/job >/dev/null 2>&1"
+
+
+def _rules(schedule, command=QUIET, mailto=None):
+    return [finding.rule for finding in lint_one((schedule, command, mailto), NOW)]
+
+
+def test_clean_job_has_no_findings():
+    assert _rules("*/5 * * * *") == []
+
+
+@pytest.mark.parametrize(
+    "schedule, rule",
+    [
+        ("61 * * * *", "invalid"),
+        ("0 0 L * *", "unsupported-syntax"),
+        ("30 2 * * 1#1", "unsupported-syntax"),
+        ("0 0 * * * 30", "unsupported-syntax"),
+        ("0 0 31 2 *", "impossible-date"),
+        ("0 0 1-15 * 1", "day-or"),
+    ],
+)
+def test_schedule_rules(schedule, rule):
+    assert _rules(schedule) == [rule]
+
+
+def test_impossible_date_names_the_months():
+    (finding,) = lint_one(("0 0 30 2 *", QUIET, None), NOW)
+    assert finding == LintFinding(
+        "impossible-date", "error", "Never runs: February has no day 30"
+    )
+
+
+def test_rarely_runs():
+    # The next 29 February is almost four years away
+    (finding,) = lint_one(("0 0 29 2 *", QUIET, None), datetime(2024, 3, 1))
+    assert finding.rule == "rarely-runs"
+    assert finding.message.endswith("2028-02-29 00:00")
+
+
+def test_never_runs():
+    # Only L/W/# schedules, which cron refuses anyway, get past the
+    # impossible-date rule and never run
+    job = crontab_lint._Job(("0 0 * * *", QUIET, None), NOW)
+    job._next_run = None
+    assert crontab_lint._rule_never_runs(job).rule == "never-runs"
+
+
+def test_day_or_is_not_reported_for_a_starred_field():
+    assert _rules("0 0 */2 * 1") == []
+
+
+def test_percent():
+    assert _rules("0 0 * * *", "date +%F >/dev/null") == ["unescaped-percent"]
+    assert _rules("0 0 * * *", "date +\\%F >/dev/null") == []
+
+
+def test_relative_path():
+    assert _rules("0 0 * * *", "cd /tmp && ./run >/dev/null") == ["relative-path"]
+    assert _rules("0 0 * * *", "FOO=1 bin/run >/dev/null") == ["relative-path"]
+    assert _rules("0 0 * * *", "$HOME/run >/dev/null") == []
+
+
+def test_output():
+    assert _rules("0 0 * * *", "/bin/job", "") == ["output-lost"]
+    (finding,) = lint_one(("0 0 * * *", "/bin/job", "ops@example.com"), NOW)
+    assert finding.rule == "output-mailed"
+    assert "ops@example.com" in finding.message
+    assert _rules("0 0 * * *", "/bin/job | logger") == []
+
+
+def test_error_stops_later_schedule_rules():
+    # Both day fields are restricted, but the line never runs at all
+    assert _rules("0 0 31 2 1#1") == ["unsupported-syntax"]
+
+
+def _job(idx, schedule, command=QUIET, enabled=True, host=None, mailto=None):
+    env = {"MAILTO": mailto} if mailto is not None else {}
+    return {
+        "id": idx,
+        "schedule": schedule,
+        "command": command,
+        "enabled": enabled,
+        "valid": True,
+        "host": host,
+        "env": env,
+    }
+
+
+def test_duplicates_compare_normalized_schedules():
+    jobs = [
+        _job(0, "*/15 * * * *"),
+        _job(1, "0,15,30,45 * * * *"),
+        _job(2, "0,15,30,45 * * * *", enabled=False),
+        _job(3, "*/15 * * * *", host="other"),
+        _job(4, "@daily"),
+        _job(5, "0 0 * * *"),
+    ]
+    results = CrontabLinter().lint(jobs)
+    duplicates = [
+        finding.message
+        for findings in results
+        for finding in findings
+        if finding.rule == "duplicate"
+    ]
+    assert duplicates == [
+        "Same schedule and command as job 1",
+        "Same schedule and command as job 5",
+    ]
+    assert [f.rule for f in results[1]] == ["duplicate"]
+    assert results[2] == ()
+    assert results[3] == ()
+
+
+def test_findings_are_cached_and_primed():
+    linter = CrontabLinter()
+    jobs = [_job(0, "0 0 31 2 *")]
+    first = linter.lint(jobs)
+    findings, normalized = linter.cached_state()
+    assert findings == {lint_key(jobs[0]): first[0]}
+
+    primed = CrontabLinter()
+    primed.prime({key: tuple(map(tuple, found)) for key, found in findings.items()})
+    assert primed.lint(jobs) == first
+
+
+def test_cache_is_bounded():
+    linter = CrontabLinter(cache_size=2)
+    linter.lint([_job(idx, f"{idx} * * * *") for idx in range(5)])
+    assert len(linter.cached_state()[0]) == 5
+    linter.lint([_job(0, "7 7 * * *")])
+    assert len(linter.cached_state()[0]) == 2
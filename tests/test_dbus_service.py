@@ -0,0 +1,165 @@
+"""
+D-Bus service: a real service on a private bus started with dbus-run-session.
+"""
+
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+gi = pytest.importorskip("gi")
+gi.require_version("Gio", "2.0")
+from gi.repository import GLib, Gio  # noqa: E402
+
+from cron_gui.dbus_client import ServiceClient, is_stale  # noqa: E402
+from cron_gui.dbus_service import BUS_NAME  # noqa: E402
+from cron_gui.edit_journal import content_hash  # noqa: E402
+
+if shutil.which("dbus-run-session") is None:
+    pytest.skip("dbus-run-session is not installed", allow_module_level=True)
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(__file__)), "src")
+
+CRONTAB = """\
+CRON_TZ=UTC
+0 * * * * /bin/hourly
+30 2 * * * /bin/nightly
+# 0 1 * * * /bin/disabled
+"""
+
+
+@pytest.fixture
+def service(tmp_path):
+    """Start the service on a private bus; yield (client, tabfile path)."""
+    path = tmp_path / "jobs.cron"
+    path.write_text(CRONTAB)
+    env = dict(os.environ, PYTHONPATH=SRC)
+    process = subprocess.Popen(
+        [
+            "dbus-run-session",
+            "--",
+            "sh",
+            "-c",
+            'echo "$DBUS_SESSION_BUS_ADDRESS"; exec "$0" -m cron_gui.dbus_service '
+            '--tabfile="$1"',
+            sys.executable,
+            str(path),
+        ],
+        stdout=subprocess.PIPE,
+        env=env,
+        text=True,
+        start_new_session=True,
+    )
+    try:
+        address = process.stdout.readline().strip()
+        connection = Gio.DBusConnection.new_for_address_sync(
+            address,
+            Gio.DBusConnectionFlags.AUTHENTICATION_CLIENT
+            | Gio.DBusConnectionFlags.MESSAGE_BUS_CONNECTION,
+            None,
+            None,
+        )
+        client = ServiceClient(connection)
+        deadline = time.monotonic() + 10
+        while True:
+            try:
+                client.list_jobs()
+                break
+            except GLib.Error:
+                if time.monotonic() > deadline or process.poll() is not None:
+                    raise
+                time.sleep(0.05)
+        yield client, path
+
+        # Stop the service first; dbus-run-session then ends the bus
+        (pid,) = connection.call_sync(
+            "org.freedesktop.DBus",
+            "/org/freedesktop/DBus",
+            "org.freedesktop.DBus",
+            "GetConnectionUnixProcessID",
+            GLib.Variant("(s)", (BUS_NAME,)),
+            GLib.VariantType("(u)"),
+            Gio.DBusCallFlags.NONE,
+            -1,
+            None,
+        ).unpack()
+        os.kill(pid, signal.SIGTERM)
+        assert process.wait(timeout=10) == 0
+    finally:
+        if process.poll() is None:
+            os.killpg(process.pid, signal.SIGTERM)
+            process.wait(timeout=10)
+
+
+def test_lists_jobs(service):
+    client, path = service
+    fingerprint, jobs = client.list_jobs()
+    assert fingerprint == content_hash(path.read_text())
+    assert [(job.id, job.command, job.enabled) for job in jobs] == [
+        (0, "/bin/hourly", True),
+        (1, "/bin/nightly", True),
+        (2, "/bin/disabled", False),
+    ]
+    assert jobs[0].env["CRON_TZ"] == "UTC"
+    assert client.get_job(1).schedule == "30 2 * * *"
+
+
+def test_next_runs_and_forecast(service):
+    client, _ = service
+    runs = client.next_runs(0, 3)
+    assert len(runs) == 3
+    assert all(later - earlier == 3600 for earlier, later in zip(runs, runs[1:]))
+
+    start = int(datetime(2026, 1, 1, tzinfo=timezone.utc).timestamp())
+    forecast = client.forecast(start, start + 6 * 3600)
+    # Runs after the start and before the end; the disabled job never runs
+    assert forecast == [
+        (start + 3600, 0),
+        (start + 2 * 3600, 0),
+        (start + 2 * 3600 + 1800, 1),
+        (start + 3 * 3600, 0),
+        (start + 4 * 3600, 0),
+        (start + 5 * 3600, 0),
+    ]
+    assert client.forecast(start, start + 6 * 3600, limit=2) == forecast[:2]
+
+
+def test_unknown_job_is_an_invalid_argument(service):
+    client, _ = service
+    with pytest.raises(GLib.Error) as error:
+        client.get_job(99)
+    remote = Gio.DBusError.get_remote_error(error.value)
+    assert remote == "org.freedesktop.DBus.Error.InvalidArgs"
+
+
+def test_writes_check_the_fingerprint(service):
+    client, path = service
+    fingerprint, _ = client.list_jobs()
+    assert client.add_job("15 * * * *", "/bin/added", fingerprint=fingerprint)
+    assert path.read_text().endswith("15 * * * * /bin/added\n")
+
+    # The listing the add was based on is now out of date
+    with pytest.raises(GLib.Error) as error:
+        client.delete_jobs([0], fingerprint=fingerprint)
+    assert is_stale(error.value)
+    assert "/bin/hourly" in path.read_text()
+
+    # So is every listing from before a change made outside the service
+    fingerprint, _ = client.list_jobs()
+    path.write_text("0 5 * * * /bin/other\n" + path.read_text())
+    with pytest.raises(GLib.Error) as error:
+        client.toggle_jobs([0], False, fingerprint=fingerprint)
+    assert is_stale(error.value)
+
+    fingerprint, jobs = client.list_jobs()
+    assert jobs[0].command == "/bin/other"
+    assert client.update_job(
+        1, "5 * * * *", "/bin/hourly", fingerprint=fingerprint
+    )
+    assert "5 * * * * /bin/hourly\n" in path.read_text()
+    assert client.undo() == "Edit job"
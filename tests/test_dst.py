@@ -0,0 +1,221 @@
+"""
+Daylight saving corpus for the run engine in cron_schedule.
+
+Cron follows vixie cron / cronie: a fixed-time job (no wildcard in the
+minute or hour field) whose time is skipped by a forward jump runs once,
+right after the jump, and runs only once in a repeated interval. Wildcard
+jobs skip the missing times and run in both passes of repeated ones.
+Expected runs are UTC times, so they do not depend on the local zone.
+"""
+
+from datetime import datetime, timedelta, timezone
+from itertools import islice
+
+import pytest
+
+from cron_gui.cron_manager import CronManager
+from cron_gui.cron_parser import iter_next_runs, next_run_timestamp
+from cron_gui.cron_schedule import compile_schedule, iter_run_timestamps, iter_runs
+
+
+def _utc(timestamp: int) -> str:
+    """Format a UTC timestamp like the expected values below."""
+    return datetime.fromtimestamp(timestamp, timezone.utc).strftime("%Y-%m-%d %H:%M")
+
+
+def runs(expression: str, start: str, tz: str, count: int = 3):
+    """Get the first runs after a wall time in a zone, as UTC strings."""
+    schedule = compile_schedule(expression)
+    start_time = datetime.strptime(start, "%Y-%m-%d %H:%M")
+    return [
+        _utc(ts) for ts in islice(iter_run_timestamps(schedule, start_time, tz), count)
+    ]
+
+
+# (zone, expression, wall time to start after, expected UTC runs)
+CORPUS = [
+    # Berlin, 2026-03-29: 02:00 CET jumps to 03:00 CEST (01:00 UTC)
+    pytest.param(
+        "Europe/Berlin",
+        "30 2 * * *",
+        "2026-03-28 12:00",
+        ["2026-03-29 01:00", "2026-03-30 00:30", "2026-03-31 00:30"],
+        id="berlin-spring-fixed-runs-at-gap-end",
+    ),
+    pytest.param(
+        "Europe/Berlin",
+        "0,15,30,45 2 * * *",
+        "2026-03-29 00:00",
+        ["2026-03-29 01:00", "2026-03-30 00:00", "2026-03-30 00:15"],
+        id="berlin-spring-fixed-several-in-gap-run-once",
+    ),
+    pytest.param(
+        "Europe/Berlin",
+        "30 * * * *",
+        "2026-03-29 00:45",
+        ["2026-03-29 00:30", "2026-03-29 01:30", "2026-03-29 02:30"],
+        id="berlin-spring-wildcard-skips-gap",
+    ),
+    pytest.param(
+        "Europe/Berlin",
+        "*/30 2 * * *",
+        "2026-03-29 00:00",
+        ["2026-03-30 00:00", "2026-03-30 00:30", "2026-03-31 00:00"],
+        id="berlin-spring-wildcard-minute-skips-gap",
+    ),
+    # Berlin, 2026-10-25: 03:00 CEST goes back to 02:00 CET (01:00 UTC)
+    pytest.param(
+        "Europe/Berlin",
+        "30 2 * * *",
+        "2026-10-24 12:00",
+        ["2026-10-25 00:30", "2026-10-26 01:30", "2026-10-27 01:30"],
+        id="berlin-fall-fixed-runs-once",
+    ),
+    pytest.param(
+        "Europe/Berlin",
+        "30 * * * *",
+        "2026-10-25 01:45",
+        ["2026-10-25 00:30", "2026-10-25 01:30", "2026-10-25 02:30"],
+        id="berlin-fall-wildcard-repeats",
+    ),
+    # New York, 2026-03-08: 02:00 EST jumps to 03:00 EDT (07:00 UTC)
+    pytest.param(
+        "America/New_York",
+        "30 2 * * *",
+        "2026-03-07 12:00",
+        ["2026-03-08 07:00", "2026-03-09 06:30", "2026-03-10 06:30"],
+        id="new-york-spring-fixed-runs-at-gap-end",
+    ),
+    pytest.param(
+        "America/New_York",
+        "30 * * * *",
+        "2026-03-08 01:45",
+        ["2026-03-08 07:30", "2026-03-08 08:30", "2026-03-08 09:30"],
+        id="new-york-spring-wildcard-skips-gap",
+    ),
+    # New York, 2026-11-01: 02:00 EDT goes back to 01:00 EST (06:00 UTC)
+    pytest.param(
+        "America/New_York",
+        "30 1 * * *",
+        "2026-10-31 12:00",
+        ["2026-11-01 05:30", "2026-11-02 06:30", "2026-11-03 06:30"],
+        id="new-york-fall-fixed-runs-once",
+    ),
+    pytest.param(
+        "America/New_York",
+        "30 * * * *",
+        "2026-11-01 00:45",
+        ["2026-11-01 05:30", "2026-11-01 06:30", "2026-11-01 07:30"],
+        id="new-york-fall-wildcard-repeats",
+    ),
+    # Lord Howe, 2026-10-04: 02:00 (+10:30) jumps half an hour to 02:30
+    # (+11:00, 15:30 UTC the day before)
+    pytest.param(
+        "Australia/Lord_Howe",
+        "15 2 * * *",
+        "2026-10-03 12:00",
+        ["2026-10-03 15:30", "2026-10-04 15:15", "2026-10-05 15:15"],
+        id="lord-howe-spring-fixed-runs-at-gap-end",
+    ),
+    pytest.param(
+        "Australia/Lord_Howe",
+        "15 * * * *",
+        "2026-10-04 01:00",
+        ["2026-10-03 14:45", "2026-10-03 16:15", "2026-10-03 17:15"],
+        id="lord-howe-spring-wildcard-skips-gap",
+    ),
+    pytest.param(
+        "Australia/Lord_Howe",
+        "45 2 * * *",
+        "2026-10-03 12:00",
+        ["2026-10-03 15:45", "2026-10-04 15:45", "2026-10-05 15:45"],
+        id="lord-howe-spring-after-gap-unchanged",
+    ),
+    # Lord Howe, 2026-04-05: 02:00 (+11:00) goes back to 01:30 (+10:30,
+    # 15:00 UTC the day before)
+    pytest.param(
+        "Australia/Lord_Howe",
+        "45 1 * * *",
+        "2026-04-04 12:00",
+        ["2026-04-04 14:45", "2026-04-05 15:15", "2026-04-06 15:15"],
+        id="lord-howe-fall-fixed-runs-once",
+    ),
+    pytest.param(
+        "Australia/Lord_Howe",
+        "45 * * * *",
+        "2026-04-05 00:50",
+        ["2026-04-04 14:45", "2026-04-04 15:15", "2026-04-04 16:15"],
+        id="lord-howe-fall-wildcard-repeats",
+    ),
+]
+
+
+@pytest.mark.parametrize("tz, expression, start, expected", CORPUS)
+def test_runs_around_transitions(tz, expression, start, expected):
+    assert runs(expression, start, tz) == expected
+
+
+def test_iter_runs_reports_offset_after_jump():
+    """Aware results carry the offset in effect at each run."""
+    schedule = compile_schedule("30 2 * * *")
+    first, second = islice(
+        iter_runs(schedule, datetime(2026, 3, 28, 12), "Europe/Berlin"), 2
+    )
+    two_hours = timedelta(hours=2)
+    assert (first.hour, first.minute, first.utcoffset()) == (3, 0, two_hours)
+    assert (second.hour, second.minute, second.utcoffset()) == (2, 30, two_hours)
+
+
+def test_iter_runs_repeated_hour_offsets():
+    """A wildcard job's two runs in a repeated hour differ in offset only."""
+    schedule = compile_schedule("30 * * * *")
+    start = datetime(2026, 11, 1, 5, 0, tzinfo=timezone.utc)
+    first, second = islice(iter_runs(schedule, start, "America/New_York"), 2)
+    assert (first.hour, first.minute) == (second.hour, second.minute) == (1, 30)
+    assert first.utcoffset() == timedelta(hours=-4)
+    assert second.utcoffset() == timedelta(hours=-5)
+
+
+def test_aware_start_is_exclusive():
+    """Runs strictly after an aware start, even inside a repeated hour."""
+    schedule = compile_schedule("30 * * * *")
+    start = datetime(2026, 10, 25, 0, 30, tzinfo=timezone.utc)
+    first = next(iter_run_timestamps(schedule, start, "Europe/Berlin"))
+    assert _utc(first) == "2026-10-25 01:30"
+
+
+def test_cron_tz_of_job_sets_zone(tmp_path):
+    """CRON_TZ above a job decides its zone, whatever the local zone is."""
+    tabfile = tmp_path / "crontab"
+    tabfile.write_text(
+        "CRON_TZ=Australia/Lord_Howe\n"
+        "15 2 * * * /usr/bin/backup\n"
+        "CRON_TZ=America/New_York\n"
+        "30 1 * * * /usr/bin/report\n"
+    )
+    jobs = CronManager(tabfile=str(tabfile), persist=False).list_jobs()
+    zones = [job["env"]["CRON_TZ"] for job in jobs]
+    assert zones == ["Australia/Lord_Howe", "America/New_York"]
+
+    after = datetime(2026, 10, 3, 12, tzinfo=timezone.utc).timestamp()
+    first = next_run_timestamp(jobs[0]["schedule"], after, zones[0])
+    assert _utc(first) == "2026-10-03 15:30"
+
+    after = datetime(2026, 10, 31, 12, tzinfo=timezone.utc).timestamp()
+    first = next_run_timestamp(jobs[1]["schedule"], after, zones[1])
+    assert _utc(first) == "2026-11-01 05:30"
+
+
+def test_cron_tz_next_runs():
+    """Previews in a job's CRON_TZ follow that zone's transitions."""
+    start = datetime(2026, 3, 7, 12)
+    previews = [
+        run.strftime("%Y-%m-%d %H:%M %Z")
+        for run in iter_next_runs("30 2 * * *", 2, start, tz="America/New_York")
+    ]
+    assert previews == ["2026-03-08 03:00 EDT", "2026-03-09 02:30 EDT"]
+
+
+def test_unknown_cron_tz_has_no_runs():
+    assert list(iter_next_runs("30 2 * * *", 2, tz="Mars/Olympus_Mons")) == []
+    assert next_run_timestamp("30 2 * * *", 0, "Mars/Olympus_Mons") is None
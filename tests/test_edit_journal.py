@@ -0,0 +1,113 @@
+"""
+Edit journal: fingerprints, undo and redo, and the persisted history.
+"""
+
+from cron_gui.cron_manager import CronManager
+from cron_gui.edit_journal import EditJournal, content_hash
+
+
+def test_hash_accepts_text_that_is_not_utf8():
+    text = b"0 * * * * echo caf\xe9\n".decode("utf-8", errors="surrogateescape")
+    assert content_hash(text) != content_hash("0 * * * * echo caf\n")
+
+
+def test_manager_loads_and_keeps_latin1_bytes(tmp_path):
+    path = tmp_path / "tab"
+    path.write_bytes(b"# caf\xe9\n0 * * * * echo caf\xe9\n")
+    manager = CronManager(tabfile=str(path), persist=False)
+    assert [job["command"] for job in manager.list_jobs()] == [
+        "echo caf\udce9"
+    ]
+    assert manager.add_job("echo more", "5 * * * *")
+    assert path.read_bytes() == (
+        b"# caf\xe9\n0 * * * * echo caf\xe9\n5 * * * * echo more\n"
+    )
+
+
+def test_persisted_journal_is_private(tmp_path):
+    path = tmp_path / "journal" / "tab.jsonl"
+    journal = EditJournal(str(path))
+    journal.record("Add job", [(0, 0, [], ["SECRET=1"])], "a", "b")
+    assert path.parent.stat().st_mode & 0o777 == 0o700
+    assert path.stat().st_mode & 0o777 == 0o600
+
+
+def _manager(tmp_path, text="0 * * * * one\n"):
+    path = tmp_path / "tab"
+    if not path.exists():
+        path.write_text(text)
+    journal = EditJournal(str(tmp_path / "journal.jsonl"))
+    return path, CronManager(tabfile=str(path), journal=journal, persist=False)
+
+
+def test_undo_and_redo_replay_edits(tmp_path):
+    path, manager = _manager(tmp_path)
+    assert manager.add_job("two", "5 * * * *")
+    assert manager.update_job(0, "uno", "0 * * * *")
+    assert manager.undo() is not None
+    assert path.read_text() == "0 * * * * one\n5 * * * * two\n"
+    assert manager.undo() is not None
+    assert path.read_text() == "0 * * * * one\n"
+    assert manager.undo() is None
+    assert manager.redo() is not None
+    assert manager.redo() is not None
+    assert path.read_text() == "0 * * * * uno\n5 * * * * two\n"
+    assert manager.redo() is None
+
+
+def test_new_edit_drops_redo(tmp_path):
+    path, manager = _manager(tmp_path)
+    manager.add_job("two", "5 * * * *")
+    manager.undo()
+    manager.add_job("three", "6 * * * *")
+    assert not manager.journal.can_redo()
+    assert manager.undo() is not None
+    assert path.read_text() == "0 * * * * one\n"
+
+
+def test_history_survives_reload(tmp_path):
+    path, manager = _manager(tmp_path)
+    manager.add_job("two", "5 * * * *")
+    manager.add_job("three", "6 * * * *")
+    manager.undo()
+
+    _, reopened = _manager(tmp_path)
+    assert reopened.journal.position == 1
+    assert reopened.redo() is not None
+    assert path.read_text() == "0 * * * * one\n5 * * * * two\n6 * * * * three\n"
+    assert reopened.undo() is not None
+    assert reopened.undo() is not None
+    assert path.read_text() == "0 * * * * one\n"
+
+
+def test_outside_change_clears_history(tmp_path):
+    path, manager = _manager(tmp_path)
+    manager.add_job("two", "5 * * * *")
+    path.write_text("0 * * * * edited by hand\n")
+    manager.reload()
+    assert not manager.journal.can_undo()
+    assert manager.undo() is None
+    assert path.read_text() == "0 * * * * edited by hand\n"
+
+
+def test_keeps_only_the_newest_entries():
+    journal = EditJournal(max_entries=3)
+    for idx in range(5):
+        journal.record(f"edit {idx}", [(0, 0, [], ["x"])], str(idx), str(idx + 1))
+    assert [entry.label for entry in journal.entries] == ["edit 2", "edit 3", "edit 4"]
+    assert journal.state() == "5"
+
+
+def test_compacts_a_mostly_dead_file(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    journal = EditJournal(str(path), max_entries=2)
+    for idx in range(40):
+        journal.record(f"edit {idx}", [(0, 0, [], ["x"])], str(idx), str(idx + 1))
+    journal.undone()
+    assert len(path.read_text().splitlines()) < 40
+
+    reopened = EditJournal(str(path), max_entries=2)
+    assert [entry.label for entry in reopened.entries] == [
+        entry.label for entry in journal.entries
+    ]
+    assert reopened.position == journal.position
@@ -0,0 +1,141 @@
+"""
+Fleet diff: schedule normalization, comparing crontabs and syncing them.
+"""
+
+import pytest
+
+from cron_gui import fleet_diff
+from cron_gui.cron_manager import CronManager
+from cron_gui.cron_schedule import normalize_schedule
+from cron_gui.crontab_document import CrontabDocument
+from cron_gui.fleet_diff import (
+    MAJORITY,
+    CrontabState,
+    diff_state,
+    diff_states,
+    format_diff,
+    majority_state,
+    sync_changes,
+)
+
+
+def _state(name, text):
+    return CrontabState(name, CrontabDocument.parse(text).jobs())
+
+
+@pytest.mark.parametrize(
+    "left, right",
+    [
+        ("*/15 * * * *", "0,15,30,45 * * * *"),
+        ("@daily", "0 0 * * *"),
+        ("0 0 * * 7", "0 0 * * 0"),
+        ("0 9 * jan-mar mon-fri", "0 9 * 1-3 1-5"),
+        ("0 0 * * * 0", "0 0 * * *"),
+        ("0  0 *  * *", "0 0 * * *"),
+    ],
+)
+def test_equivalent_schedules_normalize_equal(left, right):
+    assert normalize_schedule(left) == normalize_schedule(right)
+
+
+@pytest.mark.parametrize(
+    "left, right",
+    [
+        # A restricted day-of-month makes cron run on either day field
+        ("0 0 1-31 * 1", "0 0 * * 1"),
+        ("0 0 * * *", "0 1 * * *"),
+        ("0 0 L * *", "0 0 31 * *"),
+    ],
+)
+def test_different_schedules_normalize_apart(left, right):
+    assert normalize_schedule(left) != normalize_schedule(right)
+
+
+def test_invalid_schedule_only_collapses_whitespace():
+    assert normalize_schedule("61  * * * *") == "61 * * * *"
+    assert normalize_schedule("@reboot") == "@reboot"
+
+
+def test_diff_finds_missing_differing_and_extra_jobs():
+    target = _state("web1", "0 1 * * * /bin/a\n0 2 * * * /bin/b\n0 3 * * * /bin/c\n")
+    state = _state("web2", "0 1 * * * /bin/a\n*/5 * * * * /bin/b\n0 4 * * * /bin/d\n")
+    diff = diff_state(state, target)
+    assert [target.jobs[d].command for d in diff.missing] == ["/bin/c"]
+    assert [
+        (state.jobs[mine].schedule, target.jobs[theirs].schedule)
+        for mine, theirs in diff.differ
+    ] == [("*/5 * * * *", "0 2 * * *")]
+    assert [state.jobs[d].command for d in diff.extra] == ["/bin/d"]
+    header = format_diff(diff, state, target)[0]
+    assert header == "@@ web2: 1 missing, 1 differ, 1 extra"
+
+
+def test_equivalent_crontabs_are_the_same():
+    left = _state("a", "*/15 * * * * /bin/a\n# note\n@daily /bin/b\n")
+    right = _state("b", "0,15,30,45 * * * * /bin/a\n0 0 * * * /bin/b\n")
+    assert diff_state(left, right).same
+
+
+def test_duplicate_jobs_are_counted():
+    target = _state("a", "0 1 * * * /bin/a\n0 1 * * * /bin/a\n")
+    state = _state("b", "0 1 * * * /bin/a\n")
+    diff = diff_state(state, target)
+    assert len(diff.missing) == 1 and not diff.extra
+
+
+def test_majority_takes_the_common_version():
+    states = [
+        _state("a", "0 1 * * * /bin/a\n0 2 * * * /bin/b\n"),
+        _state("b", "0 1 * * * /bin/a\n0 5 * * * /bin/b\n"),
+        _state("c", "0 1 * * * /bin/a\n0 2 * * * /bin/b\n0 3 * * * /bin/c\n"),
+    ]
+    target = majority_state(states)
+    assert target.name == MAJORITY
+    assert [line.text for line in target.jobs.values()] == [
+        "0 1 * * * /bin/a",
+        "0 2 * * * /bin/b",
+    ]
+    _, diffs = diff_states(states)
+    assert [diff.same for diff in diffs] == [True, False, False]
+
+
+def test_unknown_target_raises():
+    states = [_state("a", ""), _state("b", "")]
+    with pytest.raises(KeyError):
+        diff_states(states, "c")
+
+
+def test_sync_changes_keep_order_and_comments(tmp_path):
+    target = _state("t", "0 1 * * * /bin/a\n0 2 * * * /bin/b\n0 3 * * * /bin/c\n")
+    path = tmp_path / "tab"
+    path.write_text(
+        "# keep me\n0 3 * * * /bin/c\n*/5 * * * * /bin/a\n0 9 * * * /bin/x\n"
+    )
+    manager = CronManager(tabfile=str(path), persist=False)
+    state = CrontabState("tab", manager.document.jobs())
+    diff = diff_state(state, target)
+    replace, delete, insert = sync_changes(state, target, diff)
+    assert replace == {1: "0 1 * * * /bin/a"}
+    assert delete == [2]
+    # Above /bin/c, the next target job the crontab keeps
+    assert insert == [(0, "0 2 * * * /bin/b")]
+    assert fleet_diff.sync_manager(manager, target, state=state)
+    assert path.read_text() == (
+        "# keep me\n0 2 * * * /bin/b\n0 3 * * * /bin/c\n0 1 * * * /bin/a\n"
+    )
+    assert fleet_diff.sync_manager(manager, target) is None
+
+
+def test_main_compares_files_without_writing_history(tmp_path, capsys):
+    first = tmp_path / "first"
+    second = tmp_path / "second"
+    first.write_text("0 1 * * * /bin/a\n")
+    second.write_text("0 2 * * * /bin/a\n")
+    assert fleet_diff.main([str(first), str(second), "--target", str(first)]) == 1
+    assert "1 of 2 crontabs match" in capsys.readouterr().out
+
+    assert fleet_diff.main(
+        [str(first), str(second), "--target", str(first), "--apply"]
+    ) == 0
+    assert second.read_text() == "0 1 * * * /bin/a\n"
+    assert not (tmp_path / "xdg").exists()
@@ -0,0 +1,104 @@
+"""
+History store: commits, checkouts and diffs of crontab versions.
+"""
+
+import difflib
+import random
+
+import pytest
+
+from cron_gui.history_store import KEYFRAME_INTERVAL, HistoryStore
+
+
+def _versions(count, seed=7):
+    """Crontab texts that each edit, add or remove a few lines."""
+    rng = random.Random(seed)
+    lines = [f"{idx} * * * * job-{idx}" for idx in range(40)]
+    texts = []
+    for step in range(count):
+        for _ in range(rng.randint(1, 3)):
+            pos = rng.randrange(len(lines))
+            action = rng.choice(("edit", "add", "remove"))
+            if action == "edit":
+                lines[pos] = f"{pos % 60} * * * * job-{pos} --step={step}"
+            elif action == "add":
+                lines.insert(pos, f"@daily new-{step}")
+            elif len(lines) > 1:
+                del lines[pos]
+        texts.append("\n".join(lines) + ("\n" if step % 5 else ""))
+    return texts
+
+
+def test_checks_out_bytes_that_are_not_utf8(tmp_path):
+    raw = b"# caf\xe9\n0 * * * * echo \xff\xfe\n"
+    content = raw.decode("utf-8", errors="surrogateescape")
+    store = HistoryStore(str(tmp_path / "history"))
+    assert store.commit(content, "First", "alice") is not None
+
+    # A second process reads the store from disk
+    reopened = HistoryStore(str(tmp_path / "history"))
+    restored = reopened.checkout(1)
+    assert restored.encode("utf-8", errors="surrogateescape") == raw
+
+
+def test_store_is_private(tmp_path):
+    directory = tmp_path / "history"
+    HistoryStore(str(directory)).commit("SECRET=1\n", "First", "alice")
+    assert directory.stat().st_mode & 0o777 == 0o700
+    for path in directory.iterdir():
+        assert path.stat().st_mode & 0o777 == 0o600, path.name
+
+
+def test_checks_out_every_version(tmp_path):
+    texts = _versions(2 * KEYFRAME_INTERVAL + 3)
+    store = HistoryStore(str(tmp_path / "history"))
+    for idx, text in enumerate(texts):
+        assert store.commit(text, f"Edit {idx}", "alice").number == idx + 1
+
+    reopened = HistoryStore(str(tmp_path / "history"))
+    bases = [version.base for version in reopened.versions()]
+    assert bases[KEYFRAME_INTERVAL] == 0 and any(bases)
+    for number in reversed(range(1, len(texts) + 1)):
+        assert reopened.checkout(number) == texts[number - 1]
+    assert [version.label for version in reopened.versions()][:2] == [
+        "Edit 0",
+        "Edit 1",
+    ]
+
+
+def test_skips_unchanged_content(tmp_path):
+    store = HistoryStore(str(tmp_path / "history"))
+    assert store.commit("a=1\n", "First", "alice") is not None
+    assert store.commit("a=1\n", "Again", "alice") is None
+    assert store.commit("", "Emptied", "bob").user == "bob"
+    assert store.checkout(2) == ""
+    assert len(store.versions()) == 2
+
+
+def test_sees_commits_of_other_processes(tmp_path):
+    first = HistoryStore(str(tmp_path / "history"))
+    second = HistoryStore(str(tmp_path / "history"))
+    first.commit("a=1\n", "First", "alice")
+    second.commit("a=1\nb=2\n", "Second", "bob")
+    assert first.latest().label == "Second"
+    assert first.checkout(2) == "a=1\nb=2\n"
+
+
+def test_diff_matches_difflib(tmp_path):
+    texts = _versions(6, seed=3)
+    store = HistoryStore(str(tmp_path / "history"))
+    for text in texts:
+        store.commit(text, "Edit", "alice")
+
+    for old, new in ((1, 6), (3, 4), (0, 2)):
+        before = texts[old - 1].splitlines() if old else []
+        after = texts[new - 1].splitlines()
+        expected = list(difflib.unified_diff(before, after, lineterm=""))[2:]
+        assert list(store.diff(old, new)) == expected
+
+
+def test_unknown_version(tmp_path):
+    store = HistoryStore(str(tmp_path / "history"))
+    store.commit("a=1\n", "First", "alice")
+    with pytest.raises(KeyError):
+        store.checkout(2)
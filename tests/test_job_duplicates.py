@@ -0,0 +1,110 @@
+"""
+Duplicate jobs: identical and mergeable schedules, and similar commands.
+"""
+
+import pytest
+
+from cron_gui.job_duplicates import (
+    IDENTICAL,
+    SAME_COMMAND,
+    SIMILAR,
+    DuplicateGroup,
+    command_shingles,
+    find_duplicates,
+    jaccard,
+    merge_schedules,
+)
+
+# Near-identical commands differ only in their last argument, so 98% of
+# their shingles match and the LSH bands put them into a shared bucket
+# whatever the hash seed
+_SCRIPT = "/opt/app/bin/sync " + " ".join(f"--opt{n}={n}" for n in range(48))
+_FLAGS = " --region="
+
+
+def _jobs(*rows):
+    return [
+        {"id": idx, "schedule": schedule, "command": command, "enabled": True}
+        for idx, (schedule, command) in enumerate(rows)
+    ]
+
+
+def test_groups_equivalent_schedules_as_identical():
+    jobs = _jobs(
+        ("0 9 * * 1-5", "report"),
+        ("0 9 * * mon,tue,wed,thu,fri", "report"),
+        ("0 9 * * *", "other"),
+    )
+    assert find_duplicates(jobs) == [DuplicateGroup(IDENTICAL, [0, 1])]
+
+
+def test_merges_schedules_differing_in_one_field():
+    jobs = _jobs(("0 9 * * *", "report"), ("0 17 * * *", "report"))
+    assert find_duplicates(jobs) == [
+        DuplicateGroup(SAME_COMMAND, [0, 1], "0 9,17 * * *")
+    ]
+
+
+def test_skips_disabled_invalid_and_other_crontabs():
+    jobs = _jobs(
+        ("0 9 * * *", "report"),
+        ("0 9 * * *", "report"),
+        ("0 9 * * *", "report"),
+        ("0 9 * * *", "report"),
+    )
+    jobs[1]["enabled"] = False
+    jobs[2]["valid"] = False
+    jobs[3]["source"] = "root"
+    assert find_duplicates(jobs) == []
+
+
+def test_groups_near_identical_commands():
+    jobs = _jobs(
+        ("0 1 * * *", _SCRIPT + _FLAGS + "eu-west-1"),
+        ("0 2 * * *", "/usr/bin/unrelated --cleanup"),
+        ("0 3 * * *", _SCRIPT + _FLAGS + "us-east-1"),
+    )
+    (group,) = find_duplicates(jobs)
+    assert group.kind == SIMILAR and group.job_ids == [0, 2]
+    expected = jaccard(
+        command_shingles(jobs[0]["command"]), command_shingles(jobs[2]["command"])
+    )
+    assert group.similarity == pytest.approx(expected)
+    assert group.similarity >= 0.7
+    assert find_duplicates(jobs, threshold=1.0) == []
+
+
+def test_finds_similar_commands_among_many():
+    rows = [(f"{idx % 60} * * * *", f"task-{idx} --id={idx}") for idx in range(2000)]
+    rows[500] = ("0 1 * * *", _SCRIPT + _FLAGS + "eu-west-1")
+    rows[1500] = ("0 2 * * *", _SCRIPT + _FLAGS + "us-east-1")
+    groups = find_duplicates(_jobs(*rows))
+    assert [(group.kind, group.job_ids) for group in groups] == [
+        (SIMILAR, [500, 1500])
+    ]
+
+
+def test_shingles_split_paths_and_options():
+    assert command_shingles("/opt/app/run --x=1") == {
+        ("opt", "app"),
+        ("app", "run"),
+        ("run", "--x"),
+        ("--x", "1"),
+    }
+    assert command_shingles("backup") == {("backup",)}
+
+
+@pytest.mark.parametrize(
+    "schedules, merged",
+    [
+        (["0 9 * * *", "0 17 * * *"], "0 9,17 * * *"),
+        (["0 9 * * *", "0 * * * *"], "0 * * * *"),
+        (["0 9 * * 1", "0 9 * * 3"], "0 9 * * 1,3"),
+        (["0 9 * * *", "30 17 * * *"], None),
+        (["0 9 * * 1", "0 9 * * *"], None),
+        (["0 0 L * *", "0 0 1 * *"], None),
+        (["@reboot", "0 9 * * *"], None),
+    ],
+)
+def test_merge_schedules(schedules, merged):
+    assert merge_schedules(schedules) == merged
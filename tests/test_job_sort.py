@@ -0,0 +1,198 @@
+"""
+Job list keys: sorting, grouping into sections, search and next runs.
+"""
+
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+from cron_gui import job_sort
+from cron_gui.crontab_document import EnvScope
+from cron_gui.job_sort import (
+    NEVER,
+    JobKeys,
+    NextRunQueue,
+    command_prefix,
+    countdown,
+    matches_search,
+    rank_jobs,
+)
+
+# Monday 2024-01-01 10:00 UTC
+NOW = datetime(2024, 1, 1, 10, 0, tzinfo=timezone.utc).timestamp()
+UTC = EnvScope(variables={"CRON_TZ": "UTC"})
+
+
+@pytest.fixture(autouse=True)
+def utc(monkeypatch):
+    """Date the group labels in UTC."""
+    monkeypatch.setenv("TZ", "UTC")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+def _job(idx, schedule, command, enabled=True, **extra):
+    job = {
+        "id": idx,
+        "schedule": schedule,
+        "command": command,
+        "comment": "",
+        "enabled": enabled,
+        "valid": True,
+        "env": UTC,
+    }
+    job.update(extra)
+    return job
+
+
+JOBS = [
+    _job(0, "0 12 * * *", "/opt/bin/backup.sh --full", user="root"),
+    _job(1, "30 10 * * *", "LANG=C report", user="alice"),
+    _job(2, "0 9 * * *", "cleanup", enabled=False, user="alice"),
+    _job(3, "@reboot", "/usr/bin/agent", user=None),
+    _job(4, "0 8 * * *", "backup.sh --quick", user="root", host="db1"),
+]
+
+
+def _order(ranks):
+    return sorted(range(len(ranks)), key=ranks.__getitem__)
+
+
+@pytest.mark.parametrize(
+    "field, order",
+    [
+        ("file", [0, 1, 2, 3, 4]),
+        ("next_run", [1, 0, 4, 2, 3]),
+        ("command", [0, 3, 4, 2, 1]),
+        ("enabled", [0, 1, 3, 4, 2]),
+        ("user", [3, 1, 2, 0, 4]),
+    ],
+)
+def test_sorts_by_field_with_file_order_breaking_ties(field, order):
+    keys = [JobKeys(job) for job in JOBS]
+    ranks, _, _ = rank_jobs(keys, field, now=NOW)
+    assert _order(ranks) == order
+
+
+def test_descending_reverses_the_order():
+    keys = [JobKeys(job) for job in JOBS]
+    ranks, _, _ = rank_jobs(keys, "next_run", descending=True, now=NOW)
+    assert _order(ranks) == [3, 2, 4, 0, 1]
+
+
+def test_groups_form_consecutive_sections():
+    keys = [JobKeys(job) for job in JOBS]
+    ranks, group_ranks, labels = rank_jobs(keys, "file", "command", now=NOW)
+    assert _order(ranks) == [3, 0, 4, 2, 1]
+    assert [group_ranks[idx] for idx in _order(ranks)] == [0, 1, 1, 2, 3]
+    assert labels == ["backup.sh", "report", "cleanup", "agent", "backup.sh"]
+
+
+def test_groups_by_next_run_date():
+    keys = [JobKeys(job) for job in JOBS]
+    _, group_ranks, labels = rank_jobs(keys, "next_run", "next_run", now=NOW)
+    assert labels == [
+        "Monday, 01 January 2024",
+        "Monday, 01 January 2024",
+        "Not Scheduled",
+        "Not Scheduled",
+        "Tuesday, 02 January 2024",
+    ]
+    assert group_ranks == [0, 0, 2, 2, 1]
+
+
+def test_groups_unknown_values_together():
+    keys = [JobKeys(job) for job in JOBS]
+    _, _, labels = rank_jobs(keys, "file", "host", now=NOW)
+    assert labels == ["(unknown)"] * 4 + ["db1"]
+
+
+def test_next_run_is_only_recomputed_once_it_passed(monkeypatch):
+    calls = []
+    real = job_sort.next_run_timestamp
+
+    def counting(*args):
+        calls.append(args)
+        return real(*args)
+
+    monkeypatch.setattr(job_sort, "next_run_timestamp", counting)
+    keys = JobKeys(JOBS[1])
+    first = keys.next_run(NOW)
+    assert first == NOW + 1800
+    assert keys.next_run(NOW + 1799) == first
+    assert len(calls) == 1
+    assert keys.next_run(first) == first + 86400
+    assert len(calls) == 2
+    assert JobKeys(JOBS[2]).next_run(NOW) == NEVER
+
+
+@pytest.mark.parametrize(
+    "command, prefix",
+    [
+        ("/opt/bin/backup.sh --full", "backup.sh"),
+        ("LANG=C TZ=UTC '/usr/bin/run' x", "run"),
+        ("FOO=1", ""),
+        ("cd /srv && make", "cd"),
+    ],
+)
+def test_command_prefix(command, prefix):
+    assert command_prefix(command) == prefix
+
+
+@pytest.mark.parametrize(
+    "text, matched",
+    [
+        ("", [0, 1, 2, 3, 4]),
+        ("backup", [0, 4]),
+        ("clean", [2]),
+        ("@reboot", [3]),
+        ("db1", [4]),
+        ("none", []),
+    ],
+)
+def test_search_matches_command_schedule_comment_and_host(text, matched):
+    assert [job["id"] for job in JOBS if matches_search(job, text)] == matched
+
+
+def test_queue_pops_due_runs_in_order():
+    queue = NextRunQueue()
+    queue.rebuild([(30.0, "c"), (NEVER, "never"), (10.0, "a")])
+    queue.push(20.0, "b")
+    assert len(queue) == 3
+    assert queue.deadline() == 10.0
+    assert queue.pop_due(25.0) == ["a", "b"]
+    assert queue.deadline() == 30.0
+    assert queue.pop_due(25.0) == []
+
+
+@pytest.mark.parametrize(
+    "remaining, text",
+    [
+        (0.2, "1s"),
+        (59, "59s"),
+        (192, "3m 12s"),
+        (3600, "1h 0m"),
+        (3700, "1h 1m"),
+        (86399, "23h 59m"),
+        (2 * 86400 + 4 * 3600 + 59, "2d 4h"),
+    ],
+)
+def test_countdown_text(remaining, text):
+    assert countdown(NOW + remaining, NOW)[0] == text
+
+
+@pytest.mark.parametrize("remaining", [1.5, 59.25, 192, 3700, 90000.5])
+def test_countdown_changes_exactly_at_its_deadline(remaining):
+    next_run = NOW + remaining
+    text, deadline = countdown(next_run, NOW)
+    assert NOW < deadline < next_run
+    assert countdown(next_run, deadline - 0.01)[0] == text
+    assert countdown(next_run, deadline)[0] != text
+
+
+def test_last_second_lasts_until_the_run_passed():
+    # The row then shows the job's following run
+    assert countdown(NOW + 0.5, NOW)[1] >= NOW + 0.5
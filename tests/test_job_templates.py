@@ -0,0 +1,53 @@
+"""
+Template expansion: placeholders, staggering and rejected input.
+"""
+
+import io
+
+import pytest
+
+from cron_gui.job_templates import JobTemplate, read_parameters
+
+
+def test_expands_rows_in_order():
+    template = JobTemplate("0 2 * * *", "backup --tenant={{tenant}}", "job {{n}}")
+    rows = read_parameters(io.StringIO("tenant\nacme\nglobex\n"))
+    assert [tuple(job) for job in template.expand(rows)] == [
+        (1, "0 2 * * *", "backup --tenant=acme", "job 1"),
+        (2, "0 2 * * *", "backup --tenant=globex", "job 2"),
+    ]
+
+
+def test_staggers_minutes():
+    template = JobTemplate("0 2 * * *", "run {{x}}", stagger=2)
+    rows = [{"x": str(idx)} for idx in range(3)]
+    assert [job.schedule for job in template.expand(rows)] == [
+        "0 2 * * *",
+        "1 2 * * *",
+        "0 2 * * *",
+    ]
+
+
+@pytest.mark.parametrize(
+    "schedule, command, comment, field",
+    [
+        ("0 * * * *", "echo a\necho {{x}}", "", "command"),
+        ("0 * * * *\n1 * * * *", "echo {{x}}", "", "schedule"),
+        ("0 * * * *", "echo {{x}}", "first\r\nsecond", "comment"),
+    ],
+)
+def test_rejects_line_breaks_in_template(schedule, command, comment, field):
+    with pytest.raises(ValueError, match=f"The {field} spans several lines"):
+        JobTemplate(schedule, command, comment)
+
+
+def test_rejects_line_breaks_in_values():
+    template = JobTemplate("0 * * * *", "echo {{x}}")
+    with pytest.raises(ValueError, match="Row 2: x spans several lines"):
+        list(template.expand([{"x": "1"}, {"x": "a\nb"}]))
+
+
+def test_reports_missing_values():
+    template = JobTemplate("0 * * * *", "echo {{x}} {{y}}")
+    with pytest.raises(ValueError, match="Row 1 has no value for y"):
+        list(template.expand([{"x": "1"}]))
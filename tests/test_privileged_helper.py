@@ -0,0 +1,155 @@
+"""
+Privileged helper: the stand-in helper under a fake pkexec, as the window
+starts it.
+"""
+
+import os
+
+import pytest
+
+from cron_gui.cron_backend import BackendError
+from cron_gui.cron_manager import CronManager
+from cron_gui.edit_journal import content_hash
+from cron_gui.privileged_helper import (
+    READ_ONLY_ERROR,
+    PrivilegedBackend,
+    PrivilegedHelper,
+    handle_request,
+)
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(__file__)), "src")
+
+
+@pytest.fixture
+def root(tmp_path, monkeypatch):
+    """A stand-in / with crontabs, reached through a fake pkexec on PATH."""
+    root = tmp_path / "root"
+    (root / "etc" / "cron.d").mkdir(parents=True)
+    (root / "var" / "spool" / "cron" / "crontabs").mkdir(parents=True)
+    (root / "etc" / "crontab").write_text("17 * * * * root cd / && run-parts\n")
+    (root / "etc" / "cron.d" / "backup").write_text("0 3 * * * root /bin/backup\n")
+    (root / "var" / "spool" / "cron" / "crontabs" / "alice").write_text(
+        "0 1 * * * /bin/alice\n"
+    )
+
+    # pkexec runs its arguments; the stand-in helper works under root
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    pkexec = bin_dir / "pkexec"
+    pkexec.write_text('#!/bin/sh\nexec "$@" --root="$FAKE_ROOT"\n')
+    pkexec.chmod(0o755)
+    monkeypatch.setenv("FAKE_ROOT", str(root))
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.setenv("PYTHONPATH", SRC)
+    monkeypatch.delenv("CRON_GUI_HELPER", raising=False)
+    return root
+
+
+@pytest.fixture
+def helper(root):
+    helper = PrivilegedHelper()
+    assert helper.command[0] == "pkexec"
+    yield helper
+    helper.close()
+
+
+def test_reads_a_user_crontab(helper):
+    backend = PrivilegedBackend("user/alice", helper)
+    assert backend.read() == "0 1 * * * /bin/alice\n"
+    assert backend.describe() == "crontab of alice"
+    assert not backend.read_only
+
+
+def test_write_if_unchanged_checks_the_fingerprint(root, helper):
+    path = root / "var" / "spool" / "cron" / "crontabs" / "alice"
+    backend = PrivilegedBackend("user/alice", helper)
+    expected = content_hash(backend.read())
+    assert backend.write_if_unchanged("0 2 * * * /bin/new\n", expected) is None
+    assert path.read_text() == "0 2 * * * /bin/new\n"
+
+    # The fingerprint is now stale; the current text comes back instead
+    current = backend.write_if_unchanged("0 3 * * * /bin/lost\n", expected)
+    assert current == "0 2 * * * /bin/new\n"
+    assert path.read_text() == current
+
+
+def test_manager_edits_through_one_helper(root, helper):
+    manager = CronManager(
+        backend=PrivilegedBackend("user/alice", helper), persist=False
+    )
+    assert manager.add_job("/bin/more", "5 * * * *")
+    assert manager.delete_job(0)
+    path = root / "var" / "spool" / "cron" / "crontabs" / "alice"
+    assert path.read_text() == "5 * * * * /bin/more\n"
+    assert not (root.parent / "xdg").exists()
+
+
+@pytest.mark.parametrize(
+    "target",
+    ["user/../../etc/shadow", "user/", "cron.d/evil.sh", "cron.d/../crontab", "etc"],
+)
+def test_rejects_targets_it_does_not_edit(helper, target):
+    with pytest.raises(BackendError, match="Unknown target"):
+        PrivilegedBackend(target, helper).read()
+    # A refused operation does not end the session
+    assert PrivilegedBackend("user/alice", helper).read()
+
+
+def test_rejects_malformed_writes(helper):
+    (result,) = helper.request(
+        [{"op": "write", "target": "user/alice", "content": "a\0b"}]
+    )
+    assert not result["ok"] and "NUL" in result["error"]
+    (result,) = helper.request(
+        [{"op": "write", "target": "user/alice", "content": "", "expected": "x"}]
+    )
+    assert not result["ok"] and "fingerprint" in result["error"]
+
+
+@pytest.mark.parametrize(
+    "target, relative",
+    [("system", "etc/crontab"), ("cron.d/backup", "etc/cron.d/backup")],
+)
+def test_system_crontabs_are_read_only(root, helper, target, relative):
+    path = root / relative
+    before = path.read_text()
+    backend = PrivilegedBackend(target, helper)
+    assert backend.read_only
+    assert backend.read() == before
+    with pytest.raises(BackendError, match="read-only"):
+        backend.write("* * * * * root /bin/evil\n")
+    with pytest.raises(BackendError, match="read-only"):
+        backend.write_if_unchanged("* * * * * root /bin/evil\n", content_hash(before))
+
+    # The helper refuses too, for windows that skip the backend's check
+    (result,) = helper.request(
+        [{"op": "write", "target": target, "content": "* * * * * root /bin/evil\n"}]
+    )
+    assert result == {"ok": False, "error": READ_ONLY_ERROR}
+    assert path.read_text() == before
+
+    assert not CronManager(backend=backend, persist=False).delete_job(0)
+    assert path.read_text() == before
+
+
+def test_operations_after_a_failure_are_skipped(root):
+    reply = handle_request(
+        {
+            "ops": [
+                {"op": "read", "target": "nope"},
+                {"op": "write", "target": "user/alice", "content": "x\n"},
+            ]
+        },
+        str(root),
+    )
+    assert [result["ok"] for result in reply["results"]] == [False, False]
+    assert "Skipped" in reply["results"][1]["error"]
+
+
+def test_cancelled_authentication(tmp_path, root):
+    # pkexec exits without starting the helper when the dialog is dismissed
+    (tmp_path / "bin" / "pkexec").write_text("#!/bin/sh\nexit 126\n")
+    helper = PrivilegedHelper()
+    with pytest.raises(BackendError, match="cancelled"):
+        PrivilegedBackend("user/alice", helper).read()
+    helper.close()
@@ -0,0 +1,114 @@
+"""
+Schedule calendar: counted runs per day and hour match generated runs.
+"""
+
+from collections import Counter
+from datetime import date, datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from cron_gui.cron_schedule import compile_schedule, iter_run_timestamps, local_zone
+from cron_gui.crontab_document import EnvScope
+from cron_gui.schedule_calendar import ScheduleCalendar
+
+LOCAL = "Europe/Berlin"
+
+# (schedule, CRON_TZ) of the jobs; Kolkata is half an hour off the hour
+JOBS = [
+    ("* * * * *", None),
+    ("*/7 1-3 * * *", None),
+    ("30 2 * * *", None),
+    ("0 9 * * mon-fri", None),
+    ("15 0 L * *", None),
+    ("0 12 1,15 * *", "America/New_York"),
+    ("45 23 * * *", "Asia/Kolkata"),
+    ("*/20 * * * sun", "Asia/Kolkata"),
+    ("@reboot", None),
+    ("0 0 * * *", "Nowhere/Unknown"),
+]
+
+
+@pytest.fixture(autouse=True)
+def berlin(monkeypatch):
+    """Use a local zone with DST changes."""
+    monkeypatch.setenv("TZ", LOCAL)
+    local_zone.cache_clear()
+    yield
+    monkeypatch.undo()
+    local_zone.cache_clear()
+
+
+def _jobs():
+    jobs = []
+    for idx, (schedule, tz) in enumerate(JOBS):
+        env = EnvScope(variables={"CRON_TZ": tz} if tz else {})
+        jobs.append(
+            {
+                "id": idx,
+                "schedule": schedule,
+                "enabled": True,
+                "valid": True,
+                "env": env,
+            }
+        )
+    return jobs
+
+
+def _generated(first: date, days: int) -> Counter:
+    """Count the runs per local (day, hour) by generating every run."""
+    local = ZoneInfo(LOCAL)
+    start = datetime(first.year, first.month, first.day, tzinfo=local)
+    end = (start + timedelta(days=days + 1)).timestamp()
+    counts: Counter = Counter()
+    for schedule, tz in JOBS:
+        if schedule == "@reboot" or tz == "Nowhere/Unknown":
+            continue
+        after = (start - timedelta(days=2)).astimezone(timezone.utc)
+        for timestamp in iter_run_timestamps(compile_schedule(schedule), after, tz):
+            if timestamp >= end:
+                break
+            moment = datetime.fromtimestamp(timestamp, local)
+            counts[moment.date(), moment.hour] += 1
+    return counts
+
+
+@pytest.mark.parametrize("year, month", [(2024, 3), (2024, 6), (2024, 10)])
+def test_month_counts_match_generated_runs(year, month):
+    counts = ScheduleCalendar(_jobs()).month_counts(year, month)
+    generated = _generated(date(year, month, 1), len(counts))
+    expected = [
+        sum(generated[date(year, month, day + 1), hour] for hour in range(24))
+        for day in range(len(counts))
+    ]
+    assert counts == expected
+
+
+@pytest.mark.parametrize(
+    "day", [date(2024, 3, 31), date(2024, 10, 27), date(2024, 6, 30)]
+)
+def test_day_hours_match_generated_runs(day):
+    hours = ScheduleCalendar(_jobs()).day_hours(day)
+    generated = _generated(day, 1)
+    expected = [generated[day, hour] for hour in range(24)]
+    if day == date(2024, 10, 27):
+        # Both passes of the repeated hour are counted
+        assert hours[2] == expected[2] > 60
+    assert hours == expected
+
+
+def test_hour_jobs_lists_runs_per_job():
+    calendar = ScheduleCalendar(_jobs())
+    assert calendar.hour_jobs(date(2024, 6, 3), 9) == [(0, 60), (3, 1)]
+    # Sunday in Kolkata ends at 20:30 in Berlin
+    assert calendar.hour_jobs(date(2024, 6, 30), 20) == [(0, 60), (6, 1), (7, 1)]
+
+
+def test_skips_disabled_and_invalid_jobs():
+    jobs = _jobs()
+    for job in jobs:
+        job["enabled"] = job["id"] != 0
+    jobs[1]["valid"] = False
+    hours = ScheduleCalendar(jobs).day_hours(date(2024, 6, 3))
+    assert (hours[2], hours[9], hours[20]) == (1, 1, 1)
+    assert sum(hours) == 3
@@ -0,0 +1,153 @@
+"""
+Fuzz the schedule engine against croniter.
+
+Random expressions over the whole grammar are compiled by cron_schedule
+and croniter, and their next runs must agree. croniter follows vixie cron
+except in two places, which the generator therefore never produces:
+
+* A day field starting with ``*`` (``*/2``) counts as unrestricted in
+  vixie, so the day of month and day of week must then both match;
+  croniter treats it as restricted and matches either. Day fields are
+  plain ``*`` or have no wildcard.
+* ``5-5/2`` is just 5 in vixie and "5 to the end, every 2" in croniter;
+  stepped ranges always have a larger end.
+* ``3/2`` in the day of week field runs up to 7 (Sunday again) in cronie
+  and only up to 6 in croniter; that field has no open-ended steps.
+
+``L``, ``W`` and ``#`` only appear with the other day field unrestricted,
+where both agree. The vixie behaviour of the excluded forms is checked
+against fixed expectations at the end.
+"""
+
+import random
+from datetime import datetime, timezone
+from itertools import islice
+
+import pytest
+
+from cron_gui.cron_schedule import (
+    MONTH_NAMES,
+    WEEKDAY_NAMES,
+    compile_schedule,
+    iter_run_timestamps,
+)
+
+croniter = pytest.importorskip("croniter").croniter
+
+SEEDS = range(5)
+EXPRESSIONS_PER_SEED = 200
+RUNS_PER_EXPRESSION = 20
+
+_MONTHS = list(MONTH_NAMES)
+_WEEKDAYS = list(WEEKDAY_NAMES)
+
+
+def _item(
+    rng: random.Random, low: int, high: int, names=None, wildcard=True, open_step=True
+) -> str:
+    """One list item of a field: a value, range, stepped range, n/step or */n."""
+    kind = rng.randrange(5 if wildcard else 4)
+    first = rng.randint(low, high)
+
+    def name(value):
+        # Names only stand for values in their range, e.g. not 7 for Sunday
+        if names and value - low < len(names) and rng.random() < 0.3:
+            return names[value - low]
+        return str(value)
+
+    if kind == 0 or first == high:
+        return name(first)
+    last = rng.randint(first + 1, high)
+    if kind == 1:
+        return f"{name(first)}-{name(last)}"
+    step = rng.randint(2, max(2, (high - low) // 2))
+    if kind == 2:
+        return f"{first}-{last}/{step}"
+    if kind == 3:
+        return f"{first}/{step}" if open_step and rng.random() < 0.3 else name(first)
+    return f"*/{step}"
+
+
+def _field(rng: random.Random, low: int, high: int, names=None, **options) -> str:
+    """A whole field: ``*`` or a list of one to three items, see _item."""
+    if rng.random() < 0.35:
+        return "*"
+    count = rng.choice((1, 1, 1, 2, 3))
+    return ",".join(_item(rng, low, high, names, **options) for _ in range(count))
+
+
+def random_expression(rng: random.Random) -> str:
+    """Generate an expression both engines read the same way."""
+    minute = _field(rng, 0, 59)
+    hour = _field(rng, 0, 23)
+    month = _field(rng, 1, 12, _MONTHS)
+    day = _field(rng, 1, 28, wildcard=False)
+    weekday = _field(rng, 0, 6, _WEEKDAYS, wildcard=False, open_step=False)
+
+    special = rng.random()
+    if special < 0.1:
+        day, weekday = rng.choice(("L", f"{rng.randint(1, 28)}W")), "*"
+    elif special < 0.2:
+        day = "*"
+        weekday = rng.choice(
+            (f"{rng.randint(0, 6)}#{rng.randint(1, 4)}", f"L{rng.randint(0, 6)}")
+        )
+
+    fields = [minute, hour, day, month, weekday]
+    if rng.random() < 0.1:
+        fields.append(_field(rng, 0, 59))
+    return " ".join(fields)
+
+
+def engine_runs(expression: str, start: datetime, count: int):
+    """Get the next runs by cron_schedule, as UTC timestamps."""
+    schedule = compile_schedule(expression)
+    return list(islice(iter_run_timestamps(schedule, start, "UTC"), count))
+
+
+def croniter_runs(expression: str, start: datetime, count: int):
+    """Get the next runs by croniter, as UTC timestamps."""
+    runs = croniter(expression, start)
+    return [int(runs.get_next(float)) for _ in range(count)]
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_matches_croniter(seed):
+    rng = random.Random(seed)
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    for _ in range(EXPRESSIONS_PER_SEED):
+        expression = random_expression(rng)
+        expected = croniter_runs(expression, start, RUNS_PER_EXPRESSION)
+        assert engine_runs(expression, start, RUNS_PER_EXPRESSION) == expected, (
+            expression
+        )
+
+
+def _days(expression: str, count: int = 3):
+    """Get the month-day of the first runs of an expression in 2026."""
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    return [
+        datetime.fromtimestamp(ts, timezone.utc).strftime("%m-%d %H:%M")
+        for ts in engine_runs(expression, start, count)
+    ]
+
+
+def test_starred_day_step_needs_both_days():
+    """Vixie: with */2 the day of month and day of week must both match."""
+    # Odd days of the month that are Mondays
+    assert _days("0 0 */2 * 1") == ["01-05 00:00", "01-19 00:00", "02-09 00:00"]
+
+
+def test_restricted_days_match_either():
+    """Vixie: with both day fields restricted, either may match."""
+    assert _days("0 0 1,15 * 1") == ["01-05 00:00", "01-12 00:00", "01-15 00:00"]
+
+
+def test_single_value_stepped_range():
+    """Vixie: 5-5/2 is the value 5 alone."""
+    assert _days("5-5/2 0 * * *") == ["01-01 00:05", "01-02 00:05", "01-03 00:05"]
+
+
+def test_open_weekday_step_reaches_sunday():
+    """Cronie: 3/2 in the day of week field is 3, 5 and 7, i.e. Sunday."""
+    assert _days("0 0 * * 3/2") == ["01-02 00:00", "01-04 00:00", "01-07 00:00"]
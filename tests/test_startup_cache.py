@@ -0,0 +1,125 @@
+"""
+Startup cache: round trips, and files that must not be trusted.
+"""
+
+import json
+import time
+
+import pytest
+
+from cron_gui import startup_cache
+from cron_gui.crontab_document import EnvScope
+from cron_gui.startup_cache import StartupCache
+
+SOURCE = "tabfile:/srv/caf\udce9.cron"
+CONTENT = "MAILTO=ops\n0 * * * * echo caf\udce9\n"
+
+
+def _save(cache, source=SOURCE):
+    env = EnvScope(variables={"MAILTO": "ops"})
+    jobs = [
+        {
+            "id": 0,
+            "command": "echo caf\udce9",
+            "schedule": "0 * * * *",
+            "comment": "",
+            "enabled": True,
+            "valid": True,
+            "env": env,
+            "source": source,
+            "user": "alice",
+            "host": None,
+        }
+    ]
+    lint = {("0 * * * *", "echo caf\udce9", "ops"): (("rule", "warning", "text"),)}
+    assert cache.save(source, "abc", CONTENT, jobs, lint, {"0 * * * *": "0 * * * *"})
+    return jobs, lint
+
+
+def test_round_trips_the_state(tmp_path):
+    cache = StartupCache(str(tmp_path / "startup"))
+    jobs, lint = _save(cache)
+    cached = cache.load(SOURCE)
+    assert cached.fingerprint == "abc"
+    assert cached.content == CONTENT
+    assert cached.jobs == jobs
+    assert cached.lint == lint
+    assert cached.schedules == {"0 * * * *": "0 * * * *"}
+    assert cache.load("tabfile:/srv/other") is None
+
+
+def test_cache_is_private(tmp_path):
+    directory = tmp_path / "startup"
+    cache = StartupCache(str(directory))
+    _save(cache)
+    assert directory.stat().st_mode & 0o777 == 0o700
+    for path in directory.iterdir():
+        assert path.stat().st_mode & 0o777 == 0o600
+
+
+def test_ignores_every_truncation(tmp_path):
+    cache = StartupCache(str(tmp_path / "startup"))
+    _save(cache)
+    path = cache.path(SOURCE)
+    with open(path, "rb") as fh:
+        data = fh.read()
+    for size in range(len(data)):
+        with open(path, "wb") as fh:
+            fh.write(data[:size])
+        assert cache.load(SOURCE) is None, size
+
+
+@pytest.mark.parametrize("position", [0, 10, -1, -20])
+def test_ignores_flipped_bytes(tmp_path, position):
+    cache = StartupCache(str(tmp_path / "startup"))
+    _save(cache)
+    path = cache.path(SOURCE)
+    with open(path, "rb") as fh:
+        data = bytearray(fh.read())
+    data[position] ^= 0x20
+    with open(path, "wb") as fh:
+        fh.write(data)
+    assert cache.load(SOURCE) is None
+
+
+@pytest.mark.parametrize(
+    "data",
+    [b"", b"\xff\xfe\n", b"[]\n{}", b'{"format": "cron_gui-startup"}\n{}'],
+)
+def test_ignores_garbage(tmp_path, data):
+    cache = StartupCache(str(tmp_path / "startup"))
+    (tmp_path / "startup").mkdir()
+    with open(cache.path(SOURCE), "wb") as fh:
+        fh.write(data)
+    assert cache.load(SOURCE) is None
+
+
+def test_ignores_a_valid_file_of_unexpected_shape(tmp_path):
+    cache = StartupCache(str(tmp_path / "startup"))
+    (tmp_path / "startup").mkdir()
+    body = json.dumps({"source": SOURCE, "jobs": [[1, 2]]}).encode()
+    header = {
+        "format": "cron_gui-startup",
+        "version": startup_cache.CACHE_VERSION,
+        "checksum": startup_cache._checksum(body),
+    }
+    with open(cache.path(SOURCE), "wb") as fh:
+        fh.write(json.dumps(header).encode() + b"\n" + body)
+    assert cache.load(SOURCE) is None
+
+
+def test_ignores_other_versions(tmp_path, monkeypatch):
+    cache = StartupCache(str(tmp_path / "startup"))
+    _save(cache)
+    monkeypatch.setattr(startup_cache, "CACHE_VERSION", startup_cache.CACHE_VERSION + 1)
+    assert cache.load(SOURCE) is None
+
+
+def test_drops_old_lint_findings(tmp_path, monkeypatch):
+    cache = StartupCache(str(tmp_path / "startup"))
+    _save(cache)
+    later = time.time() + startup_cache.LINT_MAX_AGE + 60
+    monkeypatch.setattr(startup_cache.time, "time", lambda: later)
+    cached = cache.load(SOURCE)
+    assert cached.lint == {}
+    assert cached.content == CONTENT